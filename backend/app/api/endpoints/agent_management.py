@@ -8,6 +8,7 @@ from datetime import datetime
 from app.mcp_service.components.agent_registry import agent_registry
 from app.mcp_service.data_service import DataService
 from app.config.config import Config
+from app.services.anomaly_test_jobs import AnomalyTestJobManager
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +72,8 @@ class AnomalyTestRequest(BaseModel):
     days_back: int = Field(ge=1, le=30, description="Number of days to look back (1-30)")
     start_date: Optional[str] = Field(None, description="Start date (YYYY-MM-DD). If not provided, uses days_back from current date")
     end_date: Optional[str] = Field(None, description="End date (YYYY-MM-DD). If not provided, uses current date")
+    chunk_hours: float = Field(6, gt=0, le=168, description="Hours of logs analysed per chunk")
+    store_anomalies: bool = Field(False, description="Store detected anomalies (backfill) instead of only reporting them")
 
 class AnomalyTestResponse(BaseModel):
     test_id: str
@@ -84,6 +87,7 @@ class AnomalyTestResponse(BaseModel):
     test_duration: float
     results: List[Dict[str, Any]]
     errors: List[str] = []
+    progress: Optional[Dict[str, Any]] = None
 
 @router.get("", response_model=List[AgentResponse])
 async def list_agents():
@@ -1198,20 +1202,46 @@ def _validate_agent_config(config: Dict[str, Any]) -> Dict[str, Any]:
         'warnings': warnings
     }
 
+_job_manager: Optional[AnomalyTestJobManager] = None
+_test_data_service: Optional[DataService] = None
+
+def get_job_manager() -> AnomalyTestJobManager:
+    """Get the anomaly test job manager, creating it on first use."""
+    global _job_manager
+    if _job_manager is None:
+        config = Config()
+        redis_client = agent_registry.redis_client or DataService(config).redis_client
+        _job_manager = AnomalyTestJobManager(
+            redis_client,
+            max_jobs=config.ANOMALY_TEST_MAX_JOBS,
+            chunk_concurrency=config.ANOMALY_TEST_CHUNK_CONCURRENCY,
+            process_workers=config.ANOMALY_TEST_PROCESS_WORKERS
+        )
+    return _job_manager
+
+async def shutdown_job_manager():
+    """Cancel running anomaly tests and stop their worker processes."""
+    if _job_manager is not None:
+        await _job_manager.shutdown()
+
+async def _get_test_data_service() -> DataService:
+    """Data service for agents created only to be tested."""
+    global _test_data_service
+    if _test_data_service is None:
+        data_service = DataService(Config())
+        await data_service.start()
+        _test_data_service = data_service
+    return _test_data_service
+
 @router.post("/anomaly-test", response_model=AnomalyTestResponse)
 async def run_anomaly_test(request: AnomalyTestRequest):
-    """Run an anomaly detection test on historical data for a specific agent."""
+    """Queue an anomaly detection test (or backfill) on historical data for a specific agent.
+    
+    The test runs in the background in time-window chunks; poll
+    GET /anomaly-test/{test_id} for progress and results.
+    """
     try:
-        from datetime import datetime, timedelta
-        import uuid
-        
-        # Create data service for testing
-        from app.config.config import Config
-        config = Config()
-        data_service = DataService(config)
-        
-        # Initialize the data service
-        await data_service.start()
+        from datetime import timedelta
         
         # Validate agent exists
         agent = agent_registry.get_agent(request.agent_id)
@@ -1222,7 +1252,7 @@ async def run_anomaly_test(request: AnomalyTestRequest):
                 raise HTTPException(status_code=404, detail=f"Agent {request.agent_id} not found")
             
             # Create the agent for testing
-            agent = agent_registry.create_agent(request.agent_id, data_service)
+            agent = agent_registry.create_agent(request.agent_id, await _get_test_data_service())
             if not agent:
                 raise HTTPException(status_code=500, detail=f"Failed to create agent {request.agent_id}")
         
@@ -1246,11 +1276,6 @@ async def run_anomaly_test(request: AnomalyTestRequest):
         if start_time >= end_time:
             raise HTTPException(status_code=400, detail="Start time must be before end time")
         
-        # Generate test ID
-        test_id = str(uuid.uuid4())
-        
-        logger.info(f"Starting anomaly test {test_id} for agent {request.agent_id} from {start_time} to {end_time}")
-        
         # Get historical logs for the agent's process filters
         process_filters = getattr(agent, 'process_filters', None)
         if not process_filters:
@@ -1258,115 +1283,36 @@ async def run_anomaly_test(request: AnomalyTestRequest):
             agent_config = agent_registry.get_agent_config(request.agent_id)
             process_filters = agent_config.get('process_filters', []) if agent_config else None
         
-        # Handle empty process filters (like LogLevelAgent)
-        if not process_filters or len(process_filters) == 0:
-            # For agents with no process filters, get all logs
-            logs = await data_service.get_logs_by_program(
-                start_time=start_time,
-                end_time=end_time,
-                programs=None  # Get all programs
-            )
-        else:
-            # Get logs from the specified time range for specific programs
-            logs = await data_service.get_logs_by_program(
-                start_time=start_time,
-                end_time=end_time,
-                programs=process_filters
-            )
-        
-        logger.info(f"Retrieved {len(logs)} logs for anomaly test")
-        
-        # Run the agent's analysis on the historical data
-        test_start = datetime.now()
-        anomalies_detected = []
-        
-        try:
-            # Temporarily modify agent's lookback to cover the entire time range
-            original_lookback = getattr(agent, 'lookback_minutes', 5)
-            
-            # Run analysis in chunks to avoid memory issues
-            chunk_size = 1000  # Process 1000 logs at a time
-            total_anomalies = 0
-            analysis_errors = []
-            
-            for i in range(0, len(logs), chunk_size):
-                chunk = logs[i:i + chunk_size]
-                
-                # Run analysis on this chunk
-                if hasattr(agent, '_perform_analysis'):
-                    try:
-                        await agent._perform_analysis(chunk)
-                        
-                        # For rule-based agents, count potential anomalies
-                        if hasattr(agent, 'agent_type') and agent.agent_type == 'rule_based':
-                            chunk_anomalies = len([log for log in chunk if log.get('log_level', '').lower() in ['error', 'critical']])
-                            total_anomalies += chunk_anomalies
-                            
-                            # Add to results
-                            for log in chunk:
-                                if log.get('log_level', '').lower() in ['error', 'critical']:
-                                    anomalies_detected.append({
-                                        'timestamp': log.get('timestamp', ''),
-                                        'type': f"{log.get('log_level', 'unknown')}_log",
-                                        'severity': 3 if log.get('log_level') == 'error' else 4,
-                                        'description': log.get('message', ''),
-                                        'source_log': log
-                                    })
-                    except Exception as e:
-                        analysis_errors.append(f"Chunk {i//chunk_size + 1}: {str(e)}")
-                        logger.warning(f"Error analyzing chunk {i//chunk_size + 1}: {e}")
-                        continue
-            
-            test_duration = (datetime.now() - test_start).total_seconds()
-            
-            # Determine status based on errors
-            if analysis_errors:
-                status = "completed_with_errors"
-                logger.warning(f"Anomaly test completed with {len(analysis_errors)} errors: {total_anomalies} anomalies detected in {test_duration:.2f}s")
-            else:
-                status = "completed"
-                logger.info(f"Anomaly test completed: {total_anomalies} anomalies detected in {test_duration:.2f}s")
-            
-            return AnomalyTestResponse(
-                test_id=test_id,
-                agent_id=request.agent_id,
-                agent_name=getattr(agent, 'agent_name', request.agent_id),
-                status=status,
-                start_time=start_time.isoformat(),
-                end_time=end_time.isoformat(),
-                logs_processed=len(logs),
-                anomalies_detected=total_anomalies,
-                test_duration=test_duration,
-                results=anomalies_detected,
-                errors=analysis_errors
-            )
-            
-        except Exception as e:
-            test_duration = (datetime.now() - test_start).total_seconds()
-            logger.error(f"Error during anomaly test: {e}")
-            
-            return AnomalyTestResponse(
-                test_id=test_id,
-                agent_id=request.agent_id,
-                agent_name=getattr(agent, 'agent_name', request.agent_id),
-                status="error",
-                start_time=start_time.isoformat(),
-                end_time=end_time.isoformat(),
-                logs_processed=len(logs),
-                anomalies_detected=0,
-                test_duration=test_duration,
-                results=[],
-                errors=[f"Test failed: {str(e)}"]
-            )
-        finally:
-            # Clean up data service
-            try:
-                await data_service.stop()
-            except Exception as e:
-                logger.warning(f"Error stopping data service: {e}")
-        
+        # Agents with no process filters (like LogLevelAgent) analyse all programs
+        job = get_job_manager().submit(
+            agent,
+            start_time,
+            end_time,
+            programs=process_filters or None,
+            chunk_hours=request.chunk_hours,
+            store_anomalies=request.store_anomalies
+        )
+        logger.info(f"Queued anomaly test {job['test_id']} for agent {request.agent_id} from {start_time} to {end_time}")
+        return AnomalyTestResponse(**job)
+    
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error running anomaly test: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to run anomaly test: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to run anomaly test: {str(e)}")
+
+@router.get("/anomaly-test/{test_id}", response_model=AnomalyTestResponse)
+async def get_anomaly_test(test_id: str):
+    """Get the progress and results of an anomaly test."""
+    job = get_job_manager().get_job(test_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Anomaly test {test_id} not found")
+    return AnomalyTestResponse(**job)
+
+@router.post("/anomaly-test/{test_id}/cancel", response_model=AnomalyTestResponse)
+async def cancel_anomaly_test(test_id: str):
+    """Cancel a queued or running anomaly test."""
+    job = get_job_manager().cancel(test_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Anomaly test {test_id} not found")
+    return AnomalyTestResponse(**job)
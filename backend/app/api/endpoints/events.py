@@ -0,0 +1,50 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import asyncio
+import logging
+
+from app.services.event_bus import event_bus, format_sse
+
+router = APIRouter(tags=["events"])
+
+logger = logging.getLogger(__name__)
+
+# Comment lines keep proxies from closing idle streams
+KEEPALIVE_SECONDS = 15
+
+
+@router.get("/events")
+async def stream_events(
+    request: Request,
+    types: Optional[str] = Query(None, description="Comma-separated event types (default: all)")
+):
+    """Server-sent event stream of agent, anomaly, model, export and server status changes.
+
+    Refused (503) and ended while the server has no event subscription, so
+    clients keep polling instead of waiting on a stream that carries nothing.
+    """
+    if not event_bus.connected:
+        raise HTTPException(status_code=503, detail="Event stream unavailable")
+    wanted = set(types.split(',')) if types else None
+
+    async def stream():
+        with event_bus.subscription() as queue:
+            # Clients reconnect after 5s if the stream drops
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    return
+                if wanted is None or event.get('type') in wanted:
+                    yield format_sse(event)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Query, Request
 from typing import List, Optional
 from datetime import datetime
 import uuid
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 import os
 import logging
 
@@ -10,6 +10,9 @@ from app.models.export import ExportConfig, ExportMetadata
 from app.services.export.data_exporter import DataExporter
 from app.services.export.status_manager import ExportStatusManager
 from app.services.export.cleanup_service import ExportCleanupService
+from app.services.export.download import (
+    choose_variant, file_etag, if_range_matches, last_modified, parse_range, read_file_range, tail_lines
+)
 
 router = APIRouter(prefix="/export", tags=["export"])
 
@@ -78,7 +81,8 @@ async def create_export(
             end_date=config.end_date,
             programs=config.processes,
             format=config.output_format,
-            progress_callback=lambda eid, progress, message: _update_export_progress(eid, progress, message)
+            progress_callback=lambda eid, progress, message: _update_export_progress(eid, progress, message),
+            config=config
         )
         
         # Return initial metadata
@@ -94,22 +98,93 @@ async def create_export(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/download/{export_id}", summary="Download export file by export_id")
-async def download_export_file(export_id: str):
+async def download_export_file(
+    export_id: str,
+    request: Request,
+    data_type: Optional[str] = None,
+    follow: bool = Query(False, description="Stream a JSONL export while it is being written"),
+    offset: int = Query(0, ge=0, description="Byte offset to resume following from")
+):
     """
     Download the export file for a given export_id.
+    
+    Exports of several data types have one file per type; data_type picks
+    one (default: the first requested type). Finished files support Range
+    requests (resumable and parallel downloads), ETag / If-None-Match /
+    If-Range, and are served from a pre-compressed variant when the client
+    accepts its Content-Encoding. With follow=true a JSONL export is
+    streamed line by line from offset until the export finishes.
     """
     # Look up export metadata (assume ExportStatusManager or similar is used)
     export_metadata = ExportStatusManager.get_export_metadata(export_id)
     if not export_metadata:
         raise HTTPException(status_code=404, detail="Export not found")
-    file_path = export_metadata.get("file_path")
+    data_type = data_type or (export_metadata.get("data_types") or [None])[0]
+    if data_type and export_metadata.get("files"):
+        file_path = export_metadata["files"].get(data_type)
+    else:
+        file_path = export_metadata.get("file_path")
+    
+    if follow:
+        return _follow_export(export_id, file_path, offset)
+    
     if not file_path or not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="Export file not found")
+    if export_metadata.get("status") == "running":
+        raise HTTPException(status_code=409, detail="Export is still running; use follow=true for JSONL exports")
+    
     filename = os.path.basename(file_path)
-    return FileResponse(
-        path=file_path,
-        filename=filename,
-        media_type="application/octet-stream"
+    variants = (export_metadata.get("variants") or {}).get(data_type)
+    path, encoding = choose_variant(file_path, variants, request.headers.get("accept-encoding"))
+    etag = file_etag(path, encoding)
+    size = os.path.getsize(path)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Last-Modified": last_modified(path),
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Vary": "Accept-Encoding"
+    }
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    
+    byte_range = None
+    if if_range_matches(request.headers.get("if-range"), etag, path):
+        try:
+            byte_range = parse_range(request.headers.get("range"), size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        (start, end), status_code = byte_range, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        read_file_range(path, start, end),
+        status_code=status_code,
+        media_type="application/octet-stream",
+        headers=headers
+    )
+
+def _follow_export(export_id: str, file_path: Optional[str], offset: int) -> StreamingResponse:
+    """Stream an in-progress JSONL export until it completes."""
+    if not file_path or not file_path.endswith(".jsonl"):
+        raise HTTPException(status_code=400, detail="Only uncompressed JSONL exports can be followed")
+    
+    def is_finished() -> bool:
+        metadata = ExportStatusManager.get_export_metadata(export_id)
+        return metadata is None or metadata.get("status") in ("completed", "failed")
+    
+    return StreamingResponse(
+        tail_lines(file_path, is_finished, offset=offset),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 @router.get("/")
@@ -171,14 +246,19 @@ async def delete_export(export_id: str):
         if not export_metadata:
             raise HTTPException(status_code=404, detail="Export not found")
         
-        # Delete the export file if it exists
-        file_path = export_metadata.get("file_path")
-        if file_path and os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-                logger.info(f"Deleted export file: {file_path}")
-            except Exception as e:
-                logger.warning(f"Failed to delete export file {file_path}: {e}")
+        # Delete the export files (one per data type) if they exist
+        file_paths = set((export_metadata.get("files") or {}).values())
+        if export_metadata.get("file_path"):
+            file_paths.add(export_metadata["file_path"])
+        for variants in (export_metadata.get("variants") or {}).values():
+            file_paths.update(variants.values())
+        for file_path in file_paths:
+            if os.path.exists(file_path):
+                try:
+                    os.remove(file_path)
+                    logger.info(f"Deleted export file: {file_path}")
+                except Exception as e:
+                    logger.warning(f"Failed to delete export file {file_path}: {e}")
         
         # Delete metadata from Redis
         ExportStatusManager.delete_export_metadata(export_id)
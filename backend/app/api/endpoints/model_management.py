@@ -2,8 +2,6 @@ from fastapi import APIRouter, HTTPException, BackgroundTasks, File, UploadFile
 from typing import List, Dict, Any, Optional
 import logging
 from datetime import datetime
-import tempfile
-import os
 
 from ...services.model_transfer_service import ModelTransferService
 from ...services.model_validator import ModelValidator
@@ -84,25 +82,20 @@ async def import_model_package(
     file: UploadFile = File(...),
     validate: bool = True
 ) -> Dict[str, Any]:
-    """Import a model package from a zip file."""
+    """Import a model package from a zip file.
+    
+    The package is read directly from the spooled upload and each member is
+    hashed while it is decompressed, so the bytes are never buffered in memory
+    or copied to a second temporary file.
+    """
     try:
         config = ModelConfig()
-        model_manager = ModelManager.get_instance(config)
-        
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-        
-        try:
-            # Import the model
-            result = await model_manager.import_model_from_training_service(temp_file_path, validate)
-            return result
-        finally:
-            # Clean up temporary file
-            os.unlink(temp_file_path)
-            
+        model_loader = ModelLoader(config)
+        result = await model_loader.process_model_package(file.file, validate, filename=file.filename)
+        return result
+    except ValueError as e:
+        logger.error(f"Rejected model package: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error importing model package: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -147,7 +140,7 @@ async def validate_model(version: str) -> Dict[str, Any]:
         if not model_info:
             raise HTTPException(status_code=404, detail="Model not found")
         
-        validation_result = await validator.validate_model(model_info['path'])
+        validation_result = await validator.validate_model_quality(model_info['path'])
         return validation_result
         
     except Exception as e:
@@ -8,14 +8,15 @@ logger = logging.getLogger(__name__)
 class BaseMonitor:
     """Base class for all monitoring components."""
     
-    def __init__(self, name: str):
+    def __init__(self, name: str, registry: Optional[CollectorRegistry] = None):
         """Initialize the base monitor.
         
         Args:
             name: Name of the monitor for logging and metrics
+            registry: Registry to register metrics on (default: a private registry)
         """
         self.name = name
-        self.registry = CollectorRegistry()
+        self.registry = registry if registry is not None else CollectorRegistry()
         self.metrics: Dict[str, Any] = {}
         self._last_check = datetime.utcnow()
     
@@ -66,7 +67,7 @@ class BaseMonitor:
         """
         metric_name = f"{self.name}_{name}"
         if labels:
-            return Histogram(metric_name, description, buckets=buckets, labels=labels, registry=self.registry)
+            return Histogram(metric_name, description, labels, buckets=buckets, registry=self.registry)
         return Histogram(metric_name, description, buckets=buckets, registry=self.registry)
     
     def _create_alert(self, alert_type: str, severity: str, message: str) -> Dict[str, Any]:
@@ -0,0 +1,219 @@
+import time
+import logging
+from collections import deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class FixedBinHistogram:
+    """Mergeable histogram over fixed bin edges.
+
+    Edges are taken from quantiles of a reference sample, so every bin holds
+    roughly the same share of the reference. Values below the first edge or
+    above the last fall into the open outer bins. Two histograms with the same
+    edges can be merged by adding their counts.
+    """
+
+    def __init__(self, edges: np.ndarray, counts: Optional[np.ndarray] = None):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = (
+            np.zeros(len(self.edges) + 1, dtype=np.int64)
+            if counts is None else np.asarray(counts, dtype=np.int64)
+        )
+
+    @classmethod
+    def from_reference(cls, values: np.ndarray, bins: int = 20) -> 'FixedBinHistogram':
+        """Build edges from the quantiles of values and count them."""
+        values = _finite(values)
+        if len(values) == 0:
+            raise ValueError("Cannot build a histogram from an empty reference")
+        quantiles = np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1])
+        histogram = cls(np.unique(quantiles))
+        histogram.update(values)
+        return histogram
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def bin_counts(self, values: np.ndarray) -> np.ndarray:
+        """Count values into this histogram's bins without updating it."""
+        values = _finite(values)
+        indices = np.searchsorted(self.edges, values, side='right')
+        return np.bincount(indices, minlength=len(self.counts)).astype(np.int64)
+
+    def update(self, values: np.ndarray) -> None:
+        """Add values to the histogram."""
+        self.counts += self.bin_counts(values)
+
+    def empty_like(self) -> 'FixedBinHistogram':
+        """An empty histogram with the same edges."""
+        return FixedBinHistogram(self.edges)
+
+    def merge(self, other: 'FixedBinHistogram') -> 'FixedBinHistogram':
+        """Return the sum of two histograms with identical edges."""
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge histograms with different bin edges")
+        return FixedBinHistogram(self.edges, self.counts + other.counts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'edges': self.edges.tolist(), 'counts': self.counts.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'FixedBinHistogram':
+        return cls(np.array(data['edges'], dtype=float), np.array(data['counts'], dtype=np.int64))
+
+
+class SlidingWindowHistogram:
+    """Histogram of the values seen during the last window_seconds.
+
+    The window is split into time buckets; expired buckets are subtracted
+    from a running total, so both updates and reads cost O(bins).
+    """
+
+    def __init__(self, edges: np.ndarray, window_seconds: float = 3600, num_buckets: int = 12):
+        self.edges = np.asarray(edges, dtype=float)
+        self.bucket_seconds = window_seconds / num_buckets
+        self.num_buckets = num_buckets
+        self._buckets: deque = deque()
+        self._totals = np.zeros(len(self.edges) + 1, dtype=np.int64)
+
+    def _expire(self, bucket_id: int) -> None:
+        while self._buckets and self._buckets[0][0] <= bucket_id - self.num_buckets:
+            _, counts = self._buckets.popleft()
+            self._totals -= counts
+
+    def update(self, histogram_counts: np.ndarray, now: Optional[float] = None) -> None:
+        """Add pre-binned counts observed at time now."""
+        bucket_id = int((time.time() if now is None else now) // self.bucket_seconds)
+        self._expire(bucket_id)
+        if not self._buckets or self._buckets[-1][0] != bucket_id:
+            self._buckets.append((bucket_id, np.zeros_like(self._totals)))
+        self._buckets[-1][1][:] += histogram_counts
+        self._totals += histogram_counts
+
+    def histogram(self, now: Optional[float] = None) -> FixedBinHistogram:
+        """Counts of the current window."""
+        self._expire(int((time.time() if now is None else now) // self.bucket_seconds))
+        return FixedBinHistogram(self.edges, self._totals.copy())
+
+
+def population_stability_index(reference: FixedBinHistogram, current: FixedBinHistogram,
+                               epsilon: float = 1e-4) -> float:
+    """Population stability index between two histograms with the same edges."""
+    if reference.total == 0 or current.total == 0:
+        return 0.0
+    expected = np.clip(reference.counts / reference.total, epsilon, None)
+    actual = np.clip(current.counts / current.total, epsilon, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def ks_statistic(reference: FixedBinHistogram, current: FixedBinHistogram) -> float:
+    """Kolmogorov-Smirnov distance evaluated at the bin edges."""
+    if reference.total == 0 or current.total == 0:
+        return 0.0
+    reference_cdf = np.cumsum(reference.counts) / reference.total
+    current_cdf = np.cumsum(current.counts) / current.total
+    return float(np.max(np.abs(reference_cdf - current_cdf)))
+
+
+def _finite(values: Any) -> np.ndarray:
+    values = np.asarray(values, dtype=float).ravel()
+    return values[np.isfinite(values)]
+
+
+class DriftDetector:
+    """Streaming drift detection against a frozen reference.
+
+    Each feature and the anomaly score get a reference histogram, frozen at
+    training time (or from the first warmup_size observations when no
+    training reference is available), and a sliding-window histogram of
+    recent traffic over the same edges. Drift checks compare the two in
+    O(bins) regardless of how much traffic has been seen.
+    """
+
+    SCORES = '__scores__'
+
+    def __init__(self, bins: int = 20, window_seconds: float = 3600, num_buckets: int = 12,
+                 warmup_size: int = 1000):
+        self.bins = bins
+        self.window_seconds = window_seconds
+        self.num_buckets = num_buckets
+        self.warmup_size = warmup_size
+        self.reference: Dict[str, FixedBinHistogram] = {}
+        self.windows: Dict[str, SlidingWindowHistogram] = {}
+        self._warmup: Dict[str, list] = {}
+        self._warmup_count = 0
+
+    @property
+    def has_reference(self) -> bool:
+        return bool(self.reference)
+
+    def set_reference(self, features: Dict[str, np.ndarray], scores: Optional[np.ndarray] = None) -> None:
+        """Freeze the reference distributions, e.g. from the training set."""
+        columns = dict(features)
+        if scores is not None:
+            columns[self.SCORES] = scores
+
+        self.reference = {}
+        for name, values in columns.items():
+            try:
+                self.reference[name] = FixedBinHistogram.from_reference(values, self.bins)
+            except ValueError:
+                logger.debug(f"Skipping drift reference for {name}: no finite values")
+        self._reset_windows()
+        self._warmup = {}
+        self._warmup_count = 0
+
+    def load_reference(self, data: Dict[str, Dict[str, Any]]) -> None:
+        """Load reference histograms produced by reference_to_dict."""
+        self.reference = {name: FixedBinHistogram.from_dict(h) for name, h in data.items()}
+        self._reset_windows()
+
+    def reference_to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Serialise the reference histograms (e.g. into model metadata)."""
+        return {name: histogram.to_dict() for name, histogram in self.reference.items()}
+
+    def _reset_windows(self) -> None:
+        self.windows = {
+            name: SlidingWindowHistogram(histogram.edges, self.window_seconds, self.num_buckets)
+            for name, histogram in self.reference.items()
+        }
+
+    def update(self, features: Dict[str, np.ndarray], scores: Optional[np.ndarray] = None,
+               now: Optional[float] = None) -> None:
+        """Add a batch of observations."""
+        columns = dict(features)
+        if scores is not None:
+            columns[self.SCORES] = scores
+
+        if not self.reference:
+            # Collect a bounded warm-up sample, then freeze it as the reference
+            for name, values in columns.items():
+                self._warmup.setdefault(name, []).append(_finite(values))
+            self._warmup_count += max((len(np.atleast_1d(v)) for v in columns.values()), default=0)
+            if self._warmup_count >= self.warmup_size:
+                warmup = {name: np.concatenate(parts) for name, parts in self._warmup.items()}
+                warmup_scores = warmup.pop(self.SCORES, None)
+                self.set_reference(warmup, warmup_scores)
+            return
+
+        for name, values in columns.items():
+            window = self.windows.get(name)
+            if window is not None:
+                window.update(self.reference[name].bin_counts(values), now)
+
+    def compute(self, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """PSI and KS of the current window against the reference, per column."""
+        results = {}
+        for name, reference in self.reference.items():
+            current = self.windows[name].histogram(now)
+            results[name] = {
+                'psi': population_stability_index(reference, current),
+                'ks': ks_statistic(reference, current),
+                'count': current.total
+            }
+        return results
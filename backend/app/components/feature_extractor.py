@@ -4,10 +4,28 @@ from collections import defaultdict
 import logging
 from datetime import datetime
 
+from app.components.pipeline_monitor import pipeline_monitor
+from app.components.hyperloglog import HyperLogLog
+from app.config.config import config
+
+CARDINALITY_MODES = ('exact', 'hll')
+
 class FeatureExtractor:
-    def __init__(self):
-        """Initialize the feature extractor."""
+    def __init__(self, cardinality: str = None, hll_precision: int = None):
+        """
+        Initialize the feature extractor.
+        
+        Args:
+            cardinality: How unique_*_count features are counted: 'exact' (sets)
+                or 'hll' (HyperLogLog sketches, a few KB per feature however
+                many distinct values arrive). Defaults to FEATURE_CARDINALITY.
+            hll_precision: HyperLogLog precision (4-16); defaults to FEATURE_HLL_PRECISION
+        """
         self.logger = logging.getLogger("FeatureExtractor")
+        self.cardinality = cardinality or getattr(config, 'FEATURE_CARDINALITY', 'exact')
+        self.hll_precision = hll_precision or getattr(config, 'FEATURE_HLL_PRECISION', 12)
+        if self.cardinality not in CARDINALITY_MODES:
+            raise ValueError(f"Unknown cardinality mode '{self.cardinality}', expected one of {CARDINALITY_MODES}")
         
         # Regular expressions for log parsing
         self.patterns = {
@@ -40,14 +58,14 @@ class FeatureExtractor:
             if not logs:
                 return self._get_empty_features()
             
-            # Determine log type based on program names
-            programs = set(log.get('program', '').lower() for log in logs)
+            # Determine log type based on program names; log_entries rows carry process_name
+            kind = self.detect_kind(log.get('program') or log.get('process_name') or '' for log in logs)
             
-            if any(prog in ['hostapd', 'wpa_supplicant'] for prog in programs):
+            if kind == 'wifi':
                 return self.extract_wifi_features(logs)
-            elif any(prog in ['named', 'dnsmasq', 'systemd-resolved'] for prog in programs):
+            elif kind == 'dns':
                 return self.extract_dns_features(logs)
-            elif any(prog in ['iptables', 'ufw', 'firewalld'] for prog in programs):
+            elif kind == 'firewall':
                 return self.extract_firewall_features(logs)
             else:
                 # Default to generic features
@@ -57,6 +75,18 @@ class FeatureExtractor:
             self.logger.error(f"Error in extract_features: {e}")
             return self._get_empty_features()
     
+    @staticmethod
+    def detect_kind(programs) -> str:
+        """Feature family for a batch: 'wifi', 'dns', 'firewall' or 'generic'."""
+        programs = set(program.lower() for program in programs)
+        if any(prog in ['hostapd', 'wpa_supplicant'] for prog in programs):
+            return 'wifi'
+        elif any(prog in ['named', 'dnsmasq', 'systemd-resolved'] for prog in programs):
+            return 'dns'
+        elif any(prog in ['iptables', 'ufw', 'firewalld'] for prog in programs):
+            return 'firewall'
+        return 'generic'
+    
     def _get_empty_features(self) -> Dict[str, Any]:
         """Return empty feature set."""
         return {
@@ -71,6 +101,7 @@ class FeatureExtractor:
             'timestamp': datetime.now().isoformat()
         }
 
+    @pipeline_monitor.timed('featurize')
     def extract_wifi_features(self, logs: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Extract features from WiFi logs.
@@ -86,8 +117,8 @@ class FeatureExtractor:
                 'auth_failures': 0,
                 'deauth_count': 0,
                 'beacon_count': 0,
-                'unique_macs': set(),
-                'unique_ssids': set(),
+                'unique_macs': self._distinct_counter(),
+                'unique_ssids': self._distinct_counter(),
                 'reason_codes': defaultdict(int),
                 'status_codes': defaultdict(int),
                 'program_counts': defaultdict(int),
@@ -96,13 +127,13 @@ class FeatureExtractor:
             
             for log in logs:
                 message = log.get('message', '')
-                program = log.get('program', '')
+                program = log.get('program') or log.get('process_name', '')
                 
                 # Count program occurrences
                 features['program_counts'][program] += 1
                 
-                # Extract MAC addresses
-                macs = self.patterns['mac_address'].findall(message)
+                # Extract MAC addresses (findall would return the groups, not the address)
+                macs = [match.group(0) for match in self.patterns['mac_address'].finditer(message)]
                 features['unique_macs'].update(macs)
                 
                 # Extract SSIDs
@@ -152,6 +183,7 @@ class FeatureExtractor:
             self.logger.error(f"Error extracting WiFi features: {e}")
             raise
 
+    @pipeline_monitor.timed('featurize')
     def extract_dns_features(self, logs: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Extract features from DNS logs.
@@ -167,7 +199,7 @@ class FeatureExtractor:
                 'query_count': 0,
                 'response_count': 0,
                 'error_count': 0,
-                'unique_domains': set(),
+                'unique_domains': self._distinct_counter(),
                 'query_types': defaultdict(int),
                 'response_times': [],
                 'program_counts': defaultdict(int),
@@ -176,7 +208,7 @@ class FeatureExtractor:
             
             for log in logs:
                 message = log.get('message', '').lower()
-                program = log.get('program', '')
+                program = log.get('program') or log.get('process_name', '')
                 
                 # Count program occurrences
                 features['program_counts'][program] += 1
@@ -231,6 +263,7 @@ class FeatureExtractor:
             self.logger.error(f"Error extracting DNS features: {e}")
             raise
 
+    @pipeline_monitor.timed('featurize')
     def extract_firewall_features(self, logs: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Extract features from firewall logs.
@@ -245,8 +278,8 @@ class FeatureExtractor:
             features = {
                 'blocked_connections': 0,
                 'allowed_connections': 0,
-                'unique_ips': set(),
-                'unique_ports': set(),
+                'unique_ips': self._distinct_counter(),
+                'unique_ports': self._distinct_counter(),
                 'protocols': defaultdict(int),
                 'program_counts': defaultdict(int),
                 'timestamp': datetime.now().isoformat()
@@ -254,7 +287,7 @@ class FeatureExtractor:
             
             for log in logs:
                 message = log.get('message', '').lower()
-                program = log.get('program', '')
+                program = log.get('program') or log.get('process_name', '')
                 
                 # Count program occurrences
                 features['program_counts'][program] += 1
@@ -297,6 +330,7 @@ class FeatureExtractor:
             self.logger.error(f"Error extracting firewall features: {e}")
             raise
 
+    @pipeline_monitor.timed('featurize')
     def extract_generic_features(self, logs: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Extract generic features from any type of logs.
@@ -312,20 +346,26 @@ class FeatureExtractor:
                 'log_count': len(logs),
                 'error_count': 0,
                 'warning_count': 0,
-                'unique_programs': set(),
-                'unique_hosts': set(),
+                'unique_programs': self._distinct_counter(),
+                'unique_hosts': self._distinct_counter(),
                 'program_counts': defaultdict(int),
+                'template_counts': defaultdict(int),
                 'timestamp': datetime.now().isoformat()
             }
             
             for log in logs:
                 message = log.get('message', '').lower()
-                program = log.get('program', '')
+                program = log.get('program') or log.get('process_name', '')
                 host = log.get('host', '')
                 
                 # Count program occurrences
                 features['program_counts'][program] += 1
                 
+                # Count mined log templates (set by the DataService)
+                template_id = log.get('template_id')
+                if template_id is not None:
+                    features['template_counts'][template_id] += 1
+                
                 # Count log levels
                 if any(term in message for term in ['error', 'critical', 'failed']):
                     features['error_count'] += 1
@@ -341,11 +381,13 @@ class FeatureExtractor:
             # Convert sets to counts
             features['unique_program_count'] = len(features['unique_programs'])
             features['unique_host_count'] = len(features['unique_hosts'])
+            features['unique_template_count'] = len(features['template_counts'])
             del features['unique_programs']
             del features['unique_hosts']
             
             # Convert defaultdicts to regular dicts
             features['program_counts'] = dict(features['program_counts'])
+            features['template_counts'] = dict(features['template_counts'])
             
             self.logger.debug(f"Extracted generic features: {features}")
             return features
@@ -354,6 +396,218 @@ class FeatureExtractor:
             self.logger.error(f"Error extracting generic features: {e}")
             raise
     
+    def _distinct_counter(self):
+        """A set, or a HyperLogLog sketch in 'hll' mode; both support add/update/len."""
+        if self.cardinality == 'hll':
+            return HyperLogLog(self.hll_precision)
+        return set()
+
+    def cardinality_sketches(self, logs: List[Dict[str, Any]]) -> Dict[str, HyperLogLog]:
+        """
+        HyperLogLog sketches of every distinct-value feature in a batch.
+        
+        Sketches of different windows or shards merge with HyperLogLog.merge
+        (or HyperLogLog.union) into the sketch of their combined logs.
+        
+        Args:
+            logs: List of log entries
+            
+        Returns:
+            dict: Sketch per feature ('macs', 'ssids', 'domains', 'ips',
+            'ports', 'programs', 'hosts'); features with no values are omitted
+        """
+        sketches = {}
+        for log in logs:
+            for name, values in self.observe_log(log)['distinct'].items():
+                sketch = sketches.get(name)
+                if sketch is None:
+                    sketch = sketches[name] = HyperLogLog(self.hll_precision)
+                sketch.update(values)
+        return sketches
+
+    def observe_log(self, log: Dict[str, Any], kind: str = None) -> Dict[str, Any]:
+        """
+        Per-row contribution of a log to the feature families, for rollups.
+        
+        Mirrors the per-row logic of the extract_*_features methods, so
+        summing observations gives the same counts as extracting from rows.
+        
+        Args:
+            log: Log entry
+            kind: Only observe this family ('wifi', 'dns', 'firewall' or
+                'generic'); all families when omitted
+            
+        Returns:
+            dict: 'counts' (scalar names, or (family, key) tuples for
+            breakdowns), 'distinct' (values per cardinality feature) and
+            'response_time' (or None)
+        """
+        raw_message = log.get('message') or ''
+        message = raw_message.lower()
+        program = log.get('program') or log.get('process_name') or ''
+        host = log.get('host') or ''
+        counts = defaultdict(int)
+        distinct = defaultdict(list)
+        response_time = None
+        
+        counts['log_count'] = 1
+        counts[('program', program)] = 1
+        
+        # WiFi patterns run on the original message, as in extract_wifi_features
+        if kind in (None, 'wifi'):
+            distinct['macs'] = [match.group(0) for match in self.patterns['mac_address'].finditer(raw_message)]
+            ssid_match = self.patterns['ssid'].search(raw_message)
+            if ssid_match:
+                distinct['ssids'].append(ssid_match.group(1))
+            if self.patterns['auth_failure'].search(raw_message):
+                counts['auth_failures'] += 1
+            if self.patterns['deauth'].search(raw_message):
+                counts['deauth_count'] += 1
+            if self.patterns['beacon'].search(raw_message):
+                counts['beacon_count'] += 1
+            reason_match = self.patterns['reason_code'].search(raw_message)
+            if reason_match:
+                counts[('reason_code', reason_match.group(1))] += 1
+            status_match = self.patterns['status_code'].search(raw_message)
+            if status_match:
+                counts[('status_code', status_match.group(1))] += 1
+        
+        if kind in (None, 'dns'):
+            if any(term in message for term in ['query', 'request']):
+                counts['query_count'] += 1
+                domain = self._extract_domain(message)
+                if domain:
+                    distinct['domains'].append(domain)
+                qtype = self._extract_query_type(message)
+                if qtype:
+                    counts[('query_type', qtype)] += 1
+            elif any(term in message for term in ['response', 'answer']):
+                counts['response_count'] += 1
+                response_time = self._extract_response_time(message)
+            elif any(term in message for term in ['error', 'failed', 'timeout']):
+                counts['dns_error_count'] += 1
+        
+        if kind in (None, 'firewall'):
+            if any(term in message for term in ['blocked', 'denied', 'drop']):
+                counts['blocked_connections'] += 1
+            elif any(term in message for term in ['allowed', 'accept']):
+                counts['allowed_connections'] += 1
+            distinct['ips'] = self._extract_ips(message)
+            distinct['ports'] = self._extract_ports(message)
+            protocol = self._extract_protocol(message)
+            if protocol:
+                counts[('protocol', protocol)] += 1
+        
+        if kind in (None, 'generic'):
+            if any(term in message for term in ['error', 'critical', 'failed']):
+                counts['error_count'] += 1
+            elif 'warning' in message:
+                counts['warning_count'] += 1
+            template_id = log.get('template_id')
+            if template_id is not None:
+                counts[('template', template_id)] += 1
+            if program:
+                distinct['programs'].append(program)
+            if host:
+                distinct['hosts'].append(host)
+        
+        return {
+            'counts': counts,
+            'distinct': {name: values for name, values in distinct.items() if values},
+            'response_time': response_time
+        }
+
+    def features_from_rollup(self, rollup, kind: str = None) -> Dict[str, Any]:
+        """
+        Build window features from an aggregated rollup bucket.
+        
+        Args:
+            rollup: RollupBucket summing the window (see LogRollup.window)
+            kind: 'wifi', 'dns', 'firewall' or 'generic'; detected from the
+                programs in the window like extract_features when omitted
+            
+        Returns:
+            dict: Features with the same keys as the matching extract_*_features
+        """
+        counts = rollup.counts
+        breakdown = rollup.breakdown
+        program_counts = breakdown('program')
+        if not program_counts:
+            return self._get_empty_features()
+        
+        if kind is None:
+            kind = self.detect_kind(program_counts)
+        
+        timestamp = datetime.now().isoformat()
+        if kind == 'wifi':
+            return {
+                'auth_failures': counts['auth_failures'],
+                'deauth_count': counts['deauth_count'],
+                'beacon_count': counts['beacon_count'],
+                'reason_codes': breakdown('reason_code'),
+                'status_codes': breakdown('status_code'),
+                'program_counts': program_counts,
+                'timestamp': timestamp,
+                'unique_mac_count': rollup.distinct('macs'),
+                'unique_ssid_count': rollup.distinct('ssids')
+            }
+        if kind == 'dns':
+            return {
+                'query_count': counts['query_count'],
+                'response_count': counts['response_count'],
+                'error_count': counts['dns_error_count'],
+                'query_types': breakdown('query_type'),
+                'program_counts': program_counts,
+                'timestamp': timestamp,
+                'unique_domain_count': rollup.distinct('domains'),
+                'avg_response_time': rollup.avg_response_time
+            }
+        if kind == 'firewall':
+            return {
+                'blocked_connections': counts['blocked_connections'],
+                'allowed_connections': counts['allowed_connections'],
+                'protocols': breakdown('protocol'),
+                'program_counts': program_counts,
+                'timestamp': timestamp,
+                'unique_ip_count': rollup.distinct('ips'),
+                'unique_port_count': rollup.distinct('ports')
+            }
+        template_counts = breakdown('template')
+        return {
+            'log_count': counts['log_count'],
+            'error_count': counts['error_count'],
+            'warning_count': counts['warning_count'],
+            'program_counts': program_counts,
+            'template_counts': template_counts,
+            'timestamp': timestamp,
+            'unique_program_count': rollup.distinct('programs'),
+            'unique_host_count': rollup.distinct('hosts'),
+            'unique_template_count': len(template_counts)
+        }
+
+    @pipeline_monitor.timed('featurize')
+    def extract_features_from_rollups(self, rollups, start_time: datetime, end_time: datetime,
+                                      programs: List[str] = None, devices: List[str] = None,
+                                      kind: str = None) -> Dict[str, Any]:
+        """
+        Build features for a time window by summing per-minute rollups.
+        
+        Costs O(minutes x devices x programs) in the window instead of
+        O(rows), so long lookbacks stay cheap.
+        
+        Args:
+            rollups: LogRollup maintained from incoming logs
+            start_time: Window start (inclusive)
+            end_time: Window end (exclusive)
+            programs: Program filters, matched like DataService filters
+            devices: Device ids to include (None for all)
+            kind: Feature family; detected from the programs when omitted
+            
+        Returns:
+            Dictionary of extracted features
+        """
+        return self.features_from_rollup(rollups.window(start_time, end_time, programs, devices), kind)
+
     def _extract_domain(self, message: str) -> str:
         """Extract domain name from log message."""
         match = self.patterns['domain'].search(message)
@@ -0,0 +1,139 @@
+import math
+import hashlib
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+MIN_PRECISION = 4
+MAX_PRECISION = 16
+_HASH_BITS = 64
+
+
+def _hash64(value: Any) -> int:
+    """Stable 64-bit hash (Python's hash() is salted per process)."""
+    data = value if isinstance(value, bytes) else str(value).encode('utf-8', 'surrogatepass')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    """Mergeable distinct-count sketch.
+
+    Uses ``2**precision`` registers, so memory is bounded however many
+    distinct values are added; the standard error is about
+    ``1.04 / sqrt(2**precision)`` (1.6% at the default precision of 12).
+    Small sketches keep only the registers they touched and switch to a
+    dense byte array once they touch more than 1/32 of them, so the many
+    near-empty sketches of per-minute rollups stay cheap.
+    """
+
+    __slots__ = ('precision', '_sparse', '_registers')
+
+    def __init__(self, precision: int = 12):
+        if not MIN_PRECISION <= precision <= MAX_PRECISION:
+            raise ValueError(f"HyperLogLog precision must be between {MIN_PRECISION} and {MAX_PRECISION}")
+        self.precision = precision
+        self._sparse: Optional[Dict[int, int]] = {}
+        # Dense registers are a bytearray: cheap per-item access, and numpy views for bulk math
+        self._registers: Optional[bytearray] = None
+
+    @property
+    def size(self) -> int:
+        """Number of registers."""
+        return 1 << self.precision
+
+    def _densify(self) -> bytearray:
+        if self._registers is None:
+            registers = bytearray(self.size)
+            for index, rank in self._sparse.items():
+                registers[index] = rank
+            self._registers = registers
+            self._sparse = None
+        return self._registers
+
+    def _update(self, index: int, rank: int) -> None:
+        if self._sparse is not None:
+            if rank > self._sparse.get(index, 0):
+                self._sparse[index] = rank
+                # A dict entry costs far more than the one byte a dense register does
+                if len(self._sparse) > self.size // 32:
+                    self._densify()
+        elif rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def add(self, value: Any) -> None:
+        """Add a value (anything with a stable str(), or bytes)."""
+        hashed = _hash64(value)
+        remaining_bits = _HASH_BITS - self.precision
+        remainder = hashed & ((1 << remaining_bits) - 1)
+        self._update(hashed >> remaining_bits, remaining_bits - remainder.bit_length() + 1)
+
+    def update(self, values: Iterable[Any]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """Fold another sketch of the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        if other._sparse is not None:
+            for index, rank in other._sparse.items():
+                self._update(index, rank)
+        else:
+            registers = np.frombuffer(self._densify(), dtype=np.uint8)
+            np.maximum(registers, np.frombuffer(other._registers, dtype=np.uint8), out=registers)
+        return self
+
+    @classmethod
+    def union(cls, sketches: Iterable['HyperLogLog'], precision: int = 12) -> 'HyperLogLog':
+        """A new sketch counting the union of several sketches."""
+        result = None
+        for sketch in sketches:
+            if result is None:
+                result = cls(sketch.precision)
+            result.merge(sketch)
+        return result if result is not None else cls(precision)
+
+    def copy(self) -> 'HyperLogLog':
+        return HyperLogLog(self.precision).merge(self)
+
+    def count(self) -> float:
+        """Estimated number of distinct values added."""
+        m = self.size
+        if self._sparse is not None:
+            zeros = m - len(self._sparse)
+            harmonic = zeros + sum(2.0 ** -rank for rank in self._sparse.values())
+        else:
+            registers = np.frombuffer(self._registers, dtype=np.uint8)
+            zeros = int(np.count_nonzero(registers == 0))
+            harmonic = float(np.sum(np.exp2(-registers.astype(np.float64))))
+
+        if m >= 128:
+            alpha = 0.7213 / (1 + 1.079 / m)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[m]
+        estimate = alpha * m * m / harmonic
+
+        # Linear counting is far more accurate while many registers are empty
+        if estimate <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+        return estimate
+
+    def __len__(self) -> int:
+        return int(round(self.count()))
+
+    def __bool__(self) -> bool:
+        return bool(self._sparse) if self._sparse is not None else any(self._registers)
+
+    def to_bytes(self) -> bytes:
+        """Serialize (precision byte followed by the dense registers)."""
+        registers = self._registers if self._registers is not None else self.copy()._densify()
+        return bytes([self.precision]) + bytes(registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'HyperLogLog':
+        sketch = cls(data[0])
+        if len(data) - 1 != sketch.size:
+            raise ValueError("Serialized HyperLogLog has the wrong number of registers")
+        sketch._registers = bytearray(data[1:])
+        sketch._sparse = None
+        return sketch
@@ -0,0 +1,213 @@
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.components.feature_extractor import FeatureExtractor
+from app.components.hyperloglog import HyperLogLog
+
+
+class RollupBucket:
+    """Additive summary of the logs of one (minute, device, program).
+
+    Counts and response-time sums add; distinct values are kept as
+    HyperLogLog sketches, which merge by taking register maxima. Summing
+    buckets therefore gives the summary of any union of them. With
+    ``exact=True`` distinct values are kept in sets instead, for partial
+    results that must match the exact extractors.
+    """
+
+    __slots__ = ('precision', 'exact', 'counts', 'sketches', 'response_time_sum', 'response_time_count')
+
+    def __init__(self, precision: int = 12, exact: bool = False):
+        self.precision = precision
+        self.exact = exact
+        self.counts: Dict[Any, int] = defaultdict(int)
+        self.sketches: Dict[str, Any] = {}
+        self.response_time_sum = 0.0
+        self.response_time_count = 0
+
+    def observe(self, observation: Dict[str, Any]) -> None:
+        """Add one log's observation (see FeatureExtractor.observe_log)."""
+        counts = self.counts
+        for key, value in observation['counts'].items():
+            counts[key] += value
+        for name, values in observation['distinct'].items():
+            sketch = self.sketches.get(name)
+            if sketch is None:
+                sketch = self.sketches[name] = set() if self.exact else HyperLogLog(self.precision)
+            sketch.update(values)
+        if observation['response_time'] is not None:
+            self.response_time_sum += observation['response_time']
+            self.response_time_count += 1
+
+    def merge(self, other: 'RollupBucket') -> 'RollupBucket':
+        counts = self.counts
+        for key, value in other.counts.items():
+            counts[key] += value
+        for name, other_sketch in other.sketches.items():
+            sketch = self.sketches.get(name)
+            if sketch is None:
+                self.sketches[name] = other_sketch.copy()
+            elif isinstance(sketch, set):
+                sketch.update(other_sketch)
+            else:
+                sketch.merge(other_sketch)
+        self.response_time_sum += other.response_time_sum
+        self.response_time_count += other.response_time_count
+        return self
+
+    def breakdown(self, family: str) -> Dict[Any, int]:
+        """Counts keyed within a family, e.g. breakdown('program') -> {program: count}."""
+        return {
+            key[1]: value for key, value in self.counts.items()
+            if isinstance(key, tuple) and key[0] == family
+        }
+
+    def distinct(self, name: str) -> int:
+        """Estimated number of distinct values seen for a cardinality feature."""
+        sketch = self.sketches.get(name)
+        return len(sketch) if sketch is not None else 0
+
+    @property
+    def avg_response_time(self) -> float:
+        if not self.response_time_count:
+            return 0
+        return self.response_time_sum / self.response_time_count
+
+
+class LogRollup:
+    """Per-minute, per-device, per-program log rollups.
+
+    Updated incrementally as logs arrive, so features for a window are
+    built by merging the window's buckets instead of re-reading and
+    re-parsing every row in it.
+    """
+
+    def __init__(self, feature_extractor: FeatureExtractor = None, precision: int = 12,
+                 retention_minutes: int = 1440):
+        self.feature_extractor = feature_extractor or FeatureExtractor()
+        self.precision = precision
+        self.retention = timedelta(minutes=retention_minutes)
+        self.logger = logging.getLogger("LogRollup")
+
+        self._minutes: Dict[datetime, Dict[Tuple[str, str], RollupBucket]] = {}
+        self._lock = threading.Lock()
+
+        # Highest log id ingested, and the times between which the rollups are complete
+        self.last_log_id: Optional[int] = None
+        self.covered_since: Optional[datetime] = None
+        self.covered_until: Optional[datetime] = None
+
+    @staticmethod
+    def _minute(timestamp: Any) -> Optional[datetime]:
+        if isinstance(timestamp, str):
+            try:
+                timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+            except ValueError:
+                return None
+        if not isinstance(timestamp, datetime):
+            return None
+        if timestamp.tzinfo is not None:
+            # Match the naive local timestamps the agents query with
+            timestamp = timestamp.astimezone().replace(tzinfo=None)
+        return timestamp.replace(second=0, microsecond=0)
+
+    def add_logs(self, logs: Iterable[Dict[str, Any]]) -> int:
+        """
+        Fold logs into their minute buckets.
+
+        Args:
+            logs: Log entries, with timestamp, device and program fields
+
+        Returns:
+            int: Number of logs added (rows without a usable timestamp are skipped)
+        """
+        observe = self.feature_extractor.observe_log
+        added = 0
+        with self._lock:
+            for log in logs:
+                minute = self._minute(log.get('timestamp'))
+                if minute is None:
+                    continue
+                device = str(log.get('device_id') or log.get('device_ip') or 'unknown')
+                program = log.get('program') or log.get('process_name') or ''
+
+                buckets = self._minutes.get(minute)
+                if buckets is None:
+                    buckets = self._minutes[minute] = {}
+                bucket = buckets.get((device, program))
+                if bucket is None:
+                    bucket = buckets[(device, program)] = RollupBucket(self.precision)
+                bucket.observe(observe(log))
+
+                log_id = log.get('id')
+                if log_id is not None and (self.last_log_id is None or log_id > self.last_log_id):
+                    self.last_log_id = log_id
+                added += 1
+            self._prune()
+        return added
+
+    def _prune(self) -> None:
+        if not self._minutes:
+            return
+        cutoff = max(self._minutes) - self.retention
+        for minute in [minute for minute in self._minutes if minute < cutoff]:
+            del self._minutes[minute]
+        if self.covered_since is not None and self.covered_since < cutoff:
+            self.covered_since = cutoff
+
+    def covers(self, start_time: datetime, end_time: datetime) -> bool:
+        """Whether the rollups hold every log in [start_time, end_time)."""
+        return (
+            self.covered_since is not None and self.covered_until is not None
+            and self.covered_since <= start_time and end_time <= self.covered_until
+        )
+
+    def window(self, start_time: datetime, end_time: datetime, programs: List[str] = None,
+               devices: List[str] = None) -> RollupBucket:
+        """
+        Merge the buckets of a window.
+
+        Args:
+            start_time: Window start (inclusive, at minute resolution)
+            end_time: Window end (exclusive)
+            programs: Case-insensitive substrings, as in DataService program filters
+            devices: Device ids to include (None for all)
+
+        Returns:
+            RollupBucket: Summary of the window
+        """
+        start_minute = self._minute(start_time)
+        patterns = [program.lower() for program in programs] if programs else None
+        device_set = set(str(device) for device in devices) if devices else None
+        total = RollupBucket(self.precision)
+        with self._lock:
+            for minute, buckets in self._minutes.items():
+                if minute < start_minute or minute >= end_time:
+                    continue
+                for (device, program), bucket in buckets.items():
+                    if device_set is not None and device not in device_set:
+                        continue
+                    if patterns is not None and not any(pattern in program.lower() for pattern in patterns):
+                        continue
+                    total.merge(bucket)
+        return total
+
+    def extract_features(self, start_time: datetime, end_time: datetime, programs: List[str] = None,
+                         devices: List[str] = None, kind: str = None) -> Dict[str, Any]:
+        """Features for a window, with the keys of FeatureExtractor.extract_*_features."""
+        return self.feature_extractor.extract_features_from_rollups(
+            self, start_time, end_time, programs=programs, devices=devices, kind=kind
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'minutes': len(self._minutes),
+                'buckets': sum(len(buckets) for buckets in self._minutes.values()),
+                'last_log_id': self.last_log_id,
+                'covered_since': self.covered_since.isoformat() if self.covered_since else None,
+                'covered_until': self.covered_until.isoformat() if self.covered_until else None
+            }
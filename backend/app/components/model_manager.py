@@ -13,7 +13,12 @@ import numpy as np
 from sklearn.preprocessing import StandardScaler
 
 from ..models.config import ModelConfig
+from ..services.model_loader import ModelLoader
+from ..services.model_artifact import load_mapped_model, package_metadata, write_model_index
+from ..services.model_performance_monitor import ModelPerformanceMonitor
+from ..models.monitoring import model_monitor
 from ..utils.logger import get_logger
+from ..services.event_bus import event_bus
 
 logger = get_logger(__name__)
 
@@ -99,6 +104,9 @@ class ModelManager:
             logger.error(f"Failed to create models directory {self.models_directory}: {e}")
             raise
         
+        # Package validation is shared with uploads
+        self.model_loader = ModelLoader(self.config)
+        
         self._initialized = True
         logger.info("ModelManager singleton initialized successfully")
     
@@ -142,6 +150,12 @@ class ModelManager:
             # Update metadata with import information
             await self._update_import_metadata(local_model_dir, model_path)
             
+            # Index the package so listing and loading skip metadata parsing and unpickling
+            try:
+                await asyncio.to_thread(write_model_index, local_model_dir)
+            except Exception as e:
+                logger.warning(f"Could not index imported model {local_model_dir}: {e}")
+            
             # Update model registry
             await self._update_model_registry(local_model_dir, 'imported')
             
@@ -158,128 +172,8 @@ class ModelManager:
             raise
     
     async def _validate_imported_model(self, model_path: str) -> Dict[str, Any]:
-        """Validate an imported model for compatibility with flexible requirements."""
-        validation_result = {
-            'is_valid': True,
-            'errors': [],
-            'warnings': [],
-            'metadata': {},
-            'required_files_present': [],
-            'optional_files_missing': [],
-            'optional_files_present': []
-        }
-        
-        try:
-            model_dir = Path(model_path)
-            
-            # Define required and optional files
-            required_files = ['model.joblib', 'metadata.json']
-            optional_files = ['deployment_manifest.json', 'validate_model.py', 'inference_example.py', 'requirements.txt', 'README.md']
-            
-            # Check required files (import fails if any are missing)
-            for file in required_files:
-                if (model_dir / file).exists():
-                    validation_result['required_files_present'].append(file)
-                else:
-                    validation_result['is_valid'] = False
-                    validation_result['errors'].append(f"Missing required file: {file}")
-            
-            # Check optional files (import succeeds but reports missing ones)
-            for file in optional_files:
-                if (model_dir / file).exists():
-                    validation_result['optional_files_present'].append(file)
-                else:
-                    validation_result['optional_files_missing'].append(file)
-                    validation_result['warnings'].append(f"Missing optional file: {file}")
-            
-            # Load and validate metadata
-            if (model_dir / 'metadata.json').exists():
-                try:
-                    with open(model_dir / 'metadata.json', 'r') as f:
-                        metadata = json.load(f)
-                    
-                    validation_result['metadata'] = metadata
-                    
-                    # Check metadata structure (warnings for missing fields, not errors)
-                    required_metadata_fields = ['model_info', 'training_info', 'evaluation_info']
-                    for field in required_metadata_fields:
-                        if field not in metadata:
-                            validation_result['warnings'].append(f"Missing metadata field: {field}")
-                    
-                    # Check model type compatibility
-                    model_type = metadata.get('model_info', {}).get('model_type', '')
-                    if model_type not in ['IsolationForest', 'LocalOutlierFactor']:
-                        validation_result['warnings'].append(f"Unknown model type: {model_type}")
-                    
-                    # Check evaluation metrics
-                    evaluation_metrics = metadata.get('evaluation_info', {}).get('basic_metrics', {})
-                    if evaluation_metrics:
-                        # Check if metrics meet minimum thresholds
-                        if evaluation_metrics.get('f1_score', 0) < 0.5:
-                            validation_result['warnings'].append("Low F1 score detected")
-                        
-                        if evaluation_metrics.get('roc_auc', 0) < 0.6:
-                            validation_result['warnings'].append("Low ROC AUC detected")
-                
-                except json.JSONDecodeError:
-                    validation_result['is_valid'] = False
-                    validation_result['errors'].append("Invalid metadata.json format")
-            
-            # Test model loading with scikit-learn version compatibility handling
-            if (model_dir / 'model.joblib').exists():
-                try:
-                    # Suppress scikit-learn version warnings during loading
-                    with warnings.catch_warnings(record=True) as w:
-                        warnings.simplefilter("ignore", category=UserWarning)
-                        warnings.simplefilter("ignore", category=FutureWarning)
-                        
-                        # Try to load the model
-                        test_model = joblib.load(model_dir / 'model.joblib')
-                        
-                        # Handle version warnings based on configuration
-                        version_warnings = self._handle_version_warnings(w)
-                        validation_result['warnings'].extend(version_warnings)
-                        
-                        if not hasattr(test_model, 'predict'):
-                            validation_result['is_valid'] = False
-                            validation_result['errors'].append("Model does not have predict method")
-                
-                except Exception as e:
-                    # Check if it's a scikit-learn version compatibility issue
-                    error_str = str(e).lower()
-                    if "inconsistentversionwarning" in error_str or "version" in error_str:
-                        if self.config.compatibility.allow_version_mismatch:
-                            validation_result['warnings'].append(f"Version compatibility issue: {str(e)}")
-                            if self.config.compatibility.log_version_warnings:
-                                logger.warning(f"Model loading encountered version compatibility issue: {e}")
-                            # Don't fail the import for version warnings if allowed
-                        else:
-                            validation_result['is_valid'] = False
-                            validation_result['errors'].append(f"Version compatibility error: {str(e)}")
-                    else:
-                        validation_result['is_valid'] = False
-                        validation_result['errors'].append(f"Model loading failed: {str(e)}")
-            
-            # Check feature compatibility
-            if 'training_info' in metadata:
-                feature_names = metadata['training_info'].get('feature_names', [])
-                if not feature_names:
-                    validation_result['warnings'].append("No feature names found in metadata")
-                else:
-                    validation_result['metadata']['feature_count'] = len(feature_names)
-            
-            # Add summary information
-            if validation_result['optional_files_missing']:
-                validation_result['warnings'].append(
-                    f"Model validation successful but missing {len(validation_result['optional_files_missing'])} optional files: "
-                    f"{', '.join(validation_result['optional_files_missing'])}"
-                )
-            
-        except Exception as e:
-            validation_result['is_valid'] = False
-            validation_result['errors'].append(f"Validation error: {str(e)}")
-        
-        return validation_result
+        """Validate an imported model with ModelLoader's package validation."""
+        return await self.model_loader.validate_model_contents(Path(model_path))
     
     async def _update_import_metadata(self, model_dir: Path, original_path: str):
         """Update metadata with import information."""
@@ -327,20 +221,26 @@ class ModelManager:
                 logger.error(f"Model file not found: {model_path}")
                 return False
             
-            # Load model with scikit-learn version compatibility handling
-            with warnings.catch_warnings(record=True) as w:
-                warnings.simplefilter("ignore", category=UserWarning)
-                warnings.simplefilter("ignore", category=FutureWarning)
-                
-                # Load the model
-                self.current_model = joblib.load(model_path)
-                
-                # Handle version warnings based on configuration
-                version_warnings = self._handle_version_warnings(w)
-                for warning in version_warnings:
-                    logger.warning(f"Model loaded with version compatibility warning: {warning}")
+            # Indexed packages have their tree arrays mapped instead of unpickled
+            self.current_model = None
+            if Path(model_path).name == 'model.joblib':
+                self.current_model = await asyncio.to_thread(load_mapped_model, Path(model_path).parent)
+            
+            if self.current_model is None:
+                # Load model with scikit-learn version compatibility handling
+                with warnings.catch_warnings(record=True) as w:
+                    warnings.simplefilter("ignore", category=UserWarning)
+                    warnings.simplefilter("ignore", category=FutureWarning)
+                    
+                    # Load the model
+                    self.current_model = joblib.load(model_path)
+                    
+                    # Handle version warnings based on configuration
+                    version_warnings = self._handle_version_warnings(w)
+                    for warning in version_warnings:
+                        logger.warning(f"Model loaded with version compatibility warning: {warning}")
             
-            logger.info(f"Model loaded successfully: {type(self.current_model).__name__}")
+            logger.info(f"Model loaded successfully: {self._model_type()}")
             
             # Load scaler if provided
             if scaler_path and Path(scaler_path).exists():
@@ -372,6 +272,9 @@ class ModelManager:
             if self.current_model_metadata and 'training_info' in self.current_model_metadata:
                 self.feature_names = self.current_model_metadata['training_info'].get('feature_names', [])
             
+            # Measure drift against this model's training distribution
+            self._load_drift_reference()
+            
             self.model_loaded = True
             logger.info("Model loading completed successfully")
             return True
@@ -381,6 +284,17 @@ class ModelManager:
             self.model_loaded = False
             return False
     
+    def _load_drift_reference(self) -> None:
+        """Hand the drift reference in the loaded model's metadata to the drift monitors."""
+        try:
+            model_monitor.load_reference_from_metadata(self.current_model_metadata)
+            if self.current_model_version:
+                ModelPerformanceMonitor(self.config).load_reference_from_metadata(
+                    self.current_model_version, self.current_model_metadata
+                )
+        except Exception as e:
+            logger.warning(f"Could not load drift reference: {e}")
+    
     async def load_model_version(self, version: str) -> bool:
         """Load a specific model version."""
         try:
@@ -515,6 +429,7 @@ class ModelManager:
             with open(self.model_registry_file, 'w') as f:
                 json.dump(registry_data, f, indent=2)
                 
+            event_bus.publish('model_registry', {'version': version, 'status': 'deleted'})
             logger.info(f"Model {version} removed from registry")
             
         except Exception as e:
@@ -594,6 +509,7 @@ class ModelManager:
             with open(self.model_registry_file, 'w') as f:
                 json.dump(registry_data, f, indent=2)
                 
+            event_bus.publish('model_registry', {'version': model_dir.name, 'status': status})
             logger.info(f"Model {model_dir.name} registered successfully")
             
         except Exception as e:
@@ -643,8 +559,7 @@ class ModelManager:
                         metadata_path = model_path / 'metadata.json'
                         metadata = {}
                         if metadata_path.exists():
-                            with open(metadata_path, 'r') as f:
-                                metadata = json.load(f)
+                            metadata = package_metadata(model_path)
                         
                         # Use version from metadata if available, otherwise use registry version
                         model_version = metadata.get('model_info', {}).get('version', version)
@@ -687,8 +602,7 @@ class ModelManager:
                             model_version = model_dir.name
                             
                             if metadata_path.exists():
-                                with open(metadata_path, 'r') as f:
-                                    metadata = json.load(f)
+                                metadata = package_metadata(model_dir)
                                 model_version = metadata.get('model_info', {}).get('version', model_dir.name)
                             
                             models.append({
@@ -809,12 +723,16 @@ class ModelManager:
         
         return {
             'version': self.current_model_version,
-            'model_type': type(self.current_model).__name__,
+            'model_type': self._model_type(),
             'feature_names': self.feature_names,
             'metadata': self.current_model_metadata,
             'loaded_at': datetime.now().isoformat()
         }
     
+    def _model_type(self) -> str:
+        """Class name of the loaded model (the original class for mapped models)."""
+        return getattr(self.current_model, 'model_type', type(self.current_model).__name__)
+    
     def is_model_loaded(self) -> bool:
         """Check if a model is currently loaded."""
         return self.model_loaded 
@@ -907,6 +825,7 @@ class ModelManager:
                 frontend_status = 'inactive'
             model_entry['status'] = frontend_status
             self.redis_client.set(key, json.dumps(model_entry))
+            event_bus.publish('model_status', {'model_id': model_id, **model_entry})
             logger.info(f"Setting Redis key: {key}")
             logger.info(f"Setting Redis value: {json.dumps(model_entry)}")
         except Exception as e:
@@ -1066,6 +985,7 @@ class ModelManager:
             with open(self.model_registry_file, 'w') as f:
                 json.dump(registry_data, f, indent=2)
                 
+            event_bus.publish('model_registry', {'version': version, 'status': status})
             logger.info(f"Model version {version} registry updated successfully")
             
         except Exception as e:
@@ -0,0 +1,212 @@
+import os
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.components.feature_extractor import FeatureExtractor
+from app.components.log_rollup import RollupBucket
+from app.components.pipeline_monitor import pipeline_monitor
+from app.config.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class SharedLogColumns:
+    """The columns feature extraction reads, packed into one shared memory block.
+
+    Messages are stored as concatenated UTF-8 with an offsets array;
+    programs and hosts as int32 codes into small name lists; template ids
+    as int64 (-1 for none). Workers attach by name and read their row
+    range in place, so a partition is handed over as a few integers
+    instead of a pickled list of dicts.
+    """
+
+    def __init__(self, logs: List[Dict[str, Any]]):
+        count = len(logs)
+        encoded = [(log.get('message') or '').encode('utf-8', 'surrogatepass') for log in logs]
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=count), out=offsets[1:])
+
+        program_codes, self.programs = self._encode(
+            [log.get('program') or log.get('process_name') or '' for log in logs])
+        host_codes, self.hosts = self._encode([log.get('host') or '' for log in logs])
+        template_ids = np.fromiter(
+            (-1 if log.get('template_id') is None else log['template_id'] for log in logs),
+            dtype=np.int64, count=count
+        )
+
+        self.count = count
+        self.data_size = int(offsets[-1])
+        self.shm = shared_memory.SharedMemory(create=True, size=((self.data_size + 7) & ~7) + 24 * count + 8)
+        self.shm.buf[:self.data_size] = b''.join(encoded)
+        sources = {'offsets': offsets, 'templates': template_ids, 'programs': program_codes, 'hosts': host_codes}
+        for name, view in columns_view(self.shm.buf, count, self.data_size):
+            view[:] = sources[name]
+
+    @staticmethod
+    def _encode(values: List[str]) -> Tuple[np.ndarray, List[str]]:
+        codes: Dict[str, int] = {}
+        array = np.fromiter((codes.setdefault(value, len(codes)) for value in values),
+                            dtype=np.int32, count=len(values))
+        return array, list(codes)
+
+    @property
+    def handle(self) -> Dict[str, Any]:
+        """What a worker needs to attach: block name, sizes and the name lists."""
+        return {
+            'name': self.shm.name,
+            'count': self.count,
+            'data_size': self.data_size,
+            'programs': self.programs,
+            'hosts': self.hosts
+        }
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> 'SharedLogColumns':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def columns_view(buffer, count: int, data_size: int) -> List[Tuple[str, np.ndarray]]:
+    """Numpy views of the fixed-width columns of a SharedLogColumns block."""
+    # 8-byte align the numeric columns after the message bytes
+    offset = (data_size + 7) & ~7
+    views = []
+    for name, dtype, length in (('offsets', np.int64, count + 1), ('templates', np.int64, count),
+                                ('programs', np.int32, count), ('hosts', np.int32, count)):
+        views.append((name, np.ndarray(length, dtype=dtype, buffer=buffer, offset=offset)))
+        offset += length * np.dtype(dtype).itemsize
+    return views
+
+
+_worker_extractors: Dict[Tuple[str, int], FeatureExtractor] = {}
+
+
+def extract_partition(handle: Dict[str, Any], start: int, end: int, kind: str,
+                      cardinality: str, hll_precision: int) -> RollupBucket:
+    """Observe rows [start, end) of a shared batch into a mergeable bucket.
+
+    Runs in a worker process; extractors (and their compiled patterns) are
+    cached per process.
+    """
+    key = (cardinality, hll_precision)
+    extractor = _worker_extractors.get(key)
+    if extractor is None:
+        extractor = _worker_extractors[key] = FeatureExtractor(cardinality, hll_precision)
+
+    bucket = RollupBucket(hll_precision, exact=cardinality == 'exact')
+    shm = shared_memory.SharedMemory(name=handle['name'])
+    try:
+        columns = dict(columns_view(shm.buf, handle['count'], handle['data_size']))
+        offsets = columns['offsets'][start:end + 1].tolist()
+        templates = columns['templates'][start:end].tolist()
+        program_codes = columns['programs'][start:end].tolist()
+        host_codes = columns['hosts'][start:end].tolist()
+        data = shm.buf[offsets[0]:offsets[-1]].tobytes()
+        # Views must be released before the block can be closed
+        del columns
+
+        base = offsets[0]
+        programs, hosts = handle['programs'], handle['hosts']
+        observe = extractor.observe_log
+        for row in range(end - start):
+            log = {
+                'message': data[offsets[row] - base:offsets[row + 1] - base].decode('utf-8', 'surrogatepass'),
+                'process_name': programs[program_codes[row]],
+                'host': hosts[host_codes[row]],
+                'template_id': None if templates[row] < 0 else templates[row]
+            }
+            bucket.observe(observe(log, kind))
+    finally:
+        shm.close()
+    return bucket
+
+
+class ParallelFeatureExtractor:
+    """Runs feature extraction for large batches across a process pool.
+
+    A batch is packed into shared memory, split into contiguous
+    partitions, observed in worker processes and the partial buckets
+    merged (counts add, distinct sets and sketches merge). Small batches
+    run on a thread instead. Either way the event loop stays free.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, min_batch_size: int = 20000):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_batch_size = min_batch_size
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._process_pool
+
+    def partitions(self, count: int) -> List[Tuple[int, int]]:
+        """Contiguous row ranges, one per worker."""
+        parts = min(self.max_workers, max(1, count))
+        bounds = np.linspace(0, count, parts + 1).astype(int).tolist()
+        return [(bounds[i], bounds[i + 1]) for i in range(parts) if bounds[i] < bounds[i + 1]]
+
+    async def extract_features(self, logs: List[Dict[str, Any]],
+                               feature_extractor: FeatureExtractor = None) -> Dict[str, Any]:
+        """
+        Extract features for a batch without blocking the event loop.
+
+        Args:
+            logs: List of log entries
+            feature_extractor: Extractor whose settings (cardinality mode) to use
+
+        Returns:
+            Dictionary of extracted features, as FeatureExtractor.extract_features
+        """
+        extractor = feature_extractor or FeatureExtractor()
+        if len(logs) < self.min_batch_size or self.max_workers < 2:
+            return await asyncio.to_thread(extractor.extract_features, logs)
+
+        try:
+            with pipeline_monitor.stage('featurize'):
+                return await self._extract_in_processes(logs, extractor)
+        except Exception as e:
+            logger.warning(f"Parallel feature extraction failed, extracting on a thread: {e}")
+            return await asyncio.to_thread(extractor.extract_features, logs)
+
+    async def _extract_in_processes(self, logs: List[Dict[str, Any]],
+                                    extractor: FeatureExtractor) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        columns = await asyncio.to_thread(SharedLogColumns, logs)
+        try:
+            kind = extractor.detect_kind(columns.programs)
+            pool = self._pool()
+            buckets = await asyncio.gather(*[
+                loop.run_in_executor(pool, extract_partition, columns.handle, start, end, kind,
+                                     extractor.cardinality, extractor.hll_precision)
+                for start, end in self.partitions(len(logs))
+            ])
+        finally:
+            columns.close()
+
+        total = buckets[0]
+        for bucket in buckets[1:]:
+            total.merge(bucket)
+        return extractor.features_from_rollup(total, kind)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=wait, cancel_futures=True)
+            self._process_pool = None
+
+
+# Shared by all agents, so the host runs one pool sized to its cores
+parallel_feature_extractor = ParallelFeatureExtractor(
+    max_workers=getattr(config, 'FEATURE_PROCESS_WORKERS', 0) or None,
+    min_batch_size=getattr(config, 'FEATURE_PARALLEL_MIN_BATCH', 20000)
+)
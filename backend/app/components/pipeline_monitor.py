@@ -0,0 +1,195 @@
+import time
+import asyncio
+import functools
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from prometheus_client import REGISTRY, CollectorRegistry
+
+from app.components.base_monitor import BaseMonitor
+
+logger = logging.getLogger(__name__)
+
+STAGE_BUCKETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+CYCLE_BUCKETS = [0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0]
+COUNT_BUCKETS = [0, 1, 10, 100, 1000, 10000, 100000, 1000000]
+
+
+class _CycleStats:
+    """Counters accumulated while one agent cycle runs."""
+
+    __slots__ = ('agent', 'rows', 'anomalies')
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self.rows = 0
+        self.anomalies = 0
+
+
+# The agent whose cycle is running in the current task; lets shared services
+# (DataService, FeatureExtractor, ...) label their timings without new arguments.
+_current_cycle: ContextVar[Optional[_CycleStats]] = ContextVar('pipeline_cycle', default=None)
+
+
+class PipelineMonitor(BaseMonitor):
+    """Stage-level metrics for the fetch -> featurize -> score -> persist pipeline.
+
+    Metrics are registered on the default Prometheus registry so they are
+    served by the /metrics endpoint.
+    """
+
+    def __init__(self, registry: CollectorRegistry = REGISTRY):
+        super().__init__('mcp_pipeline', registry)
+
+        self.metrics.update({
+            'stage_seconds': self._create_histogram(
+                'stage_seconds',
+                'Time spent in each pipeline stage',
+                buckets=STAGE_BUCKETS,
+                labels=['agent', 'stage']
+            ),
+            'cycle_seconds': self._create_histogram(
+                'cycle_seconds',
+                'Duration of agent analysis cycles',
+                buckets=CYCLE_BUCKETS,
+                labels=['agent']
+            ),
+            'cycle_rows': self._create_histogram(
+                'cycle_rows',
+                'Log rows fetched per agent cycle',
+                buckets=COUNT_BUCKETS,
+                labels=['agent']
+            ),
+            'cycle_anomalies': self._create_histogram(
+                'cycle_anomalies',
+                'Anomalies stored per agent cycle',
+                buckets=COUNT_BUCKETS,
+                labels=['agent']
+            ),
+            'cycle_lag': self._create_gauge(
+                'cycle_lag_seconds',
+                'How late the last agent cycle started relative to its interval',
+                ['agent']
+            ),
+            'cycle_errors': self._create_counter(
+                'cycle_errors_total',
+                'Agent cycles that raised an error',
+                ['agent']
+            ),
+            'backend_calls': self._create_counter(
+                'backend_calls_total',
+                'Calls made to PostgreSQL and Redis',
+                ['backend', 'operation', 'agent']
+            )
+        })
+
+        self._last_cycle_start: Dict[str, float] = {}
+        self._listeners: List[Callable[[str, str, float], None]] = []
+
+    @staticmethod
+    def current_agent() -> str:
+        """Agent of the cycle running in the current task."""
+        stats = _current_cycle.get()
+        return stats.agent if stats else 'none'
+
+    def add_listener(self, listener: Callable[[str, str, float], None]) -> None:
+        """Also report every stage timing to listener(agent, stage, seconds).
+
+        Used by the offline benchmarks, which need raw timings rather than
+        histogram buckets.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, str, float], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def observe_stage(self, stage: str, seconds: float, agent: Optional[str] = None) -> None:
+        """Record the duration of one pipeline stage."""
+        agent = agent or self.current_agent()
+        self.metrics['stage_seconds'].labels(agent=agent, stage=stage).observe(seconds)
+        for listener in self._listeners:
+            listener(agent, stage, seconds)
+
+    @contextmanager
+    def stage(self, stage: str, agent: Optional[str] = None):
+        """Time a block of code as a pipeline stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - start, agent)
+
+    def timed(self, stage: str) -> Callable:
+        """Decorator timing a sync or async function as a pipeline stage."""
+        def decorator(func: Callable) -> Callable:
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    start = time.perf_counter()
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        self.observe_stage(stage, time.perf_counter() - start)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe_stage(stage, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def count_call(self, backend: str, operation: str, count: int = 1) -> None:
+        """Count calls to a backend (``postgres`` or ``redis``)."""
+        self.metrics['backend_calls'].labels(
+            backend=backend, operation=operation, agent=self.current_agent()
+        ).inc(count)
+
+    def record_rows(self, rows: int) -> None:
+        """Add fetched rows to the running cycle."""
+        stats = _current_cycle.get()
+        if stats is not None:
+            stats.rows += rows
+
+    def record_anomalies(self, count: int = 1) -> None:
+        """Add stored anomalies to the running cycle."""
+        stats = _current_cycle.get()
+        if stats is not None:
+            stats.anomalies += count
+
+    @contextmanager
+    def cycle(self, agent: str, interval: float):
+        """Track one analysis cycle of an agent.
+
+        Args:
+            agent: Agent identifier used as the metric label
+            interval: Expected seconds between cycle starts, for the lag gauge
+        """
+        start = time.perf_counter()
+        last_start = self._last_cycle_start.get(agent)
+        if last_start is not None:
+            self.metrics['cycle_lag'].labels(agent=agent).set(max(0.0, start - last_start - interval))
+        self._last_cycle_start[agent] = start
+
+        stats = _CycleStats(agent)
+        token = _current_cycle.set(stats)
+        try:
+            yield stats
+        except Exception:
+            self.metrics['cycle_errors'].labels(agent=agent).inc()
+            raise
+        finally:
+            _current_cycle.reset(token)
+            self.metrics['cycle_seconds'].labels(agent=agent).observe(time.perf_counter() - start)
+            self.metrics['cycle_rows'].labels(agent=agent).observe(stats.rows)
+            self.metrics['cycle_anomalies'].labels(agent=agent).observe(stats.anomalies)
+
+
+# Global pipeline monitor instance
+pipeline_monitor = PipelineMonitor()
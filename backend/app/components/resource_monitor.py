@@ -13,6 +13,9 @@ class ResourceMonitor:
         self.cpu_threshold = cpu_threshold
         self.memory_threshold = memory_threshold
         self.logger = logging.getLogger("ResourceMonitor")
+        
+        # Prime the CPU counters so later non-blocking reads are meaningful
+        psutil.cpu_percent(interval=None)
 
     def is_healthy(self) -> bool:
         """
@@ -22,8 +25,8 @@ class ResourceMonitor:
             bool: True if resources are healthy, False otherwise
         """
         try:
-            # Get CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # CPU usage since the previous call; does not block
+            cpu_percent = psutil.cpu_percent(interval=None)
             
             # Get memory usage
             memory = psutil.virtual_memory()
@@ -61,7 +64,7 @@ class ResourceMonitor:
             dict: Dictionary containing CPU and memory usage statistics
         """
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent = psutil.cpu_percent(interval=None)
             memory = psutil.virtual_memory()
             
             return {
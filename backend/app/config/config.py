@@ -45,6 +45,35 @@ class Config:
         log_level = os.getenv('LOG_LEVEL', 'info')
         self.LOG_LEVEL = log_level.upper()
         self.ANALYSIS_INTERVAL = int(os.getenv('ANALYSIS_INTERVAL', '300'))
+        self.HEALTH_CHECK_INTERVAL = float(os.getenv('HEALTH_CHECK_INTERVAL', '10'))
+        self.HEALTH_CHECK_TIMEOUT = float(os.getenv('HEALTH_CHECK_TIMEOUT', '3'))
+        self.HEARTBEAT_INTERVAL = float(os.getenv('HEARTBEAT_INTERVAL', '10'))
+        # Status hash expiry; defaults to three missed beats
+        self.HEARTBEAT_TTL = float(os.getenv('HEARTBEAT_TTL', str(3 * self.HEARTBEAT_INTERVAL)))
+        
+        # Anomaly test / backfill jobs
+        self.ANOMALY_TEST_MAX_JOBS = int(os.getenv('ANOMALY_TEST_MAX_JOBS', '2'))
+        self.ANOMALY_TEST_CHUNK_CONCURRENCY = int(os.getenv('ANOMALY_TEST_CHUNK_CONCURRENCY', '4'))
+        self.ANOMALY_TEST_PROCESS_WORKERS = int(os.getenv('ANOMALY_TEST_PROCESS_WORKERS', '2'))
+        
+        # Gzip copies of uncompressed exports, served by Accept-Encoding
+        self.EXPORT_PRECOMPRESS = os.getenv('EXPORT_PRECOMPRESS', 'true').lower() == 'true'
+        
+        # Per-minute log rollups for window features
+        self.ROLLUP_ENABLED = os.getenv('ROLLUP_ENABLED', 'true').lower() == 'true'
+        self.ROLLUP_INTERVAL = float(os.getenv('ROLLUP_INTERVAL', '30'))
+        self.ROLLUP_BACKFILL_MINUTES = int(os.getenv('ROLLUP_BACKFILL_MINUTES', '60'))
+        self.ROLLUP_RETENTION_MINUTES = int(os.getenv('ROLLUP_RETENTION_MINUTES', '1440'))
+        self.ROLLUP_BATCH_SIZE = int(os.getenv('ROLLUP_BATCH_SIZE', '10000'))
+        self.ROLLUP_HLL_PRECISION = int(os.getenv('ROLLUP_HLL_PRECISION', '12'))
+        
+        # unique_*_count features: 'exact' sets or bounded-memory 'hll' sketches
+        self.FEATURE_CARDINALITY = os.getenv('FEATURE_CARDINALITY', 'exact')
+        self.FEATURE_HLL_PRECISION = int(os.getenv('FEATURE_HLL_PRECISION', '12'))
+        
+        # Feature extraction process pool (0 workers = one per core)
+        self.FEATURE_PROCESS_WORKERS = int(os.getenv('FEATURE_PROCESS_WORKERS', '0'))
+        self.FEATURE_PARALLEL_MIN_BATCH = int(os.getenv('FEATURE_PARALLEL_MIN_BATCH', '20000'))
 
         # SocketIO Configuration
         self.SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE', f'redis://{self.redis["host"]}:{self.redis["port"]}/{self.redis["db"]}')
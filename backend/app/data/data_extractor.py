@@ -5,9 +5,12 @@ This module provides an interface for extracting and preprocessing data from the
 It handles data quality issues and provides a clean interface for the model training pipeline.
 """
 
+import io
+import queue
 import logging
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -17,6 +20,65 @@ from sqlalchemy.exc import SQLAlchemyError
 
 logger = logging.getLogger(__name__)
 
+# Rows without these fields are dropped before features are computed
+REQUIRED_FIELDS = ["device_id", "message", "raw_message", "timestamp"]
+
+# Columns of the bulk extraction query, in COPY order
+LOG_COLUMNS = REQUIRED_FIELDS + ["device_activity"]
+
+# Filters accepted by the bulk extraction path (same semantics as export filters)
+LOG_FILTER_COLUMNS = {
+    "device_id": "device_id::text",
+    "device_ip": "device_ip::text",
+    "log_level": "log_level",
+    "process_name": "process_name",
+}
+
+DEFAULT_CHUNK_ROWS = 50000
+
+
+class _CopyCancelled(Exception):
+    """The reader stopped consuming chunks."""
+
+
+class _CopySink:
+    """
+    File-like target for copy_expert that hands rows over in chunks.
+
+    PostgreSQL sends one row per CopyData message and psycopg2 writes each
+    message separately, so every write() is one complete CSV row. The queue
+    is bounded, so the server is only read as fast as chunks are consumed.
+    """
+
+    def __init__(self, chunk_rows: int, max_pending: int = 2):
+        self.chunk_rows = chunk_rows
+        self.rows: List[bytes] = []
+        self.queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.cancelled = threading.Event()
+
+    def write(self, row: bytes) -> int:
+        self.rows.append(row)
+        if len(self.rows) >= self.chunk_rows:
+            self.flush()
+        return len(row)
+
+    def flush(self) -> None:
+        if self.rows:
+            data, self.rows = b"".join(self.rows), []
+            if not self.put(data):
+                # Aborts the COPY from inside copy_expert
+                raise _CopyCancelled()
+
+    def put(self, item: Any) -> bool:
+        """Queue an item, giving up once the reader has gone away."""
+        while not self.cancelled.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
 
 class DataExtractor:
     """Extracts and preprocesses data from the source database."""
@@ -24,6 +86,7 @@ class DataExtractor:
     def __init__(self, config: Dict):
         """Initialize the data extractor with configuration."""
         self.config = config
+        self.chunk_rows = config.get("extraction", {}).get("chunk_rows", DEFAULT_CHUNK_ROWS)
         self.engine = self._create_engine()
         self._validate_connection()
 
@@ -50,25 +113,9 @@ class DataExtractor:
             logger.error(f"Database connection failed: {e}")
             raise
 
-    def _handle_missing_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Handle missing data in the DataFrame."""
-        # Drop rows with missing required fields
-        required_fields = ["device_id", "message", "raw_message", "timestamp"]
-        df = df.dropna(subset=required_fields)
-        
-        # Log data quality metrics
-        total_rows = len(df)
-        for field in required_fields:
-            missing = df[field].isna().sum()
-            if missing > 0:
-                logger.warning(f"Missing {missing} values in {field} ({missing/total_rows*100:.2f}%)")
-        
-        return df
-
     def _extract_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Extract features from raw log data."""
+        """Extract per-row features from a chunk of raw log data."""
         # Basic features
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
         df["hour"] = df["timestamp"].dt.hour
         df["day_of_week"] = df["timestamp"].dt.dayofweek
         
@@ -76,42 +123,154 @@ class DataExtractor:
         df["message_length"] = df["message"].str.len()
         df["raw_message_length"] = df["raw_message"].str.len()
         
-        # Device activity features
-        device_activity = df.groupby("device_id").size().reset_index(name="device_activity")
-        df = df.merge(device_activity, on="device_id", how="left")
+        # device_activity is computed by the query, over the whole result
+        df["device_activity"] = df.pop("device_activity")
         
         return df
 
+    def _log_query(
+        self,
+        hours: int,
+        limit: Optional[int] = None,
+        device_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Query and psycopg2 parameters for the bulk extraction path.
+
+        Rows missing a required field are excluded in SQL, and device_activity
+        (rows per device in the result) is a window function over the limited
+        result, so each chunk arrives complete.
+        """
+        conditions = ["timestamp >= NOW() - make_interval(hours => %(hours)s)"]
+        conditions += [f"{field} IS NOT NULL" for field in REQUIRED_FIELDS]
+        params: Dict[str, Any] = {"hours": int(hours)}
+        
+        if device_id is not None:
+            conditions.append("device_id = %(device_id)s")
+            params["device_id"] = device_id
+        
+        for index, (name, value) in enumerate((filters or {}).items()):
+            if name not in LOG_FILTER_COLUMNS:
+                raise ValueError(f"Unsupported extraction filter: {name}")
+            key = f"filter_{index}"
+            if isinstance(value, (list, tuple)):
+                conditions.append(f"{LOG_FILTER_COLUMNS[name]} = ANY(%({key})s::text[])")
+                params[key] = [str(item) for item in value]
+            else:
+                conditions.append(f"{LOG_FILTER_COLUMNS[name]} = %({key})s")
+                params[key] = str(value)
+        
+        limit_clause = ""
+        if limit:
+            limit_clause = "LIMIT %(limit)s"
+            params["limit"] = int(limit)
+        
+        query = f"""
+            SELECT
+                device_id,
+                message,
+                raw_message,
+                timestamp,
+                COUNT(*) OVER (PARTITION BY device_id) AS device_activity
+            FROM (
+                SELECT device_id, message, raw_message, timestamp
+                FROM log_entries
+                WHERE {' AND '.join(conditions)}
+                ORDER BY timestamp DESC
+                {limit_clause}
+            ) AS recent
+            ORDER BY timestamp DESC
+        """
+        return query, params
+
+    def _copy_to_sink(self, query: str, params: Dict[str, Any], sink: _CopySink) -> None:
+        """Run COPY (query) TO STDOUT into sink; ends the queue with None or the error."""
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            # COPY takes no bind parameters, so they are bound client-side
+            statement = cursor.mogrify(query, params).decode()
+            cursor.copy_expert(f"COPY ({statement}) TO STDOUT WITH (FORMAT csv)", sink)
+            sink.flush()
+            sink.put(None)
+        except Exception as e:
+            # The connection may be left mid-COPY
+            connection.invalidate()
+            if not isinstance(e, _CopyCancelled):
+                sink.put(e)
+        finally:
+            connection.close()
+
+    def _parse_chunk(self, data: bytes) -> pd.DataFrame:
+        """Typed DataFrame with features from a chunk of COPY CSV rows."""
+        df = pd.read_csv(
+            io.BytesIO(data),
+            header=None,
+            names=LOG_COLUMNS,
+            # device_id is VARCHAR (e.g. "device_1"), so it stays a string
+            dtype={"device_id": object, "device_activity": "int64",
+                   "message": object, "raw_message": object, "timestamp": object},
+            # Required fields are non-null, so empty strings stay strings
+            na_filter=False,
+        )
+        try:
+            df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601")
+        except ValueError:
+            # timestamptz values on both sides of a DST change
+            df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601", utc=True)
+        return self._extract_features(df)
+
+    def iter_recent_logs(
+        self,
+        hours: int = 24,
+        limit: Optional[int] = None,
+        device_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        chunk_rows: Optional[int] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream recent log entries with features, chunk by chunk.
+
+        Rows are pulled with COPY ... TO STDOUT on a background thread and
+        parsed into typed columns, so memory is bounded by a few chunks
+        however long the window is. Requires a psycopg2 engine.
+
+        Args:
+            hours: Size of the time window
+            limit: Most recent rows to return
+            device_id: Only rows for this device
+            filters: device_id, device_ip, log_level or process_name values
+            chunk_rows: Rows per DataFrame (defaults to extraction.chunk_rows)
+        """
+        query, params = self._log_query(hours, limit, device_id, filters)
+        sink = _CopySink(chunk_rows or self.chunk_rows)
+        worker = threading.Thread(target=self._copy_to_sink, args=(query, params, sink), daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = sink.queue.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield self._parse_chunk(item)
+        finally:
+            sink.cancelled.set()
+            worker.join()
+
     def get_recent_logs(
         self, hours: int = 24, limit: Optional[int] = None
     ) -> pd.DataFrame:
         """Get recent log entries from the database."""
         try:
-            query = f"""
-                SELECT 
-                    device_id,
-                    message,
-                    raw_message,
-                    timestamp
-                FROM log_entries 
-                WHERE timestamp >= NOW() - INTERVAL '{hours} hours'
-                ORDER BY timestamp DESC
-            """
-            if limit:
-                query += f" LIMIT {limit}"
-
-            with self.engine.connect() as conn:
-                df = pd.read_sql(query, conn)
+            chunks = list(self.iter_recent_logs(hours=hours, limit=limit))
                 
-            if df.empty:
+            if not chunks:
                 logger.warning(f"No log entries found in the last {hours} hours")
                 return pd.DataFrame()
 
-            # Handle missing data
-            df = self._handle_missing_data(df)
-            
-            # Extract features
-            df = self._extract_features(df)
+            df = pd.concat(chunks, ignore_index=True)
             
             logger.info(f"Retrieved {len(df)} log entries")
             return df
@@ -125,34 +284,13 @@ class DataExtractor:
     ) -> pd.DataFrame:
         """Get log entries for a specific device."""
         try:
-            query = f"""
-                SELECT 
-                    device_id,
-                    message,
-                    raw_message,
-                    timestamp
-                FROM log_entries 
-                WHERE device_id = :device_id
-                AND timestamp >= NOW() - INTERVAL '{hours} hours'
-                ORDER BY timestamp DESC
-            """
+            chunks = list(self.iter_recent_logs(hours=hours, device_id=device_id))
 
-            with self.engine.connect() as conn:
-                df = pd.read_sql(
-                    query,
-                    conn,
-                    params={"device_id": device_id}
-                )
-
-            if df.empty:
+            if not chunks:
                 logger.warning(f"No log entries found for device {device_id}")
                 return pd.DataFrame()
 
-            # Handle missing data
-            df = self._handle_missing_data(df)
-            
-            # Extract features
-            df = self._extract_features(df)
+            df = pd.concat(chunks, ignore_index=True)
             
             logger.info(f"Retrieved {len(df)} log entries for device {device_id}")
             return df
@@ -166,7 +304,7 @@ class DataExtractor:
     ) -> pd.DataFrame:
         """Get anomaly records from the database."""
         try:
-            query = f"""
+            query = """
                 SELECT 
                     device_id,
                     anomaly_type,
@@ -174,7 +312,7 @@ class DataExtractor:
                     details,
                     timestamp
                 FROM anomaly_records 
-                WHERE timestamp >= NOW() - INTERVAL '{hours} hours'
+                WHERE timestamp >= NOW() - make_interval(hours => :hours)
             """
             
             if device_id:
@@ -183,11 +321,10 @@ class DataExtractor:
             query += " ORDER BY timestamp DESC"
 
             with self.engine.connect() as conn:
-                df = pd.read_sql(
-                    query,
-                    conn,
-                    params={"device_id": device_id} if device_id else {}
-                )
+                params = {"hours": int(hours)}
+                if device_id:
+                    params["device_id"] = device_id
+                df = pd.read_sql(text(query), conn, params=params)
 
             if df.empty:
                 logger.warning("No anomaly records found")
@@ -8,7 +8,6 @@ import os
 import redis
 from datetime import datetime, timedelta
 import psutil
-from sqlalchemy import text
 import json
 from dotenv import load_dotenv
 import asyncio
@@ -20,18 +19,25 @@ load_dotenv()
 # Import existing components
 from app.mcp_service.data_service import DataService
 from app.mcp_service.components.resource_monitor import ResourceMonitor
+from app.mcp_service.components.health_sampler import HealthSampler
+from app.mcp_service.components.rollup_ingestor import RollupIngestor
 from app.components.model_manager import ModelManager
 from app.models.config import ModelConfig
 from app.mcp_service.components.agent_registry import agent_registry
 from app.mcp_service.status_manager import MCPStatusManager
 from app.config.config import config
-from app.db import get_db_connection
+from app.components.pipeline_monitor import pipeline_monitor
+from app.components.parallel_features import parallel_feature_extractor
+from app.services.event_bus import event_bus
+from app.services.heartbeat import heartbeat_service
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 
 # Import routers
 from app.api.endpoints.export import router as export_router
 from app.api.endpoints.model_management import router as model_management_router
 from app.api.endpoints.agent_management import router as agent_management_router
+from app.api.endpoints.agent_management import shutdown_job_manager
+from app.api.endpoints.events import router as events_router
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -62,22 +68,47 @@ main_model_manager.set_redis_client(redis_client)
 # Set Redis client for agent registry
 agent_registry.redis_client = redis_client
 
+# State changes are published once and pushed to every open dashboard
+event_bus.redis_client = redis_client
+
+# Every status manager reports through one heartbeat loop and one pipelined write
+heartbeat_service.redis_client = redis_client
+heartbeat_service.interval = config.HEARTBEAT_INTERVAL
+heartbeat_service.ttl = config.HEARTBEAT_TTL
+heartbeat_service.timeout = config.HEALTH_CHECK_TIMEOUT
+
+# Cached health probes, served by the health/status/dashboard endpoints
+health_sampler = HealthSampler(
+    data_service,
+    redis_client,
+    main_model_manager,
+    interval=config.HEALTH_CHECK_INTERVAL,
+    timeout=config.HEALTH_CHECK_TIMEOUT
+)
+
+# Keeps data_service.rollups current for agents reading window features from rollups
+rollup_ingestor = RollupIngestor(
+    data_service,
+    interval=config.ROLLUP_INTERVAL,
+    backfill_minutes=config.ROLLUP_BACKFILL_MINUTES,
+    batch_size=config.ROLLUP_BATCH_SIZE
+)
+
 # Define lifespan function before app creation
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifespan."""
-    global data_service, resource_monitor, status_manager, analysis_task
+    global analysis_task
     
-    # Startup
+    # Startup; services are built once at import and only started here
     try:
-        # Initialize services
-        data_service = DataService(config)
-        resource_monitor = ResourceMonitor()
-        status_manager = MCPStatusManager(redis_host=config.redis['host'], redis_port=config.redis['port'])
-        
         # Start services
+        await event_bus.start(config.redis['host'], config.redis['port'], config.redis['db'])
         await data_service.start()
+        if config.ROLLUP_ENABLED:
+            await rollup_ingestor.start()
         status_manager.start_status_updates()
+        heartbeat_service.start()
         
         # Create and start agents using the Generic Agent Framework
         logger.info("Creating agents using Generic Agent Framework...")
@@ -106,6 +137,8 @@ async def lifespan(app: FastAPI):
         # Start background analysis task
         analysis_task = asyncio.create_task(run_analysis_cycles())
         
+        await health_sampler.start()
+        
         logger.info("MCP Service components initialized successfully")
         
         # Scan for new models
@@ -150,10 +183,16 @@ async def lifespan(app: FastAPI):
                 logger.info(f"Stopped and unregistered agent: {agent_id}")
         
         # Stop services
+        await shutdown_job_manager()
+        await health_sampler.stop()
+        await rollup_ingestor.stop()
+        parallel_feature_extractor.shutdown()
+        await event_bus.stop()
         if data_service:
             await data_service.stop()
         if status_manager:
             status_manager.stop_status_updates()
+        await heartbeat_service.stop()
         
         logger.info("MCP Service components stopped successfully")
     except Exception as e:
@@ -162,6 +201,7 @@ async def lifespan(app: FastAPI):
 
 async def run_analysis_cycles():
     """Background task to run agent analysis cycles."""
+    interval = getattr(config, 'ANALYSIS_INTERVAL', 300)
     try:
         while True:
             # Get all registered agents and run their analysis cycles
@@ -173,7 +213,8 @@ async def run_analysis_cycles():
                 
                 if agent and agent.is_running:
                     try:
-                        await agent.run_analysis_cycle()
+                        with pipeline_monitor.cycle(agent_id, interval):
+                            await agent.run_analysis_cycle()
                         logger.debug(f"{agent_id} analysis cycle completed successfully")
                     except Exception as e:
                         logger.error(f"Error in {agent_id} analysis cycle: {e}")
@@ -181,7 +222,7 @@ async def run_analysis_cycles():
                     logger.debug(f"{agent_id} not running, skipping analysis cycle")
             
             # Wait for next cycle (default 5 minutes)
-            await asyncio.sleep(getattr(config, 'ANALYSIS_INTERVAL', 300))
+            await asyncio.sleep(interval)
     except asyncio.CancelledError:
         logger.info("Analysis cycles task cancelled")
         raise
@@ -226,6 +267,7 @@ app.mount("/static", StaticFiles(directory=static_dir), name="static")
 app.include_router(export_router, prefix="/api/v1")
 app.include_router(model_management_router, prefix="/api/v1/model-management")
 app.include_router(agent_management_router, prefix="/api/v1/agents")
+app.include_router(events_router, prefix="/api/v1")
 
 # Root endpoint
 @app.get("/")
@@ -236,57 +278,31 @@ async def root():
 # Health check endpoint
 @app.get("/api/v1/health")
 async def health_check():
-    """Health check endpoint that verifies critical services"""
-    try:
-        # Check Redis connection
-        redis_client.ping()
-        
-        # Check database connection
-        with get_db_connection() as conn:
-            conn.execute(text('SELECT 1'))
-        
-        # Check if services are running (handle uninitialized services)
-        services_healthy = True
-        
-        if data_service:
-            services_healthy = services_healthy and data_service.is_running()
-        else:
-            services_healthy = False
-            
-        if main_model_manager:
-            services_healthy = services_healthy and main_model_manager.is_running()
-        else:
-            services_healthy = False
-            
-        if wifi_agent:
-            services_healthy = services_healthy and wifi_agent.check_running()
-        else:
-            services_healthy = False
-            
-        if log_level_agent:
-            services_healthy = services_healthy and log_level_agent.is_running
-        else:
-            services_healthy = False
-            
-        if resource_monitor:
-            services_healthy = services_healthy and resource_monitor.is_running()
-        else:
-            services_healthy = False
-        
-        if not services_healthy:
-            return JSONResponse(
-                status_code=503,
-                content={"status": "unhealthy", "error": "One or more services are not running"}
-            )
-        
-        return {"status": "healthy"}
-        
-    except Exception as e:
-        logger.error(f"Health check failed: {e}")
+    """Health check endpoint answered from the latest health sample"""
+    snapshot = health_sampler.snapshot
+    if snapshot is None or health_sampler.is_stale():
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unhealthy", "error": "No recent health sample"}
+        )
+    
+    if snapshot['status'] != 'healthy':
+        errors = [
+            f"{name}: {service['error']}"
+            for name, service in snapshot['services'].items()
+            if service['status'] != 'healthy'
+        ]
+        errors += [
+            f"{agent_id}: not running"
+            for agent_id, agent in snapshot['agents'].items()
+            if not agent['is_running']
+        ]
         return JSONResponse(
             status_code=503,
-            content={"status": "unhealthy", "error": str(e)}
+            content={"status": "unhealthy", "error": "; ".join(errors)}
         )
+    
+    return {"status": "healthy"}
 
 # Metrics endpoint
 @app.get("/metrics")
@@ -295,90 +311,77 @@ async def metrics():
     return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 # Server status endpoint
+def build_server_status(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Server status payload from a health sample (served and pushed as server_status)"""
+    resources = snapshot['resources']
+    
+    # Map sampled probes onto the reported services
+    agents_running = all(agent['is_running'] for agent in snapshot['agents'].values())
+    services = {
+        'database': snapshot['services']['database'],
+        'redis': snapshot['services']['redis'],
+        'model_service': snapshot['services']['model_service'],
+        'data_source': snapshot['services']['database'],
+        'mcp_service': {
+            'status': 'healthy' if agents_running else 'error',
+            'last_check': snapshot['timestamp'],
+            'error': None if agents_running else 'One or more agents are not running'
+        }
+    }
+
+    # Calculate overall system status
+    system_status = 'healthy'
+    if any(service['status'] == 'error' for service in services.values()):
+        system_status = 'unhealthy'
+
+    uptime = get_uptime()
+    return {
+        'status': system_status,
+        'version': '1.0.0',
+        'uptime': uptime,
+        'components': {
+            'database': services['database']['status'],
+            'model': services['model_service']['status'],
+            'cache': services['redis']['status']
+        },
+        'metrics': {
+            'cpu_usage': resources['cpu_usage'],
+            'memory_usage': resources['memory_usage'],
+            'response_time': 120  # Placeholder value
+        },
+        'services': [
+            {
+                'name': service_name,
+                'status': service_info['status'],
+                'uptime': uptime,
+                'memoryUsage': resources['memory_usage']
+            }
+            for service_name, service_info in services.items()
+        ]
+    }
+
 @app.get("/api/v1/server/status")
 async def get_server_status():
     """Get detailed server status information"""
     try:
-        # Get system metrics
-        cpu_percent = psutil.cpu_percent()
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
-        # Get service statuses
-        services = {
-            'database': {
-                'status': 'healthy',
-                'last_check': datetime.now().isoformat(),
-                'error': None
-            },
-            'redis': {
-                'status': 'healthy',
-                'last_check': datetime.now().isoformat(),
-                'error': None
-            },
-            'model_service': {
-                'status': 'healthy',
-                'last_check': datetime.now().isoformat(),
-                'error': None
-            },
-            'data_source': {
-                'status': 'healthy',
-                'last_check': datetime.now().isoformat(),
-                'error': None
-            },
-            'mcp_service': {
-                'status': 'healthy',
-                'last_check': datetime.now().isoformat(),
-                'error': None
-            }
-        }
-
-        # Check database connection
-        try:
-            with get_db_connection() as conn:
-                conn.execute(text('SELECT 1'))
-        except Exception as e:
-            services['database']['status'] = 'error'
-            services['database']['error'] = str(e)
+        return build_server_status(await get_health_snapshot())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Check Redis connection
-        try:
-            redis_client.ping()
-        except Exception as e:
-            services['redis']['status'] = 'error'
-            services['redis']['error'] = str(e)
+def publish_health_events(snapshot: Dict[str, Any]) -> None:
+    """Health sampler listener pushing the status payloads dashboards poll for"""
+    event_bus.publish('server_status', build_server_status(snapshot))
+    event_bus.publish('dashboard', build_dashboard(snapshot))
 
-        # Calculate overall system status
-        system_status = 'healthy'
-        if any(service['status'] == 'error' for service in services.values()):
-            system_status = 'unhealthy'
+# Push fresh server status and dashboard data after every health sample
+health_sampler.add_listener(publish_health_events)
 
-        return {
-            'status': system_status,
-            'version': '1.0.0',
-            'uptime': get_uptime(),
-            'components': {
-                'database': services['database']['status'],
-                'model': services['model_service']['status'],
-                'cache': services['redis']['status']
-            },
-            'metrics': {
-                'cpu_usage': cpu_percent,
-                'memory_usage': memory.percent,
-                'response_time': 120  # Placeholder value
-            },
-            'services': [
-                {
-                    'name': service_name,
-                    'status': service_info['status'],
-                    'uptime': get_uptime(),
-                    'memoryUsage': memory.percent
-                }
-                for service_name, service_info in services.items()
-            ]
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def get_health_snapshot() -> Dict[str, Any]:
+    """Latest health sample, sampling once if none has been taken yet"""
+    snapshot = health_sampler.snapshot
+    if snapshot is None:
+        snapshot = await health_sampler.sample()
+    return snapshot
 
 def get_uptime() -> str:
     """Get system uptime in human readable format"""
@@ -511,87 +514,84 @@ async def get_anomalies(
         raise HTTPException(status_code=500, detail=str(e))
 
 # Dashboard endpoint
-@app.get("/api/v1/dashboard")
-async def get_dashboard():
-    """Get dashboard data"""
-    try:
-        # Get system status
-        system_status = {
-            "status": "healthy",
-            "uptime": get_uptime(),
-            "version": "1.0.0",
-            "metrics": {
-                "cpu_usage": psutil.cpu_percent(),
-                "memory_usage": psutil.virtual_memory().percent,
-                "response_time": 120  # Placeholder value
-            },
-            "connections": {
-                "mcp_service": {
-                    "status": "connected",
-                    "last_check": datetime.now().isoformat(),
-                    "error": None
-                },
-                "backend_service": {
-                    "status": "connected",
-                    "last_check": datetime.now().isoformat(),
-                    "error": None
-                },
-                "data_source": {
-                    "status": "connected",
-                    "last_check": datetime.now().isoformat(),
-                    "error": None
-                },
-                "database": {
-                    "status": "connected",
-                    "last_check": datetime.now().isoformat(),
-                    "error": None
-                },
-                "model_service": {
-                    "status": "connected",
-                    "last_check": datetime.now().isoformat(),
-                    "error": None
-                },
-                "redis": {
-                    "status": "connected",
-                    "last_check": datetime.now().isoformat(),
-                    "error": None
-                }
-            }
+def build_dashboard(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Dashboard payload from a health sample (served and pushed as dashboard)"""
+    services = snapshot['services']
+    
+    def connection(probe: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "status": "connected" if probe['status'] == 'healthy' else "error",
+            "last_check": probe['last_check'],
+            "error": probe['error']
         }
-        
-        # Get recent anomalies (mock data for now)
-        recent_anomalies = [
-            {
-                "id": "1",
-                "timestamp": (datetime.now() - timedelta(minutes=5)).isoformat(),
-                "type": "network",
-                "severity": 8,
-                "description": "Unusual network traffic pattern detected",
-                "status": "detected"
+    
+    # Get system status
+    system_status = {
+        "status": snapshot['status'],
+        "uptime": get_uptime(),
+        "version": "1.0.0",
+        "metrics": {
+            "cpu_usage": snapshot['resources']['cpu_usage'],
+            "memory_usage": snapshot['resources']['memory_usage'],
+            "response_time": 120  # Placeholder value
+        },
+        "connections": {
+            "mcp_service": {
+                "status": "connected",
+                "last_check": snapshot['timestamp'],
+                "error": None
             },
-            {
-                "id": "2",
-                "timestamp": (datetime.now() - timedelta(hours=1)).isoformat(),
-                "type": "system",
-                "severity": 6,
-                "description": "High CPU usage detected",
-                "status": "investigating"
+            "backend_service": {
+                "status": "connected",
+                "last_check": snapshot['timestamp'],
+                "error": None
             },
-            {
-                "id": "3",
-                "timestamp": (datetime.now() - timedelta(hours=2)).isoformat(),
-                "type": "security",
-                "severity": 9,
-                "description": "Multiple failed login attempts",
-                "status": "resolved"
-            }
-        ]
-        
-        return {
-            "system_status": system_status,
-            "recent_anomalies": recent_anomalies,
-            "performance_metrics": system_status["metrics"]
+            "data_source": connection(services['database']),
+            "database": connection(services['database']),
+            "model_service": connection(services['model_service']),
+            "redis": connection(services['redis'])
         }
+    }
+    
+    # Get recent anomalies (mock data for now)
+    recent_anomalies = [
+        {
+            "id": "1",
+            "timestamp": (datetime.now() - timedelta(minutes=5)).isoformat(),
+            "type": "network",
+            "severity": 8,
+            "description": "Unusual network traffic pattern detected",
+            "status": "detected"
+        },
+        {
+            "id": "2",
+            "timestamp": (datetime.now() - timedelta(hours=1)).isoformat(),
+            "type": "system",
+            "severity": 6,
+            "description": "High CPU usage detected",
+            "status": "investigating"
+        },
+        {
+            "id": "3",
+            "timestamp": (datetime.now() - timedelta(hours=2)).isoformat(),
+            "type": "security",
+            "severity": 9,
+            "description": "Multiple failed login attempts",
+            "status": "resolved"
+        }
+    ]
+    
+    return {
+        "system_status": system_status,
+        "recent_anomalies": recent_anomalies,
+        "performance_metrics": system_status["metrics"]
+    }
+
+@app.get("/api/v1/dashboard")
+async def get_dashboard():
+    """Get dashboard data"""
+    try:
+        return build_dashboard(await get_health_snapshot())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -4,6 +4,8 @@ from typing import List, Dict, Any, Optional
 import json
 import os
 
+from app.components.pipeline_monitor import pipeline_monitor
+from app.services.event_bus import event_bus
 from .base_agent import BaseAgent
 
 class GenericAgent(BaseAgent):
@@ -163,7 +165,9 @@ class GenericAgent(BaseAgent):
             if hasattr(self.data_service, 'redis_client') and self.data_service.redis_client:
                 key = f"mcp:agent:{self.agent_id}:status"
                 self.data_service.redis_client.set(key, json.dumps(status_data))
+                pipeline_monitor.count_call('redis', 'set')
                 self.logger.debug(f"Updated Redis status for {self.agent_id}")
+            event_bus.publish('agent_status', status_data)
         except Exception as e:
             self.logger.warning(f"Failed to update Redis status: {e}")
     
@@ -4,7 +4,10 @@ from typing import List, Dict, Any
 import asyncpg
 import json
 
+from app.components.pipeline_monitor import pipeline_monitor
+from app.services.event_bus import event_bus
 from .base_agent import BaseAgent
+from ..components.anomaly_aggregator import AnomalyAggregator, AnomalyGroup, CooldownStore
 
 class LogLevelAgent(BaseAgent):
     def __init__(self, config, data_service):
@@ -29,6 +32,16 @@ class LogLevelAgent(BaseAgent):
             'error': 4,      # High severity
             'critical': 5    # Critical severity
         }
+        
+        # One anomaly per program and level per window; cooldowns are shared through Redis
+        self.alert_cooldown = getattr(config, 'log_level_alert_cooldown', 300)
+        self._aggregator = AnomalyAggregator(
+            key_fields=getattr(config, 'log_level_aggregation_keys', ['program', 'level']),
+            window_seconds=self.lookback_minutes * 60,
+            cooldown_seconds=self.alert_cooldown,
+            cooldown_store=CooldownStore(getattr(data_service, 'redis_client', None)),
+            namespace=self.agent_id
+        )
 
     async def start(self):
         """Start the Log Level agent."""
@@ -120,7 +133,9 @@ class LogLevelAgent(BaseAgent):
             if hasattr(self.data_service, 'redis_client') and self.data_service.redis_client:
                 key = f"mcp:agent:{self.agent_id}:status"
                 self.data_service.redis_client.set(key, json.dumps(status_data))
+                pipeline_monitor.count_call('redis', 'set')
                 self.logger.debug(f"Updated Redis status for {self.agent_id}")
+            event_bus.publish('agent_status', status_data)
         except Exception as e:
             self.logger.warning(f"Failed to update Redis status: {e}")
 
@@ -154,14 +169,16 @@ class LogLevelAgent(BaseAgent):
                 self.logger.info("No error or critical logs found")
                 return
 
-            # Process each log and generate anomalies
+            # Aggregate logs and generate one anomaly per group
+            with pipeline_monitor.stage('score'):
+                groups = self._aggregator.emit(logs)
             anomalies_created = 0
-            for log in logs:
+            for group in groups:
                 try:
-                    await self._process_log_for_anomaly(log)
+                    await self._process_group_for_anomaly(group)
                     anomalies_created += 1
                 except Exception as e:
-                    self.logger.error(f"Error processing log {log.get('id')}: {e}")
+                    self.logger.error(f"Error processing anomaly group {group.key_string}: {e}")
                     continue
 
             # Update cycle statistics
@@ -225,19 +242,21 @@ class LogLevelAgent(BaseAgent):
             self.logger.error(f"Error getting logs by level: {e}")
             return []
 
-    async def _process_log_for_anomaly(self, log: Dict[str, Any]):
-        """Process a single log entry and create an anomaly.
+    async def _process_group_for_anomaly(self, group: AnomalyGroup):
+        """Create an anomaly for a group of error or critical logs.
         
         Args:
-            log: Log entry to process
+            group: Aggregated logs sharing one key and window
         """
         try:
+            log = group.first_log
+            
             # Get log level and determine severity
-            log_level = log.get('log_level', '').lower()
+            log_level = (log.get('log_level') or '').lower()
             severity = self.severity_mapping.get(log_level, 3)
             
             # Create anomaly description
-            description = self._create_anomaly_description(log)
+            description = self._create_anomaly_description(log, group.count)
             
             # Store the anomaly
             await self.store_anomaly(
@@ -248,34 +267,37 @@ class LogLevelAgent(BaseAgent):
                 features={
                     'log_level': log_level,
                     'program': log.get('process_name', 'unknown'),
-                    'message': log.get('message', ''),
-                    'timestamp': log.get('timestamp', ''),
-                    'source': 'log_level_agent'
+                    'message': log.get('message') or '',
+                    'timestamp': group.last_seen.isoformat(),
+                    'source': 'log_level_agent',
+                    **group.to_features()
                 }
             )
             
         except Exception as e:
-            self.logger.error(f"Error processing log for anomaly: {e}")
+            self.logger.error(f"Error processing anomaly group: {e}")
             raise
 
-    def _create_anomaly_description(self, log: Dict[str, Any]) -> str:
+    def _create_anomaly_description(self, log: Dict[str, Any], count: int = 1) -> str:
         """Create a human-readable description for the anomaly.
         
         Args:
             log: Log entry that triggered the anomaly
+            count: Number of logs aggregated into the anomaly
             
         Returns:
             str: Description of the anomaly
         """
-        log_level = log.get('log_level', 'unknown')
-        program = log.get('process_name', 'unknown')
-        message = log.get('message', '')
+        log_level = log.get('log_level') or 'unknown'
+        program = log.get('process_name') or 'unknown'
+        message = log.get('message') or ''
         
         # Truncate message if too long
         if len(message) > 200:
             message = message[:200] + "..."
         
-        return f"{log_level.upper()} log detected from {program}: {message}"
+        occurrences = f" ({count} occurrences)" if count > 1 else ""
+        return f"{log_level.upper()} log detected from {program}{occurrences}: {message}"
 
     def get_status(self) -> Dict[str, Any]:
         """Get the current status of the agent.
@@ -2,10 +2,11 @@ import logging
 import asyncio
 from typing import List, Dict, Any, Optional
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from .generic_agent import GenericAgent
 from app.components.feature_extractor import FeatureExtractor
+from app.components.parallel_features import parallel_feature_extractor
 from ..components.anomaly_classifier import AnomalyClassifier
 from .base_agent import BaseAgent
 from ..data_service import DataService
@@ -28,14 +29,25 @@ class MLBasedAgent(GenericAgent):
         """
         super().__init__(config, data_service, model_manager)
         
+        # ML-specific configuration
+        self.feature_extraction_config = self.analysis_rules.get('feature_extraction', {})
+        self.thresholds = self.analysis_rules.get('thresholds', {})
+        
         # Initialize components
-        self.feature_extractor = FeatureExtractor()
+        self.feature_extractor = FeatureExtractor(
+            cardinality=self.feature_extraction_config.get('cardinality'),
+            hll_precision=self.feature_extraction_config.get('hll_precision')
+        )
         self.classifier = AnomalyClassifier()
         self.model = None
         
-        # ML-specific configuration
-        self.feature_extraction_config = self.analysis_rules.get('feature_extraction', {})
-        self.thresholds = self.analysis_rules.get('thresholds', {})
+        # 'rollups' builds window features from the DataService log rollups
+        # (falling back to the fetched logs until they cover the window)
+        self.feature_source = self.analysis_rules.get('feature_source', 'logs')
+        self.rollup_lookback_minutes = self.analysis_rules.get('rollup_lookback_minutes', self.lookback_minutes)
+        # Rollups are complete only up to the last ingestion poll; windows end
+        # there when it is at most this old, and are read from logs otherwise
+        self.rollup_max_lag_seconds = self.analysis_rules.get('rollup_max_lag_seconds', 60)
         
         # Always attempt to load the model if model_path is provided
         if self.model_path:
@@ -130,7 +142,7 @@ class MLBasedAgent(GenericAgent):
                 return
             
             # Extract features from logs
-            features = self.feature_extractor.extract_features(logs)
+            features = await self._extract_window_features(logs)
             self.logger.info("Extracted features from logs")
             
             # Detect anomalies using the classifier
@@ -157,6 +169,24 @@ class MLBasedAgent(GenericAgent):
             self.logger.error(f"Error in ML-based analysis: {e}")
             raise
     
+    async def _extract_window_features(self, logs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Features for the analysis window, from rollups when configured and available."""
+        rollups = getattr(self.data_service, 'rollups', None)
+        if self.feature_source == 'rollups' and rollups is not None:
+            end_time = datetime.now()
+            covered_until = rollups.covered_until
+            if covered_until is not None and end_time - covered_until <= timedelta(seconds=self.rollup_max_lag_seconds):
+                end_time = min(end_time, covered_until)
+            start_time = end_time - timedelta(minutes=self.rollup_lookback_minutes)
+            if rollups.covers(start_time, end_time):
+                return self.feature_extractor.extract_features_from_rollups(
+                    rollups, start_time, end_time,
+                    programs=self.process_filters if self.process_filters else None
+                )
+            self.logger.debug("Log rollups do not cover the window yet, extracting from logs")
+        # Off the event loop; large batches are split across worker processes
+        return await parallel_feature_extractor.extract_features(logs, self.feature_extractor)
+    
     async def start(self):
         """Start the ML-based agent."""
         try:
@@ -1,9 +1,10 @@
 import logging
-import re
 from typing import List, Dict, Any, Optional
-from datetime import datetime
 
+from app.components.pipeline_monitor import pipeline_monitor
 from .generic_agent import GenericAgent
+from ..components.rule_engine import CompiledRules
+from ..components.anomaly_aggregator import AnomalyAggregator, AnomalyGroup, CooldownStore
 
 class RuleBasedAgent(GenericAgent):
     """
@@ -29,13 +30,14 @@ class RuleBasedAgent(GenericAgent):
         self.include_patterns = self.analysis_rules.get('include_patterns', [])
         self.alert_cooldown = self.analysis_rules.get('alert_cooldown', 300)  # 5 minutes
         self.escalation_rules = self.analysis_rules.get('escalation_rules', {})
+        self.aggregation = self.analysis_rules.get('aggregation', {})
         
-        # Compile regex patterns for performance
-        self._compiled_exclude_patterns = [re.compile(pattern) for pattern in self.exclude_patterns]
-        self._compiled_include_patterns = [re.compile(pattern) for pattern in self.include_patterns]
+        # Compile rules once; they are rebuilt only when update_rules changes them
+        self._compile_rules()
         
-        # Track last alert times for cooldown
-        self.last_alert_times = {}
+        # Matching logs are grouped per key and window; cooldowns are shared through Redis
+        self._cooldowns = CooldownStore(getattr(data_service, 'redis_client', None))
+        self._aggregator = self._create_aggregator()
     
     async def _perform_analysis(self, logs: List[Dict[str, Any]]):
         """
@@ -46,21 +48,24 @@ class RuleBasedAgent(GenericAgent):
         """
         try:
             # Filter logs based on rules
-            filtered_logs = self._filter_logs_by_rules(logs)
+            with pipeline_monitor.stage('score'):
+                filtered_logs = self._filter_logs_by_rules(logs)
             self.logger.info(f"Filtered {len(filtered_logs)} logs from {len(logs)} total logs")
             
             if not filtered_logs:
                 self.logger.info("No logs match the rule criteria")
                 return
             
-            # Process each log and generate anomalies
+            # Aggregate matching logs and generate one anomaly per group
+            with pipeline_monitor.stage('score'):
+                groups = self._aggregator.emit(filtered_logs)
             anomalies_created = 0
-            for log in filtered_logs:
+            for group in groups:
                 try:
-                    await self._process_log_for_anomaly(log)
+                    await self._process_group_for_anomaly(group)
                     anomalies_created += 1
                 except Exception as e:
-                    self.logger.error(f"Error processing log {log.get('id')}: {e}")
+                    self.logger.error(f"Error processing anomaly group {group.key_string}: {e}")
                     continue
             
             self.logger.info(f"Created {anomalies_created} anomalies from {len(filtered_logs)} filtered logs")
@@ -69,6 +74,21 @@ class RuleBasedAgent(GenericAgent):
             self.logger.error(f"Error in rule-based analysis: {e}")
             raise
     
+    def _create_aggregator(self) -> AnomalyAggregator:
+        """Create the anomaly aggregator from the aggregation rules."""
+        return AnomalyAggregator(
+            key_fields=self.aggregation.get('key_fields', ['program', 'level']),
+            window_seconds=self.aggregation.get('window_seconds', self.alert_cooldown),
+            max_samples=self.aggregation.get('max_samples', 5),
+            cooldown_seconds=self.alert_cooldown,
+            cooldown_store=self._cooldowns,
+            namespace=self.agent_id
+        )
+    
+    def _compile_rules(self):
+        """Compile the target levels and include/exclude patterns."""
+        self._rules = CompiledRules(self.target_levels, self.include_patterns, self.exclude_patterns)
+    
     def _filter_logs_by_rules(self, logs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Filter logs based on rule-based criteria.
@@ -79,22 +99,7 @@ class RuleBasedAgent(GenericAgent):
         Returns:
             List of filtered log entries
         """
-        filtered_logs = []
-        
-        for log in logs:
-            # Check if log should be excluded
-            if self._should_exclude_log(log):
-                continue
-            
-            # Check if log should be included
-            if not self._should_include_log(log):
-                continue
-            
-            # Check if log level matches target levels
-            if self._matches_target_level(log):
-                filtered_logs.append(log)
-        
-        return filtered_logs
+        return self._rules.filter(logs)
     
     def _should_exclude_log(self, log: Dict[str, Any]) -> bool:
         """
@@ -106,13 +111,7 @@ class RuleBasedAgent(GenericAgent):
         Returns:
             bool: True if log should be excluded
         """
-        log_message = log.get('message', '').lower()
-        
-        for pattern in self._compiled_exclude_patterns:
-            if pattern.search(log_message):
-                return True
-        
-        return False
+        return self._rules.exclude.search((log.get('message') or '').lower())
     
     def _should_include_log(self, log: Dict[str, Any]) -> bool:
         """
@@ -125,16 +124,9 @@ class RuleBasedAgent(GenericAgent):
             bool: True if log should be included
         """
         # If no include patterns specified, include all logs
-        if not self._compiled_include_patterns:
+        if not self._rules.include:
             return True
-        
-        log_message = log.get('message', '').lower()
-        
-        for pattern in self._compiled_include_patterns:
-            if pattern.search(log_message):
-                return True
-        
-        return False
+        return self._rules.include.search((log.get('message') or '').lower())
     
     def _matches_target_level(self, log: Dict[str, Any]) -> bool:
         """
@@ -146,33 +138,31 @@ class RuleBasedAgent(GenericAgent):
         Returns:
             bool: True if log level matches target levels
         """
-        log_level = log.get('level', '').lower()
-        return log_level in [level.lower() for level in self.target_levels]
+        return self._rules.matches_level(log)
     
-    async def _process_log_for_anomaly(self, log: Dict[str, Any]):
+    async def _process_group_for_anomaly(self, group: AnomalyGroup):
         """
-        Process a single log entry and create an anomaly if needed.
+        Create an anomaly for a group of matching logs.
         
         Args:
-            log: Log entry to process
+            group: Aggregated logs sharing one key and window
         """
-        # Check alert cooldown
-        log_key = f"{log.get('program', 'unknown')}_{log.get('level', 'unknown')}"
-        if self._is_in_cooldown(log_key):
-            return
+        log = group.first_log
+        program = log.get('program') or log.get('process_name') or 'unknown'
         
         # Determine severity based on log level
-        log_level = log.get('level', '').lower()
+        log_level = CompiledRules.log_level(log)
         severity = self.severity_mapping.get(log_level, 3)
         
         # Check for escalation rules
+        log_key = f"{program}_{log_level}"
         if log_key in self.escalation_rules:
             escalation_threshold = self.escalation_rules[log_key]
             # Apply escalation logic here if needed
             severity = min(5, severity + 1)  # Increase severity by 1, max 5
         
         # Create anomaly description
-        description = self._create_anomaly_description(log)
+        description = self._create_anomaly_description(log, group.count)
         
         # Store the anomaly
         await self.store_anomaly(
@@ -182,51 +172,35 @@ class RuleBasedAgent(GenericAgent):
             description=description,
             features={
                 'log_level': log_level,
-                'program': log.get('program', 'unknown'),
-                'message': log.get('message', ''),
-                'timestamp': log.get('timestamp', ''),
-                'source': 'rule_based_agent'
+                'program': program,
+                'message': log.get('message') or '',
+                'timestamp': group.last_seen.isoformat(),
+                'source': 'rule_based_agent',
+                **group.to_features()
             }
         )
-        
-        # Update last alert time
-        self.last_alert_times[log_key] = datetime.now()
-    
-    def _is_in_cooldown(self, log_key: str) -> bool:
-        """
-        Check if a log key is in cooldown period.
-        
-        Args:
-            log_key: Key to check for cooldown
-            
-        Returns:
-            bool: True if in cooldown
-        """
-        if log_key not in self.last_alert_times:
-            return False
-        
-        time_since_last_alert = datetime.now() - self.last_alert_times[log_key]
-        return time_since_last_alert.total_seconds() < self.alert_cooldown
     
-    def _create_anomaly_description(self, log: Dict[str, Any]) -> str:
+    def _create_anomaly_description(self, log: Dict[str, Any], count: int = 1) -> str:
         """
         Create a human-readable description for the anomaly.
         
         Args:
             log: Log entry that triggered the anomaly
+            count: Number of matching logs aggregated into the anomaly
             
         Returns:
             str: Description of the anomaly
         """
-        log_level = log.get('level', 'unknown')
-        program = log.get('program', 'unknown')
-        message = log.get('message', '')
+        log_level = CompiledRules.log_level(log) or 'unknown'
+        program = log.get('program') or log.get('process_name') or 'unknown'
+        message = log.get('message') or ''
         
         # Truncate message if too long
         if len(message) > 200:
             message = message[:200] + "..."
         
-        return f"{log_level.upper()} log detected from {program}: {message}"
+        occurrences = f" ({count} occurrences)" if count > 1 else ""
+        return f"{log_level.upper()} log detected from {program}{occurrences}: {message}"
     
     def get_rule_info(self) -> Dict[str, Any]:
         """
@@ -242,6 +216,7 @@ class RuleBasedAgent(GenericAgent):
             'include_patterns': self.include_patterns,
             'alert_cooldown': self.alert_cooldown,
             'escalation_rules': self.escalation_rules,
+            'aggregation': self.aggregation,
             'severity_mapping': self.severity_mapping
         }
     
@@ -262,11 +237,12 @@ class RuleBasedAgent(GenericAgent):
             
             if 'exclude_patterns' in new_rules:
                 self.exclude_patterns = new_rules['exclude_patterns']
-                self._compiled_exclude_patterns = [re.compile(pattern) for pattern in self.exclude_patterns]
             
             if 'include_patterns' in new_rules:
                 self.include_patterns = new_rules['include_patterns']
-                self._compiled_include_patterns = [re.compile(pattern) for pattern in self.include_patterns]
+            
+            if {'target_levels', 'exclude_patterns', 'include_patterns'} & new_rules.keys():
+                self._compile_rules()
             
             if 'alert_cooldown' in new_rules:
                 self.alert_cooldown = new_rules['alert_cooldown']
@@ -274,6 +250,12 @@ class RuleBasedAgent(GenericAgent):
             if 'escalation_rules' in new_rules:
                 self.escalation_rules = new_rules['escalation_rules']
             
+            if 'aggregation' in new_rules:
+                self.aggregation = new_rules['aggregation']
+            
+            if {'alert_cooldown', 'aggregation'} & new_rules.keys():
+                self._aggregator = self._create_aggregator()
+            
             self.logger.info("Updated agent rules")
             
         except Exception as e:
@@ -290,8 +272,9 @@ class RuleBasedAgent(GenericAgent):
         status = super().get_status()
         status.update({
             'rule_info': self.get_rule_info(),
-            'last_alert_times': {
-                key: time.isoformat() for key, time in self.last_alert_times.items()
+            # Cooldowns held in process memory (only used while Redis is unreachable)
+            'local_cooldowns_until': {
+                key: expires_at.isoformat() for key, expires_at in self._cooldowns.local_keys().items()
             }
         })
         return status 
\ No newline at end of file
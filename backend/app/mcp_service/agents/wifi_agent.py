@@ -19,7 +19,10 @@ class WiFiAgent(MLBasedAgent):
         super().__init__(config, data_service, model_manager)
         
         # Override the model loading with WiFiAgent's specific method
-        self.feature_extractor = FeatureExtractor()
+        self.feature_extractor = FeatureExtractor(
+            cardinality=self.feature_extraction_config.get('cardinality'),
+            hll_precision=self.feature_extraction_config.get('hll_precision')
+        )
         self.classifier = AnomalyClassifier()
         self.programs = ['hostapd', 'wpa_supplicant']
         self.description = "WiFi anomaly detection agent"
@@ -340,7 +343,7 @@ class WiFiAgent(MLBasedAgent):
                 return
 
             # Extract features
-            features = self.feature_extractor.extract_features(logs)
+            features = await self._extract_window_features(logs)
             self.logger.info("Extracted features from logs")
 
             # Detect anomalies
@@ -14,6 +14,7 @@ from ..agents.rule_based_agent import RuleBasedAgent
 from ..agents.hybrid_agent import HybridAgent
 from app.components.model_manager import ModelManager
 from app.models.config import ModelConfig
+from app.services.event_bus import event_bus
 
 logger = logging.getLogger(__name__)
 
@@ -335,6 +336,7 @@ class AgentRegistry:
                 if self.redis_client:
                     key = f"mcp:agent:{agent_id}:status"
                     self.redis_client.delete(key)
+                event_bus.publish('agent_removed', {'id': agent_id})
                 
                 return True
             return False
@@ -686,6 +688,7 @@ class AgentRegistry:
             
             # Save to Redis
             self.redis_client.set(key, json.dumps(current_status))
+            event_bus.publish('agent_status', {'id': agent_id, **current_status})
             
         except Exception as e:
             self.logger.error(f"Error updating agent status for {agent_id}: {e}")
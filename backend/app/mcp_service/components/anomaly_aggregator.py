@@ -0,0 +1,177 @@
+import math
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.components.pipeline_monitor import pipeline_monitor
+from .template_miner import mask_variables
+
+logger = logging.getLogger(__name__)
+
+# Log fields each key part is read from, in order of preference
+KEY_FIELDS = {
+    'program': ('program', 'process_name'),
+    'level': ('level', 'log_level'),
+    'device': ('device_id', 'device_ip'),
+    # Mined template id when the DataService annotated the log, else the masked message
+    'template': ('template_id', 'message')
+}
+
+
+class CooldownStore:
+    """Bounded set of alert keys that expire after a TTL.
+
+    When a Redis client is given the keys live in Redis (``SET NX EX``), so
+    every replica and restart sees the same cooldowns. Otherwise, or when
+    Redis is unreachable, an in-process LRU of at most ``max_entries`` keys
+    is used.
+    """
+
+    def __init__(self, redis_client=None, prefix: str = 'mcp:cooldown', max_entries: int = 10000):
+        self.redis_client = redis_client
+        self.prefix = prefix
+        self.max_entries = max_entries
+        self._local: 'OrderedDict[str, float]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, ttl: float) -> bool:
+        """Start a cooldown for key; False if one is already running."""
+        if ttl <= 0:
+            return True
+
+        if self.redis_client is not None:
+            try:
+                acquired = self.redis_client.set(f"{self.prefix}:{key}", 1, nx=True, ex=math.ceil(ttl))
+                pipeline_monitor.count_call('redis', 'set')
+                return bool(acquired)
+            except Exception as e:
+                logger.warning(f"Redis cooldown unavailable, using local state: {e}")
+
+        now = time.time()
+        with self._lock:
+            expires_at = self._local.get(key)
+            if expires_at is not None and expires_at > now:
+                return False
+            self._local[key] = now + ttl
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+            return True
+
+    def local_keys(self) -> Dict[str, datetime]:
+        """Cooldowns held in process memory, with their expiry times."""
+        now = time.time()
+        with self._lock:
+            return {
+                key: datetime.fromtimestamp(expires_at)
+                for key, expires_at in self._local.items() if expires_at > now
+            }
+
+
+class AnomalyGroup:
+    """Matching logs that share an aggregation key within one time window."""
+
+    __slots__ = ('key', 'count', 'first_seen', 'last_seen', 'samples', 'first_log')
+
+    def __init__(self, key: Dict[str, Any], log: Dict[str, Any], seen: datetime):
+        self.key = key
+        self.count = 0
+        self.first_seen = seen
+        self.last_seen = seen
+        self.samples: List[str] = []
+        self.first_log = log
+
+    @property
+    def key_string(self) -> str:
+        return '|'.join(f"{name}={value}" for name, value in self.key.items())
+
+    def to_features(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'first_seen': self.first_seen.isoformat(),
+            'last_seen': self.last_seen.isoformat(),
+            'sample_messages': self.samples,
+            'group_key': self.key
+        }
+
+
+class AnomalyAggregator:
+    """Groups matching logs into one anomaly per key and time window.
+
+    Logs are grouped by the configured key fields (any of ``program``,
+    ``level``, ``device`` and ``template``) and by fixed windows of their
+    timestamps. Each group carries its count, first/last seen times and a
+    few sample messages. A group is only emitted when its key is not in
+    cooldown, so an error storm yields one anomaly per key and cooldown
+    instead of one per log.
+    """
+
+    def __init__(self, key_fields: Iterable[str] = ('program', 'level'), window_seconds: float = 300,
+                 max_samples: int = 5, cooldown_seconds: float = 300,
+                 cooldown_store: Optional[CooldownStore] = None, namespace: str = ''):
+        self.key_fields = tuple(key_fields)
+        unknown = set(self.key_fields) - KEY_FIELDS.keys()
+        if unknown:
+            raise ValueError(f"Unknown aggregation key fields: {sorted(unknown)}")
+        self.window_seconds = window_seconds
+        self.max_samples = max_samples
+        self.cooldown_seconds = cooldown_seconds
+        self.cooldown_store = cooldown_store or CooldownStore()
+        self.namespace = namespace
+
+    @staticmethod
+    def _field(log: Dict[str, Any], name: str) -> Any:
+        for field in KEY_FIELDS[name]:
+            value = log.get(field)
+            if value not in (None, ''):
+                return mask_variables(value) if field == 'message' and name == 'template' else value
+        return 'unknown'
+
+    @staticmethod
+    def _timestamp(log: Dict[str, Any]) -> datetime:
+        value = log.get('timestamp')
+        if isinstance(value, datetime):
+            return value
+        if isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                pass
+        return datetime.now()
+
+    def key_for(self, log: Dict[str, Any]) -> Dict[str, Any]:
+        """The aggregation key of a log."""
+        return {name: self._field(log, name) for name in self.key_fields}
+
+    def group(self, logs: Iterable[Dict[str, Any]]) -> List[AnomalyGroup]:
+        """Group logs by key and window, in order of first appearance."""
+        groups: Dict[Tuple, AnomalyGroup] = {}
+        for log in logs:
+            key = self.key_for(log)
+            seen = self._timestamp(log)
+            window = int(seen.timestamp() // self.window_seconds) if self.window_seconds > 0 else 0
+            group_id = (tuple(key.values()), window)
+
+            group = groups.get(group_id)
+            if group is None:
+                group = groups[group_id] = AnomalyGroup(key, log, seen)
+            group.count += 1
+            group.first_seen = min(group.first_seen, seen)
+            group.last_seen = max(group.last_seen, seen)
+            if len(group.samples) < self.max_samples:
+                group.samples.append(log.get('message') or '')
+        return list(groups.values())
+
+    def emit(self, logs: Iterable[Dict[str, Any]]) -> List[AnomalyGroup]:
+        """Group logs and return the groups whose key is not in cooldown."""
+        emitted = []
+        for group in self.group(logs):
+            cooldown_key = f"{self.namespace}:{group.key_string}" if self.namespace else group.key_string
+            if self.cooldown_store.acquire(cooldown_key, self.cooldown_seconds):
+                emitted.append(group)
+            else:
+                logger.debug(f"Suppressed {group.count} logs for {group.key_string} (cooldown)")
+        return emitted
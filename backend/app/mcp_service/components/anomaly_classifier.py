@@ -2,6 +2,8 @@ import logging
 from typing import List, Dict, Any, Optional
 import numpy as np
 
+from app.components.pipeline_monitor import pipeline_monitor
+
 logger = logging.getLogger(__name__)
 
 class AnomalyClassifier:
@@ -27,6 +29,7 @@ class AnomalyClassifier:
         self.model = model
         self.logger.info("Anomaly detection model set")
     
+    @pipeline_monitor.timed('score')
     def detect_anomalies(self, features: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Detect anomalies using both ML model and rule-based detection.
@@ -0,0 +1,157 @@
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import psutil
+
+from .agent_registry import agent_registry
+
+logger = logging.getLogger(__name__)
+
+
+class HealthSampler:
+    """Probes backing services on a fixed cadence and caches the results.
+
+    Health, status and dashboard endpoints read the cached snapshot instead
+    of probing PostgreSQL, Redis and the host on every request, so frequent
+    load-balancer probes cost nothing and a slow dependency cannot block the
+    event loop.
+    """
+
+    def __init__(self, data_service, redis_client, model_manager=None,
+                 interval: float = 10.0, timeout: float = 3.0):
+        self.data_service = data_service
+        self.redis_client = redis_client
+        self.model_manager = model_manager
+        self.interval = interval
+        self.timeout = timeout
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+        # The first cpu_percent(None) call only primes the counters
+        psutil.cpu_percent(interval=None)
+
+    @property
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """The most recent sample, or None before the first one completes."""
+        return self._snapshot
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Call listener(snapshot) after every sample."""
+        self._listeners.append(listener)
+
+    def is_stale(self) -> bool:
+        """Whether the sampler has missed several consecutive samples."""
+        if self._snapshot is None:
+            return True
+        return time.monotonic() - self._snapshot['sampled_at'] > 3 * self.interval
+
+    async def start(self) -> None:
+        """Take a first sample and start sampling in the background."""
+        if self._task is None:
+            await self.sample()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop background sampling."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sample()
+            except Exception as e:
+                logger.error(f"Error sampling service health: {e}")
+
+    async def _probe(self, check: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+        """Run one probe with a timeout and describe the outcome."""
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), timeout=self.timeout)
+            status, error = 'healthy', None
+        except asyncio.TimeoutError:
+            status, error = 'error', f"Timed out after {self.timeout}s"
+        except Exception as e:
+            status, error = 'error', str(e)
+        return {
+            'status': status,
+            'error': error,
+            'latency_ms': round((time.perf_counter() - start) * 1000, 2),
+            'last_check': datetime.now().isoformat()
+        }
+
+    async def _check_redis(self) -> None:
+        await asyncio.to_thread(self.redis_client.ping)
+
+    async def _check_database(self) -> None:
+        await self.data_service.check_database()
+
+    async def _check_model_service(self) -> None:
+        if self.model_manager is None or not self.model_manager.is_running():
+            raise RuntimeError("Model manager is not running")
+
+    @staticmethod
+    def _sample_resources() -> Dict[str, Any]:
+        memory = psutil.virtual_memory()
+        return {
+            'cpu_usage': psutil.cpu_percent(interval=None),
+            'memory_usage': memory.percent,
+            'disk_usage': psutil.disk_usage('/').percent
+        }
+
+    @staticmethod
+    def _sample_agents() -> Dict[str, Dict[str, Any]]:
+        return {
+            agent['id']: {
+                'name': agent['name'],
+                'status': agent['status'],
+                'is_running': agent['is_running'],
+                'last_run': agent['last_run']
+            }
+            for agent in agent_registry.list_agents()
+        }
+
+    async def sample(self) -> Dict[str, Any]:
+        """Probe every service once and replace the cached snapshot."""
+        database, redis_status, model_service, resources = await asyncio.gather(
+            self._probe(self._check_database),
+            self._probe(self._check_redis),
+            self._probe(self._check_model_service),
+            asyncio.to_thread(self._sample_resources)
+        )
+        agents = self._sample_agents()
+
+        services = {
+            'database': database,
+            'redis': redis_status,
+            'model_service': model_service
+        }
+        healthy = (
+            all(service['status'] == 'healthy' for service in services.values())
+            and all(agent['is_running'] for agent in agents.values())
+        )
+
+        self._snapshot = {
+            'status': 'healthy' if healthy else 'unhealthy',
+            'timestamp': datetime.now().isoformat(),
+            'sampled_at': time.monotonic(),
+            'services': services,
+            'agents': agents,
+            'resources': resources
+        }
+        for listener in self._listeners:
+            try:
+                listener(self._snapshot)
+            except Exception as e:
+                logger.error(f"Health sample listener failed: {e}")
+        return self._snapshot
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RollupIngestor:
+    """Keeps the DataService log rollups current.
+
+    Backfills the last few minutes once, then polls for logs with ids above
+    the highest one ingested, so each row is read and parsed once instead
+    of once per agent cycle and lookback window.
+    """
+
+    def __init__(self, data_service, interval: float = 30.0, backfill_minutes: int = 60,
+                 batch_size: int = 10000):
+        self.data_service = data_service
+        self.rollups = data_service.rollups
+        self.interval = interval
+        self.backfill_minutes = backfill_minutes
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start ingesting in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop background ingestion."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.ingest()
+            except Exception as e:
+                logger.error(f"Error updating log rollups: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def backfill(self) -> int:
+        """Load the backfill window; the rollups are complete from its start."""
+        until = datetime.now()
+        since = until - timedelta(minutes=self.backfill_minutes)
+        logs = await self.data_service.get_logs_by_program(since, None, None)
+        added = await asyncio.to_thread(self.rollups.add_logs, logs)
+        if self.rollups.last_log_id is None:
+            self.rollups.last_log_id = 0
+        self.rollups.covered_since = since
+        self.rollups.covered_until = until
+        logger.info(f"Backfilled log rollups with {added} logs since {since.isoformat()}")
+        return added
+
+    async def ingest(self) -> int:
+        """
+        Fold every log inserted since the last call into the rollups.
+
+        Once the table is read to its end, the rollups are complete up to
+        the time the poll started.
+
+        Returns:
+            int: Number of logs added
+        """
+        if self.rollups.last_log_id is None:
+            return await self.backfill()
+
+        polled_at = datetime.now()
+        added = 0
+        while True:
+            logs = await self.data_service.get_logs_after_id(self.rollups.last_log_id, self.batch_size)
+            if not logs:
+                break
+            # Parsing is CPU-bound; keep it off the event loop
+            added += await asyncio.to_thread(self.rollups.add_logs, logs)
+            if len(logs) < self.batch_size:
+                break
+        self.rollups.covered_until = polled_at
+        return added
@@ -0,0 +1,95 @@
+import re
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Pattern
+
+logger = logging.getLogger(__name__)
+
+# A leading (?i), (?s)... applies to the whole pattern and is rejected mid-alternation
+_GLOBAL_FLAGS = re.compile(r'^\(\?[aiLmsux]+\)')
+
+
+class PatternSet:
+    """A set of regex patterns matched as one combined alternation.
+
+    Searching a message for ``(?:p1)|(?:p2)|...`` scans it once instead of
+    once per pattern. Patterns that cannot be combined (ones with capture
+    groups, whose numbering would shift, or a leading global flag) are kept
+    as separate compiled regexes.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(patterns)
+        self._combined: Optional[Pattern] = None
+        self._separate: List[Pattern] = []
+
+        combinable = []
+        for pattern in self.patterns:
+            compiled = re.compile(pattern)
+            if compiled.groups or _GLOBAL_FLAGS.match(pattern):
+                # Group numbers would shift once the patterns are combined
+                self._separate.append(compiled)
+            else:
+                combinable.append(pattern)
+
+        if combinable:
+            try:
+                self._combined = re.compile('|'.join(f'(?:{pattern})' for pattern in combinable))
+            except re.error as e:
+                logger.warning(f"Could not combine rule patterns, matching them separately: {e}")
+                self._separate.extend(re.compile(pattern) for pattern in combinable)
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def search(self, text: str) -> bool:
+        """Whether any pattern matches text."""
+        if self._combined is not None and self._combined.search(text):
+            return True
+        return any(pattern.search(text) for pattern in self._separate)
+
+
+class CompiledRules:
+    """Include/exclude patterns and target levels compiled for batch filtering.
+
+    Messages and levels are compared lowercased, as the rule agent always
+    has. A log passes when its level is a target level, it matches no exclude
+    pattern and, if include patterns are given, at least one of them.
+    """
+
+    def __init__(self, target_levels: Iterable[str], include_patterns: Iterable[str] = (),
+                 exclude_patterns: Iterable[str] = ()):
+        self.target_levels = frozenset(level.lower() for level in target_levels)
+        self.include = PatternSet(include_patterns)
+        self.exclude = PatternSet(exclude_patterns)
+
+    @staticmethod
+    def log_level(log: Dict[str, Any]) -> str:
+        """Lowercased level of a log; rows from log_entries carry it as log_level."""
+        return (log.get('level') or log.get('log_level') or '').lower()
+
+    def matches_level(self, log: Dict[str, Any]) -> bool:
+        return self.log_level(log) in self.target_levels
+
+    def matches_message(self, message: str) -> bool:
+        """Apply the exclude and include patterns to an already lowercased message."""
+        if self.exclude and self.exclude.search(message):
+            return False
+        return not self.include or self.include.search(message)
+
+    def matches(self, log: Dict[str, Any]) -> bool:
+        return self.matches_level(log) and self.matches_message((log.get('message') or '').lower())
+
+    def filter(self, logs: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return the logs that pass every rule, in one pass over the batch.
+
+        The level lookup runs first so the regexes only see logs at a target
+        level, and each message is lowercased once.
+        """
+        target_levels = self.target_levels
+        log_level = self.log_level
+        matches_message = self.matches_message
+        return [
+            log for log in logs
+            if log_level(log) in target_levels
+            and matches_message((log.get('message') or '').lower())
+        ]
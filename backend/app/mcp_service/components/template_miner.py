@@ -0,0 +1,265 @@
+import re
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.components.pipeline_monitor import pipeline_monitor
+
+logger = logging.getLogger(__name__)
+
+PARAM = '<*>'
+
+_VARIABLE_TOKENS = re.compile(
+    r'\b(?:[0-9a-f]{2}[:-]){5}[0-9a-f]{2}\b'   # MAC addresses
+    r'|\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b'    # IPv4 addresses with optional port
+    r'|\b0x[0-9a-f]+\b'                         # hex literals
+    r'|\b\d+(?:\.\d+)?',                        # numbers, including units like 5s
+    re.IGNORECASE
+)
+
+
+def mask_variables(text: str) -> str:
+    """Replace obviously variable tokens (numbers, addresses) with <*>."""
+    return _VARIABLE_TOKENS.sub(PARAM, text or '')
+
+
+class LogTemplate:
+    """One mined template: its tokens, with <*> at parameter positions."""
+
+    __slots__ = ('template_id', 'tokens', 'size')
+
+    def __init__(self, template_id: int, tokens: List[str], size: int = 0):
+        self.template_id = template_id
+        self.tokens = tokens
+        self.size = size
+
+    @property
+    def template(self) -> str:
+        return ' '.join(self.tokens)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'tokens': self.tokens, 'size': self.size}
+
+
+class TemplateMiner:
+    """Online log template miner using a Drain-style fixed-depth parse tree.
+
+    Messages are routed by token count and then by their first
+    ``depth - 2`` tokens to a small leaf of candidate templates; the most
+    similar candidate absorbs the message (differing tokens become <*>) or a
+    new template is created. Each message therefore costs O(tokens), however
+    many templates exist.
+
+    With a Redis client, template ids are reserved in blocks from a shared
+    counter, so replicas never hand the same id to different templates, and
+    templates are stored in a Redis hash so they survive restarts. Each
+    process still mines on its own: templates learned elsewhere are only
+    merged in on ``reload()``, so until then two replicas may give the same
+    message different ids. After a Redis error the miner keeps working with
+    local ids and stops calling Redis until ``reload()``.
+    """
+
+    def __init__(self, depth: int = 4, similarity_threshold: float = 0.5, max_children: int = 100,
+                 redis_client=None, redis_key: str = 'mcp:log_templates', id_block_size: int = 100):
+        if depth < 3:
+            raise ValueError("Template tree depth must be at least 3")
+        self.depth = depth
+        self.similarity_threshold = similarity_threshold
+        self.max_children = max_children
+        self.redis_client = redis_client
+        self.redis_key = redis_key
+        self.id_block_size = id_block_size
+
+        self.templates: Dict[int, LogTemplate] = {}
+        self._tree: Dict[int, Dict] = {}
+        self._next_local_id = 1
+        # Shared ids reserved by the last INCRBY: next to hand out, last in block
+        self._next_shared_id = 1
+        self._last_shared_id = 0
+        self._redis_failed = False
+        self._dirty: set = set()
+        self._loaded = redis_client is None
+        self._lock = threading.Lock()
+
+    # Parse tree
+
+    def _leaf(self, tokens: List[str]) -> List[int]:
+        """Walk (and grow) the tree to the leaf holding candidates for tokens."""
+        node = self._tree.setdefault(len(tokens), {})
+        for token in tokens[:self.depth - 2]:
+            if PARAM in token or any(c.isdigit() for c in token):
+                token = PARAM
+            elif token not in node and len(node) >= self.max_children:
+                token = PARAM
+            node = node.setdefault(token, {})
+        return node.setdefault(None, [])
+
+    @staticmethod
+    def _similarity(template_tokens: List[str], tokens: List[str]) -> Tuple[float, int]:
+        matches = params = 0
+        for template_token, token in zip(template_tokens, tokens):
+            if template_token == PARAM:
+                params += 1
+            elif template_token == token:
+                matches += 1
+        return matches / len(tokens) if tokens else 1.0, params
+
+    def _best_match(self, leaf: List[int], tokens: List[str]) -> Optional[LogTemplate]:
+        best, best_score = None, (-1.0, 0)
+        for template_id in leaf:
+            template = self.templates[template_id]
+            similarity, params = self._similarity(template.tokens, tokens)
+            # Prefer higher similarity, then fewer parameters
+            score = (similarity, -params)
+            if score > best_score:
+                best, best_score = template, score
+        if best is not None and best_score[0] >= self.similarity_threshold:
+            return best
+        return None
+
+    @property
+    def _redis(self):
+        """The Redis client, or None when absent or disabled after an error."""
+        return None if self._redis_failed else self.redis_client
+
+    def _redis_error(self, action: str, error: Exception) -> None:
+        logger.warning(f"Could not {action} in Redis, using local templates until reload: {error}")
+        self._redis_failed = True
+
+    def _allocate_id(self) -> int:
+        if self._next_shared_id <= self._last_shared_id:
+            template_id = self._next_shared_id
+            self._next_shared_id += 1
+            return template_id
+        if self._redis is not None:
+            try:
+                last = int(self._redis.incrby(f"{self.redis_key}:next_id", self.id_block_size))
+                pipeline_monitor.count_call('redis', 'incrby')
+                self._next_shared_id, self._last_shared_id = last - self.id_block_size + 2, last
+                return last - self.id_block_size + 1
+            except Exception as e:
+                self._redis_error('reserve template ids', e)
+        if self.redis_client is not None:
+            # Keep local ids out of the range the shared counter hands out
+            self._next_local_id = max(self._next_local_id, 1_000_000_000)
+        template_id = max(self._next_local_id, max(self.templates, default=0) + 1)
+        self._next_local_id = template_id + 1
+        return template_id
+
+    @staticmethod
+    def _tokenize(message: str) -> Tuple[List[str], List[str]]:
+        raw = (message or '').split()
+        return raw, [mask_variables(token) for token in raw]
+
+    # Public API
+
+    def add_log_message(self, message: str) -> Tuple[int, List[str]]:
+        """Assign a message to a template, learning from it.
+
+        Returns:
+            Tuple of the template id and the message's parameter values
+        """
+        raw, tokens = self._tokenize(message)
+        with self._lock:
+            self._ensure_loaded()
+            leaf = self._leaf(tokens)
+            template = self._best_match(leaf, tokens)
+            if template is None:
+                template = LogTemplate(self._allocate_id(), tokens)
+                self.templates[template.template_id] = template
+                leaf.append(template.template_id)
+                self._dirty.add(template.template_id)
+            else:
+                merged = [t if t == token else PARAM for t, token in zip(template.tokens, tokens)]
+                if merged != template.tokens:
+                    template.tokens = merged
+                    self._dirty.add(template.template_id)
+            template.size += 1
+        return template.template_id, self._parameters(template.tokens, raw)
+
+    def match(self, message: str) -> Optional[int]:
+        """Template id of a message without learning from it."""
+        _, tokens = self._tokenize(message)
+        with self._lock:
+            self._ensure_loaded()
+            template = self._best_match(self._leaf(tokens), tokens)
+        return template.template_id if template else None
+
+    @staticmethod
+    def _parameters(template_tokens: List[str], raw_tokens: List[str]) -> List[str]:
+        return [raw for token, raw in zip(template_tokens, raw_tokens) if PARAM in token]
+
+    def annotate(self, logs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add template_id and template_params to each log in a batch, then sync.
+
+        This blocks on mining and Redis; call it from a worker thread in async code.
+        """
+        for log in logs:
+            log['template_id'], log['template_params'] = self.add_log_message(log.get('message') or '')
+        self.save()
+        return logs
+
+    def get_template(self, template_id: int) -> Optional[str]:
+        """Template text for an id."""
+        template = self.templates.get(template_id)
+        return template.template if template else None
+
+    # Persistence
+
+    def _add_template(self, template_id: int, data: Dict[str, Any]) -> None:
+        template = LogTemplate(template_id, list(data['tokens']), int(data.get('size', 0)))
+        existing = self.templates.get(template_id)
+        if existing is not None:
+            existing.tokens = template.tokens
+            return
+        self.templates[template_id] = template
+        self._leaf(template.tokens).append(template_id)
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self._redis is None:
+            return
+        try:
+            stored = self._redis.hgetall(self.redis_key)
+            pipeline_monitor.count_call('redis', 'hgetall')
+        except Exception as e:
+            self._redis_error('load log templates', e)
+            return
+        for template_id, data in stored.items():
+            self._add_template(int(template_id), json.loads(data))
+        logger.info(f"Loaded {len(stored)} log templates")
+
+    def save(self) -> None:
+        """Write new or changed templates to Redis in one round trip."""
+        if self.redis_client is None:
+            self._dirty.clear()
+            return
+        with self._lock:
+            if not self._dirty or self._redis is None:
+                return
+            dirty, self._dirty = self._dirty, set()
+            mapping = {
+                str(template_id): json.dumps(self.templates[template_id].to_dict())
+                for template_id in dirty
+            }
+        try:
+            self.redis_client.hset(self.redis_key, mapping=mapping)
+            pipeline_monitor.count_call('redis', 'hset')
+        except Exception as e:
+            self._redis_error('save log templates', e)
+            with self._lock:
+                self._dirty |= dirty
+
+    def reload(self) -> None:
+        """Pick up templates created by other agents or replicas.
+
+        Also retries Redis after an earlier error; templates learned locally
+        meanwhile are written on the next ``save()``.
+        """
+        with self._lock:
+            self._redis_failed = False
+            self._loaded = self.redis_client is None
+            self._ensure_loaded()
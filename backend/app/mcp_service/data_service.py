@@ -1,17 +1,32 @@
+import asyncio
 import logging
 import redis
 import os
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from app.services.status_manager import ServiceStatusManager
+from app.components.pipeline_monitor import pipeline_monitor
+from app.mcp_service.components.template_miner import TemplateMiner
+from app.components.log_rollup import LogRollup
+from app.services.event_bus import event_bus
 from datetime import datetime, timedelta
 import asyncpg
 
 logger = logging.getLogger(__name__)
 
+# SQL expressions for the export filters (app.models.export.EXPORT_FILTER_FIELDS)
+EXPORT_FILTER_COLUMNS = {
+    'device_id': 'device_id::text',
+    'device_ip': 'device_ip::text',
+    'log_level': 'log_level',
+    'process_name': 'process_name',
+    'message_contains': 'message'
+}
+
 class DataService:
     def __init__(self, config):
         self.config = config
         self.db = None
+        self.pool = None
         
         # Initialize Redis client
         redis_host = os.getenv('REDIS_HOST', 'redis')
@@ -26,6 +41,15 @@ class DataService:
         
         # Initialize status manager with Redis client
         self.status_manager = ServiceStatusManager('data_source', self.redis_client)
+        
+        # Log templates are mined from every fetched batch and shared through Redis
+        self.template_miner = TemplateMiner(redis_client=self.redis_client)
+        
+        # Per-minute rollups for window features, fed by the RollupIngestor
+        self.rollups = LogRollup(
+            precision=getattr(config, 'ROLLUP_HLL_PRECISION', 12),
+            retention_minutes=getattr(config, 'ROLLUP_RETENTION_MINUTES', 1440)
+        )
 
     async def start(self):
         """Initialize database connection."""
@@ -55,9 +79,9 @@ class DataService:
     async def stop(self):
         """Close database connection."""
         try:
-            if self.db:
-                # TODO: Close database connection
-                pass
+            if self.pool:
+                await self.pool.close()
+                self.pool = None
             self.status_manager.update_status('disconnected')
             logger.info("DataService stopped successfully")
         except Exception as e:
@@ -75,6 +99,245 @@ class DataService:
             logger.error(f"DataService health check failed: {e}")
             return False
 
+    async def _get_pool(self):
+        """The small shared pool used by background work (health probes, rollups)."""
+        if self.pool is None:
+            self.pool = await asyncpg.create_pool(
+                host=self.db_config['host'],
+                port=self.db_config['port'],
+                user=self.db_config['user'],
+                password=self.db_config['password'],
+                database=self.db_config['database'],
+                min_size=1,
+                max_size=2
+            )
+        return self.pool
+
+    async def check_database(self) -> None:
+        """Run a trivial query on the shared connection pool; raises on failure."""
+        pool = await self._get_pool()
+        await pool.fetchval('SELECT 1')
+        pipeline_monitor.count_call('postgres', 'health_check')
+
+    @pipeline_monitor.timed('fetch')
+    async def get_logs_after_id(self, last_id: int, limit: int = 10000) -> List[Dict[str, Any]]:
+        """
+        Get the next batch of logs inserted after a given id, oldest first.
+        
+        Args:
+            last_id: Highest log id already seen
+            limit: Maximum number of logs to return
+            
+        Returns:
+            List of log entries, annotated with their template ids
+        """
+        pool = await self._get_pool()
+        records = await pool.fetch(
+            """
+                SELECT 
+                    id, device_id, device_ip, timestamp, log_level, 
+                    process_name, message, raw_message, structured_data,
+                    pushed_to_ai, pushed_at, push_attempts, last_push_error
+                FROM log_entries
+                WHERE id > $1
+                ORDER BY id
+                LIMIT $2
+            """,
+            last_id,
+            limit
+        )
+        logs = [dict(record) for record in records]
+        pipeline_monitor.count_call('postgres', 'fetch_logs_after_id')
+        pipeline_monitor.record_rows(len(logs))
+        
+        with pipeline_monitor.stage('parse'):
+            await asyncio.to_thread(self.template_miner.annotate, logs)
+        return logs
+
+    @staticmethod
+    def _export_conditions(
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        programs: Optional[List[str]],
+        filters: Optional[Dict[str, Any]]
+    ) -> Tuple[str, List[Any]]:
+        """
+        WHERE clause and parameters for export queries over log_entries.
+
+        Program matching follows get_logs_by_program (case-insensitive
+        substrings, cron also matching crond). Filter values may be a single
+        value or a list; message_contains matches a substring.
+        """
+        conditions = []
+        params: List[Any] = []
+
+        def param(value) -> str:
+            params.append(value)
+            return f"${len(params)}"
+
+        if start_time is not None:
+            conditions.append(f"timestamp >= {param(start_time.replace(tzinfo=None))}")
+        if end_time is not None:
+            conditions.append(f"timestamp <= {param(end_time.replace(tzinfo=None))}")
+
+        if programs:
+            program_conditions = []
+            for program in programs:
+                program_conditions.append(f"process_name ILIKE {param(f'%{program}%')}")
+                if program.lower() == 'cron':
+                    program_conditions.append(f"process_name ILIKE {param(f'%{program}d%')}")
+            conditions.append(f"({' OR '.join(program_conditions)})")
+
+        for name, value in (filters or {}).items():
+            if name not in EXPORT_FILTER_COLUMNS:
+                raise ValueError(f"Unsupported export filter: {name}")
+            column = EXPORT_FILTER_COLUMNS[name]
+            if name == 'message_contains':
+                conditions.append(f"{column} ILIKE {param(f'%{value}%')}")
+            elif isinstance(value, (list, tuple)):
+                conditions.append(f"{column} = ANY({param([str(item) for item in value])}::text[])")
+            else:
+                conditions.append(f"{column} = {param(str(value))}")
+
+        return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+    async def _iter_query_batches(self, query: str, params: List[Any],
+                                  batch_size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream a query's rows in batches through a server-side cursor."""
+        conn = await asyncpg.connect(
+            host=self.db_config['host'],
+            port=self.db_config['port'],
+            user=self.db_config['user'],
+            password=self.db_config['password'],
+            database=self.db_config['database']
+        )
+        try:
+            # Cursors only live inside a transaction
+            async with conn.transaction():
+                cursor = await conn.cursor(query, *params)
+                while True:
+                    with pipeline_monitor.stage('fetch'):
+                        records = await cursor.fetch(batch_size)
+                    if not records:
+                        break
+                    pipeline_monitor.count_call('postgres', 'fetch_export_batch')
+                    pipeline_monitor.record_rows(len(records))
+                    yield [dict(record) for record in records]
+        finally:
+            await conn.close()
+
+    async def iter_log_batches(
+        self,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        programs: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream log entries for export, batch_size rows at a time.
+
+        Args:
+            start_time: Start time (None for no lower bound)
+            end_time: End time (None for no upper bound)
+            programs: Program names to filter by (None or empty for all)
+            filters: Column filters (see EXPORT_FILTER_FIELDS), applied in SQL
+            batch_size: Rows per batch
+
+        Yields:
+            Lists of log entries, in id order
+        """
+        where, params = self._export_conditions(start_time, end_time, programs, filters)
+        query = f"""
+            SELECT
+                id, device_id, device_ip, timestamp, log_level,
+                process_name, message, raw_message, structured_data,
+                pushed_to_ai, pushed_at, push_attempts, last_push_error
+            FROM log_entries
+            {where}
+            ORDER BY id
+        """
+        async for batch in self._iter_query_batches(query, params, batch_size):
+            yield batch
+
+    async def iter_ip_batches(
+        self,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        programs: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream per-address activity summaries for export.
+
+        Aggregated in SQL over the same filters as iter_log_batches. The
+        risk score is the percentage of an address's entries logged at
+        error severity or above.
+
+        Yields:
+            Lists of {address, first_seen, last_seen, log_count, error_count, risk_score}
+        """
+        where, params = self._export_conditions(start_time, end_time, programs, filters)
+        query = f"""
+            SELECT
+                device_ip::text AS address,
+                MIN(timestamp) AS first_seen,
+                MAX(timestamp) AS last_seen,
+                COUNT(*) AS log_count,
+                COUNT(*) FILTER (WHERE lower(log_level) IN ('err', 'error', 'crit', 'critical', 'alert', 'emerg')) AS error_count
+            FROM log_entries
+            {where}
+            GROUP BY device_ip
+            ORDER BY device_ip
+        """
+        async for batch in self._iter_query_batches(query, params, batch_size):
+            for row in batch:
+                row['risk_score'] = round(100.0 * row['error_count'] / row['log_count'], 2) if row['log_count'] else 0.0
+            yield batch
+
+    async def iter_anomaly_batches(
+        self,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        batch_size: int = 1000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream stored anomalies (see store_anomaly) for export.
+
+        Keys are scanned and read batch_size at a time, each batch with
+        one pipelined round trip; the time range applies to the time each
+        anomaly was stored. The client is synchronous, so every SCAN page
+        and batch read runs in a worker thread.
+        """
+        keys = []
+        cursor = None
+        while cursor != 0:
+            cursor, page = await asyncio.to_thread(
+                self.redis_client.scan, cursor or 0, match='anomaly:*', count=batch_size
+            )
+            for key in page:
+                try:
+                    stored_at = datetime.fromisoformat(key.split(':', 1)[1])
+                except ValueError:
+                    continue
+                if (start_time is not None and stored_at < start_time) or (end_time is not None and stored_at > end_time):
+                    continue
+                keys.append(key)
+                if len(keys) >= batch_size:
+                    yield await asyncio.to_thread(self._read_anomalies, keys)
+                    keys = []
+        if keys:
+            yield await asyncio.to_thread(self._read_anomalies, keys)
+
+    def _read_anomalies(self, keys: List[str]) -> List[Dict[str, Any]]:
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hgetall(key)
+        pipeline_monitor.count_call('redis', 'hgetall_batch')
+        return [{'id': key, **values} for key, values in zip(keys, pipe.execute()) if values]
+
+    @pipeline_monitor.timed('fetch')
     async def get_logs_by_program(
         self,
         start_time: Optional[datetime],
@@ -291,6 +554,12 @@ class DataService:
                 
                 logs = await conn.fetch(query, *params)
                 logs = [dict(record) for record in logs]
+                pipeline_monitor.count_call('postgres', 'fetch_logs')
+                pipeline_monitor.record_rows(len(logs))
+                
+                # Tag each log with its template id and parameters
+                with pipeline_monitor.stage('parse'):
+                    await asyncio.to_thread(self.template_miner.annotate, logs)
                 
                 logger.info(f"Retrieved {len(logs)} logs for programs {programs if programs else 'all'}")
                 return logs
@@ -302,6 +571,7 @@ class DataService:
             logger.error(f"Error getting logs by program: {e}")
             raise
 
+    @pipeline_monitor.timed('persist')
     async def store_anomaly(self, anomaly: Dict[str, Any]):
         """
         Store an anomaly in the database.
@@ -314,6 +584,10 @@ class DataService:
             anomaly_id = f"anomaly:{datetime.now().isoformat()}"
             self.redis_client.hmset(anomaly_id, anomaly)
             self.redis_client.expire(anomaly_id, 86400)  # Expire after 24 hours
+            pipeline_monitor.count_call('redis', 'hmset')
+            pipeline_monitor.count_call('redis', 'expire')
+            pipeline_monitor.record_anomalies()
+            event_bus.publish('anomaly', {'id': anomaly_id, **anomaly})
             
             logger.info(f"Stored anomaly: {anomaly_id}")
             
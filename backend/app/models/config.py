@@ -36,6 +36,7 @@ class StorageConfig(BaseModel):
     backup_enabled: bool = Field(default=True, description="Enable model backup")
     compression: bool = Field(default=True, description="Enable model compression")
     retention_days: int = Field(default=30, description="Model retention period in days")
+    max_package_size_mb: int = Field(default=2048, description="Maximum uncompressed size of an imported model package (MB)")
 
 class EvaluationConfig(BaseModel):
     """Model evaluation configuration."""
@@ -57,6 +58,11 @@ class MonitoringConfig(BaseModel):
     performance_tracking: bool = Field(default=True, description="Enable performance tracking")
     resource_monitoring: bool = Field(default=True, description="Enable resource monitoring")
     model_health_checks: bool = Field(default=True, description="Enable model health checks")
+    metrics_buffer_size: int = Field(default=1000, description="Inference metrics retained per model")
+    metrics_flush_interval: float = Field(default=5.0, description="Seconds between inference metrics flushes to disk")
+    drift_bins: int = Field(default=20, description="Histogram bins used for drift detection")
+    drift_reference_size: int = Field(default=200, description="Scores frozen as the drift reference of a model")
+    drift_window_size: int = Field(default=200, description="Recent scores compared against the drift reference")
     alerting: Dict[str, Any] = Field(default_factory=lambda: {
         "enabled": True,
         "email_notifications": False,
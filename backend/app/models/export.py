@@ -22,6 +22,51 @@ class DataValidationResult(BaseModel):
     missing_fields: List[str] = Field(default_factory=list)
     invalid_values: Dict[str, List[Any]] = Field(default_factory=dict)
 
+class ChunkValidationReport(BaseModel):
+    """Aggregated validation results for a chunk of records."""
+    data_type: str = Field(..., description="Validated data type")
+    validation_level: str = Field(default="basic", description="Level of validation performed")
+    record_count: int = Field(default=0, description="Number of records validated")
+    valid_count: int = Field(default=0, description="Number of valid records")
+    missing_fields: Dict[str, int] = Field(default_factory=dict, description="Records missing each required field")
+    invalid_values: Dict[str, int] = Field(default_factory=dict, description="Records with an invalid value per field")
+    invalid_samples: Dict[str, List[Any]] = Field(default_factory=dict, description="Example invalid values (full validation)")
+    invalid_rows: List[int] = Field(default_factory=list, description="Positions of invalid records (full validation)")
+    quality_metrics: Dict[str, float] = Field(default_factory=dict)
+
+    @property
+    def is_valid(self) -> bool:
+        return self.valid_count == self.record_count
+
+    def merge(self, other: 'ChunkValidationReport', max_samples: int = 5) -> 'ChunkValidationReport':
+        """Combine with the report of the following chunk into an export-level report."""
+        total = self.record_count + other.record_count
+        for name, value in other.missing_fields.items():
+            self.missing_fields[name] = self.missing_fields.get(name, 0) + value
+        for name, value in other.invalid_values.items():
+            self.invalid_values[name] = self.invalid_values.get(name, 0) + value
+        for name, samples in other.invalid_samples.items():
+            merged = self.invalid_samples.setdefault(name, [])
+            merged.extend(samples[:max(0, max_samples - len(merged))])
+        self.invalid_rows.extend(row + self.record_count for row in other.invalid_rows)
+        if total:
+            # Record-weighted means of the chunk metrics
+            self.quality_metrics = {
+                name: (self.quality_metrics.get(name, 1.0) * self.record_count
+                       + other.quality_metrics.get(name, 1.0) * other.record_count) / total
+                for name in set(self.quality_metrics) | set(other.quality_metrics)
+            }
+        self.record_count = total
+        self.valid_count += other.valid_count
+        return self
+
+# Filters pushed into the export queries; see DataService.iter_log_batches
+EXPORT_FILTER_FIELDS = ('device_id', 'device_ip', 'log_level', 'process_name', 'message_contains')
+COMPRESSION_FORMATS = ('gzip', 'zstd')
+VALIDATION_LEVELS = ('none', 'basic', 'full')
+# Levels older clients still send
+VALIDATION_LEVEL_ALIASES = {'strict': 'full', 'custom': 'basic'}
+
 class ExportConfig(BaseModel):
     """Configuration for data export."""
     start_date: Optional[Union[datetime, str]] = Field(None, description="Start date for data export (optional)")
@@ -33,6 +78,7 @@ class ExportConfig(BaseModel):
     validation_level: str = Field(default="basic", description="Level of validation to perform")
     output_format: str = Field(default="json", description="Output format for export")
     compression: bool = Field(default=False, description="Whether to compress output")
+    compression_format: str = Field(default="gzip", description="Compression codec: gzip or zstd")
     processes: List[str] = Field(default_factory=list, description="List of processes to filter by")
     
     @validator('start_date', 'end_date', pre=True)
@@ -62,6 +108,32 @@ class ExportConfig(BaseModel):
                 raise ValueError(f"Invalid data type: {data_type}")
         return v
     
+    @validator('filters')
+    def validate_filters(cls, v):
+        for name in v:
+            if name not in EXPORT_FILTER_FIELDS:
+                raise ValueError(f"Invalid filter: {name}")
+        return v
+    
+    @validator('batch_size')
+    def validate_batch_size(cls, v):
+        if v < 1:
+            raise ValueError("Batch size must be positive")
+        return v
+    
+    @validator('compression_format')
+    def validate_compression_format(cls, v):
+        if v not in COMPRESSION_FORMATS:
+            raise ValueError(f"Invalid compression format: {v}")
+        return v
+    
+    @validator('validation_level')
+    def validate_validation_level(cls, v):
+        v = VALIDATION_LEVEL_ALIASES.get(v, v)
+        if v not in VALIDATION_LEVELS:
+            raise ValueError(f"Invalid validation level: {v}")
+        return v
+    
     @validator('end_date')
     def validate_date_range(cls, v, values):
         if v and 'start_date' in values and values['start_date']:
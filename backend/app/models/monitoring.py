@@ -6,6 +6,7 @@ from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry
 from sklearn.metrics import precision_recall_curve, average_precision_score
 
 from app.components.base_monitor import BaseMonitor
+from app.components.drift_detector import DriftDetector
 from app.components.data_service import DataService
 
 # Configure logging
@@ -34,14 +35,16 @@ class ModelMonitor(BaseMonitor):
                 buckets=[1.0, 5.0, 10.0, 30.0, 60.0]
             ),
             'feature_drift': self._create_gauge('feature_drift', 'Feature drift score', ['feature']),
+            'feature_psi': self._create_gauge('feature_psi', 'Feature population stability index', ['feature']),
             'prediction_drift': self._create_gauge('prediction_drift', 'Prediction drift score'),
+            'prediction_psi': self._create_gauge('prediction_psi', 'Prediction population stability index'),
             'data_quality': self._create_gauge('data_quality', 'Data quality score', ['metric'])
         })
         
         # Initialize drift detection parameters
         self.drift_threshold = 0.1
         self.window_size = 1000
-        self.reference_data = None
+        self.drift_detector = DriftDetector(warmup_size=self.window_size)
         self.data_service = DataService()
         self.data_service.set_metrics(self.metrics)  # Pass metrics to DataService
         self._initialized = False
@@ -82,52 +85,57 @@ class ModelMonitor(BaseMonitor):
         # Update data quality metrics
         await self._update_data_quality_metrics(features)
     
-    async def _update_drift_metrics(self, features: Dict, scores: np.ndarray) -> None:
-        """Update feature and prediction drift metrics.
+    def set_reference(self, features: Dict, scores: Optional[np.ndarray] = None) -> None:
+        """Freeze the drift reference, normally from the model's training data.
         
         Args:
-            features: Input features
-            scores: Anomaly scores
+            features: Training features by name
+            scores: Anomaly scores on the training data
         """
-        # Initialize reference data if not exists
-        if self.reference_data is None:
-            self.reference_data = {
-                'features': features,
-                'scores': scores
-            }
-            return
-        
-        # Calculate feature drift
-        for feature_name, feature_values in features.items():
-            if feature_name in self.reference_data['features']:
-                ref_values = self.reference_data['features'][feature_name]
-                drift_score = self._calculate_drift_score(feature_values, ref_values)
-                self.metrics['feature_drift'].labels(feature=feature_name).set(drift_score)
-        
-        # Calculate prediction drift
-        drift_score = self._calculate_drift_score(scores, self.reference_data['scores'])
-        self.metrics['prediction_drift'].set(drift_score)
-        
-        # Update reference data
-        self.reference_data = {
-            'features': features,
-            'scores': scores
-        }
+        self.drift_detector.set_reference(features, scores)
     
-    def _calculate_drift_score(self, current: np.ndarray, reference: np.ndarray) -> float:
-        """Calculate drift score between current and reference data.
+    def load_reference_from_metadata(self, metadata: Dict) -> bool:
+        """Load the drift reference stored in the metadata of a newly loaded model.
+        
+        Without one, any previous model's reference is dropped and the
+        first window_size observations become the reference.
         
         Args:
-            current: Current data
-            reference: Reference data
+            metadata: Model metadata
             
         Returns:
-            Drift score (0 to 1, higher means more drift)
+            True if a reference was loaded
+        """
+        reference = (metadata or {}).get('drift_reference')
+        if not reference:
+            self.drift_detector = DriftDetector(warmup_size=self.window_size)
+            return False
+        self.drift_detector.load_reference(reference)
+        return True
+    
+    async def _update_drift_metrics(self, features: Dict, scores: np.ndarray) -> None:
+        """Update feature and prediction drift metrics.
+        
+        Observations are added to per-feature sliding-window histograms and
+        compared with the frozen reference, so the cost does not depend on
+        traffic volume. Without a training reference the first window_size
+        observations become the reference.
+        
+        Args:
+            features: Input features
+            scores: Anomaly scores
         """
-        # Use Kolmogorov-Smirnov test for drift detection
-        from scipy import stats
-        ks_statistic, _ = stats.ks_2samp(current, reference)
-        return ks_statistic
+        self.drift_detector.update(features, scores)
+        if not self.drift_detector.has_reference:
+            return
+        
+        for name, result in self.drift_detector.compute().items():
+            if name == DriftDetector.SCORES:
+                self.metrics['prediction_drift'].set(result['ks'])
+                self.metrics['prediction_psi'].set(result['psi'])
+            else:
+                self.metrics['feature_drift'].labels(feature=name).set(result['ks'])
+                self.metrics['feature_psi'].labels(feature=name).set(result['psi'])
     
     async def _update_data_quality_metrics(self, features: Dict) -> None:
         """Update data quality metrics.
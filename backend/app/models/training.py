@@ -1,26 +1,168 @@
 import os
+import copy
+import asyncio
 import json
+import time
 import logging
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple, Any
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 import yaml
 import joblib
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import precision_recall_curve, average_precision_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler, train_test_split
+from sklearn.metrics import precision_recall_curve, average_precision_score, roc_auc_score
 
 from app.components.feature_extractor import FeatureExtractor
 from app.components.data_service import DataService
+from app.components.drift_detector import DriftDetector
 from app.models.config import ModelConfig
+from app.services.model_artifact import write_model_index
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+TRAINING_QUERY = """
+    SELECT * FROM wifi_logs 
+    WHERE timestamp BETWEEN $1 AND $2
+    ORDER BY timestamp
+"""
+
+# Rows logged after the previous refresh, up to the new one
+INCREMENTAL_QUERY = """
+    SELECT * FROM wifi_logs 
+    WHERE timestamp > $1 AND timestamp <= $2
+    ORDER BY timestamp
+"""
+
+# Saved next to model.joblib so the next refresh can continue from a version
+INCREMENTAL_STATE_FILE = 'incremental.joblib'
+DEFAULT_RESERVOIR_SIZE = 10000
+
+class ReservoirSample:
+    """Fixed-size uniform sample of all feature vectors seen so far (Algorithm R)."""
+    
+    def __init__(self, size: int = DEFAULT_RESERVOIR_SIZE, random_state: Optional[int] = None):
+        self.size = size
+        self.items: Optional[np.ndarray] = None
+        self.seen = 0
+        self.rng = np.random.default_rng(random_state)
+    
+    def add(self, X: np.ndarray) -> None:
+        """Offer a batch of rows, with the same outcome as offering them one at a time.
+        
+        Args:
+            X: Raw (unscaled) feature rows
+        """
+        if self.items is None:
+            self.items = np.empty((0, X.shape[1]))
+        
+        # Fill the reservoir first
+        fill = max(0, min(self.size - len(self.items), len(X)))
+        if fill:
+            self.items = np.vstack([self.items, X[:fill]])
+        
+        rest = X[fill:]
+        if len(rest):
+            # The k-th row of the stream takes a random slot with probability size / (k + 1)
+            positions = self.seen + fill + np.arange(len(rest))
+            slots = self.rng.integers(0, positions + 1)
+            accepted = slots < self.size
+            # Where several rows land in one slot the latest wins
+            slots, rows = slots[accepted][::-1], rest[accepted][::-1]
+            slots, latest = np.unique(slots, return_index=True)
+            self.items[slots] = rows[latest]
+        
+        self.seen += len(X)
+
+def rescale_forest(model: IsolationForest, old_scaler: StandardScaler,
+                   new_scaler: StandardScaler) -> None:
+    """Move the split thresholds of fitted trees from one feature scaling to another.
+    
+    Each split compares a single feature with a threshold, so mapping the
+    thresholds through the change of scaling keeps every tree's partition of
+    the raw feature space, and therefore its scores, unchanged.
+    """
+    for tree, features in zip(model.estimators_, model.estimators_features_):
+        nodes = tree.tree_
+        split = nodes.children_left != -1
+        columns = np.asarray(features)[nodes.feature[split]]
+        raw = nodes.threshold[split] * old_scaler.scale_[columns] + old_scaler.mean_[columns]
+        nodes.threshold[split] = (raw - new_scaler.mean_[columns]) / new_scaler.scale_[columns]
+
+# Uniform background points added to an unlabelled held-out set, as a fraction of it
+SYNTHETIC_OUTLIER_FRACTION = 0.1
+
+class SharedArray:
+    """A numpy array copied once into shared memory for sweep workers.
+    
+    Workers attach by name and read it in place, so every candidate fits
+    on the same training data without a pickled copy per task.
+    """
+    
+    def __init__(self, array: np.ndarray):
+        array = np.ascontiguousarray(array)
+        self.shape = array.shape
+        self.dtype = array.dtype.str
+        self.shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(self.shape, dtype=array.dtype, buffer=self.shm.buf)[...] = array
+    
+    @property
+    def handle(self) -> Dict[str, Any]:
+        """What a worker needs to attach: block name, shape and dtype."""
+        return {'name': self.shm.name, 'shape': self.shape, 'dtype': self.dtype}
+    
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+    
+    def __enter__(self) -> 'SharedArray':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def fit_candidate(params: Dict[str, Any], train: Dict[str, Any], evaluation: Dict[str, Any],
+                  y_eval: np.ndarray, random_state: int) -> Dict[str, Any]:
+    """Fit one sweep candidate and score it on the held-out set.
+    
+    Runs in a worker process, reading the shared training and evaluation
+    arrays in place. Only the metrics travel back; the forest itself would
+    have to be pickled to the parent.
+    """
+    blocks = [shared_memory.SharedMemory(name=train['name']),
+              shared_memory.SharedMemory(name=evaluation['name'])]
+    try:
+        X_train = np.ndarray(train['shape'], dtype=train['dtype'], buffer=blocks[0].buf)
+        X_eval = np.ndarray(evaluation['shape'], dtype=evaluation['dtype'], buffer=blocks[1].buf)
+        X_train.flags.writeable = False
+        
+        started = time.perf_counter()
+        model = IsolationForest(**params, random_state=random_state).fit(X_train)
+        fitted = time.perf_counter()
+        # One vectorized pass over the whole held-out set
+        scores = -model.score_samples(X_eval)
+        scored = time.perf_counter()
+        # Views must be released before the blocks can be closed
+        del X_train, X_eval
+    finally:
+        for block in blocks:
+            block.close()
+    
+    metrics = {
+        'average_precision': float(average_precision_score(y_eval, scores)),
+        'roc_auc': float(roc_auc_score(y_eval, scores)),
+        'fit_seconds': fitted - started,
+        'score_seconds': scored - fitted
+    }
+    return metrics
+
 class ModelTrainer:
     """Handles model training, evaluation, and persistence."""
     
@@ -50,20 +192,12 @@ class ModelTrainer:
         Returns:
             Tuple of (features, labels) for training
         """
-        # Fetch logs from database
-        query = """
-            SELECT * FROM wifi_logs 
-            WHERE timestamp BETWEEN $1 AND $2
-            ORDER BY timestamp
-        """
-        logs = await self.data_service.fetch_all(query, start_date, end_date)
+        # Fetch logs from database and extract features
+        features = await self._fetch_features(TRAINING_QUERY, start_date, end_date)
         
-        if not logs:
+        if features is None:
             raise ValueError("No training data available for the specified period")
         
-        # Extract features
-        features = await self.feature_extractor.extract(logs)
-        
         # Prepare feature matrix
         X = self._prepare_feature_matrix(features)
         
@@ -73,8 +207,25 @@ class ModelTrainer:
         
         return X, y
     
-    def _prepare_feature_matrix(self, features: Dict) -> np.ndarray:
-        """Prepare feature matrix for training.
+    async def _fetch_features(self, query: str, *args) -> Optional[Dict]:
+        """Fetch logs and extract their features.
+        
+        Args:
+            query: Query over wifi_logs
+            *args: Query parameters
+            
+        Returns:
+            Dictionary of extracted features, or None when no logs match
+        """
+        logs = await self.data_service.fetch_all(query, *args)
+        
+        if not logs:
+            return None
+        
+        return await self.feature_extractor.extract(logs)
+    
+    def _raw_feature_matrix(self, features: Dict) -> np.ndarray:
+        """Select the numeric feature columns, unscaled.
         
         Args:
             features: Dictionary of extracted features
@@ -85,16 +236,20 @@ class ModelTrainer:
         # Convert features to DataFrame
         df = pd.DataFrame(features)
         
-        # Select numeric features
-        numeric_features = self.config.feature_columns
-        
         # Extract numeric features
-        X = df[numeric_features].values
+        return df[self.config.feature_columns].values.astype(float)
+    
+    def _prepare_feature_matrix(self, features: Dict) -> np.ndarray:
+        """Prepare feature matrix for training.
         
+        Args:
+            features: Dictionary of extracted features
+            
+        Returns:
+            Feature matrix as numpy array
+        """
         # Scale features
-        X = self.scaler.fit_transform(X)
-        
-        return X
+        return self.scaler.fit_transform(self._raw_feature_matrix(features))
     
     def train_model(self, X: np.ndarray, y: np.ndarray) -> IsolationForest:
         """Train the anomaly detection model.
@@ -157,12 +312,144 @@ class ModelTrainer:
             'thresholds': thresholds.tolist()
         }
     
-    def save_model(self, model: IsolationForest, version: str) -> str:
+    def _default_param_grid(self) -> Dict[str, List[Any]]:
+        """Candidates around the configured model parameters."""
+        n_estimators = self.config.n_estimators
+        return {
+            'n_estimators': sorted({max(10, n_estimators // 2), n_estimators, n_estimators * 2}),
+            'max_samples': list(dict.fromkeys([self.config.max_samples, 'auto', 0.5])),
+            'max_features': [1.0, 0.5],
+            'contamination': [self.config.contamination]
+        }
+    
+    def _evaluation_set(self, X_train: np.ndarray, X_val: np.ndarray,
+                        y_val: np.ndarray) -> Tuple[np.ndarray, np.ndarray, str]:
+        """Held-out rows and anomaly labels to compare sweep candidates on.
+        
+        Uses y_val when it marks any anomalies. Otherwise the held-out rows
+        count as normal and uniform points over the (slightly widened) range
+        of the training data as anomalies.
+        
+        Returns:
+            Tuple of (features, labels, label source)
+        """
+        if np.any(y_val):
+            return X_val, (y_val != 0).astype(int), 'labels'
+        
+        rng = np.random.default_rng(self.config.random_state)
+        low, high = X_train.min(axis=0), X_train.max(axis=0)
+        margin = 0.1 * (high - low)
+        count = max(1, int(len(X_val) * SYNTHETIC_OUTLIER_FRACTION))
+        outliers = rng.uniform(low - margin, high + margin, size=(count, X_train.shape[1]))
+        
+        X_eval = np.vstack([X_val, outliers])
+        y_eval = np.concatenate([np.zeros(len(X_val), dtype=int), np.ones(count, dtype=int)])
+        return X_eval, y_eval, 'synthetic_outliers'
+    
+    def sweep_models(self, X: np.ndarray, y: np.ndarray,
+                     param_grid: Optional[Dict[str, List[Any]]] = None,
+                     n_iter: Optional[int] = None,
+                     n_jobs: Optional[int] = None) -> Tuple[IsolationForest, Dict[str, Any]]:
+        """Train candidate models in parallel and keep the best on a held-out set.
+        
+        Args:
+            X: Feature matrix
+            y: Labels, 1 for known anomalies (all zeros when unlabelled)
+            param_grid: IsolationForest parameter lists (defaults around the config)
+            n_iter: Random search over this many candidates instead of the full grid
+            n_jobs: Worker processes (None or -1 for one per CPU)
+            
+        Returns:
+            Tuple of (best model, comparison report)
+        """
+        X_train, X_val, y_train, y_val = train_test_split(
+            X, y, test_size=self.config.train_test_split,
+            random_state=self.config.random_state
+        )
+        X_eval, y_eval, label_source = self._evaluation_set(X_train, X_val, y_val)
+        
+        param_grid = param_grid or self._default_param_grid()
+        if n_iter:
+            candidates = list(ParameterSampler(param_grid, n_iter, random_state=self.config.random_state))
+        else:
+            candidates = list(ParameterGrid(param_grid))
+        
+        if n_jobs in (None, -1):
+            n_jobs = os.cpu_count() or 1
+        workers = max(1, min(n_jobs, len(candidates)))
+        started = time.perf_counter()
+        with SharedArray(X_train) as train, SharedArray(X_eval) as evaluation:
+            args = (train.handle, evaluation.handle, y_eval, self.config.random_state)
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(fit_candidate, params, *args) for params in candidates]
+                    results = [future.result() for future in futures]
+            else:
+                results = [fit_candidate(params, *args) for params in candidates]
+        elapsed = time.perf_counter() - started
+        
+        ranked = sorted(zip(candidates, results), key=lambda item: item[1]['average_precision'],
+                        reverse=True)
+        best_params = ranked[0][0]
+        # Fitting is deterministic for a fixed random_state, so refitting the
+        # winner here reproduces the candidate the worker scored
+        best_model = IsolationForest(**best_params, random_state=self.config.random_state).fit(X_train)
+        report = {
+            'selection_metric': 'average_precision',
+            'label_source': label_source,
+            'train_samples': len(X_train),
+            'held_out_samples': len(X_eval),
+            'workers': workers,
+            'wall_seconds': elapsed,
+            'best_params': best_params,
+            'candidates': [{'params': params, **metrics} for params, metrics in ranked]
+        }
+        logger.info(f"Sweep of {len(candidates)} candidates on {workers} workers took {elapsed:.2f}s, "
+                    f"best {best_params} (average precision {ranked[0][1]['average_precision']:.4f})")
+        
+        return best_model, report
+    
+    def build_drift_reference(self, model: IsolationForest, X: np.ndarray) -> Dict[str, Any]:
+        """Build the frozen drift reference histograms for a trained model.
+        
+        Args:
+            model: Trained model
+            X: Scaled training feature matrix
+            
+        Returns:
+            Serialised reference histograms per feature and for anomaly scores
+        """
+        detector = DriftDetector()
+        raw_features = self.scaler.inverse_transform(X)
+        detector.set_reference(
+            dict(zip(self.config.feature_columns, raw_features.T)),
+            -model.score_samples(X)
+        )
+        return detector.reference_to_dict()
+    
+    def _new_version(self) -> str:
+        """A version name that sorts after existing ones and names no existing directory.
+        
+        Names carry microseconds, so an incremental refresh in the same
+        second as its base version gets a name of its own.
+        """
+        moment = datetime.now()
+        version = moment.strftime('%Y%m%d_%H%M%S_%f')
+        while os.path.exists(os.path.join(self.model_dir, version)):
+            moment += timedelta(microseconds=1)
+            version = moment.strftime('%Y%m%d_%H%M%S_%f')
+        return version
+    
+    def save_model(self, model: IsolationForest, version: str,
+                   drift_reference: Optional[Dict[str, Any]] = None,
+                   metadata: Optional[Dict[str, Any]] = None) -> str:
         """Save model and metadata.
         
         Args:
             model: Trained model
             version: Model version
+            drift_reference: Reference histograms for drift detection
+            metadata: Additional entries for metadata.json
             
         Returns:
             Path to saved model
@@ -184,22 +471,34 @@ class ModelTrainer:
             'version': version,
             'timestamp': datetime.now().isoformat(),
             'config': self.config.dict(),
-            'feature_names': self.config.feature_columns
+            'feature_names': self.config.feature_columns,
+            **(metadata or {})
         }
+        if drift_reference:
+            metadata['drift_reference'] = drift_reference
         
         metadata_path = os.path.join(version_dir, 'metadata.json')
         with open(metadata_path, 'w') as f:
             json.dump(metadata, f, indent=2)
         
+        # Index and tree arrays for listing and loading without unpickling
+        write_model_index(Path(version_dir), model, metadata)
+        
         return version_dir
     
     async def train_and_save(self, start_date: Optional[datetime] = None,
-                           end_date: Optional[datetime] = None) -> str:
+                           end_date: Optional[datetime] = None,
+                           sweep: bool = False,
+                           param_grid: Optional[Dict[str, List[Any]]] = None,
+                           n_iter: Optional[int] = None) -> str:
         """Train model and save to disk.
         
         Args:
             start_date: Start date for data collection
             end_date: End date for data collection
+            sweep: Select the model with a parallel hyperparameter sweep
+            param_grid: Sweep parameter lists (see sweep_models)
+            n_iter: Sweep candidates to sample instead of the full grid
             
         Returns:
             Path to saved model
@@ -208,12 +507,137 @@ class ModelTrainer:
         X, y = await self.prepare_training_data(start_date, end_date)
         
         # Train model
-        model = self.train_model(X, y)
+        metadata: Dict[str, Any] = {'training_mode': 'full'}
+        if sweep:
+            # The sweep blocks on its worker processes; keep the event loop free
+            model, metadata['sweep'] = await asyncio.to_thread(self.sweep_models, X, y, param_grid, n_iter)
+        else:
+            model = self.train_model(X, y)
         
         # Generate version
-        version = datetime.now().strftime('%Y%m%d_%H%M%S')
+        version = self._new_version()
         
-        # Save model
-        model_path = self.save_model(model, version)
+        # Save model with its training-time drift reference
+        model_path = self.save_model(model, version, self.build_drift_reference(model, X), metadata)
+        
+        # Seed the state later incremental refreshes continue from
+        reservoir = ReservoirSample(random_state=self.config.random_state)
+        reservoir.add(self.scaler.inverse_transform(X))
+        self._save_incremental_state(model_path, reservoir, end_date or datetime.now())
+        
+        return model_path
+    
+    def _save_incremental_state(self, version_dir: str, reservoir: ReservoirSample,
+                                trained_until: datetime) -> None:
+        """Save the reservoir and data watermark of a model version.
+        
+        Args:
+            version_dir: Model version directory
+            reservoir: Sample of the raw training feature vectors
+            trained_until: Timestamp of the newest data the model has seen
+        """
+        joblib.dump(
+            {'reservoir': reservoir, 'trained_until': trained_until},
+            os.path.join(version_dir, INCREMENTAL_STATE_FILE)
+        )
+    
+    def _latest_incremental_version(self) -> Optional[str]:
+        """Directory of the newest version that can be refreshed incrementally."""
+        versions = sorted(
+            name for name in os.listdir(self.model_dir)
+            if os.path.exists(os.path.join(self.model_dir, name, INCREMENTAL_STATE_FILE))
+        )
+        return os.path.join(self.model_dir, versions[-1]) if versions else None
+    
+    def _retire_oldest_trees(self, model: IsolationForest, keep: int, X: np.ndarray) -> int:
+        """Drop the oldest trees so that keep remain.
+        
+        Args:
+            model: Model after a warm-start fit (newest trees last)
+            keep: Number of trees to keep
+            X: Scaled data the refresh was fitted on, for the decision offset
+            
+        Returns:
+            Number of trees retired
+        """
+        retired = len(model.estimators_) - keep
+        if retired <= 0:
+            return 0
+        
+        model.estimators_ = model.estimators_[retired:]
+        model.estimators_features_ = model.estimators_features_[retired:]
+        # Per-tree caches kept alongside the estimators
+        for name in ('_average_path_length_per_tree', '_decision_path_lengths'):
+            if hasattr(model, name):
+                setattr(model, name, getattr(model, name)[retired:])
+        model.n_estimators = keep
+        
+        # The offset was derived from the scores of the larger forest
+        if model.contamination != 'auto':
+            model.offset_ = np.percentile(model.score_samples(X), 100.0 * model.contamination)
+        
+        return retired
+    
+    async def train_incremental(self, end_date: Optional[datetime] = None,
+                                new_trees: Optional[int] = None) -> str:
+        """Refresh the latest model with the data logged since it was trained.
+        
+        Only the new rows are read. Scaler statistics are updated with them
+        (running mean/variance), the existing trees are rescaled to match,
+        and new_trees trees are grown on the reservoir sample plus the new
+        rows before the same number of the oldest trees is retired. Falls
+        back to train_and_save when no version has incremental state.
+        
+        Args:
+            end_date: End of the new data (defaults to now)
+            new_trees: Trees to replace (defaults to a tenth of the forest)
+            
+        Returns:
+            Path to saved model
+        """
+        base_dir = self._latest_incremental_version()
+        if base_dir is None:
+            logger.info("No incremental training state found, training from scratch")
+            return await self.train_and_save(end_date=end_date)
+        
+        model = joblib.load(os.path.join(base_dir, 'model.joblib'))
+        self.scaler = joblib.load(os.path.join(base_dir, 'scaler.joblib'))
+        state = joblib.load(os.path.join(base_dir, INCREMENTAL_STATE_FILE))
+        end_date = end_date or datetime.now()
+        
+        features = await self._fetch_features(INCREMENTAL_QUERY, state['trained_until'], end_date)
+        if features is None:
+            logger.info(f"No new training data since {state['trained_until']}, keeping {base_dir}")
+            return base_dir
+        X_new = self._raw_feature_matrix(features)
+        
+        # Update running scaler statistics and keep the existing trees consistent
+        previous_scaler = copy.deepcopy(self.scaler)
+        self.scaler.partial_fit(X_new)
+        rescale_forest(model, previous_scaler, self.scaler)
+        
+        # Fit on a sample of the history plus everything new
+        reservoir = state['reservoir']
+        X = self.scaler.transform(np.vstack([reservoir.items, X_new]))
+        reservoir.add(X_new)
+        
+        keep = len(model.estimators_)
+        model.set_params(warm_start=True, n_estimators=keep + (new_trees or max(1, keep // 10)))
+        model.fit(X)
+        retired = self._retire_oldest_trees(model, keep, X)
+        
+        metrics = self._evaluate_model(model, self.scaler.transform(X_new))
+        logger.info(f"Incremental refresh on {len(X_new)} new rows, average precision "
+                    f"{metrics['average_precision']:.4f}, {retired} trees replaced")
+        
+        version = self._new_version()
+        model_path = self.save_model(model, version, self.build_drift_reference(model, X), {
+            'training_mode': 'incremental',
+            'base_version': os.path.basename(base_dir),
+            'new_samples': len(X_new),
+            'trees_replaced': retired,
+            'trained_until': end_date.isoformat()
+        })
+        self._save_incremental_state(model_path, reservoir, end_date)
         
         return model_path 
\ No newline at end of file
@@ -0,0 +1,289 @@
+import json
+import uuid
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.components.feature_extractor import FeatureExtractor
+from app.mcp_service.components.anomaly_classifier import AnomalyClassifier
+
+logger = logging.getLogger(__name__)
+
+JOB_KEY_PREFIX = "anomaly_test:job"
+JOB_TTL = 7 * 24 * 60 * 60  # 7 days, like export metadata
+MAX_STORED_RESULTS = 500
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once its cancellation flag is set."""
+
+
+def score_logs(logs: List[Dict[str, Any]], model: Any, thresholds: Dict[str, Any],
+               threshold: float) -> List[Dict[str, Any]]:
+    """Featurize and score one chunk of logs.
+
+    Runs in a worker process, so it only touches its arguments.
+    """
+    classifier = AnomalyClassifier()
+    classifier.thresholds.update(thresholds)
+    classifier.threshold = threshold
+    classifier.set_model(model)
+    features = FeatureExtractor().extract_features(logs)
+    return classifier.detect_anomalies(features)
+
+
+def split_time_range(start_time: datetime, end_time: datetime,
+                     chunk: timedelta) -> List[Tuple[datetime, datetime]]:
+    """Split [start_time, end_time) into consecutive windows of at most chunk."""
+    windows = []
+    window_start = start_time
+    while window_start < end_time:
+        window_end = min(window_start + chunk, end_time)
+        windows.append((window_start, window_end))
+        window_start = window_end
+    return windows
+
+
+class AnomalyTestJobManager:
+    """Runs anomaly tests and backfills as background jobs.
+
+    A job splits its time range into windows. Windows are fetched and
+    analysed concurrently (at most ``chunk_concurrency`` per job, at most
+    ``max_jobs`` jobs at a time), with feature extraction and scoring for ML
+    agents sent to a process pool. Job state lives in Redis under
+    ``anomaly_test:job:<id>`` so any API worker can report progress or
+    cancel it.
+    """
+
+    def __init__(self, redis_client, max_jobs: int = 2, chunk_concurrency: int = 4,
+                 process_workers: int = 2):
+        self.redis_client = redis_client
+        self.chunk_concurrency = chunk_concurrency
+        self.process_workers = process_workers
+        self._job_slots = asyncio.Semaphore(max_jobs)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    # Job state
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"{JOB_KEY_PREFIX}:{job_id}"
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Current state of a job."""
+        data = self.redis_client.get(self._key(job_id))
+        return json.loads(data) if data else None
+
+    def _save_job(self, job: Dict[str, Any]) -> None:
+        job['updated_at'] = datetime.now().isoformat()
+        self.redis_client.setex(self._key(job['test_id']), JOB_TTL, json.dumps(job, default=str))
+
+    def _is_cancelled(self, job_id: str) -> bool:
+        return bool(self.redis_client.exists(f"{self._key(job_id)}:cancel"))
+
+    # Submission and cancellation
+
+    def submit(self, agent, start_time: datetime, end_time: datetime, programs: Optional[List[str]],
+               chunk_hours: float = 6, store_anomalies: bool = False) -> Dict[str, Any]:
+        """Queue a job and return its initial state."""
+        windows = split_time_range(start_time, end_time, timedelta(hours=chunk_hours))
+        job = {
+            'test_id': str(uuid.uuid4()),
+            'agent_id': agent.agent_id,
+            'agent_name': getattr(agent, 'agent_name', agent.agent_id),
+            'status': 'queued',
+            'start_time': start_time.isoformat(),
+            'end_time': end_time.isoformat(),
+            'store_anomalies': store_anomalies,
+            'logs_processed': 0,
+            'anomalies_detected': 0,
+            'test_duration': 0.0,
+            'progress': {'chunks_done': 0, 'chunks_total': len(windows), 'percentage': 0.0},
+            'results': [],
+            'errors': [],
+            'created_at': datetime.now().isoformat()
+        }
+        self._save_job(job)
+
+        task = asyncio.create_task(self._run(job, agent, windows, programs))
+        self._tasks[job['test_id']] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job['test_id'], None))
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Request cancellation; running windows stop at their next checkpoint."""
+        job = self.get_job(job_id)
+        if job is None or job['status'] not in ACTIVE_STATUSES:
+            return job
+        self.redis_client.setex(f"{self._key(job_id)}:cancel", JOB_TTL, 1)
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+        return job
+
+    async def shutdown(self) -> None:
+        """Cancel local jobs and stop the worker processes."""
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(cancel_futures=True)
+            self._process_pool = None
+
+    # Execution
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+        return self._process_pool
+
+    async def _run(self, job: Dict[str, Any], agent, windows: List[Tuple[datetime, datetime]],
+                   programs: Optional[List[str]]) -> None:
+        started = datetime.now()
+        tasks: List[asyncio.Task] = []
+        try:
+            async with self._job_slots:
+                started = datetime.now()
+                job['status'] = 'running'
+                self._save_job(job)
+
+                chunk_slots = asyncio.Semaphore(self.chunk_concurrency)
+                tasks = [
+                    asyncio.create_task(self._run_window(job, agent, window, programs, chunk_slots, started))
+                    for window in windows
+                ]
+                await asyncio.gather(*tasks)
+                job['status'] = 'completed_with_errors' if job['errors'] else 'completed'
+        except (asyncio.CancelledError, JobCancelled):
+            job['status'] = 'cancelled'
+        except Exception as e:
+            logger.error(f"Anomaly test {job['test_id']} failed: {e}")
+            job['status'] = 'error'
+            job['errors'].append(f"Test failed: {e}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            job['results'].sort(key=lambda result: str(result.get('timestamp', '')))
+            job['test_duration'] = (datetime.now() - started).total_seconds()
+            self._save_job(job)
+            logger.info(
+                f"Anomaly test {job['test_id']} {job['status']}: {job['anomalies_detected']} anomalies "
+                f"in {job['logs_processed']} logs ({job['test_duration']:.2f}s)"
+            )
+
+    async def _run_window(self, job: Dict[str, Any], agent, window: Tuple[datetime, datetime],
+                          programs: Optional[List[str]], chunk_slots: asyncio.Semaphore,
+                          started: datetime) -> None:
+        """Analyse one window and fold its outcome into the job state."""
+        async with chunk_slots:
+            if self._is_cancelled(job['test_id']):
+                raise JobCancelled(job['test_id'])
+            try:
+                logs_processed, results = await self._analyze_window(agent, window, programs,
+                                                                     job['store_anomalies'])
+                error = None
+            except Exception as e:
+                logger.warning(f"Anomaly test {job['test_id']} window {window[0]}: {e}")
+                logs_processed, results, error = 0, [], f"{window[0].isoformat()}: {e}"
+
+        # Runs on the event loop without awaiting, so updates cannot interleave
+        job['logs_processed'] += logs_processed
+        job['anomalies_detected'] += len(results)
+        room = MAX_STORED_RESULTS - len(job['results'])
+        job['results'].extend(results[:max(room, 0)])
+        if error:
+            job['errors'].append(error)
+        progress = job['progress']
+        progress['chunks_done'] += 1
+        progress['percentage'] = round(100 * progress['chunks_done'] / progress['chunks_total'], 1)
+        job['test_duration'] = (datetime.now() - started).total_seconds()
+        self._save_job(job)
+
+    async def _analyze_window(self, agent, window: Tuple[datetime, datetime], programs: Optional[List[str]],
+                              store_anomalies: bool) -> Tuple[int, List[Dict[str, Any]]]:
+        """Fetch and analyse one time window; returns (logs processed, results)."""
+        start_time, end_time = window
+        logs = await agent.data_service.get_logs_by_program(
+            start_time=start_time,
+            end_time=end_time,
+            programs=programs or None
+        )
+        if not logs:
+            return 0, []
+
+        # Hybrid agents delegate to whichever detector they run
+        detector = getattr(agent, 'ml_agent', None) or getattr(agent, 'rule_agent', None) or agent
+
+        if hasattr(detector, 'classifier') and hasattr(detector, 'feature_extractor'):
+            results = await self._score_with_model(detector, logs, end_time, store_anomalies)
+        else:
+            results = await self._score_with_rules(detector, logs, store_anomalies)
+        return len(logs), results
+
+    async def _score_with_model(self, agent, logs: List[Dict[str, Any]], window_end: datetime,
+                                store_anomalies: bool) -> List[Dict[str, Any]]:
+        model = getattr(agent, 'model', None)
+        if not model:
+            raise ValueError(f"Agent {agent.agent_id} has no model loaded")
+
+        loop = asyncio.get_running_loop()
+        anomalies = await loop.run_in_executor(
+            self._pool(), score_logs, logs, model,
+            dict(agent.classifier.thresholds), agent.classifier.threshold
+        )
+
+        results = []
+        for anomaly in anomalies:
+            if store_anomalies:
+                await agent.store_anomaly(
+                    anomaly_type=anomaly['type'],
+                    severity=anomaly['severity'],
+                    confidence=anomaly['confidence'],
+                    description=anomaly['description'],
+                    features=anomaly['features']
+                )
+            results.append({
+                'timestamp': window_end.isoformat(),
+                'type': anomaly['type'],
+                'severity': anomaly['severity'],
+                'description': anomaly['description'],
+                'source_log': anomaly.get('features', {})
+            })
+        return results
+
+    async def _score_with_rules(self, agent, logs: List[Dict[str, Any]],
+                                store_anomalies: bool) -> List[Dict[str, Any]]:
+        if hasattr(agent, '_filter_logs_by_rules'):
+            matching = await asyncio.to_thread(agent._filter_logs_by_rules, logs)
+        else:
+            target_levels = {level.lower() for level in getattr(agent, 'target_levels', ['error', 'critical'])}
+            matching = [
+                log for log in logs
+                if (log.get('level') or log.get('log_level') or '').lower() in target_levels
+            ]
+
+        aggregator = getattr(agent, '_aggregator', None)
+        if aggregator is None:
+            raise ValueError(f"Agent {agent.agent_id} does not support historical testing")
+
+        # Group without claiming cooldowns so tests do not silence live alerts
+        results = []
+        for group in aggregator.group(matching):
+            if store_anomalies:
+                await agent._process_group_for_anomaly(group)
+            log = group.first_log
+            level = (log.get('level') or log.get('log_level') or 'unknown').lower()
+            results.append({
+                'timestamp': group.last_seen.isoformat(),
+                'type': f"{level}_log",
+                'severity': agent.severity_mapping.get(level, 3),
+                'description': log.get('message') or '',
+                'count': group.count,
+                'source_log': log
+            })
+        return results
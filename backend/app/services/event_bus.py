@@ -0,0 +1,124 @@
+import json
+import asyncio
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Set
+
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = 'mcp:events'
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encode an event as a named server-sent event."""
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+class EventBus:
+    """Pushes state changes to connected dashboards through Redis pub/sub.
+
+    Publishers (agents, the model manager, export status, the health
+    sampler) publish each change once. Every process holds a single
+    subscription and fans events out to its stream clients through
+    bounded in-memory queues, so Redis load does not grow with the number
+    of open dashboards and a slow client only drops its own oldest events.
+    When the subscription fails, open streams are ended (subscribers receive
+    None) so clients fall back to polling until it is restored.
+    """
+
+    def __init__(self, redis_client=None, channel: str = EVENTS_CHANNEL, queue_size: int = 256,
+                 reconnect_delay: float = 5.0):
+        self.redis_client = redis_client
+        self.channel = channel
+        self.queue_size = queue_size
+        self.reconnect_delay = reconnect_delay
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.connected = False
+
+    def publish(self, event_type: str, data: Any) -> None:
+        """
+        Publish an event to every process; never raises.
+
+        Args:
+            event_type: Event name, e.g. 'agent_status' or 'anomaly'
+            data: JSON-serializable payload
+        """
+        if self.redis_client is None:
+            return
+        event = {'type': event_type, 'data': data, 'timestamp': datetime.now().isoformat()}
+        try:
+            self.redis_client.publish(self.channel, json.dumps(event, default=str))
+        except Exception as e:
+            logger.warning(f"Failed to publish {event_type} event: {e}")
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @contextmanager
+    def subscription(self) -> Iterator[asyncio.Queue]:
+        """A queue receiving every event while the context is open."""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    def dispatch(self, event: Optional[Dict[str, Any]]) -> None:
+        """Hand an event (or None, ending the stream) to every local subscriber."""
+        for queue in list(self._subscribers):
+            if queue.full():
+                # Keep the stream current for slow clients
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def _disconnected(self) -> None:
+        if self.connected:
+            self.connected = False
+            self.dispatch(None)
+
+    async def start(self, host: str, port: int, db: int = 0) -> None:
+        """Subscribe to the events channel in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(host, port, db))
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self, host: str, port: int, db: int) -> None:
+        while True:
+            client = aioredis.Redis(host=host, port=port, db=db, decode_responses=True)
+            try:
+                pubsub = client.pubsub()
+                await pubsub.subscribe(self.channel)
+                self.connected = True
+                async for message in pubsub.listen():
+                    if message['type'] != 'message':
+                        continue
+                    try:
+                        self.dispatch(json.loads(message['data']))
+                    except (TypeError, ValueError) as e:
+                        logger.warning(f"Ignoring malformed event: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event subscription failed, retrying in {self.reconnect_delay}s: {e}")
+            finally:
+                self._disconnected()
+                await client.aclose()
+            await asyncio.sleep(self.reconnect_delay)
+
+
+# Shared by every publisher and stream endpoint in the process
+event_bus = EventBus()
@@ -0,0 +1,76 @@
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Records or an already columnar chunk
+Chunk = Union[pd.DataFrame, List[Dict[str, Any]]]
+
+_OFFSET_SUFFIX = r'(?:Z|[+-]\d{2}:?\d{2})$'
+
+
+def to_frame(chunk: Chunk) -> pd.DataFrame:
+    """A columnar view of a chunk of records.
+
+    Fields absent from every record are absent columns; fields absent
+    from some records are nulls in those rows. Values stay Python objects,
+    so integers with gaps are not widened to floats.
+    """
+    if isinstance(chunk, pd.DataFrame):
+        return chunk
+    return pd.DataFrame(chunk, dtype=object)
+
+
+def to_records(frame: pd.DataFrame, like: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Records from a chunk, with nulls as None.
+
+    Args:
+        frame: The chunk
+        like: The records the chunk was built from. Each record then keeps
+            only the fields its original had, in their order, and its
+            original null values (transforms never null a present value).
+    """
+    records = frame.astype(object).where(frame.notna(), None).to_dict('records')
+    if like is None:
+        return records
+    return [
+        {key: original[key] if row[key] is None else row[key] for key in original}
+        for row, original in zip(records, like)
+    ]
+
+
+def parse_timestamps(column: pd.Series) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """
+    Parse the ISO 8601 strings of a column in one vectorized pass.
+
+    UTC offsets are split off first, so a column mixing naive and offset
+    timestamps (or several offsets) needs no per-row parsing, and every
+    value keeps its own offset.
+
+    Returns:
+        tuple: (is_string mask, parsed local timestamps, normalised offsets
+        as '+HH:MM' or ''); unparseable strings are NaT
+    """
+    is_string = column.map(type).eq(str).to_numpy()
+    strings = column[is_string].astype(str)
+    offsets = (
+        strings.str.extract(f'({_OFFSET_SUFFIX})', expand=False).fillna('')
+        .replace('Z', '+00:00')
+        .str.replace(r'^([+-]\d{2})(\d{2})$', r'\1:\2', regex=True)
+    )
+    local = strings.str.replace(_OFFSET_SUFFIX, '', regex=True)
+    parsed = pd.to_datetime(local, format='ISO8601', errors='coerce')
+    return pd.Series(is_string, index=column.index), parsed, offsets
+
+
+def isoformat(timestamps: pd.Series, suffix: Union[str, np.ndarray] = '') -> np.ndarray:
+    """Vectorized datetime.isoformat() of non-null timestamps: microseconds only when non-zero.
+
+    suffix (e.g. per-value UTC offsets) is appended to every value.
+    """
+    values = timestamps.dt.tz_localize(None) if timestamps.dt.tz is not None else timestamps
+    full = np.datetime_as_string(values.to_numpy().astype('datetime64[us]'), unit='us')
+    whole_seconds = timestamps.dt.microsecond.to_numpy() == 0
+    # Truncating to 19 characters drops the '.000000'
+    return np.char.add(np.where(whole_seconds, full.astype('<U19'), full), suffix)
@@ -1,20 +1,23 @@
 import os
 import json
-import uuid
+import time
 import logging
-import gzip
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, AsyncIterator, Optional
 from pathlib import Path
 import asyncio
 import yaml
-import csv
 import zipfile
-import tempfile
+import pandas as pd
 
-from app.models.export import ExportConfig, ExportMetadata
+from app.models.export import ChunkValidationReport, ExportConfig
+from app.services.export.columnar import to_frame, to_records
 from app.services.export.data_validator import DataValidator
 from app.services.export.data_transformer import DataTransformer
+from app.services.export.writers import (
+    COMPRESSION_SUFFIXES, WRITERS, RecordStreamWriter, ZipStreamWriter, open_compressed, precompress
+)
+from app.config.config import config as app_config
 from app.services.export.status_manager import ExportStatusManager
 from app.mcp_service.data_service import DataService
 
@@ -23,6 +26,9 @@ logger = logging.getLogger(__name__)
 class DataExporter:
     """Exports data from the remote PostgreSQL database to various formats."""
 
+    # Validator record types of the export data types
+    VALIDATION_TYPES = {"logs": "log_entry", "anomalies": "anomaly", "ips": "ip"}
+
     def __init__(self, config_path: str = "app/config/data_source_config.yaml"):
         self.config_path = config_path
         self.data_service = None
@@ -63,67 +69,120 @@ class DataExporter:
         end_date: Optional[datetime] = None,
         programs: Optional[List[str]] = None,
         format: str = "json",
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        config: Optional[ExportConfig] = None
     ) -> Dict[str, Any]:
         """
         Export data from the remote PostgreSQL database.
         
+        Each requested data type is streamed into its own output (one file
+        per type, or one entry per type in a ZIP), batch_size records at a
+        time: rows come from a server-side cursor with the config filters
+        applied in SQL, are validated per chunk and written through an
+        optional gzip/zstd stream, so memory stays bounded by one batch.
+        
         Args:
             export_id: Unique identifier for this export
             start_date: Start date for data range (None for no lower bound)
             end_date: End date for data range (None for no upper bound)
             programs: List of program names to filter by (None for all programs)
-            format: Export format ('json', 'csv', 'zip')
+            format: Export format ('json', 'jsonl', 'csv', 'zip'; 'json.gz' for gzipped JSON)
             progress_callback: Callback function for progress updates
+            config: Export settings (data_types, batch_size, filters, compression,
+                validation_level); defaults to logs only
             
         Returns:
-            Dictionary containing export metadata and file path
+            Dictionary containing export metadata and file paths
         """
         try:
+            config = config or ExportConfig(data_types=["logs"])
+            format = format.lower()
+            compression = config.compression_format if config.compression else None
+            if format.endswith(".gz"):
+                format, compression = format[:-3], "gzip"
+            if format not in ("json", "jsonl", "csv", "zip"):
+                raise ValueError(f"Unsupported export format: {format}")
+            if format == "zip":
+                # Entries are already deflated
+                compression = None
+            
             await self._initialize_data_service()
             
             # Update progress
             if progress_callback:
                 progress_callback(export_id, 10, "Connecting to database...")
             
-            # Get logs from the real database using DataService
-            logs = await self.data_service.get_logs_by_program(
-                start_time=start_date,
-                end_time=end_date,
-                programs=programs
-            )
-            
-            if progress_callback:
-                progress_callback(export_id, 30, f"Retrieved {len(logs)} log entries")
-            
-            if not logs:
-                logger.warning("No logs found for the specified criteria")
-                return {
-                    "export_id": export_id,
-                    "status": "completed",
-                    "records_exported": 0,
-                    "file_path": None,
-                    "message": "No data found for export criteria"
-                }
-            
-            # Update progress
-            if progress_callback:
-                progress_callback(export_id, 50, "Processing data...")
-            
-            # Process and format the data
-            processed_data = await self._process_logs(logs)
+            exports_dir = Path("exports")
+            exports_dir.mkdir(exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            validator = DataValidator(config.validation_level) if config.validation_level != "none" else None
+            transformer = DataTransformer(config)
             
-            if progress_callback:
-                progress_callback(export_id, 70, "Generating export file...")
+            files: Dict[str, str] = {}
+            variants: Dict[str, Dict[str, str]] = {}
+            records_by_type: Dict[str, int] = {}
+            validation: Dict[str, ChunkValidationReport] = {}
+            archive = None
+            if format == "zip":
+                archive_path = exports_dir / f"export_{export_id}_{timestamp}.zip"
+                archive = zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED)
             
-            # Generate export file
-            file_path = await self._generate_export_file(
-                processed_data, export_id, format
-            )
+            try:
+                for index, data_type in enumerate(config.data_types):
+                    base_progress = 10 + 80 * index // len(config.data_types)
+                    if progress_callback:
+                        progress_callback(export_id, base_progress, f"Exporting {data_type}...")
+                    
+                    if archive is not None:
+                        writer = ZipStreamWriter(archive, data_type)
+                        files[data_type] = str(archive_path)
+                    else:
+                        suffix = COMPRESSION_SUFFIXES.get(compression, "")
+                        file_path = exports_dir / f"export_{export_id}_{timestamp}_{data_type}.{format}{suffix}"
+                        writer = WRITERS[format](open_compressed(file_path, compression))
+                        files[data_type] = str(file_path)
+                    # Published before writing so JSONL exports can be followed while they run
+                    self._update_metadata(export_id, {"status": "running", "files": dict(files)})
+                    
+                    report = None
+                    last_progress = time.monotonic()
+                    try:
+                        async for batch in self._iter_batches(data_type, start_date, end_date, programs, config):
+                            # Transforming, validating and writing are CPU-bound; keep them off the event loop
+                            chunk_report = await asyncio.to_thread(
+                                self._export_batch, data_type, batch, transformer, validator, writer
+                            )
+                            if chunk_report is not None:
+                                report = chunk_report if report is None else report.merge(chunk_report)
+                            
+                            if progress_callback and time.monotonic() - last_progress >= 1:
+                                last_progress = time.monotonic()
+                                progress_callback(export_id, base_progress, f"Exported {writer.count} {data_type} records")
+                    finally:
+                        stream_metadata = {
+                            "created_at": datetime.now().isoformat(),
+                            "data_type": data_type,
+                            "total_records": writer.count,
+                            "format": format,
+                            "transformation": transformer.metadata
+                        } if config.include_metadata else None
+                        await asyncio.to_thread(writer.close, stream_metadata)
+                    
+                    records_by_type[data_type] = writer.count
+                    if compression is None and archive is None and app_config.EXPORT_PRECOMPRESS:
+                        variants[data_type] = {"gzip": await asyncio.to_thread(precompress, files[data_type])}
+                    if report is not None:
+                        validation[data_type] = report
+            finally:
+                if archive is not None:
+                    archive.close()
             
             if progress_callback:
                 progress_callback(export_id, 90, "Finalizing export...")
             
+            total_records = sum(records_by_type.values())
+            paths = sorted(set(files.values()))
+            
             # Create export metadata
             export_metadata = {
                 "export_id": export_id,
@@ -133,9 +192,16 @@ class DataExporter:
                 "end_date": end_date.isoformat() if end_date else None,
                 "programs": programs,
                 "format": format,
-                "records_exported": len(logs),
-                "file_path": file_path,
-                "file_size": os.path.getsize(file_path) if file_path else 0
+                "compression": compression,
+                "data_types": config.data_types,
+                "records_exported": total_records,
+                "records_by_type": records_by_type,
+                "files": files,
+                "variants": variants,
+                "file_path": files[config.data_types[0]] if files else None,
+                "file_size": sum(os.path.getsize(path) for path in paths),
+                "data_quality_metrics": self._quality_metrics(validation),
+                "validation": {data_type: report.dict() for data_type, report in validation.items()}
             }
             
             # Store final metadata in Redis
@@ -144,16 +210,103 @@ class DataExporter:
             if progress_callback:
                 progress_callback(export_id, 100, "Export completed successfully")
             
-            logger.info(f"Export {export_id} completed: {len(logs)} records exported")
+            logger.info(f"Export {export_id} completed: {total_records} records exported")
             return export_metadata
             
         except Exception as e:
             logger.error(f"Export failed for {export_id}: {e}")
+            self._update_metadata(export_id, {"status": "failed", "error_message": str(e)})
             if progress_callback:
                 progress_callback(export_id, -1, f"Export failed: {str(e)}")
             raise
 
-    async def _process_logs(self, logs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _update_metadata(export_id: str, update: Dict[str, Any]) -> None:
+        """Merge fields into the stored export metadata."""
+        metadata = ExportStatusManager.get_export_metadata(export_id) or {"export_id": export_id}
+        metadata.update(update)
+        ExportStatusManager.store_export_metadata(export_id, metadata)
+
+    def _iter_batches(
+        self,
+        data_type: str,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        programs: Optional[List[str]],
+        config: ExportConfig
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """The raw record batches of one data type."""
+        if data_type == "logs":
+            return self.data_service.iter_log_batches(
+                start_date, end_date, programs, config.filters, config.batch_size
+            )
+        if data_type == "ips":
+            return self.data_service.iter_ip_batches(
+                start_date, end_date, programs, config.filters, config.batch_size
+            )
+        if data_type == "anomalies":
+            return self.data_service.iter_anomaly_batches(start_date, end_date, config.batch_size)
+        raise ValueError(f"Unsupported data type: {data_type}")
+
+    def _export_batch(
+        self,
+        data_type: str,
+        batch: List[Dict[str, Any]],
+        transformer: DataTransformer,
+        validator: Optional[DataValidator],
+        writer: RecordStreamWriter
+    ) -> Optional[ChunkValidationReport]:
+        """Prepare, validate and write one batch, returning its validation report."""
+        records = self._prepare_records(data_type, batch, transformer)
+        chunk_report = None
+        if validator is not None:
+            chunk_report = validator.validate_chunk(
+                self.VALIDATION_TYPES[data_type], self._validation_view(data_type, records)
+            )
+        writer.write_chunk(records)
+        return chunk_report
+
+    def _prepare_records(
+        self,
+        data_type: str,
+        batch: List[Dict[str, Any]],
+        transformer: DataTransformer
+    ) -> List[Dict[str, Any]]:
+        """Turn a raw batch into export records."""
+        if data_type == "logs":
+            return self._process_logs(batch)
+        if data_type == "ips":
+            return [
+                {**row, "first_seen": row["first_seen"].isoformat() if row.get("first_seen") else None,
+                 "last_seen": row["last_seen"].isoformat() if row.get("last_seen") else None}
+                for row in batch
+            ]
+        # Transformation metadata is stored once per export, not per record
+        frame = transformer.transform_chunk(self.VALIDATION_TYPES[data_type], batch)
+        return to_records(frame, like=batch)
+
+    @staticmethod
+    def _validation_view(data_type: str, records: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Records as a chunk with the field names the validator expects."""
+        frame = to_frame(records)
+        if data_type == "logs":
+            frame = frame.rename(columns={"log_level": "level", "process_name": "source"})
+            if "level" in frame:
+                frame["level"] = frame["level"].str.upper()
+        return frame
+
+    @staticmethod
+    def _quality_metrics(validation: Dict[str, ChunkValidationReport]) -> Dict[str, float]:
+        """Record-weighted quality metrics over every validated data type."""
+        total = None
+        for report in validation.values():
+            snapshot = report.copy(deep=True)
+            total = snapshot if total is None else total.merge(snapshot)
+        if total is None or not total.record_count:
+            return {}
+        return {**total.quality_metrics, "valid_ratio": total.valid_count / total.record_count}
+
+    def _process_logs(self, logs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Process and clean log data for export.
         
@@ -208,113 +361,6 @@ class DataExporter:
             logger.warning(f"Failed to parse structured data: {e}")
             return {"parse_error": str(e), "raw_data": str(structured_data)}
 
-    async def _generate_export_file(
-        self, 
-        data: List[Dict[str, Any]], 
-        export_id: str, 
-        format: str
-    ) -> str:
-        """
-        Generate export file in the specified format.
-        
-        Args:
-            data: Processed data to export
-            export_id: Export identifier
-            format: Export format
-            
-        Returns:
-            Path to the generated file
-        """
-        # Create exports directory if it doesn't exist
-        exports_dir = Path("exports")
-        exports_dir.mkdir(exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        if format.lower() == "json":
-            file_path = exports_dir / f"export_{export_id}_{timestamp}.json"
-            await self._export_to_json(data, file_path)
-            
-        elif format.lower() == "csv":
-            file_path = exports_dir / f"export_{export_id}_{timestamp}.csv"
-            await self._export_to_csv(data, file_path)
-            
-        elif format.lower() == "zip":
-            file_path = exports_dir / f"export_{export_id}_{timestamp}.zip"
-            await self._export_to_zip(data, file_path)
-            
-        else:
-            raise ValueError(f"Unsupported export format: {format}")
-        
-        logger.info(f"Export file generated: {file_path}")
-        return str(file_path)
-
-    async def _export_to_json(self, data: List[Dict[str, Any]], file_path: Path):
-        """Export data to JSON format."""
-        export_data = {
-            "export_metadata": {
-                "created_at": datetime.now().isoformat(),
-                "total_records": len(data),
-                "format": "json"
-            },
-            "data": data
-        }
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
-
-    async def _export_to_csv(self, data: List[Dict[str, Any]], file_path: Path):
-        """Export data to CSV format."""
-        if not data:
-            return
-        
-        # Get all unique field names
-        fieldnames = set()
-        for record in data:
-            fieldnames.update(record.keys())
-        
-        fieldnames = sorted(list(fieldnames))
-        
-        with open(file_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for record in data:
-                # Ensure all fields are present
-                row = {field: record.get(field, '') for field in fieldnames}
-                writer.writerow(row)
-
-    async def _export_to_zip(self, data: List[Dict[str, Any]], file_path: Path):
-        """Export data to ZIP format containing JSON and CSV files."""
-        with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Add JSON file
-            json_data = {
-                "export_metadata": {
-                    "created_at": datetime.now().isoformat(),
-                    "total_records": len(data),
-                    "format": "zip"
-                },
-                "data": data
-            }
-            
-            zipf.writestr("data.json", json.dumps(json_data, indent=2, ensure_ascii=False))
-            
-            # Add CSV file
-            if data:
-                fieldnames = set()
-                for record in data:
-                    fieldnames.update(record.keys())
-                fieldnames = sorted(list(fieldnames))
-                
-                csv_content = []
-                csv_content.append(','.join(fieldnames))
-                
-                for record in data:
-                    row = [str(record.get(field, '')) for field in fieldnames]
-                    csv_content.append(','.join(row))
-                
-                zipf.writestr("data.csv", '\n'.join(csv_content))
-
     async def cleanup_old_exports(self, max_age_days: int = 7):
         """Clean up old export files."""
         try:
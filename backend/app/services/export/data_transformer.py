@@ -2,7 +2,9 @@ from typing import Dict, List, Any
 from datetime import datetime
 import json
 import logging
+import pandas as pd
 from app.models.export import ExportConfig
+from app.services.export.columnar import Chunk, isoformat, parse_timestamps, to_frame, to_records
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +18,21 @@ class DataTransformer:
             "anomaly": self._transform_anomaly,
             "ip": self._transform_ip
         }
+        # Chunk transforms share one export-level copy instead of a _metadata dict per row
+        self.metadata = {
+            "transformed_at": datetime.utcnow().isoformat(),
+            "transformation_version": "1.0"
+        }
+        self.timestamp_fields = {
+            "log_entry": ["timestamp"],
+            "anomaly": ["timestamp"],
+            "ip": ["first_seen", "last_seen"]
+        }
+        # Field, threshold, divisor: the per-row score normalisations
+        self.score_scales = {
+            "anomaly": ("score", 1, 100),
+            "ip": ("risk_score", 100, 10)
+        }
 
     def transform(self, data_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Transform data based on its type."""
@@ -106,6 +123,71 @@ class DataTransformer:
         
         return transformed
 
+    def transform_chunk(self, data_type: str, chunk: Chunk) -> pd.DataFrame:
+        """
+        Transform a chunk with column operations.
+
+        Applies the same timestamp and score normalisation as transform(),
+        but per column instead of per row, and without per-row metadata
+        (see self.metadata). Fields missing from some records are nulls in
+        those rows; to_records(frame, like=records) drops them again.
+
+        Args:
+            data_type: 'log_entry', 'anomaly' or 'ip'
+            chunk: Records or a DataFrame
+
+        Returns:
+            pd.DataFrame: The transformed chunk (the input is not modified)
+        """
+        if data_type not in self.transformations:
+            raise ValueError(f"Unsupported data type: {data_type}")
+        
+        frame = to_frame(chunk).copy()
+        for field in self.timestamp_fields[data_type]:
+            if field in frame:
+                frame[field] = self._normalize_timestamps(frame[field])
+        
+        if data_type in self.score_scales:
+            field, threshold, divisor = self.score_scales[data_type]
+            if field in frame:
+                frame[field] = self._scale_scores(frame[field], threshold, divisor)
+        
+        return frame
+
+    def _normalize_timestamps(self, column: pd.Series) -> pd.Series:
+        """ISO-format the parseable strings of a column; anything else is left as is."""
+        is_string, parsed, offsets = parse_timestamps(column)
+        parsed = parsed.dropna()
+        invalid = int(is_string.sum()) - len(parsed)
+        if invalid:
+            logger.warning(f"{invalid} invalid {column.name} values left unchanged")
+        
+        normalized = column.astype(object)
+        if len(parsed):
+            normalized[parsed.index] = isoformat(parsed, offsets[parsed.index].to_numpy(dtype=str))
+        return normalized
+
+    def _scale_scores(self, column: pd.Series, threshold: float, divisor: float) -> pd.Series:
+        """Divide scores above threshold; non-numeric values are left as is."""
+        scores = pd.to_numeric(column, errors='coerce')
+        invalid = int((scores.isna() & column.notna()).sum())
+        if invalid:
+            logger.warning(f"{invalid} invalid {column.name} values left unchanged")
+        
+        scaled = column.astype(object)
+        over = scores > threshold
+        scaled[over] = scores[over] / divisor
+        return scaled
+
     def batch_transform(self, data_type: str, data_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Transform a batch of data."""
-        return [self.transform(data_type, item) for item in data_list] 
\ No newline at end of file
+        """Transform a batch of data as one chunk; the records match transform()'s."""
+        if not data_list:
+            return []
+        metadata = {
+            "transformed_at": datetime.utcnow().isoformat(),
+            "transformation_version": "1.0"
+        }
+        records = to_records(self.transform_chunk(data_type, data_list), like=data_list)
+        for record in records:
+            record["_metadata"] = dict(metadata)
+        return records
@@ -1,7 +1,11 @@
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+import ipaddress
 import logging
-from app.models.export import DataValidationResult
+import numpy as np
+import pandas as pd
+from app.models.export import ChunkValidationReport, DataValidationResult
+from app.services.export.columnar import Chunk, parse_timestamps, to_frame
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +19,8 @@ class DataValidator:
             "anomaly": ["timestamp", "score", "type", "details"],
             "ip": ["address", "first_seen", "last_seen", "risk_score"]
         }
+        self.log_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+        self.max_samples = 5
 
     def validate_log_entry(self, entry: Dict[str, Any]) -> DataValidationResult:
         """Validate a log entry."""
@@ -110,7 +116,6 @@ class DataValidator:
 
         # Validate IP address format
         if "address" in ip:
-            import ipaddress
             try:
                 ipaddress.ip_address(ip["address"])
             except ValueError:
@@ -139,4 +144,102 @@ class DataValidator:
             quality_metrics=quality_metrics,
             missing_fields=missing_fields,
             invalid_values=invalid_values
-        ) 
\ No newline at end of file
+        )
+
+    def validate_chunk(self, data_type: str, chunk: Chunk) -> ChunkValidationReport:
+        """
+        Validate a chunk of records with column operations.
+
+        Runs the checks of validate_log_entry / validate_anomaly /
+        validate_ip over whole columns and returns one aggregated report
+        instead of a result per record. A required field counts as missing
+        when no record in the chunk has it, and as null where a record
+        lacks it. At validation_level "full" the report also holds example
+        invalid values and the positions of invalid records.
+
+        Args:
+            data_type: 'log_entry', 'anomaly' or 'ip'
+            chunk: Records or a DataFrame
+
+        Returns:
+            ChunkValidationReport: Counts and quality metrics for the chunk
+        """
+        if data_type not in self.required_fields:
+            raise ValueError(f"Unsupported data type: {data_type}")
+        
+        frame = to_frame(chunk)
+        required = self.required_fields[data_type]
+        count = len(frame)
+        missing_fields = [field for field in required if field not in frame]
+        
+        invalid: Dict[str, np.ndarray] = {}
+        for field in required:
+            if field not in missing_fields:
+                invalid[field] = frame[field].isna().to_numpy()
+        for field, mask in self._value_checks(data_type, frame).items():
+            invalid[field] = invalid[field] | mask if field in invalid else mask
+        
+        invalid_per_row = np.zeros(count, dtype=np.int64)
+        for mask in invalid.values():
+            invalid_per_row += mask
+        valid_rows = invalid_per_row == 0 if not missing_fields else np.zeros(count, dtype=bool)
+        
+        report = ChunkValidationReport(
+            data_type=data_type,
+            validation_level=self.validation_level,
+            record_count=count,
+            valid_count=int(valid_rows.sum()),
+            missing_fields={field: count for field in missing_fields},
+            invalid_values={field: int(mask.sum()) for field, mask in invalid.items() if mask.any()},
+            quality_metrics={
+                "completeness": 1.0 - (len(missing_fields) / len(required)),
+                "validity": 1.0 - (float(invalid_per_row.mean()) / len(required) if count else 0.0)
+            }
+        )
+        
+        if self.validation_level == "full":
+            report.invalid_rows = np.flatnonzero(~valid_rows).tolist()
+            for field, mask in invalid.items():
+                if mask.any():
+                    values = frame[field][mask].head(self.max_samples)
+                    report.invalid_samples[field] = ["null" if pd.isna(value) else value for value in values]
+        
+        return report
+
+    def _value_checks(self, data_type: str, frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Per-field masks of records with a present but invalid value."""
+        checks = {}
+        if data_type == "log_entry":
+            if "timestamp" in frame:
+                is_string, timestamps, _ = parse_timestamps(frame["timestamp"])
+                parsed = pd.Series(False, index=frame.index)
+                parsed[timestamps.dropna().index] = True
+                checks["timestamp"] = (is_string & ~parsed).to_numpy()
+            if "level" in frame:
+                checks["level"] = (~frame["level"].isin(self.log_levels)).to_numpy()
+        elif data_type == "anomaly":
+            if "score" in frame:
+                checks["score"] = self._out_of_range(frame["score"], 0, 1)
+        elif data_type == "ip":
+            if "address" in frame:
+                # Parse each distinct address once
+                addresses = frame["address"]
+                valid = {value: self._is_ip_address(value) for value in addresses.dropna().unique()}
+                checks["address"] = (addresses.notna() & ~addresses.map(valid).eq(True)).to_numpy()
+            if "risk_score" in frame:
+                checks["risk_score"] = self._out_of_range(frame["risk_score"], 0, 100)
+        return checks
+
+    @staticmethod
+    def _out_of_range(column: pd.Series, low: float, high: float) -> np.ndarray:
+        """Values that are not numbers within [low, high]."""
+        scores = pd.to_numeric(column, errors='coerce')
+        return (~scores.between(low, high)).to_numpy()
+
+    @staticmethod
+    def _is_ip_address(value: Any) -> bool:
+        try:
+            ipaddress.ip_address(value)
+            return True
+        except ValueError:
+            return False
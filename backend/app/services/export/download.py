@@ -0,0 +1,150 @@
+import os
+import asyncio
+from email.utils import formatdate, parsedate_to_datetime
+from typing import AsyncIterator, Callable, Dict, Optional, Tuple
+
+BLOCK_SIZE = 256 * 1024
+
+# Content-Encoding of each pre-compressed variant, in order of preference
+VARIANT_ENCODINGS = ("zstd", "gzip")
+
+
+def file_etag(path: str, encoding: Optional[str] = None) -> str:
+    """A strong validator for a finished file (changes with its size or mtime)."""
+    stat = os.stat(path)
+    suffix = f"-{encoding}" if encoding else ""
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}{suffix}"'
+
+
+def last_modified(path: str) -> str:
+    return formatdate(os.stat(path).st_mtime, usegmt=True)
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> set:
+    """Codings a client accepts (q=0 excluded)."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = params.strip()
+        if q.startswith("q=") and q[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_variant(path: str, variants: Optional[Dict[str, str]],
+                   accept_encoding: Optional[str]) -> Tuple[str, Optional[str]]:
+    """
+    The file to send for a request: a pre-compressed variant when accepted.
+
+    Args:
+        path: The identity file
+        variants: Content-Encoding to pre-compressed file path
+        accept_encoding: The request's Accept-Encoding header
+
+    Returns:
+        tuple: (path, content encoding or None)
+    """
+    accepted = accepted_encodings(accept_encoding)
+    for encoding in VARIANT_ENCODINGS:
+        variant = (variants or {}).get(encoding)
+        if variant and (encoding in accepted or "*" in accepted) and os.path.exists(variant):
+            return variant, encoding
+    return path, None
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    The byte range requested by a single-range Range header.
+
+    Returns:
+        tuple: Inclusive (start, end), or None to send the whole file
+            (no header, or several ranges, which are not supported)
+
+    Raises:
+        ValueError: The range cannot be satisfied
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec:
+        return None
+    start_text, _, end_text = spec.partition("-")
+    try:
+        if not start_text:
+            # Suffix range: the last N bytes, of which an empty file has none
+            length = int(end_text)
+            if length <= 0 or size == 0:
+                raise ValueError("Empty suffix range")
+            return max(0, size - length), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        raise ValueError(f"Malformed range: {header}")
+    if start >= size or start > end:
+        raise ValueError(f"Range not satisfiable: {header}")
+    return start, min(end, size - 1)
+
+
+def if_range_matches(if_range: Optional[str], etag: str, path: str) -> bool:
+    """Whether a Range may be honoured under the request's If-Range precondition."""
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        # Only strong validators may match
+        return if_range == etag
+    try:
+        return int(parsedate_to_datetime(if_range).timestamp()) >= int(os.stat(path).st_mtime)
+    except (TypeError, ValueError):
+        return False
+
+
+async def read_file_range(path: str, start: int, end: int) -> AsyncIterator[bytes]:
+    """Stream bytes [start, end] of a file without blocking the event loop."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            block = await asyncio.to_thread(f.read, min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+async def tail_lines(path: str, is_finished: Callable[[], bool], offset: int = 0,
+                     poll_interval: float = 0.5) -> AsyncIterator[bytes]:
+    """
+    Follow a JSONL file that is still being written.
+
+    Yields complete lines only, in blocks, from offset until the writer
+    has finished and everything written has been sent. is_finished is only
+    consulted when no new data is available, and in a worker thread, since
+    it may block (e.g. on Redis).
+    """
+    position = offset
+    pending = b""
+    while True:
+        block = b""
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                f.seek(position)
+                block = await asyncio.to_thread(f.read, BLOCK_SIZE)
+        if block:
+            position += len(block)
+            pending += block
+            cut = pending.rfind(b"\n") + 1
+            if cut:
+                yield pending[:cut]
+                pending = pending[cut:]
+            continue
+        if await asyncio.to_thread(is_finished):
+            # Anything written between the last read and completion
+            if os.path.exists(path) and os.path.getsize(path) > position:
+                continue
+            if pending:
+                yield pending
+            return
+        await asyncio.sleep(poll_interval)
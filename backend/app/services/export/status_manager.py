@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import get_db_connection
 from app.models.export_status import ExportStatus
+from app.services.event_bus import event_bus
 
 logger = logging.getLogger(__name__)
 
@@ -83,6 +84,7 @@ class ExportStatusManager:
                 7 * 24 * 60 * 60,  # 7 days in seconds
                 json.dumps(serializable_metadata)
             )
+            event_bus.publish('export_status', {'export_id': export_id, **serializable_metadata})
             
             logger.info(f"Stored export metadata for export_id: {export_id}")
             return True
@@ -260,6 +262,7 @@ class ExportStatusManager:
             redis_client = ExportStatusManager._get_redis_client()
             metadata_key = f"export:metadata:{export_id}"
             redis_client.delete(metadata_key)
+            event_bus.publish('export_removed', {'export_id': export_id})
             
             logger.info(f"Deleted export metadata for export_id: {export_id}")
             return True
@@ -0,0 +1,153 @@
+import io
+import csv
+import gzip
+import json
+import shutil
+import zipfile
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def open_compressed(path: Path, compression: Optional[str]) -> BinaryIO:
+    """
+    Open a file for streaming writes, compressing as data is written.
+
+    Args:
+        path: Output path
+        compression: None, 'gzip' or 'zstd'
+    """
+    if compression is None:
+        return open(path, "wb")
+    if compression == "gzip":
+        # Level 6 trades little size for a much faster write than 9
+        return gzip.open(path, "wb", compresslevel=6)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+        return zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"), closefd=True)
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+class RecordStreamWriter(ABC):
+    """Writes records chunk by chunk, so an export never holds more than one batch."""
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+        self.count = 0
+
+    @abstractmethod
+    def write_chunk(self, records: List[Dict[str, Any]]) -> None:
+        """Write one chunk of records."""
+
+    def close(self, metadata: Optional[Dict[str, Any]] = None) -> None:
+        self.text.close()
+
+
+class JSONStreamWriter(RecordStreamWriter):
+    """A JSON document {"data": [...], "export_metadata": {...}} written incrementally."""
+
+    def __init__(self, stream: BinaryIO):
+        super().__init__(stream)
+        self.text.write('{"data": [')
+
+    def write_chunk(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        separator = ",\n" if self.count else "\n"
+        self.text.write(separator + ",\n".join(json.dumps(record, ensure_ascii=False, default=str) for record in records))
+        self.count += len(records)
+
+    def close(self, metadata: Optional[Dict[str, Any]] = None) -> None:
+        self.text.write("\n]")
+        if metadata is not None:
+            self.text.write(', "export_metadata": ' + json.dumps(metadata, ensure_ascii=False, default=str))
+        self.text.write("}\n")
+        super().close()
+
+
+class JSONLStreamWriter(RecordStreamWriter):
+    """One JSON record per line, flushed per chunk so readers can follow the file."""
+
+    def write_chunk(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        self.text.write("".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records))
+        self.text.flush()
+        self.count += len(records)
+
+
+class CSVStreamWriter(RecordStreamWriter):
+    """CSV with the columns of the first chunk (later extra fields are dropped)."""
+
+    def __init__(self, stream: BinaryIO):
+        super().__init__(stream)
+        self.writer = None
+
+    def write_chunk(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        if self.writer is None:
+            fieldnames = list(dict.fromkeys(key for record in records for key in record))
+            self.writer = csv.DictWriter(self.text, fieldnames=fieldnames, extrasaction="ignore", restval="")
+            self.writer.writeheader()
+        self.writer.writerows(
+            {key: json.dumps(value, default=str) if isinstance(value, (dict, list)) else value
+             for key, value in record.items()}
+            for record in records
+        )
+        self.count += len(records)
+
+
+class ZipStreamWriter(RecordStreamWriter):
+    """A ZIP with <name>.json and <name>.csv entries for one data type.
+
+    The JSON entry streams straight into the archive; CSV rows are spooled
+    to a temporary file and appended when the stream closes.
+    """
+
+    def __init__(self, archive: zipfile.ZipFile, name: str):
+        self.archive = archive
+        self.name = name
+        self.json = JSONStreamWriter(archive.open(f"{name}.json", "w", force_zip64=True))
+        self.spool = tempfile.TemporaryFile()
+        self.csv = CSVStreamWriter(self.spool)
+        self.count = 0
+
+    def write_chunk(self, records: List[Dict[str, Any]]) -> None:
+        self.json.write_chunk(records)
+        self.csv.write_chunk(records)
+        self.count += len(records)
+
+    def close(self, metadata: Optional[Dict[str, Any]] = None) -> None:
+        self.json.close(metadata)
+        self.csv.text.flush()
+        self.csv.text.detach()
+        self.spool.seek(0)
+        with self.archive.open(f"{self.name}.csv", "w", force_zip64=True) as entry:
+            while True:
+                block = self.spool.read(1 << 20)
+                if not block:
+                    break
+                entry.write(block)
+        self.spool.close()
+
+
+def precompress(path: str, compression: str = "gzip") -> str:
+    """Write a compressed copy of a finished file next to it; returns its path."""
+    variant = path + COMPRESSION_SUFFIXES[compression]
+    with open(path, "rb") as source, open_compressed(Path(variant), compression) as target:
+        shutil.copyfileobj(source, target, 1 << 20)
+    return variant
+
+
+WRITERS = {"json": JSONStreamWriter, "jsonl": JSONLStreamWriter, "csv": CSVStreamWriter}
@@ -0,0 +1,180 @@
+import asyncio
+import inspect
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_KEY = 'mcp:heartbeat'
+
+
+class HeartbeatService:
+    """Reports the health of every registered component from one asyncio loop.
+
+    Components either register a health check, which runs on every beat,
+    or report status changes as they happen. Each beat writes every
+    component's fields into one Redis hash (``<component>:<field>``) with a
+    single pipelined HSET + EXPIRE, so statuses vanish if the process dies
+    and readers need a single HGETALL.
+    """
+
+    def __init__(self, redis_client=None, interval: float = 10.0, timeout: float = 3.0,
+                 ttl: Optional[float] = None, key: str = HEARTBEAT_KEY):
+        self.redis_client = redis_client
+        self.interval = interval
+        self.timeout = timeout
+        self.ttl = ttl
+        self.key = key
+        self._checks: Dict[str, Dict[str, Any]] = {}
+        self._state: Dict[str, Dict[str, str]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def _component(self, name: str) -> Dict[str, str]:
+        state = self._state.get(name)
+        if state is None:
+            state = self._state[name] = {
+                'status': 'disconnected',
+                'health': 'false',
+                'error': '',
+                'last_check': datetime.now().isoformat(),
+                'start_time': datetime.now().isoformat()
+            }
+        return state
+
+    def register(self, name: str, check: Callable[[], Any] = None, healthy_status: str = 'connected') -> None:
+        """
+        Track a component, optionally with a health check run on every beat.
+
+        Args:
+            name: Component name, e.g. 'data_source'
+            check: Sync or async callable returning True when healthy
+            healthy_status: Status recorded when the check passes
+        """
+        self._component(name)
+        if check is not None:
+            self._checks[name] = {'check': check, 'healthy_status': healthy_status}
+
+    def unregister(self, name: str) -> None:
+        """Stop running a component's health check (its last status is kept)."""
+        self._checks.pop(name, None)
+
+    def report(self, name: str, status: str, error: Optional[str] = None, healthy: Optional[bool] = None) -> None:
+        """Record a status change; it is written on the next beat, which is brought forward."""
+        self._record(name, status, error, healthy)
+        if self._wake is not None:
+            self._wake.set()
+
+    def _record(self, name: str, status: str, error: Optional[str] = None, healthy: Optional[bool] = None) -> None:
+        state = self._component(name)
+        state['status'] = status
+        state['error'] = str(error) if error else ''
+        if healthy is not None:
+            state['health'] = str(healthy).lower()
+        state['last_check'] = datetime.now().isoformat()
+
+    def local_status(self, name: str) -> Optional[Dict[str, str]]:
+        """This process's view of a component, without a Redis round trip."""
+        return self._state.get(name)
+
+    async def _run_check(self, name: str, entry: Dict[str, Any]) -> None:
+        try:
+            check = entry['check']
+            if inspect.iscoroutinefunction(check):
+                pending = check()
+            else:
+                # Blocking checks (driver pings) run off the event loop
+                pending = asyncio.to_thread(check)
+            healthy = await asyncio.wait_for(pending, timeout=self.timeout)
+            if healthy:
+                self._record(name, entry['healthy_status'], healthy=True)
+            else:
+                self._record(name, 'error', 'Health check failed', healthy=False)
+        except asyncio.TimeoutError:
+            self._record(name, 'error', f"Health check timed out after {self.timeout}s", healthy=False)
+        except Exception as e:
+            self._record(name, 'error', str(e), healthy=False)
+
+    async def beat(self) -> None:
+        """Run every health check and write all component fields in one round trip."""
+        await asyncio.gather(*[self._run_check(name, entry) for name, entry in list(self._checks.items())])
+        if self.redis_client is None or not self._state:
+            return
+        mapping = {
+            f"{name}:{field}": value
+            for name, state in self._state.items()
+            for field, value in state.items()
+        }
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hset(self.key, mapping=mapping)
+        pipe.expire(self.key, int(self.ttl or 3 * self.interval))
+        await asyncio.to_thread(pipe.execute)
+
+    def start(self) -> None:
+        """Start beating on the running event loop."""
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wake = None
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                await self.beat()
+            except Exception as e:
+                logger.error(f"Error writing status heartbeat: {e}")
+            try:
+                # Reported changes wake the loop early; repeated reports coalesce
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def read(self, redis_client=None) -> Dict[str, Dict[str, Any]]:
+        """
+        Every component's last written status, with one HGETALL.
+
+        Returns:
+            dict: Component name to its status (as ServiceStatusManager.get_current_status)
+        """
+        client = redis_client or self.redis_client
+        raw = client.hgetall(self.key) if client is not None else {}
+        components: Dict[str, Dict[str, str]] = {}
+        for field, value in raw.items():
+            name, _, attribute = field.rpartition(':')
+            components.setdefault(name, {})[attribute] = value
+        return {name: describe(name, values) for name, values in components.items()}
+
+
+def describe(name: str, values: Dict[str, str]) -> Dict[str, Any]:
+    """Status dictionary for a component from its stored fields."""
+    start_time = values.get('start_time')
+    uptime = None
+    if start_time:
+        try:
+            uptime = str(datetime.now() - datetime.fromisoformat(start_time))
+        except ValueError:
+            uptime = None
+    return {
+        'service': name,
+        'status': values.get('status') or 'disconnected',
+        'error': values.get('error') or None,
+        'last_check': values.get('last_check'),
+        'health': values.get('health') == 'true',
+        'start_time': start_time,
+        'uptime': uptime
+    }
+
+
+# Shared by every status manager in the process
+heartbeat_service = HeartbeatService()
@@ -0,0 +1,255 @@
+import os
+import re
+import time
+import fcntl
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# One fixed-size record per inference
+RECORD_DTYPE = np.dtype([
+    ('inference_time', '<f8'),
+    ('anomaly_score', '<f8'),
+    ('is_anomaly', 'u1'),
+    ('timestamp', '<f8')
+])
+
+# Header: magic, layout version, capacity, total inferences, records appended
+HEADER_DTYPE = np.dtype('<i8')
+HEADER_FIELDS = 5
+HEADER_SIZE = 64
+MAGIC = 0x4D43504D45545249  # "MCPMETRI"
+LAYOUT_VERSION = 1
+
+_TOTAL = 3
+_APPENDED = 4
+
+
+class InferenceMetricsRing:
+    """Fixed-size ring buffer of inference metrics backed by a memory-mapped file.
+
+    Appends write a single record in place, so recording a metric costs the
+    same no matter how much history is kept. Dirty pages are flushed to disk
+    every ``flush_interval`` seconds rather than on every append.
+
+    Every API worker process maps the same file, so each access also holds
+    an flock on it: appends from different workers never claim the same
+    slot, and reads never see a half-written header.
+    """
+
+    def __init__(self, path: Path, capacity: int = 1000, flush_interval: float = 5.0):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._dirty = False
+
+        if not self.path.exists():
+            self._create(capacity)
+
+        self._fd = os.open(self.path, os.O_RDWR)
+        self._header = np.memmap(self.path, dtype=HEADER_DTYPE, mode='r+', shape=(HEADER_FIELDS,))
+        if int(self._header[0]) != MAGIC or int(self._header[1]) != LAYOUT_VERSION:
+            os.close(self._fd)
+            raise ValueError(f"Unrecognised metrics buffer layout: {self.path}")
+
+        self.capacity = int(self._header[2])
+        self._records = np.memmap(
+            self.path, dtype=RECORD_DTYPE, mode='r+', offset=HEADER_SIZE, shape=(self.capacity,)
+        )
+
+    def _create(self, capacity: int) -> None:
+        """Create an empty buffer file, unless another process just did."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            header = np.zeros(HEADER_SIZE // HEADER_DTYPE.itemsize, dtype=HEADER_DTYPE)
+            header[:HEADER_FIELDS] = [MAGIC, LAYOUT_VERSION, capacity, 0, 0]
+            f.write(header.tobytes())
+            f.truncate(HEADER_SIZE + capacity * RECORD_DTYPE.itemsize)
+        try:
+            # Unlike a rename, linking never replaces a buffer already in use
+            os.link(tmp_path, self.path)
+        except FileExistsError:
+            pass
+        finally:
+            tmp_path.unlink()
+
+    @contextmanager
+    def _locked(self, exclusive: bool = True) -> Iterator[None]:
+        """Hold the thread lock and the cross-process file lock."""
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @property
+    def total(self) -> int:
+        """Total number of inferences ever recorded."""
+        with self._locked(exclusive=False):
+            return int(self._header[_TOTAL])
+
+    def __len__(self) -> int:
+        with self._locked(exclusive=False):
+            return min(int(self._header[_APPENDED]), self.capacity)
+
+    def append(self, inference_time: float, anomaly_score: float, is_anomaly: bool,
+               timestamp: Optional[float] = None) -> None:
+        """Record one inference."""
+        with self._locked():
+            appended = int(self._header[_APPENDED])
+            self._records[appended % self.capacity] = (
+                inference_time, anomaly_score, 1 if is_anomaly else 0,
+                time.time() if timestamp is None else timestamp
+            )
+            self._header[_APPENDED] = appended + 1
+            self._header[_TOTAL] = int(self._header[_TOTAL]) + 1
+            self._dirty = True
+
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def add_to_total(self, count: int) -> None:
+        """Account for inferences recorded elsewhere (e.g. migrated history)."""
+        with self._locked():
+            self._header[_TOTAL] = int(self._header[_TOTAL]) + count
+            self._dirty = True
+
+    def snapshot(self) -> np.ndarray:
+        """Return a chronological copy of the retained records."""
+        with self._locked(exclusive=False):
+            appended = int(self._header[_APPENDED])
+            if appended <= self.capacity:
+                return np.array(self._records[:appended])
+            start = appended % self.capacity
+            return np.concatenate((self._records[start:], self._records[:start]))
+
+    def last_timestamp(self) -> Optional[float]:
+        """Timestamp of the most recent record, if any."""
+        with self._locked(exclusive=False):
+            appended = int(self._header[_APPENDED])
+            if appended == 0:
+                return None
+            return float(self._records[(appended - 1) % self.capacity]['timestamp'])
+
+    def flush(self) -> None:
+        """Flush dirty pages to disk."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._dirty:
+            self._records.flush()
+            self._header.flush()
+            self._dirty = False
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """Flush and release the memory maps."""
+        self.flush()
+        del self._records
+        del self._header
+        os.close(self._fd)
+
+
+class InferenceMetricsStore:
+    """Per-model collection of inference metric ring buffers in one directory."""
+
+    SUFFIX = '.ring'
+
+    def __init__(self, directory: Path, capacity: int = 1000, flush_interval: float = 5.0):
+        self.directory = Path(directory)
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self._rings: Dict[str, InferenceMetricsRing] = {}
+        self._lock = threading.Lock()
+
+    def _path_for(self, model_version: str) -> Path:
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', model_version)
+        return self.directory / f"{safe_name}{self.SUFFIX}"
+
+    def reference_path(self, model_version: str) -> Path:
+        """Path of the frozen drift reference stored next to a model's buffer."""
+        return self._path_for(model_version).with_suffix('.drift.json')
+
+    def exists(self, model_version: str) -> bool:
+        """Whether a buffer exists for this model version."""
+        return model_version in self._rings or self._path_for(model_version).exists()
+
+    def get(self, model_version: str, create: bool = False) -> Optional[InferenceMetricsRing]:
+        """Return the ring for a model version, opening or creating it as needed."""
+        ring = self._rings.get(model_version)
+        if ring is not None:
+            return ring
+
+        with self._lock:
+            ring = self._rings.get(model_version)
+            if ring is None:
+                path = self._path_for(model_version)
+                if not path.exists() and not create:
+                    return None
+                ring = InferenceMetricsRing(path, self.capacity, self.flush_interval)
+                self._rings[model_version] = ring
+            return ring
+
+    def versions(self) -> Dict[str, Path]:
+        """Map of model version to buffer file for every stored model."""
+        versions = {}
+        if self.directory.exists():
+            for path in self.directory.glob(f"*{self.SUFFIX}"):
+                versions[path.stem] = path
+        for version in self._rings:
+            versions[version] = self._path_for(version)
+        return versions
+
+    def remove(self, model_version: str) -> None:
+        """Close and delete the buffer for a model version."""
+        with self._lock:
+            ring = self._rings.pop(model_version, None)
+            if ring is not None:
+                ring.close()
+            self._path_for(model_version).unlink(missing_ok=True)
+            self.reference_path(model_version).unlink(missing_ok=True)
+
+    def flush_all(self) -> None:
+        """Flush every open buffer."""
+        for ring in list(self._rings.values()):
+            ring.flush()
+
+
+_stores: Dict[Path, InferenceMetricsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_metrics_store(directory: Path, capacity: int = 1000,
+                      flush_interval: float = 5.0) -> InferenceMetricsStore:
+    """Get the process-wide store for a directory.
+
+    Monitors are created per request, so the open memory maps live here
+    rather than on the monitor instance.
+    """
+    directory = Path(directory).resolve()
+    with _stores_lock:
+        store = _stores.get(directory)
+        if store is None:
+            store = InferenceMetricsStore(directory, capacity, flush_interval)
+            _stores[directory] = store
+        return store
+
+
+@atexit.register
+def _flush_stores() -> None:
+    for store in list(_stores.values()):
+        try:
+            store.flush_all()
+        except Exception as e:
+            logger.warning(f"Error flushing inference metrics: {e}")
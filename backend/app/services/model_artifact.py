@@ -0,0 +1,277 @@
+import os
+import json
+import zlib
+import struct
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .model_package_integrity import hash_package_files, load_model_artifact
+
+logger = logging.getLogger(__name__)
+
+# Artifact layout, next to model.joblib and metadata.json:
+#   model.index   fixed header + JSON body (type, features, metrics, hashes, sizes)
+#   trees/*.npy   tree arrays of all estimators, concatenated, memory-mappable
+INDEX_FILE = 'model.index'
+TREES_DIR = 'trees'
+ARTIFACT_FORMAT_VERSION = 1
+
+# magic, format version, flags, body length, body CRC32
+INDEX_HEADER = struct.Struct('<8sHHII')
+INDEX_MAGIC = b'MCPMODEL'
+
+# Files whose size and mtime the index records, with its tree arrays; it is
+# stale once any of them changes
+INDEX_SOURCES = ('model.joblib', 'metadata.json')
+
+# Large metadata entries the index does not copy
+INDEX_EXCLUDED_METADATA = ('drift_reference',)
+
+MODEL_METHODS = ('predict', 'fit', 'score_samples', 'decision_function', 'predict_proba')
+
+
+def _average_path_length(n_samples: np.ndarray) -> np.ndarray:
+    """Average path length of an unsuccessful BST search among n samples."""
+    n_samples = np.asarray(n_samples, dtype=np.float64)
+    lengths = np.zeros_like(n_samples)
+    lengths[n_samples == 2] = 1.0
+    large = n_samples > 2
+    n = n_samples[large]
+    lengths[large] = 2.0 * (np.log(n - 1.0) + np.euler_gamma) - 2.0 * (n - 1.0) / n
+    return lengths
+
+
+def forest_arrays(model) -> Dict[str, np.ndarray]:
+    """Flatten the trees of a fitted IsolationForest into concatenated arrays.
+
+    Child indices are global, split features are mapped to input columns,
+    and each leaf carries its path length (depth plus the expected depth of
+    the samples it holds), so scoring needs no per-tree metadata.
+    """
+    lefts, rights, columns, thresholds, leaf_lengths, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for tree, features in zip(model.estimators_, model.estimators_features_):
+        nodes = tree.tree_
+        left, right = nodes.children_left, nodes.children_right
+        leaf = left == -1
+
+        depths = np.zeros(nodes.node_count, dtype=np.float64)
+        for node in range(nodes.node_count):
+            # Children always follow their parent
+            if not leaf[node]:
+                depths[left[node]] = depths[right[node]] = depths[node] + 1
+        max_depth = max(max_depth, int(depths.max()))
+
+        roots.append(offset)
+        lefts.append(np.where(leaf, -1, left + offset))
+        rights.append(np.where(leaf, -1, right + offset))
+        columns.append(np.where(leaf, -1, np.asarray(features)[np.maximum(nodes.feature, 0)]))
+        thresholds.append(nodes.threshold)
+        # Root counts as depth 1, as in IsolationForest.score_samples
+        leaf_lengths.append(np.where(leaf, depths + _average_path_length(nodes.n_node_samples), 0.0))
+        offset += nodes.node_count
+
+    return {
+        'children_left': np.concatenate(lefts).astype(np.int64),
+        'children_right': np.concatenate(rights).astype(np.int64),
+        'column': np.concatenate(columns).astype(np.int32),
+        'threshold': np.concatenate(thresholds).astype(np.float64),
+        'leaf_path_length': np.concatenate(leaf_lengths),
+        'roots': np.asarray(roots, dtype=np.int64),
+        'max_depth': np.asarray(max_depth, dtype=np.int64)
+    }
+
+
+class MappedIsolationForest:
+    """IsolationForest scoring over memory-mapped tree arrays.
+
+    Scores match the original model; nothing is unpickled and the arrays
+    are paged in on first use.
+    """
+
+    model_type = 'IsolationForest'
+
+    def __init__(self, arrays: Dict[str, np.ndarray], params: Dict[str, Any]):
+        self.arrays = arrays
+        self.offset_ = params['offset_']
+        self.max_samples_ = params['max_samples_']
+        self.n_features_in_ = params['n_features_in_']
+        self.n_estimators = len(arrays['roots'])
+
+    def score_samples(self, X) -> np.ndarray:
+        # Trees compare float32 inputs, as scikit-learn does
+        X = np.asarray(X, dtype=np.float32)
+        arrays = self.arrays
+        left, right = arrays['children_left'], arrays['children_right']
+        column, threshold = arrays['column'], arrays['threshold']
+        rows = np.arange(len(X))[None, :]
+
+        # One node per (tree, sample), all trees advanced together
+        nodes = np.repeat(np.asarray(arrays['roots'])[:, None], len(X), axis=1)
+        for _ in range(int(arrays['max_depth'])):
+            inner = left[nodes] != -1
+            if not inner.any():
+                break
+            go_left = X[rows, np.maximum(column[nodes], 0)] <= threshold[nodes]
+            nodes = np.where(inner, np.where(go_left, left[nodes], right[nodes]), nodes)
+
+        depths = arrays['leaf_path_length'][nodes].sum(axis=0)
+        denominator = self.n_estimators * _average_path_length([self.max_samples_])[0]
+        return -(2.0 ** (-depths / denominator))
+
+    def decision_function(self, X) -> np.ndarray:
+        return self.score_samples(X) - self.offset_
+
+    def predict(self, X) -> np.ndarray:
+        return np.where(self.decision_function(X) < 0, -1, 1)
+
+
+def _source_files(arrays: Dict[str, Any]) -> List[str]:
+    """The files an index is built from: the sources and its tree arrays."""
+    return list(INDEX_SOURCES) + [spec['file'] for spec in arrays.values()]
+
+
+def _source_stats(model_dir: Path, files: List[str]) -> Dict[str, Any]:
+    stats = {}
+    for name in files:
+        path = model_dir / name
+        if path.is_file():
+            stat = path.stat()
+            stats[name] = [stat.st_size, stat.st_mtime_ns]
+    return stats
+
+
+def write_model_index(model_dir: Path, model=None, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Write the index (and tree arrays, for IsolationForest) of a model package.
+
+    Args:
+        model_dir: Package directory containing model.joblib and metadata.json
+        model: The fitted model, if already loaded
+        metadata: The package metadata, if already loaded
+
+    Returns:
+        Dict[str, Any]: The index body
+    """
+    model_dir = Path(model_dir)
+    if metadata is None:
+        with open(model_dir / 'metadata.json', 'r') as f:
+            metadata = json.load(f)
+    if model is None:
+        model, _ = load_model_artifact(model_dir / 'model.joblib')
+
+    index = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'model_type': type(model).__name__,
+        'methods': [name for name in MODEL_METHODS if hasattr(model, name)],
+        'feature_names': (metadata.get('training_info', {}).get('feature_names')
+                          or metadata.get('feature_names') or []),
+        'metrics': metadata.get('evaluation_info', {}).get('basic_metrics', {}),
+        'metadata': {key: value for key, value in metadata.items() if key not in INDEX_EXCLUDED_METADATA},
+        'arrays': {},
+        'params': {}
+    }
+
+    if index['model_type'] == 'IsolationForest' and hasattr(model, 'estimators_'):
+        trees_dir = model_dir / TREES_DIR
+        trees_dir.mkdir(exist_ok=True)
+        for name, array in forest_arrays(model).items():
+            relative = f"{TREES_DIR}/{name}.npy"
+            np.save(model_dir / relative, array)
+            index['arrays'][name] = {'file': relative, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+        index['params'] = {
+            'offset_': float(model.offset_),
+            'max_samples_': int(model.max_samples_),
+            'n_features_in_': int(model.n_features_in_)
+        }
+
+    sources = _source_files(index['arrays'])
+    index['file_hashes'] = hash_package_files(model_dir, sources + ['scaler.joblib'])
+    index['file_sizes'] = {name: (model_dir / name).stat().st_size for name in index['file_hashes']}
+    # Trees are mapped without rehashing, so a rewritten array must also invalidate the index
+    index['sources'] = _source_stats(model_dir, sources)
+
+    body = json.dumps(index, default=str).encode('utf-8')
+    header = INDEX_HEADER.pack(INDEX_MAGIC, ARTIFACT_FORMAT_VERSION, 0, len(body), zlib.crc32(body))
+    tmp_path = model_dir / f"{INDEX_FILE}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header + body)
+    os.replace(tmp_path, model_dir / INDEX_FILE)
+    return index
+
+
+_index_cache: Dict[str, Any] = {}
+_index_lock = threading.Lock()
+
+
+def read_model_index(model_dir: Path) -> Optional[Dict[str, Any]]:
+    """The index of a model package, or None if missing, unreadable or stale.
+
+    Parsed indexes are cached by file identity, so repeated listings only
+    stat the index and the files it was built from.
+    """
+    model_dir = Path(model_dir)
+    index_path = model_dir / INDEX_FILE
+    try:
+        stat = index_path.stat()
+    except OSError:
+        return None
+
+    key = str(index_path)
+    identity = (stat.st_size, stat.st_mtime_ns)
+    with _index_lock:
+        cached = _index_cache.get(key)
+    if cached is not None and cached[0] == identity:
+        index = cached[1]
+    else:
+        try:
+            with open(index_path, 'rb') as f:
+                magic, version, _, length, checksum = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+                if magic != INDEX_MAGIC or version > ARTIFACT_FORMAT_VERSION:
+                    logger.warning(f"Unsupported model index in {model_dir}")
+                    return None
+                body = f.read(length)
+            if len(body) != length or zlib.crc32(body) != checksum:
+                logger.warning(f"Corrupt model index in {model_dir}")
+                return None
+            index = json.loads(body)
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"Error reading model index in {model_dir}: {e}")
+            return None
+        with _index_lock:
+            _index_cache[key] = (identity, index)
+
+    if index.get('sources') != _source_stats(model_dir, _source_files(index.get('arrays', {}))):
+        logger.debug(f"Model index in {model_dir} is stale")
+        return None
+    return index
+
+
+def package_metadata(model_dir: Path) -> Dict[str, Any]:
+    """Package metadata from the index when current, else from metadata.json.
+
+    Entries the index does not copy (drift_reference) are only present in
+    the metadata.json fallback.
+    """
+    index = read_model_index(model_dir)
+    if index is not None:
+        return index['metadata']
+    with open(Path(model_dir) / 'metadata.json', 'r') as f:
+        return json.load(f)
+
+
+def load_mapped_model(model_dir: Path) -> Optional[MappedIsolationForest]:
+    """Map a package's tree arrays, or None if it has no current index with arrays."""
+    model_dir = Path(model_dir)
+    index = read_model_index(model_dir)
+    if index is None or not index.get('arrays'):
+        return None
+    arrays = {
+        name: np.load(model_dir / spec['file'], mmap_mode='r')
+        for name, spec in index['arrays'].items()
+    }
+    return MappedIsolationForest(arrays, index['params'])
@@ -1,5 +1,7 @@
 import os
+import re
 import json
+import asyncio
 import zipfile
 import shutil
 import logging
@@ -8,13 +10,26 @@ import tempfile
 import warnings
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
-import joblib
+from typing import Dict, Any, List, Optional, Union, BinaryIO
 
 from ..models.config import ModelConfig
+from .model_package_integrity import (
+    calculate_file_hash,
+    hash_package_files,
+    package_fingerprint,
+    load_model_artifact,
+    validation_cache
+)
 
 logger = logging.getLogger(__name__)
 
+# Members are decompressed through a buffer of this size, so memory use
+# does not depend on the size of the model artifacts.
+EXTRACT_CHUNK_SIZE = 1024 * 1024
+
+# Versions come from uploaded file names and become directory names
+VERSION_PATTERN = re.compile(r'[\w.-]+')
+
 class ModelLoader:
     """Service for loading and validating model packages."""
     
@@ -34,14 +49,16 @@ class ModelLoader:
         
         logger.info(f"ModelLoader initialized with models directory: {self.models_directory}")
         
-        # Define required and optional components
+        # Define required and optional components; uploaded ZIPs must also
+        # carry deployment_manifest.json, packages from the training service
+        # may come without one
         self.required_files = [
             'model.joblib',
-            'metadata.json',
-            'deployment_manifest.json'
+            'metadata.json'
         ]
         
         self.optional_files = [
+            'deployment_manifest.json',
             'validate_model.py',
             'inference_example.py',
             'requirements.txt',
@@ -62,28 +79,46 @@ class ModelLoader:
         
         return version_warnings
 
-    async def process_model_package(self, zip_path: str, validate: bool = True) -> Dict[str, Any]:
-        """Process uploaded model package ZIP file."""
+    async def process_model_package(self, zip_source: Union[str, BinaryIO], validate: bool = True,
+                                    filename: Optional[str] = None) -> Dict[str, Any]:
+        """Process uploaded model package ZIP file.
+        
+        Args:
+            zip_source: Path to the ZIP file or a seekable binary file object
+                (e.g. the spooled body of an upload)
+            validate: Whether to validate the package contents
+            filename: Original file name, required when zip_source is a file object
+        """
+        staging_dir = None
         try:
             # Extract version from filename
-            filename = Path(zip_path).name
+            filename = filename or Path(zip_source).name
             version = filename.replace('model_', '').replace('_deployment.zip', '')
+            if not VERSION_PATTERN.fullmatch(version):
+                raise ValueError(f"Invalid model version in file name: {filename}")
             
-            # Create model directory
             model_dir = self.models_directory / f"model_{version}"
-            model_dir.mkdir(parents=True, exist_ok=True)
+            if model_dir.resolve().parent != self.models_directory.resolve():
+                raise ValueError(f"Invalid model version in file name: {filename}")
+            staging_dir = self.models_directory / f".{model_dir.name}.partial"
+            if staging_dir.exists():
+                shutil.rmtree(staging_dir)
             
-            # Extract ZIP contents
-            if not await self.extract_model_package(zip_path, model_dir):
-                raise ValueError("Failed to extract model package")
+            # Extract ZIP contents, hashing each member as it is written
+            file_hashes = await asyncio.to_thread(self._extract_model_package_sync, zip_source, staging_dir)
             
-            # Validate contents
+            # Validate contents; the extraction hashes are reused instead of re-reading files
             if validate:
-                validation_result = await self.validate_model_contents(model_dir)
+                validation_result = await self.validate_model_contents(staging_dir, file_hashes)
                 if not validation_result['is_valid']:
-                    shutil.rmtree(model_dir)
                     raise ValueError(f"Model validation failed: {validation_result['errors']}")
             
+            # Move the fully extracted package into place
+            if model_dir.exists():
+                shutil.rmtree(model_dir)
+            staging_dir.rename(model_dir)
+            staging_dir = None
+            
             # Register model
             await self.register_model(model_dir, version)
             
@@ -102,22 +137,80 @@ class ModelLoader:
         except Exception as e:
             logger.error(f"Error processing model package: {e}")
             raise
+        finally:
+            if staging_dir is not None and staging_dir.exists():
+                shutil.rmtree(staging_dir, ignore_errors=True)
     
-    async def extract_model_package(self, zip_path: str, target_dir: Path) -> bool:
+    async def extract_model_package(self, zip_source: Union[str, BinaryIO], target_dir: Path) -> bool:
         """Extract model package ZIP to target directory."""
+        await asyncio.to_thread(self._extract_model_package_sync, zip_source, Path(target_dir))
+        return True
+    
+    def _extract_model_package_sync(self, zip_source: Union[str, BinaryIO], target_dir: Path) -> Dict[str, str]:
+        """Stream ZIP members to target_dir, hashing them while they are decompressed.
+        
+        The manifest is read and checked before any other member is written,
+        so a bad package is rejected before most of its bytes hit the disk.
+        
+        Returns:
+            Dict[str, str]: SHA256 digest of every extracted file
+        """
         try:
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                # Check for required files before extraction
-                zip_files = zip_ref.namelist()
-                missing_required = [f for f in self.required_files if f not in zip_files]
+            with zipfile.ZipFile(zip_source, 'r') as zip_ref:
+                members = [info for info in zip_ref.infolist() if not info.is_dir()]
+                zip_files = [info.filename for info in members]
                 
+                # Check for required files before extraction
+                missing_required = [f for f in (*self.required_files, 'deployment_manifest.json')
+                                    if f not in zip_files]
                 if missing_required:
                     raise ValueError(f"Missing required files: {missing_required}")
                 
-                # Extract to target directory
-                zip_ref.extractall(target_dir)
+                # Reject unsafe paths and oversized packages from the central directory alone
+                for info in members:
+                    member_path = Path(info.filename)
+                    if member_path.is_absolute() or '..' in member_path.parts:
+                        raise ValueError(f"Unsafe path in model package: {info.filename}")
                 
-                return True
+                max_bytes = self.config.storage.max_package_size_mb * 1024 * 1024
+                total_size = sum(info.file_size for info in members)
+                if total_size > max_bytes:
+                    raise ValueError(
+                        f"Model package expands to {total_size} bytes, limit is {max_bytes} bytes"
+                    )
+                
+                # Read the manifest first so hash mismatches abort the extraction early
+                try:
+                    manifest = json.loads(zip_ref.read('deployment_manifest.json'))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    raise ValueError("Invalid deployment_manifest.json format")
+                expected_hashes = manifest.get('file_hashes', {}) if isinstance(manifest, dict) else {}
+                
+                target_dir.mkdir(parents=True, exist_ok=True)
+                buffer = bytearray(EXTRACT_CHUNK_SIZE)
+                view = memoryview(buffer)
+                file_hashes = {}
+                
+                for info in members:
+                    destination = target_dir / info.filename
+                    destination.parent.mkdir(parents=True, exist_ok=True)
+                    hash_sha256 = hashlib.sha256()
+                    
+                    with zip_ref.open(info) as source, open(destination, 'wb') as dest:
+                        while True:
+                            read = source.readinto(buffer)
+                            if not read:
+                                break
+                            hash_sha256.update(view[:read])
+                            dest.write(view[:read])
+                    
+                    digest = hash_sha256.hexdigest()
+                    expected_hash = expected_hashes.get(info.filename)
+                    if expected_hash is not None and expected_hash != digest:
+                        raise ValueError(f"Hash mismatch for {info.filename}")
+                    file_hashes[info.filename] = digest
+                
+                return file_hashes
                 
         except zipfile.BadZipFile:
             raise ValueError("Invalid ZIP file format")
@@ -125,8 +218,24 @@ class ModelLoader:
             logger.error(f"Error extracting ZIP: {e}")
             raise
     
-    async def validate_model_contents(self, model_dir: Path) -> Dict[str, Any]:
-        """Validate model package contents with flexible requirements."""
+    async def validate_model_contents(self, model_dir: Path,
+                                      file_hashes: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Validate model package contents with flexible requirements.
+        
+        This is the only package validation; ModelManager uses it for imports
+        and directory scans too. Hashing and the trial deserialization run in
+        a worker thread so large packages do not block the event loop. Results
+        are cached by package content hash.
+        
+        Args:
+            model_dir: Extracted package directory
+            file_hashes: Digests computed during extraction, if already known
+        """
+        return await asyncio.to_thread(self._validate_model_contents_sync, Path(model_dir), file_hashes)
+    
+    def _validate_model_contents_sync(self, model_dir: Path,
+                                      file_hashes: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Blocking implementation of validate_model_contents."""
         validation_result = {
             'is_valid': True,
             'errors': [],
@@ -138,6 +247,17 @@ class ModelLoader:
         }
         
         try:
+            # Hash every file once, in parallel; the digests feed both the
+            # manifest check and the cache key
+            if file_hashes is None:
+                file_hashes = hash_package_files(model_dir)
+            fingerprint = package_fingerprint(file_hashes)
+            cache_variant = f"model_loader:{self.config.compatibility.model_dump_json()}"
+            cached_result = validation_cache.get(fingerprint, cache_variant)
+            if cached_result is not None:
+                logger.debug(f"Using cached validation result for {model_dir}")
+                return cached_result
+            
             # Check required files (import fails if any are missing)
             for file in self.required_files:
                 if (model_dir / file).exists():
@@ -155,18 +275,33 @@ class ModelLoader:
                     validation_result['warnings'].append(f"Missing optional file: {file}")
             
             # Validate metadata.json
+            metadata = {}
             if (model_dir / 'metadata.json').exists():
                 try:
                     with open(model_dir / 'metadata.json', 'r') as f:
                         metadata = json.load(f)
                     
-                    # Check required metadata fields
-                    required_metadata_fields = ['model_type', 'version', 'created_at', 'training_info']
+                    validation_result['metadata'] = metadata
+                    
+                    # Check metadata structure (warnings for missing fields, not errors)
+                    required_metadata_fields = ['model_info', 'training_info', 'evaluation_info']
                     for field in required_metadata_fields:
                         if field not in metadata:
                             validation_result['warnings'].append(f"Missing metadata field: {field}")
                     
-                    validation_result['metadata'] = metadata
+                    # Check model type compatibility
+                    model_type = metadata.get('model_info', {}).get('model_type', '')
+                    if model_type not in ['IsolationForest', 'LocalOutlierFactor']:
+                        validation_result['warnings'].append(f"Unknown model type: {model_type}")
+                    
+                    # Check evaluation metrics against minimum thresholds
+                    evaluation_metrics = metadata.get('evaluation_info', {}).get('basic_metrics', {})
+                    if evaluation_metrics:
+                        if evaluation_metrics.get('f1_score', 0) < 0.5:
+                            validation_result['warnings'].append("Low F1 score detected")
+                        
+                        if evaluation_metrics.get('roc_auc', 0) < 0.6:
+                            validation_result['warnings'].append("Low ROC AUC detected")
                     
                 except json.JSONDecodeError:
                     validation_result['is_valid'] = False
@@ -181,9 +316,8 @@ class ModelLoader:
                     # Verify SHA256 hashes for files that exist
                     if 'file_hashes' in manifest:
                         for filename, expected_hash in manifest['file_hashes'].items():
-                            file_path = model_dir / filename
-                            if file_path.exists():
-                                actual_hash = self._calculate_file_hash(file_path)
+                            actual_hash = file_hashes.get(filename)
+                            if actual_hash is not None:
                                 if actual_hash != expected_hash:
                                     validation_result['is_valid'] = False
                                     validation_result['errors'].append(f"Hash mismatch for {filename}")
@@ -193,27 +327,23 @@ class ModelLoader:
                     validation_result['errors'].append("Invalid deployment_manifest.json format")
             
             # Test model loading with scikit-learn version compatibility handling
+            model = None
             try:
                 model_file = model_dir / 'model.joblib'
                 if model_file.exists():
-                    # Suppress scikit-learn version warnings during loading
-                    with warnings.catch_warnings(record=True) as w:
-                        warnings.simplefilter("ignore", category=UserWarning)
-                        warnings.simplefilter("ignore", category=FutureWarning)
-                        
-                        # Try to load the model
-                        model = joblib.load(str(model_file))
-                        
-                        # Handle version warnings based on configuration
-                        version_warnings = self._handle_version_warnings(w)
-                        validation_result['warnings'].extend(version_warnings)
-                        
-                        validation_result['metadata']['model_type'] = type(model).__name__
-                        
-                        # Basic model validation
-                        if not hasattr(model, 'predict'):
-                            validation_result['is_valid'] = False
-                            validation_result['errors'].append("Model does not have required 'predict' method")
+                    # Load once; scikit-learn version warnings are recorded, not raised
+                    model, w = load_model_artifact(model_file)
+                    
+                    # Handle version warnings based on configuration
+                    version_warnings = self._handle_version_warnings(w)
+                    validation_result['warnings'].extend(version_warnings)
+                    
+                    validation_result['metadata']['model_type'] = type(model).__name__
+                    
+                    # Basic model validation
+                    if not hasattr(model, 'predict'):
+                        validation_result['is_valid'] = False
+                        validation_result['errors'].append("Model does not have required 'predict' method")
                     
             except Exception as e:
                 # Check if it's a scikit-learn version compatibility issue
@@ -231,6 +361,20 @@ class ModelLoader:
                     validation_result['is_valid'] = False
                     validation_result['errors'].append(f"Failed to load model: {str(e)}")
             
+            # Check feature compatibility, reusing the loaded model
+            if 'training_info' in metadata:
+                feature_names = metadata['training_info'].get('feature_names', [])
+                if not feature_names:
+                    validation_result['warnings'].append("No feature names found in metadata")
+                else:
+                    validation_result['metadata']['feature_count'] = len(feature_names)
+                    
+                    expected_features = getattr(model, 'n_features_in_', None)
+                    if expected_features is not None and expected_features != len(feature_names):
+                        validation_result['warnings'].append(
+                            f"Model expects {expected_features} features but metadata lists {len(feature_names)}"
+                        )
+            
             # Add summary information
             if validation_result['optional_files_missing']:
                 validation_result['warnings'].append(
@@ -238,6 +382,9 @@ class ModelLoader:
                     f"{', '.join(validation_result['optional_files_missing'])}"
                 )
             
+            validation_result['content_hash'] = fingerprint
+            validation_cache.put(fingerprint, cache_variant, validation_result)
+            
         except Exception as e:
             validation_result['is_valid'] = False
             validation_result['errors'].append(f"Validation error: {str(e)}")
@@ -246,11 +393,7 @@ class ModelLoader:
     
     def _calculate_file_hash(self, file_path: Path) -> str:
         """Calculate SHA256 hash of file."""
-        hash_sha256 = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_sha256.update(chunk)
-        return hash_sha256.hexdigest()
+        return calculate_file_hash(file_path)
     
     async def register_model(self, model_dir: Path, version: str):
         """Register model in the registry."""
@@ -0,0 +1,171 @@
+import os
+import mmap
+import copy
+import hashlib
+import logging
+import threading
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+# Files at least this large are hashed through a read-only memory map,
+# smaller ones are streamed through a single reusable buffer.
+HASH_BUFFER_SIZE = 1024 * 1024
+MMAP_THRESHOLD = 8 * 1024 * 1024
+
+# hashlib releases the GIL while digesting large buffers, so threads give
+# real parallelism when a package contains several big artifacts.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=min(8, (os.cpu_count() or 1) * 2),
+    thread_name_prefix="model-package-hash"
+)
+
+
+def calculate_file_hash(file_path: Path) -> str:
+    """Calculate the SHA256 hash of a file.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        str: Hex encoded SHA256 digest
+    """
+    hash_sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                hash_sha256.update(mapped)
+        else:
+            buffer = bytearray(HASH_BUFFER_SIZE)
+            view = memoryview(buffer)
+            while True:
+                read = f.readinto(buffer)
+                if not read:
+                    break
+                hash_sha256.update(view[:read])
+    return hash_sha256.hexdigest()
+
+
+def hash_package_files(model_dir: Path, filenames: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """Hash the files of a model package in parallel.
+
+    Args:
+        model_dir: Package directory
+        filenames: Relative file names to hash (default: every regular file)
+
+    Returns:
+        Dict[str, str]: Mapping of relative file name to SHA256 digest.
+            Files that do not exist are omitted.
+    """
+    model_dir = Path(model_dir)
+    if filenames is None:
+        names = sorted(
+            str(p.relative_to(model_dir)) for p in model_dir.rglob('*') if p.is_file()
+        )
+    else:
+        names = sorted(n for n in set(filenames) if (model_dir / n).is_file())
+
+    digests = _hash_executor.map(calculate_file_hash, [model_dir / n for n in names])
+    return dict(zip(names, digests))
+
+
+def package_fingerprint(file_hashes: Dict[str, str]) -> str:
+    """Combine per-file hashes into a single content hash for a package."""
+    combined = hashlib.sha256()
+    for name in sorted(file_hashes):
+        combined.update(f"{name}:{file_hashes[name]}\n".encode())
+    return combined.hexdigest()
+
+
+_content_hashes: Dict[str, Tuple[Tuple, str]] = {}
+_content_hash_lock = threading.Lock()
+
+
+def package_content_hash(model_dir: Path) -> str:
+    """Fingerprint of every file in a package, rehashed only when it changes.
+
+    The last fingerprint of each directory is kept with the name, size and
+    mtime of its files, so an unchanged package costs a directory walk.
+
+    Returns:
+        str: The package_fingerprint of all regular files
+    """
+    model_dir = Path(model_dir)
+    identity = tuple(sorted(
+        (str(p.relative_to(model_dir)), stat.st_size, stat.st_mtime_ns)
+        for p in model_dir.rglob('*') if p.is_file()
+        for stat in (p.stat(),)
+    ))
+    key = str(model_dir.resolve())
+    with _content_hash_lock:
+        cached = _content_hashes.get(key)
+    if cached is not None and cached[0] == identity:
+        return cached[1]
+
+    fingerprint = package_fingerprint(hash_package_files(model_dir, [entry[0] for entry in identity]))
+    with _content_hash_lock:
+        _content_hashes[key] = (identity, fingerprint)
+    return fingerprint
+
+
+def load_model_artifact(model_file: Path) -> Tuple[Any, List[warnings.WarningMessage]]:
+    """Deserialize a model artifact once, recording version warnings.
+
+    The loaded object is handed to every structural check instead of each
+    check loading the file again.
+
+    Returns:
+        Tuple of (model, recorded warnings)
+    """
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("ignore", category=UserWarning)
+        warnings.simplefilter("ignore", category=FutureWarning)
+        model = joblib.load(str(model_file))
+    return model, list(w)
+
+
+class ValidationCache:
+    """Bounded LRU cache of validation results keyed by package content hash."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint: str, variant: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of a cached result, or None."""
+        key = (fingerprint, variant)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(result)
+
+    def put(self, fingerprint: str, variant: str, result: Dict[str, Any]) -> None:
+        """Store a copy of a validation result."""
+        key = (fingerprint, variant)
+        with self._lock:
+            self._entries[key] = copy.deepcopy(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+
+
+# One store for ModelLoader (which also validates for ModelManager) and
+# ModelValidator. Each keys its results by its own variant, since they run
+# different checks, so a package is only revalidated by the same validator
+# when its content or configuration changed.
+validation_cache = ValidationCache()
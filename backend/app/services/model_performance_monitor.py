@@ -6,6 +6,8 @@ from datetime import datetime, timedelta
 from pathlib import Path
 
 from ..models.config import ModelConfig
+from .inference_metrics_store import get_metrics_store
+from ..components.drift_detector import DriftDetector, FixedBinHistogram, population_stability_index
 
 logger = logging.getLogger(__name__)
 
@@ -14,11 +16,18 @@ class ModelPerformanceMonitor:
     
     def __init__(self, config: ModelConfig):
         self.config = config
+        # Legacy JSON history, migrated into the ring buffers on first use
         self.performance_file = Path(config.storage.directory) / "performance_metrics.json"
         self.drift_threshold = config.monitoring.drift_threshold
         
         # Ensure performance file directory exists
         self.performance_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        self.metrics_store = get_metrics_store(
+            Path(config.storage.directory) / "performance",
+            capacity=config.monitoring.metrics_buffer_size,
+            flush_interval=config.monitoring.metrics_flush_interval
+        )
     
     async def record_inference_metrics(self, model_version: str, 
                                      inference_time: float,
@@ -26,51 +35,111 @@ class ModelPerformanceMonitor:
                                      is_anomaly: bool) -> None:
         """Record inference performance metrics."""
         try:
-            metrics = self._load_performance_metrics()
-            
-            timestamp = datetime.now().isoformat()
-            
-            if model_version not in metrics:
-                metrics[model_version] = {
-                    'inference_times': [],
-                    'anomaly_scores': [],
-                    'anomaly_counts': [],
-                    'total_inferences': 0,
-                    'last_updated': timestamp
-                }
-            
-            # Record metrics
-            metrics[model_version]['inference_times'].append(inference_time)
-            metrics[model_version]['anomaly_scores'].append(anomaly_score)
-            metrics[model_version]['anomaly_counts'].append(1 if is_anomaly else 0)
-            metrics[model_version]['total_inferences'] += 1
-            metrics[model_version]['last_updated'] = timestamp
-            
-            # Keep only recent metrics (last 1000 inferences)
-            max_metrics = 1000
-            for key in ['inference_times', 'anomaly_scores', 'anomaly_counts']:
-                if len(metrics[model_version][key]) > max_metrics:
-                    metrics[model_version][key] = metrics[model_version][key][-max_metrics:]
-            
-            self._save_performance_metrics(metrics)
+            ring = self.metrics_store.get(model_version)
+            if ring is None:
+                ring = self._create_ring(model_version)
+            ring.append(inference_time, anomaly_score, is_anomaly)
             
         except Exception as e:
             logger.error(f"Error recording inference metrics: {e}")
     
+    def _create_ring(self, model_version: str):
+        """Create the ring buffer for a model, seeding it from legacy JSON history."""
+        ring = self.metrics_store.get(model_version, create=True)
+        
+        legacy = self._load_performance_metrics().get(model_version)
+        if legacy and ring.total == 0:
+            try:
+                timestamp = datetime.fromisoformat(legacy['last_updated']).timestamp()
+            except (KeyError, TypeError, ValueError):
+                timestamp = None
+            
+            history = list(zip(
+                legacy.get('inference_times', []),
+                legacy.get('anomaly_scores', []),
+                legacy.get('anomaly_counts', [])
+            ))
+            for inference_time, anomaly_score, anomaly_count in history:
+                ring.append(inference_time, anomaly_score, bool(anomaly_count), timestamp)
+            ring.add_to_total(max(legacy.get('total_inferences', 0) - len(history), 0))
+            ring.flush()
+            logger.info(f"Migrated {len(history)} legacy inference metrics for model {model_version}")
+        
+        return ring
+    
+    def _get_model_metrics(self, model_version: str) -> Optional[Dict[str, Any]]:
+        """Read the retained metrics of a model as column arrays."""
+        ring = self.metrics_store.get(model_version)
+        if ring is None:
+            if model_version not in self._load_performance_metrics():
+                return None
+            ring = self._create_ring(model_version)
+        
+        records = ring.snapshot()
+        last_timestamp = ring.last_timestamp()
+        return {
+            'inference_times': records['inference_time'],
+            'anomaly_scores': records['anomaly_score'],
+            'anomaly_counts': records['is_anomaly'],
+            'timestamps': records['timestamp'],
+            'total_inferences': ring.total,
+            'last_updated': datetime.fromtimestamp(last_timestamp).isoformat() if last_timestamp else None,
+            'score_reference': self._get_score_reference(model_version, records['anomaly_score'])
+        }
+    
+    def load_reference_from_metadata(self, model_version: str, metadata: Dict[str, Any]) -> bool:
+        """Freeze a model's score reference from the training scores in its metadata.
+        
+        Args:
+            model_version: Model version
+            metadata: Model metadata (see ModelTrainer.build_drift_reference)
+            
+        Returns:
+            True if the metadata held a score reference
+        """
+        reference = ((metadata or {}).get('drift_reference') or {}).get(DriftDetector.SCORES)
+        if not reference:
+            return False
+        reference_path = self.metrics_store.reference_path(model_version)
+        reference_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(reference_path, 'w') as f:
+            json.dump(reference, f)
+        return True
+    
+    def _get_score_reference(self, model_version: str, scores: np.ndarray) -> Optional[FixedBinHistogram]:
+        """Load the frozen score reference of a model, freezing it once enough scores exist.
+        
+        The training reference is stored when the model is loaded; models
+        without one get a reference built from their earliest recorded scores.
+        Either is persisted, so later windows are always compared with the
+        same baseline.
+        """
+        reference_path = self.metrics_store.reference_path(model_version)
+        if reference_path.exists():
+            with open(reference_path, 'r') as f:
+                return FixedBinHistogram.from_dict(json.load(f))
+        
+        reference_size = self.config.monitoring.drift_reference_size
+        if len(scores) < reference_size:
+            return None
+        
+        reference = FixedBinHistogram.from_reference(scores[:reference_size], self.config.monitoring.drift_bins)
+        with open(reference_path, 'w') as f:
+            json.dump(reference.to_dict(), f)
+        return reference
+    
     async def check_model_drift(self, model_version: str) -> Dict[str, Any]:
         """Check for model drift."""
         try:
-            metrics = self._load_performance_metrics()
+            model_metrics = self._get_model_metrics(model_version)
             
-            if model_version not in metrics:
+            if model_metrics is None:
                 return {
                     'drift_detected': False,
                     'confidence': 0.0,
                     'metrics': {}
                 }
             
-            model_metrics = metrics[model_version]
-            
             # Calculate drift indicators
             drift_indicators = {
                 'anomaly_rate_change': self._calculate_anomaly_rate_change(model_metrics),
@@ -79,7 +148,7 @@ class ModelPerformanceMonitor:
             }
             
             # Determine overall drift
-            drift_score = np.mean(list(drift_indicators.values()))
+            drift_score = float(np.mean(list(drift_indicators.values())))
             drift_detected = drift_score > self.drift_threshold
             
             return {
@@ -111,25 +180,22 @@ class ModelPerformanceMonitor:
         if older_rate == 0:
             return 0.0
         
-        return abs(recent_rate - older_rate) / older_rate
+        return float(abs(recent_rate - older_rate) / older_rate)
     
     def _calculate_score_distribution_change(self, metrics: Dict[str, Any]) -> float:
-        """Calculate change in anomaly score distribution."""
-        scores = metrics.get('anomaly_scores', [])
-        if len(scores) < 20:
-            return 0.0
+        """Calculate change in anomaly score distribution.
         
-        # Compare recent vs older score distributions
-        recent_scores = scores[-10:]
-        older_scores = scores[-20:-10]
-        
-        recent_mean = np.mean(recent_scores)
-        older_mean = np.mean(older_scores)
-        
-        if older_mean == 0:
+        Population stability index of the most recent scores against the
+        model's frozen score reference.
+        """
+        scores = metrics.get('anomaly_scores', [])
+        reference = metrics.get('score_reference')
+        if reference is None or len(scores) < 20:
             return 0.0
         
-        return abs(recent_mean - older_mean) / older_mean
+        current = reference.empty_like()
+        current.update(scores[-self.config.monitoring.drift_window_size:])
+        return population_stability_index(reference, current)
     
     def _calculate_inference_time_change(self, metrics: Dict[str, Any]) -> float:
         """Calculate change in inference time."""
@@ -147,26 +213,21 @@ class ModelPerformanceMonitor:
         if older_mean == 0:
             return 0.0
         
-        return abs(recent_mean - older_mean) / older_mean
+        return float(abs(recent_mean - older_mean) / older_mean)
     
     def _load_performance_metrics(self) -> Dict[str, Any]:
-        """Load performance metrics from file."""
+        """Load legacy JSON performance metrics from file."""
         if self.performance_file.exists():
             with open(self.performance_file, 'r') as f:
                 return json.load(f)
         return {}
     
-    def _save_performance_metrics(self, metrics: Dict[str, Any]) -> None:
-        """Save performance metrics to file."""
-        with open(self.performance_file, 'w') as f:
-            json.dump(metrics, f, indent=2)
-    
     async def get_performance_summary(self, model_version: str) -> Dict[str, Any]:
         """Get performance summary for a model version."""
         try:
-            metrics = self._load_performance_metrics()
+            model_metrics = self._get_model_metrics(model_version)
             
-            if model_version not in metrics:
+            if model_metrics is None:
                 return {
                     'model_version': model_version,
                     'total_inferences': 0,
@@ -174,21 +235,20 @@ class ModelPerformanceMonitor:
                     'performance_metrics': {}
                 }
             
-            model_metrics = metrics[model_version]
-            
-            # Calculate performance statistics
-            inference_times = model_metrics.get('inference_times', [])
-            anomaly_scores = model_metrics.get('anomaly_scores', [])
-            anomaly_counts = model_metrics.get('anomaly_counts', [])
+            # Calculate performance statistics over the retained window
+            inference_times = model_metrics['inference_times']
+            anomaly_scores = model_metrics['anomaly_scores']
+            anomaly_counts = model_metrics['anomaly_counts']
+            has_data = len(inference_times) > 0
             
             performance_metrics = {
                 'total_inferences': model_metrics['total_inferences'],
-                'avg_inference_time': np.mean(inference_times) if inference_times else 0,
-                'max_inference_time': np.max(inference_times) if inference_times else 0,
-                'min_inference_time': np.min(inference_times) if inference_times else 0,
-                'avg_anomaly_score': np.mean(anomaly_scores) if anomaly_scores else 0,
-                'anomaly_rate': np.mean(anomaly_counts) if anomaly_counts else 0,
-                'total_anomalies': sum(anomaly_counts)
+                'avg_inference_time': float(inference_times.mean()) if has_data else 0,
+                'max_inference_time': float(inference_times.max()) if has_data else 0,
+                'min_inference_time': float(inference_times.min()) if has_data else 0,
+                'avg_anomaly_score': float(anomaly_scores.mean()) if has_data else 0,
+                'anomaly_rate': float(anomaly_counts.mean()) if has_data else 0,
+                'total_anomalies': int(anomaly_counts.sum())
             }
             
             return {
@@ -208,10 +268,10 @@ class ModelPerformanceMonitor:
     async def get_all_model_performance(self) -> List[Dict[str, Any]]:
         """Get performance summary for all models."""
         try:
-            metrics = self._load_performance_metrics()
+            model_versions = set(self.metrics_store.versions()) | set(self._load_performance_metrics())
             summaries = []
             
-            for model_version in metrics.keys():
+            for model_version in model_versions:
                 summary = await self.get_performance_summary(model_version)
                 summaries.append(summary)
             
@@ -226,17 +286,26 @@ class ModelPerformanceMonitor:
     async def cleanup_old_metrics(self, days_to_keep: int = 30):
         """Clean up old performance metrics."""
         try:
-            metrics = self._load_performance_metrics()
-            cutoff_date = datetime.now() - timedelta(days=days_to_keep)
+            cutoff = (datetime.now() - timedelta(days=days_to_keep)).timestamp()
+            
+            # Migrate any remaining legacy history before the JSON file is removed
+            for model_version in self._load_performance_metrics():
+                if not self.metrics_store.exists(model_version):
+                    self._create_ring(model_version)
+            
+            kept = 0
+            for model_version in self.metrics_store.versions():
+                ring = self.metrics_store.get(model_version)
+                last_timestamp = ring.last_timestamp() if ring else None
+                if last_timestamp is None or last_timestamp <= cutoff:
+                    self.metrics_store.remove(model_version)
+                else:
+                    kept += 1
             
-            cleaned_metrics = {}
-            for model_version, model_metrics in metrics.items():
-                last_updated = datetime.fromisoformat(model_metrics['last_updated'])
-                if last_updated > cutoff_date:
-                    cleaned_metrics[model_version] = model_metrics
+            if self.performance_file.exists():
+                self.performance_file.unlink()
             
-            self._save_performance_metrics(cleaned_metrics)
-            logger.info(f"Cleaned up performance metrics, kept {len(cleaned_metrics)} models")
+            logger.info(f"Cleaned up performance metrics, kept {kept} models")
             
         except Exception as e:
             logger.error(f"Error cleaning up performance metrics: {e}")
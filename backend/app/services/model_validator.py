@@ -1,83 +1,77 @@
+import re
+import asyncio
 import logging
 import numpy as np
 import json
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable
 from pathlib import Path
 import joblib
-from datetime import datetime
+from datetime import datetime, date
 
 from ..models.config import ModelConfig
+from .model_artifact import MODEL_METHODS, package_metadata, read_model_index
+from .model_package_integrity import package_content_hash, validation_cache
 
 logger = logging.getLogger(__name__)
 
+# Shared by all validators; one worker per independent check of a package
+_check_executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="model-validator")
+
 class ModelValidator:
     """Comprehensive model validation and quality assurance."""
     
     def __init__(self, config: ModelConfig):
         self.config = config
     
+    async def _cached(self, model_dir: Path, variant: str, compute: Callable[[], Awaitable[Dict[str, Any]]],
+                      fingerprint: Optional[str] = None) -> Dict[str, Any]:
+        """Return a result memoized by package content, computing it on a miss.
+        
+        Results include the model's age in days, so entries are also keyed by
+        date. Failures (compute raising, or a result with an 'error' in it or
+        in one of its sections) are not cached.
+        """
+        if fingerprint is None:
+            fingerprint = await asyncio.to_thread(package_content_hash, model_dir)
+        cache_variant = f"model_validator:{variant}:{date.today().isoformat()}"
+        cached_result = validation_cache.get(fingerprint, cache_variant)
+        if cached_result is not None:
+            logger.debug(f"Using cached {variant} validation for {model_dir}")
+            return cached_result
+        
+        result = await compute()
+        if not self._has_error(result):
+            validation_cache.put(fingerprint, cache_variant, result)
+        return result
+    
+    @staticmethod
+    def _has_error(result: Dict[str, Any]) -> bool:
+        """Whether a result, or any section of it, records a failure."""
+        return 'error' in result or any(
+            isinstance(section, dict) and 'error' in section for section in result.values()
+        )
+    
+    async def _run_checks(self, *checks: Tuple[Callable[..., Any], Any]) -> List[Any]:
+        """Run independent (function, argument) checks concurrently in the check pool."""
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(*(
+            loop.run_in_executor(_check_executor, check, argument) for check, argument in checks
+        ))
+    
     async def validate_model_quality(self, model_path: str) -> Dict[str, Any]:
         """Validate model quality and performance."""
+        return await self._quality(Path(model_path))
+    
+    async def _quality(self, model_dir: Path, fingerprint: Optional[str] = None) -> Dict[str, Any]:
         try:
-            validation_result = {
-                'is_valid': True,
-                'score': 0.0,
-                'errors': [],
-                'warnings': [],
-                'recommendations': [],
-                'quality_metrics': {},
-                'issues': []
-            }
-            
-            # Load model and metadata
-            model_dir = Path(model_path)
-            model = joblib.load(model_dir / 'model.joblib')
-            
-            with open(model_dir / 'metadata.json', 'r') as f:
-                metadata = json.load(f)
-            
-            # Check model structure
-            structure_check = self._validate_model_structure(model)
-            validation_result['errors'].extend(structure_check['errors'])
-            validation_result['warnings'].extend(structure_check['warnings'])
-            
-            # Check performance metrics
-            performance_check = self._validate_performance_metrics(metadata)
-            validation_result['errors'].extend(performance_check['errors'])
-            validation_result['warnings'].extend(performance_check['warnings'])
-            validation_result['recommendations'].extend(performance_check['recommendations'])
-            validation_result['quality_metrics'] = performance_check['metrics']
-            
-            # Check feature compatibility
-            feature_check = self._validate_feature_compatibility(metadata)
-            validation_result['warnings'].extend(feature_check['warnings'])
-            
-            # Check model age
-            age_check = self._validate_model_age(metadata)
-            validation_result['warnings'].extend(age_check['warnings'])
-            validation_result['recommendations'].extend(age_check['recommendations'])
-            
-            # Check package structure
-            structure_check = self._validate_package_structure(model_dir)
-            validation_result['errors'].extend(structure_check['errors'])
-            validation_result['warnings'].extend(structure_check['warnings'])
-            validation_result['recommendations'].extend(structure_check['recommendations'])
-            
-            # Calculate overall validation score
-            validation_result['score'] = self._calculate_validation_score(validation_result)
-            
-            # Determine if model is valid
-            validation_result['is_valid'] = len(validation_result['errors']) == 0
-            
-            # Create issues list for frontend
-            validation_result['issues'] = self._create_issues_list(validation_result)
-            
-            logger.info(f"Model validation completed with score: {validation_result['score']}")
-            return validation_result
+            return await self._cached(model_dir, 'quality', lambda: self._validate_model_quality(model_dir),
+                                      fingerprint)
             
         except Exception as e:
             logger.error(f"Error validating model quality: {e}")
             return {
+                'error': str(e),
                 'is_valid': False,
                 'score': 0.0,
                 'errors': [f"Validation failed: {str(e)}"],
@@ -87,20 +81,90 @@ class ModelValidator:
                 'issues': []
             }
     
-    def _validate_model_structure(self, model) -> Dict[str, Any]:
-        """Validate model structure and basic functionality."""
+    async def _validate_model_quality(self, model_dir: Path) -> Dict[str, Any]:
+        validation_result = {
+            'is_valid': True,
+            'score': 0.0,
+            'errors': [],
+            'warnings': [],
+            'recommendations': [],
+            'quality_metrics': {},
+            'issues': []
+        }
+        
+        metadata = await asyncio.to_thread(package_metadata, model_dir)
+        
+        # The checks are independent of each other
+        structure_check, performance_check, feature_check, age_check, package_check = await self._run_checks(
+            (self._check_model_structure, model_dir),
+            (self._validate_performance_metrics, metadata),
+            (self._validate_feature_compatibility, metadata),
+            (self._validate_model_age, metadata),
+            (self._validate_package_structure, model_dir)
+        )
+        
+        # Check model structure
+        validation_result['errors'].extend(structure_check['errors'])
+        validation_result['warnings'].extend(structure_check['warnings'])
+        
+        # Check performance metrics
+        validation_result['errors'].extend(performance_check['errors'])
+        validation_result['warnings'].extend(performance_check['warnings'])
+        validation_result['recommendations'].extend(performance_check['recommendations'])
+        validation_result['quality_metrics'] = performance_check['metrics']
+        
+        # Check feature compatibility
+        validation_result['warnings'].extend(feature_check['warnings'])
+        
+        # Check model age
+        validation_result['warnings'].extend(age_check['warnings'])
+        validation_result['recommendations'].extend(age_check['recommendations'])
+        
+        # Check package structure
+        validation_result['errors'].extend(package_check['errors'])
+        validation_result['warnings'].extend(package_check['warnings'])
+        validation_result['recommendations'].extend(package_check['recommendations'])
+        
+        # Calculate overall validation score
+        validation_result['score'] = self._calculate_validation_score(validation_result)
+        
+        # Determine if model is valid
+        validation_result['is_valid'] = len(validation_result['errors']) == 0
+        
+        # Create issues list for frontend
+        validation_result['issues'] = self._create_issues_list(validation_result)
+        
+        logger.info(f"Model validation completed with score: {validation_result['score']}")
+        return validation_result
+    
+    def _check_model_structure(self, model_dir: Path) -> Dict[str, Any]:
+        """Validate the model structure, loading the model only when the package has no index."""
+        index = read_model_index(model_dir)
+        if index is not None:
+            model_type, methods = index['model_type'], set(index['methods'])
+        else:
+            model = joblib.load(model_dir / 'model.joblib')
+            model_type, methods = type(model).__name__, {name for name in MODEL_METHODS if hasattr(model, name)}
+        return self._validate_model_structure(model_type, methods)
+    
+    def _validate_model_structure(self, model_type: str, methods: set) -> Dict[str, Any]:
+        """Validate model structure and basic functionality.
+        
+        Args:
+            model_type: Class name of the model
+            methods: Names of the model's methods (see MODEL_METHODS)
+        """
         errors = []
         warnings = []
         
         # Check if model has required methods
-        if not hasattr(model, 'predict'):
+        if 'predict' not in methods:
             errors.append("Model does not have predict method")
         
-        if not hasattr(model, 'fit'):
+        if 'fit' not in methods:
             warnings.append("Model does not have fit method (may be pre-trained)")
         
         # Check model type
-        model_type = type(model).__name__
         if model_type not in ['IsolationForest', 'LocalOutlierFactor', 'RandomForestClassifier', 'LogisticRegression']:
             warnings.append(f"Unknown model type: {model_type}")
         
@@ -263,8 +327,7 @@ class ModelValidator:
         metadata_file = model_dir / 'metadata.json'
         if metadata_file.exists():
             try:
-                with open(metadata_file, 'r') as f:
-                    metadata = json.load(f)
+                metadata = package_metadata(model_dir)
                 
                 # Check required metadata sections
                 required_sections = ['model_info', 'training_info', 'evaluation_info']
@@ -331,58 +394,11 @@ class ModelValidator:
     async def validate_model_compatibility(self, model_path: str, target_features: List[str]) -> Dict[str, Any]:
         """Validate model compatibility with target feature set."""
         try:
-            compatibility_result = {
-                'is_compatible': True,
-                'compatibility_score': 0.0,
-                'missing_features': [],
-                'extra_features': [],
-                'feature_mapping': {},
-                'warnings': [],
-                'recommendations': []
-            }
-            
-            # Load model metadata
             model_dir = Path(model_path)
-            with open(model_dir / 'metadata.json', 'r') as f:
-                metadata = json.load(f)
-            
-            # Get model features
-            model_features = metadata.get('training_info', {}).get('feature_names', [])
-            
-            # Check for missing features
-            missing_features = [f for f in target_features if f not in model_features]
-            compatibility_result['missing_features'] = missing_features
-            
-            # Check for extra features
-            extra_features = [f for f in model_features if f not in target_features]
-            compatibility_result['extra_features'] = extra_features
-            
-            # Create feature mapping
-            feature_mapping = {}
-            for i, feature in enumerate(model_features):
-                if feature in target_features:
-                    feature_mapping[feature] = i
-            
-            compatibility_result['feature_mapping'] = feature_mapping
-            
-            # Calculate compatibility score
-            if len(target_features) > 0:
-                compatibility_score = len(feature_mapping) / len(target_features)
-                compatibility_result['compatibility_score'] = compatibility_score
-                
-                if compatibility_score < 1.0:
-                    compatibility_result['is_compatible'] = False
-                    compatibility_result['warnings'].append(
-                        f"Feature compatibility: {compatibility_score:.1%} - some features may not be available"
-                    )
-                    
-                    if missing_features:
-                        compatibility_result['recommendations'].append(
-                            f"Add missing features: {', '.join(missing_features)}"
-                        )
-            
-            logger.info(f"Model compatibility check completed: {compatibility_result['is_compatible']}")
-            return compatibility_result
+            return await self._cached(
+                model_dir, f"compatibility:{json.dumps(list(target_features))}",
+                lambda: asyncio.to_thread(self._validate_model_compatibility, model_dir, target_features)
+            )
             
         except Exception as e:
             logger.error(f"Error validating model compatibility: {e}")
@@ -396,6 +412,58 @@ class ModelValidator:
                 'recommendations': []
             }
     
+    def _validate_model_compatibility(self, model_dir: Path, target_features: List[str]) -> Dict[str, Any]:
+        compatibility_result = {
+            'is_compatible': True,
+            'compatibility_score': 0.0,
+            'missing_features': [],
+            'extra_features': [],
+            'feature_mapping': {},
+            'warnings': [],
+            'recommendations': []
+        }
+        
+        # Load model metadata
+        metadata = package_metadata(model_dir)
+        
+        # Get model features
+        model_features = metadata.get('training_info', {}).get('feature_names', [])
+        
+        # Check for missing features
+        missing_features = [f for f in target_features if f not in model_features]
+        compatibility_result['missing_features'] = missing_features
+        
+        # Check for extra features
+        extra_features = [f for f in model_features if f not in target_features]
+        compatibility_result['extra_features'] = extra_features
+        
+        # Create feature mapping
+        feature_mapping = {}
+        for i, feature in enumerate(model_features):
+            if feature in target_features:
+                feature_mapping[feature] = i
+        
+        compatibility_result['feature_mapping'] = feature_mapping
+        
+        # Calculate compatibility score
+        if len(target_features) > 0:
+            compatibility_score = len(feature_mapping) / len(target_features)
+            compatibility_result['compatibility_score'] = compatibility_score
+            
+            if compatibility_score < 1.0:
+                compatibility_result['is_compatible'] = False
+                compatibility_result['warnings'].append(
+                    f"Feature compatibility: {compatibility_score:.1%} - some features may not be available"
+                )
+                
+                if missing_features:
+                    compatibility_result['recommendations'].append(
+                        f"Add missing features: {', '.join(missing_features)}"
+                    )
+        
+        logger.info(f"Model compatibility check completed: {compatibility_result['is_compatible']}")
+        return compatibility_result
+    
     async def check_model_drift(self, model_path: str, reference_data: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Check for model drift using reference data."""
         try:
@@ -411,9 +479,10 @@ class ModelValidator:
                 'recommendations': []
             }
             
-            # Load model
+            # Load model (an indexed package is already known to hold a readable model)
             model_dir = Path(model_path)
-            model = joblib.load(model_dir / 'model.joblib')
+            if read_model_index(model_dir) is None:
+                joblib.load(model_dir / 'model.joblib')
             
             # If no reference data provided, use model's training data characteristics
             if reference_data is None:
@@ -422,8 +491,7 @@ class ModelValidator:
                 drift_result['warnings'].append("No reference data provided - using model age heuristic")
                 
                 # Load metadata to check model age
-                with open(model_dir / 'metadata.json', 'r') as f:
-                    metadata = json.load(f)
+                metadata = package_metadata(model_dir)
                 
                 created_at = metadata.get('model_info', {}).get('created_at', '')
                 if created_at:
@@ -461,47 +529,20 @@ class ModelValidator:
             }
     
     async def generate_validation_report(self, model_path: str) -> Dict[str, Any]:
-        """Generate a comprehensive validation report."""
+        """Generate a comprehensive validation report.
+        
+        Reports are memoized by package content, so a repeated request returns
+        the first report (with its report_id and generated_at) until the
+        package changes.
+        """
         try:
-            # Perform all validation checks
-            quality_result = await self.validate_model_quality(model_path)
-            
-            # Load metadata for additional information
             model_dir = Path(model_path)
-            with open(model_dir / 'metadata.json', 'r') as f:
-                metadata = json.load(f)
-            
-            # Get package structure information
-            package_structure = self._get_package_structure_info(model_dir)
-            
-            # Get comprehensive package information
-            package_info = self._get_comprehensive_package_info(model_dir, metadata)
-            
-            report = {
-                'report_id': f"validation_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                'generated_at': datetime.now().isoformat(),
-                'model_path': model_path,
-                'package_info': package_info,
-                'model_info': metadata.get('model_info', {}),
-                'training_info': metadata.get('training_info', {}),
-                'evaluation_info': metadata.get('evaluation_info', {}),
-                'package_structure': package_structure,
-                'validation_summary': {
-                    'is_valid': quality_result['is_valid'],
-                    'score': quality_result['score'],
-                    'error_count': len(quality_result['errors']),
-                    'warning_count': len(quality_result['warnings']),
-                    'recommendation_count': len(quality_result['recommendations'])
-                },
-                'quality_metrics': quality_result['quality_metrics'],
-                'issues': quality_result['issues'],
-                'recommendations': quality_result['recommendations'],
-                'next_steps': self._generate_next_steps(quality_result),
-                'trainer_notes': self._generate_trainer_notes(quality_result, metadata, package_structure)
-            }
-            
-            logger.info(f"Validation report generated: {report['report_id']}")
-            return report
+            # One fingerprint keys both the report and the quality check inside it
+            fingerprint = await asyncio.to_thread(package_content_hash, model_dir)
+            # Reports name their package path; identical copies elsewhere get their own
+            return await self._cached(model_dir, f"report:{model_path}",
+                                      lambda: self._generate_validation_report(model_path, fingerprint),
+                                      fingerprint)
             
         except Exception as e:
             logger.error(f"Error generating validation report: {e}")
@@ -518,6 +559,76 @@ class ModelValidator:
                 }
             }
     
+    async def _generate_validation_report(self, model_path: str, fingerprint: Optional[str] = None) -> Dict[str, Any]:
+        model_dir = Path(model_path)
+        
+        # Validation, the model type and one pass over the package files run side by side
+        quality_result, (metadata, files, texts), algorithm = await asyncio.gather(
+            self._quality(model_dir, fingerprint),
+            asyncio.to_thread(self._read_package, model_dir),
+            asyncio.to_thread(self._extract_algorithm_info, model_dir)
+        )
+        
+        # Get package structure information
+        package_structure = self._get_package_structure_info(model_dir, files)
+        
+        # Get comprehensive package information
+        package_info = self._get_comprehensive_package_info(model_dir, metadata, files, texts, algorithm)
+        
+        report = {
+            'report_id': f"validation_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            'generated_at': datetime.now().isoformat(),
+            'model_path': model_path,
+            'package_info': package_info,
+            'model_info': metadata.get('model_info', {}),
+            'training_info': metadata.get('training_info', {}),
+            'evaluation_info': metadata.get('evaluation_info', {}),
+            'package_structure': package_structure,
+            'validation_summary': {
+                'is_valid': quality_result['is_valid'],
+                'score': quality_result['score'],
+                'error_count': len(quality_result['errors']),
+                'warning_count': len(quality_result['warnings']),
+                'recommendation_count': len(quality_result['recommendations'])
+            },
+            'quality_metrics': quality_result['quality_metrics'],
+            'issues': quality_result['issues'],
+            'recommendations': quality_result['recommendations'],
+            'next_steps': self._generate_next_steps(quality_result),
+            'trainer_notes': self._generate_trainer_notes(quality_result, metadata, package_structure)
+        }
+        
+        if 'error' in quality_result:
+            # Keeps a report built on a failed validation out of the cache
+            report['validation_summary']['error'] = quality_result['error']
+        
+        logger.info(f"Validation report generated: {report['report_id']}")
+        return report
+    
+    def _read_package(self, model_dir: Path) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Optional[str]]]:
+        """Read what a report needs from a package in one pass.
+        
+        Args:
+            model_dir: Package directory
+            
+        Returns:
+            Tuple of (metadata, stat results by relative path, contents of
+            deployment_manifest.json and requirements.txt or None)
+        """
+        metadata = package_metadata(model_dir)
+        files = {
+            str(file_path.relative_to(model_dir)): file_path.stat()
+            for file_path in model_dir.rglob('*') if file_path.is_file()
+        }
+        texts = {}
+        for name in ('deployment_manifest.json', 'requirements.txt'):
+            try:
+                texts[name] = (model_dir / name).read_text() if name in files else None
+            except Exception as e:
+                logger.warning(f"Error reading {name}: {e}")
+                texts[name] = None
+        return metadata, files, texts
+    
     def _generate_next_steps(self, validation_result: Dict[str, Any]) -> List[str]:
         """Generate next steps based on validation results."""
         next_steps = []
@@ -534,19 +645,25 @@ class ModelValidator:
         
         return next_steps
     
-    def _get_package_structure_info(self, model_dir: Path) -> Dict[str, Any]:
-        """Get detailed information about the model package structure."""
+    def _get_package_structure_info(self, model_dir: Path, files: Dict[str, Any]) -> Dict[str, Any]:
+        """Get detailed information about the model package structure.
+        
+        Args:
+            model_dir: Package directory
+            files: Stat results by relative path (see _read_package)
+        """
         structure_info = {
             'required_files': {
-                'model.joblib': (model_dir / 'model.joblib').exists(),
-                'metadata.json': (model_dir / 'metadata.json').exists()
+                name: name in files for name in ('model.joblib', 'metadata.json')
             },
             'optional_files': {
-                'deployment_manifest.json': (model_dir / 'deployment_manifest.json').exists(),
-                'requirements.txt': (model_dir / 'requirements.txt').exists(),
-                'README.md': (model_dir / 'README.md').exists(),
-                'validate_model.py': (model_dir / 'validate_model.py').exists(),
-                'inference_example.py': (model_dir / 'inference_example.py').exists()
+                name: name in files for name in (
+                    'deployment_manifest.json',
+                    'requirements.txt',
+                    'README.md',
+                    'validate_model.py',
+                    'inference_example.py'
+                )
             },
             'file_sizes': {},
             'total_package_size': 0
@@ -554,12 +671,9 @@ class ModelValidator:
         
         # Calculate file sizes
         total_size = 0
-        for file_path in model_dir.rglob('*'):
-            if file_path.is_file():
-                file_size = file_path.stat().st_size
-                relative_path = str(file_path.relative_to(model_dir))
-                structure_info['file_sizes'][relative_path] = file_size
-                total_size += file_size
+        for relative_path, stat in files.items():
+            structure_info['file_sizes'][relative_path] = stat.st_size
+            total_size += stat.st_size
         
         structure_info['total_package_size'] = total_size
         
@@ -630,8 +744,18 @@ class ModelValidator:
         
         return trainer_notes
     
-    def _get_comprehensive_package_info(self, model_dir: Path, metadata: Dict[str, Any]) -> Dict[str, Any]:
-        """Get comprehensive information about the model package for reference."""
+    def _get_comprehensive_package_info(self, model_dir: Path, metadata: Dict[str, Any], files: Dict[str, Any],
+                                        texts: Dict[str, Optional[str]], algorithm: str) -> Dict[str, Any]:
+        """Get comprehensive information about the model package for reference.
+        
+        Args:
+            model_dir: Package directory
+            metadata: Package metadata
+            files: Stat results by relative path (see _read_package)
+            texts: Contents of deployment_manifest.json and requirements.txt
+            algorithm: Model type (see _extract_algorithm_info)
+        """
+        requirements_text = texts.get('requirements.txt')
         package_info = {
             'package_identifier': {
                 'name': None,
@@ -693,9 +817,9 @@ class ModelValidator:
         package_info['model_details'].update({
             'model_type': model_info.get('model_type'),
             'model_name': model_info.get('model_name'),
-            'algorithm': self._extract_algorithm_info(model_dir),
-            'framework': self._extract_framework_info(model_dir),
-            'framework_version': self._extract_framework_version(model_dir)
+            'algorithm': algorithm,
+            'framework': self._extract_framework_info(requirements_text),
+            'framework_version': self._extract_framework_version(requirements_text)
         })
         
         # Extract creation information
@@ -703,15 +827,13 @@ class ModelValidator:
             'created_at': model_info.get('created_at'),
             'created_by': model_info.get('created_by'),
             'training_duration': metadata.get('training_info', {}).get('training_duration'),
-            'last_modified': self._get_last_modified_time(model_dir)
+            'last_modified': self._get_last_modified_time(files)
         })
         
         # Extract deployment information
-        deployment_manifest_path = model_dir / 'deployment_manifest.json'
-        if deployment_manifest_path.exists():
+        if texts.get('deployment_manifest.json') is not None:
             try:
-                with open(deployment_manifest_path, 'r') as f:
-                    deployment_manifest = json.load(f)
+                deployment_manifest = json.loads(texts['deployment_manifest.json'])
                 
                 package_info['deployment_info'].update({
                     'deployment_ready': deployment_manifest.get('deployment_ready', False),
@@ -723,20 +845,18 @@ class ModelValidator:
                 logger.warning(f"Error reading deployment manifest: {e}")
         
         # Extract requirements if available
-        requirements_path = model_dir / 'requirements.txt'
-        if requirements_path.exists():
-            try:
-                with open(requirements_path, 'r') as f:
-                    requirements = [line.strip() for line in f.readlines() if line.strip() and not line.startswith('#')]
-                package_info['deployment_info']['environment_dependencies'] = requirements
-            except Exception as e:
-                logger.warning(f"Error reading requirements.txt: {e}")
+        if requirements_text is not None:
+            requirements = [line.strip() for line in requirements_text.splitlines() if line.strip() and not line.startswith('#')]
+            package_info['deployment_info']['environment_dependencies'] = requirements
         
         return package_info
     
     def _extract_algorithm_info(self, model_dir: Path) -> str:
         """Extract algorithm information from the model file."""
         try:
+            index = read_model_index(model_dir)
+            if index is not None:
+                return index['model_type']
             model_path = model_dir / 'model.joblib'
             if model_path.exists():
                 model = joblib.load(model_path)
@@ -745,64 +865,44 @@ class ModelValidator:
             logger.warning(f"Error extracting algorithm info: {e}")
         return "Unknown"
     
-    def _extract_framework_info(self, model_dir: Path) -> str:
-        """Extract framework information."""
-        try:
-            # Check for common ML framework indicators
-            if (model_dir / 'requirements.txt').exists():
-                with open(model_dir / 'requirements.txt', 'r') as f:
-                    content = f.read().lower()
-                    if 'scikit-learn' in content or 'sklearn' in content:
-                        return 'scikit-learn'
-                    elif 'tensorflow' in content:
-                        return 'tensorflow'
-                    elif 'pytorch' in content or 'torch' in content:
-                        return 'pytorch'
-                    elif 'xgboost' in content:
-                        return 'xgboost'
-                    elif 'lightgbm' in content:
-                        return 'lightgbm'
-        except Exception as e:
-            logger.warning(f"Error extracting framework info: {e}")
+    def _extract_framework_info(self, requirements_text: Optional[str]) -> str:
+        """Extract framework information from the contents of requirements.txt."""
+        # Check for common ML framework indicators
+        if requirements_text:
+            content = requirements_text.lower()
+            if 'scikit-learn' in content or 'sklearn' in content:
+                return 'scikit-learn'
+            elif 'tensorflow' in content:
+                return 'tensorflow'
+            elif 'pytorch' in content or 'torch' in content:
+                return 'pytorch'
+            elif 'xgboost' in content:
+                return 'xgboost'
+            elif 'lightgbm' in content:
+                return 'lightgbm'
         return "Unknown"
     
-    def _extract_framework_version(self, model_dir: Path) -> str:
-        """Extract framework version information."""
-        try:
-            if (model_dir / 'requirements.txt').exists():
-                with open(model_dir / 'requirements.txt', 'r') as f:
-                    content = f.read()
-                    # Look for version patterns
-                    import re
-                    patterns = [
-                        r'scikit-learn[=<>~!]+([\d.]+)',
-                        r'sklearn[=<>~!]+([\d.]+)',
-                        r'tensorflow[=<>~!]+([\d.]+)',
-                        r'torch[=<>~!]+([\d.]+)',
-                        r'xgboost[=<>~!]+([\d.]+)',
-                        r'lightgbm[=<>~!]+([\d.]+)'
-                    ]
-                    for pattern in patterns:
-                        match = re.search(pattern, content)
-                        if match:
-                            return match.group(1)
-        except Exception as e:
-            logger.warning(f"Error extracting framework version: {e}")
+    def _extract_framework_version(self, requirements_text: Optional[str]) -> str:
+        """Extract framework version information from the contents of requirements.txt."""
+        if requirements_text:
+            # Look for version patterns
+            patterns = [
+                r'scikit-learn[=<>~!]+([\d.]+)',
+                r'sklearn[=<>~!]+([\d.]+)',
+                r'tensorflow[=<>~!]+([\d.]+)',
+                r'torch[=<>~!]+([\d.]+)',
+                r'xgboost[=<>~!]+([\d.]+)',
+                r'lightgbm[=<>~!]+([\d.]+)'
+            ]
+            for pattern in patterns:
+                match = re.search(pattern, requirements_text)
+                if match:
+                    return match.group(1)
         return "Unknown"
     
-    def _get_last_modified_time(self, model_dir: Path) -> str:
-        """Get the last modified time of the model directory."""
-        try:
-            # Get the most recent modification time of any file in the directory
-            latest_time = 0
-            for file_path in model_dir.rglob('*'):
-                if file_path.is_file():
-                    mtime = file_path.stat().st_mtime
-                    if mtime > latest_time:
-                        latest_time = mtime
-            
-            if latest_time > 0:
-                return datetime.fromtimestamp(latest_time).isoformat()
-        except Exception as e:
-            logger.warning(f"Error getting last modified time: {e}")
-        return None 
\ No newline at end of file
+    def _get_last_modified_time(self, files: Dict[str, Any]) -> Optional[str]:
+        """Get the most recent modification time of any file in the package."""
+        latest_time = max((stat.st_mtime for stat in files.values()), default=0)
+        if latest_time > 0:
+            return datetime.fromtimestamp(latest_time).isoformat()
+        return None
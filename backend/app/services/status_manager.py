@@ -1,12 +1,10 @@
 import redis
-import time
-import threading
-import os
 from datetime import datetime
 import logging
 from dotenv import load_dotenv
 from typing import Dict, Any
-import json
+
+from app.services.heartbeat import heartbeat_service, describe
 
 # Load environment variables
 load_dotenv()
@@ -14,26 +12,22 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 class ServiceStatusManager:
-    def __init__(self, service_name, redis_client):
+    """Reports a service's status through the shared heartbeat.
+
+    Status changes and health checks are recorded in memory; the heartbeat
+    writes every service's fields to Redis in one pipelined hash write, so
+    managers hold no threads or connections of their own.
+    """
+
+    def __init__(self, service_name, redis_client=None, heartbeat=None):
         self.service_name = service_name
-        self.redis_client = redis_client
+        self.heartbeat = heartbeat or heartbeat_service
+        if redis_client is not None and self.heartbeat.redis_client is None:
+            # Services constructed outside the app lifespan bring their own client
+            self.heartbeat.redis_client = redis_client
+        self.redis_client = redis_client or self.heartbeat.redis_client
         self.prefix = self._get_service_prefix(service_name)
-        self.status_key = f'mcp:{service_name}:status'
-        self.health_key = f'mcp:{service_name}:health'
-        self.error_key = f'mcp:{service_name}:error'
-        self.last_check_key = f'mcp:{service_name}:last_check'
-        self.data_source_status_key = f'mcp:data_source:status'
-        self.data_source_health_key = f'mcp:data_source:health'
-        self.data_source_error_key = f'mcp:data_source:error'
-        self.data_source_last_check_key = f'mcp:data_source:last_check'
-        self.start_time_key = f'mcp:{service_name}:start_time'
-        self._stop_event = threading.Event()
-        self._thread = None
-        
-        # Test Redis connection on initialization
-        self._test_redis_connection()
-        # Set initial start time
-        self._set_start_time()
+        self.heartbeat.register(service_name)
 
     def _get_service_prefix(self, service_name):
         """Get the appropriate prefix for a service name"""
@@ -46,107 +40,30 @@ class ServiceStatusManager:
         }
         return prefix_map.get(service_name, service_name)
 
-    def _set_start_time(self):
-        """Set the service start time"""
-        try:
-            self.redis_client.set(self.start_time_key, datetime.now().isoformat())
-        except Exception as e:
-            logger.error(f"Failed to set start time for {self.service_name}: {str(e)}")
-
-    def _test_redis_connection(self):
-        """Test Redis connection and log the result"""
-        try:
-            self.redis_client.ping()
-            logger.info(f"Successfully connected to Redis for {self.service_name}")
-            # Update Redis status
-            self._update_redis_status(True)
-        except redis.ConnectionError as e:
-            logger.error(f"Could not connect to Redis for {self.service_name}: {str(e)}")
-            self._update_redis_status(False)
-        except Exception as e:
-            logger.error(f"Unexpected error connecting to Redis for {self.service_name}: {str(e)}")
-            self._update_redis_status(False)
-
-    def _update_redis_status(self, is_connected: bool):
-        """Update Redis connection status"""
-        try:
-            status = 'connected' if is_connected else 'error'
-            self.redis_client.set(self.status_key, status)
-            self.redis_client.set(self.last_check_key, datetime.now().isoformat())
-            logger.debug(f"Updated Redis status to {status} for {self.service_name}")
-        except Exception as e:
-            logger.error(f"Failed to update Redis status for {self.service_name}: {str(e)}")
-
     def update_status(self, status, error=None):
-        """Update service status in Redis"""
-        try:
-            logger.debug(f"Updating status for {self.service_name} to {status}")
-            self.redis_client.set(self.status_key, status)
-            if error:
-                self.redis_client.set(self.error_key, str(error))
-            else:
-                self.redis_client.delete(self.error_key)
-            self.redis_client.set(self.last_check_key, datetime.now().isoformat())
-            logger.debug(f"Updated {self.service_name} status to {status}")
-        except Exception as e:
-            logger.error(f"Failed to update status for {self.service_name}: {str(e)}")
+        """Record a status change; it reaches Redis on the next heartbeat"""
+        logger.debug(f"Updating status for {self.service_name} to {status}")
+        self.heartbeat.report(self.service_name, status, error)
 
     def start_status_updates(self, health_check_func, interval=10):
-        """Start periodic status updates in a background thread"""
-        def update_loop():
-            while not self._stop_event.is_set():
-                try:
-                    is_healthy = health_check_func()
-                    if is_healthy:
-                        self.update_status('connected')
-                        self._update_health(True)
-                        logger.debug(f"{self.service_name} health check passed")
-                    else:
-                        self.update_status('error', 'Health check failed')
-                        self._update_health(False)
-                        logger.warning(f"{self.service_name} health check failed")
-                except Exception as e:
-                    self.update_status('error', str(e))
-                    self._update_health(False)
-                    logger.error(f"{self.service_name} health check error: {str(e)}")
-                time.sleep(interval)
-
-        self._thread = threading.Thread(target=update_loop, daemon=True)
-        self._thread.start()
-        logger.info(f"Started status updates for {self.service_name} with interval={interval}s")
-
-    def _update_health(self, is_healthy):
-        """Update service health status"""
+        """Run health_check_func on every heartbeat (the heartbeat interval applies)"""
+        self.heartbeat.register(self.service_name, health_check_func)
         try:
-            self.redis_client.set(self.health_key, str(is_healthy).lower())
-        except Exception as e:
-            logger.error(f"Failed to update health status for {self.service_name}: {str(e)}")
+            self.heartbeat.start()
+        except RuntimeError:
+            # No running loop; the application lifespan starts the heartbeat
+            pass
+        logger.info(f"Registered {self.service_name} health check with the heartbeat")
 
     def stop_status_updates(self):
-        """Stop the status update thread"""
-        self._stop_event.set()
-        if self._thread:
-            self._thread.join()
+        """Stop running the health check"""
+        self.heartbeat.unregister(self.service_name)
         logger.info(f"Stopped status updates for {self.service_name}")
 
     def get_current_status(self):
         """Get the current status from Redis"""
         try:
-            status = self.redis_client.get(self.status_key)
-            error = self.redis_client.get(self.error_key)
-            last_check = self.redis_client.get(self.last_check_key)
-            health = self.redis_client.get(self.health_key)
-            start_time = self.redis_client.get(self.start_time_key)
-            
-            return {
-                'service': self.service_name,
-                'status': status or 'disconnected',
-                'error': error,
-                'last_check': last_check,
-                'health': health == 'true' if health else False,
-                'start_time': start_time,
-                'uptime': self._calculate_uptime(start_time) if start_time else None
-            }
+            return self.heartbeat.read(self.redis_client).get(self.service_name) or describe(self.service_name, {})
         except Exception as e:
             logger.error(f"Failed to get status for {self.service_name}: {str(e)}")
             return {
@@ -159,110 +76,55 @@ class ServiceStatusManager:
                 'uptime': None
             }
 
-    def _calculate_uptime(self, start_time_str):
-        """Calculate service uptime"""
-        try:
-            start_time = datetime.fromisoformat(start_time_str)
-            uptime = datetime.now() - start_time
-            return str(uptime)
-        except Exception as e:
-            logger.error(f"Failed to calculate uptime for {self.service_name}: {str(e)}")
-            return None
-
     @staticmethod
-    def get_all_services_status():
+    def get_all_services_status(redis_client=None):
         """Get status of all services"""
         try:
-            redis_host = os.getenv('REDIS_HOST', 'localhost')
-            redis_port = int(os.getenv('REDIS_PORT', '6379'))
-            r = redis.Redis(host=redis_host, port=redis_port, decode_responses=True)
-            service_keys = r.keys('mcp:*:status')
-            services = []
-            
-            for key in service_keys:
-                service_name = key.split(':')[1]
-                status_manager = ServiceStatusManager(service_name, r)
-                services.append(status_manager.get_current_status())
-            
-            return services
+            return list(heartbeat_service.read(redis_client).values())
         except Exception as e:
             logger.error(f"Failed to get all services status: {str(e)}")
             return []
 
 class StatusManager:
-    def __init__(self, redis_host: str = 'localhost', redis_port: int = 6379):
-        """Initialize the status manager with Redis connection."""
-        self.redis_client = redis.Redis(
-            host=redis_host,
-            port=redis_port,
-            decode_responses=True
-        )
-        self._stop_event = threading.Event()
-        self._status_thread = None
+    def __init__(self, redis_host: str = 'localhost', redis_port: int = 6379, heartbeat=None):
+        """Initialize the status manager; Redis writes go through the shared heartbeat."""
+        self.heartbeat = heartbeat or heartbeat_service
         self._last_status = {}
-        
+
     def start(self):
-        """Start the status monitoring thread."""
-        if self._status_thread is None or not self._status_thread.is_alive():
-            self._stop_event.clear()
-            self._status_thread = threading.Thread(target=self._monitor_status)
-            self._status_thread.daemon = True
-            self._status_thread.start()
-            logger.info("Status monitoring started")
-            
+        """Report backend status on every heartbeat."""
+        self.heartbeat.register('backend', self._check_status, healthy_status='healthy')
+        logger.info("Status monitoring started")
+
     def stop(self):
-        """Stop the status monitoring thread."""
-        if self._status_thread and self._status_thread.is_alive():
-            self._stop_event.set()
-            self._status_thread.join()
-            logger.info("Status monitoring stopped")
-            
-    def _monitor_status(self):
-        """Monitor and update service status."""
-        while not self._stop_event.is_set():
-            try:
-                # Get current status
-                current_status = self._get_current_status()
-                
-                # Update Redis with current status
-                self._update_redis_status(current_status)
-                
-                # Store last status
-                self._last_status = current_status
-                
-                # Wait for next update
-                time.sleep(30)  # Update every 30 seconds
-                
-            except Exception as e:
-                logger.error(f"Error in status monitoring: {str(e)}")
-                time.sleep(5)  # Wait before retrying
-                
+        """Stop reporting backend status."""
+        self.heartbeat.unregister('backend')
+        logger.info("Status monitoring stopped")
+
+    def _check_status(self) -> bool:
+        """The backend is healthy while it can reach Redis."""
+        self._last_status = self._get_current_status()
+        return self._last_status['status'] == 'healthy'
+
     def _get_current_status(self) -> Dict[str, Any]:
         """Get the current status of the service."""
-        try:
-            # Basic service status
-            status = {
-                'service': 'backend',
-                'status': 'healthy',
-                'timestamp': datetime.utcnow().isoformat(),
-                'components': {
-                    'redis': self._check_redis_status()
-                }
+        redis_status = self._check_redis_status()
+        return {
+            'service': 'backend',
+            'status': redis_status['status'],
+            'timestamp': datetime.utcnow().isoformat(),
+            'components': {
+                'redis': redis_status
             }
-            return status
-        except Exception as e:
-            logger.error(f"Error getting current status: {str(e)}")
-            return {
-                'service': 'backend',
-                'status': 'error',
-                'error': str(e),
-                'timestamp': datetime.utcnow().isoformat()
-            }
-            
+        }
+
     def _check_redis_status(self) -> Dict[str, Any]:
         """Check Redis connection status."""
+        client = self.heartbeat.redis_client
         try:
-            self.redis_client.ping()
+            if client is None:
+                raise redis.ConnectionError('No Redis client configured')
+            client.ping()
             return {
                 'status': 'healthy',
                 'message': 'Connected to Redis'
@@ -272,23 +134,7 @@ class StatusManager:
                 'status': 'error',
                 'message': f'Redis connection error: {str(e)}'
             }
-            
-    def _update_redis_status(self, status: Dict[str, Any]):
-        """Update status in Redis."""
-        try:
-            # Convert status dictionary to JSON string
-            status_json = json.dumps(status)
-            
-            # Store status in Redis
-            self.redis_client.set(
-                'service:status:backend',
-                status_json,
-                ex=3600  # 1 hour expiry
-            )
-            logger.info("Successfully updated Redis status")
-        except Exception as e:
-            logger.error(f"Error updating Redis status: {str(e)}")
-            
+
     def get_status(self) -> Dict[str, Any]:
         """Get the current service status."""
-        return self._last_status 
\ No newline at end of file
+        return self._last_status
\ No newline at end of file
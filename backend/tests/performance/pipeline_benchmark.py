@@ -0,0 +1,504 @@
+"""Offline replay benchmark for the agent analysis pipeline.
+
+Replays a log corpus (recorded, or generated by tests.utils.log_generator)
+through the real agents (fetch -> parse -> featurize -> score -> persist)
+against an in-memory SQLite ``log_entries`` table and an in-memory Redis,
+so no live PostgreSQL, Redis or API server is needed.
+
+Usage (from backend/):
+
+    python -m tests.performance.pipeline_benchmark --logs 50000 --hours 6
+    python -m tests.performance.pipeline_benchmark --baseline tests/performance/baselines/pipeline_baseline.json
+    python -m tests.performance.pipeline_benchmark --corpus logs.ndjson \\
+        --output tests/performance/baselines/mine.local.json
+
+Per agent the report gives cycle latency percentiles, per-stage latency
+percentiles and throughput (rows/s), and peak traced memory. As in
+DataService, the fetch stage includes template parsing. With
+``--baseline`` the run is compared against a saved report and the command
+exits non-zero when a metric regressed by more than ``--tolerance``
+(default: the tolerance saved in the baseline).
+
+``baselines/pipeline_baseline.json`` is the versioned reference for the
+default generated corpus; ``--save-baseline`` rewrites it. Timings differ
+between machines, so it carries a wide tolerance. For tighter checks, write
+a local report with ``--output baselines/<name>.local.json`` (ignored by git)
+and compare against that.
+"""
+import argparse
+import asyncio
+import fnmatch
+import json
+import logging
+import os
+import platform
+import sqlite3
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.components.pipeline_monitor import pipeline_monitor
+from app.mcp_service.agents.hybrid_agent import HybridAgent
+from app.mcp_service.agents.log_level_agent import LogLevelAgent
+from app.mcp_service.agents.ml_based_agent import MLBasedAgent
+from app.mcp_service.agents.rule_based_agent import RuleBasedAgent
+from app.mcp_service.components.template_miner import TemplateMiner
+from tests.utils.log_generator import AttackScenario, LogGenerator
+
+logger = logging.getLogger(__name__)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines', 'pipeline_baseline.json')
+DEFAULT_TOLERANCE = 0.5
+STAGES = ('fetch', 'parse', 'featurize', 'score', 'persist')
+LOG_COLUMNS = (
+    'id', 'device_id', 'device_ip', 'timestamp', 'log_level', 'process_name', 'message',
+    'raw_message', 'structured_data', 'pushed_to_ai', 'pushed_at', 'push_attempts', 'last_push_error'
+)
+
+
+class MemoryRedis:
+    """In-process stand-in for the subset of the Redis client the agents use."""
+
+    def __init__(self):
+        self.data: Dict[str, Any] = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+        return True
+
+    def exists(self, *keys):
+        return sum(key in self.data for key in keys)
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def expire(self, key, ttl):
+        return key in self.data
+
+    def incr(self, key, amount=1):
+        self.data[key] = int(self.data.get(key, 0)) + amount
+        return self.data[key]
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        hash_ = self.data.setdefault(key, {})
+        if field is not None:
+            hash_[field] = value
+        hash_.update(mapping or {})
+        return len(mapping or {}) + (field is not None)
+
+    def hmset(self, key, mapping):
+        # redis-py rejects nested values; store them as JSON so the replay can proceed
+        return self.hset(key, mapping={k: v if isinstance(v, (str, int, float)) else json.dumps(v, default=str)
+                                       for k, v in mapping.items()})
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def keys(self, pattern='*'):
+        return [key for key in self.data if fnmatch.fnmatch(key, pattern)]
+
+
+class SQLiteLogStore:
+    """``log_entries`` table in an in-memory SQLite database."""
+
+    def __init__(self, path: str = ':memory:'):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS log_entries ({', '.join(LOG_COLUMNS)})")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_log_entries_timestamp ON log_entries (timestamp)")
+
+    def load(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Bulk insert rows; returns the number inserted."""
+        values = [
+            tuple(row.get(column).isoformat() if isinstance(row.get(column), datetime) else
+                  json.dumps(row[column]) if isinstance(row.get(column), dict) else row.get(column)
+                  for column in LOG_COLUMNS)
+            for row in rows
+        ]
+        self.conn.executemany(
+            f"INSERT INTO log_entries VALUES ({', '.join('?' for _ in LOG_COLUMNS)})", values
+        )
+        self.conn.commit()
+        return len(values)
+
+    def time_range(self):
+        low, high = self.conn.execute("SELECT MIN(timestamp), MAX(timestamp) FROM log_entries").fetchone()
+        return datetime.fromisoformat(low), datetime.fromisoformat(high)
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM log_entries").fetchone()[0]
+
+    def fetch(self, start_time: datetime, end_time: datetime,
+              programs: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Same filter as DataService.get_logs_by_program (ILIKE on process_name)."""
+        query = "SELECT * FROM log_entries WHERE timestamp >= ? AND timestamp <= ?"
+        params: List[Any] = [start_time.isoformat(), end_time.isoformat()]
+        if programs:
+            query += " AND (" + " OR ".join("process_name LIKE ?" for _ in programs) + ")"
+            params.extend(f"%{program}%" for program in programs)
+        query += " ORDER BY timestamp DESC"
+
+        logs = []
+        for record in self.conn.execute(query, params):
+            log = dict(record)
+            log['timestamp'] = datetime.fromisoformat(log['timestamp'])
+            logs.append(log)
+        return logs
+
+
+class ReplayDataService:
+    """DataService stand-in that serves logs as of a replay clock."""
+
+    def __init__(self, store: SQLiteLogStore, redis_client: Optional[MemoryRedis] = None):
+        self.store = store
+        self.redis_client = redis_client or MemoryRedis()
+        self.template_miner = TemplateMiner(redis_client=self.redis_client)
+        self.clock = datetime.now()
+        self.anomalies_stored = 0
+
+    @pipeline_monitor.timed('fetch')
+    async def get_logs_by_program(self, start_time: Optional[datetime], end_time: Optional[datetime],
+                                  programs: Optional[List[str]]) -> List[Dict[str, Any]]:
+        logs = self.store.fetch(start_time or datetime.min, end_time or datetime.max, programs)
+        pipeline_monitor.count_call('sqlite', 'fetch_logs')
+        pipeline_monitor.record_rows(len(logs))
+        with pipeline_monitor.stage('parse'):
+            self.template_miner.annotate(logs)
+        return logs
+
+    async def get_recent_logs(self, programs: Optional[List[str]], minutes: int = 5) -> List[Dict[str, Any]]:
+        return await self.get_logs_by_program(self.clock - timedelta(minutes=minutes), self.clock, programs)
+
+    @pipeline_monitor.timed('persist')
+    async def store_anomaly(self, anomaly: Dict[str, Any]):
+        self.anomalies_stored += 1
+        anomaly_id = f"anomaly:{anomaly['timestamp']}:{self.anomalies_stored}"
+        self.redis_client.hmset(anomaly_id, anomaly)
+        self.redis_client.expire(anomaly_id, 86400)
+        pipeline_monitor.record_anomalies()
+
+
+# Corpus generation
+
+def generate_corpus(count: int, start_time: datetime, hours: float = 6.0, devices: int = 50,
+                    attacks: bool = True, seed: int = 42) -> List[Dict[str, Any]]:
+    """Generate log_entries rows spread over ``hours`` with the synthetic log generator.
+
+    With ``attacks``, a deauth flood, an SSH brute force and a DNS flood are
+    injected so the detection and aggregation paths see realistic spikes.
+    """
+    scenarios = []
+    if attacks:
+        minutes = hours * 60
+        mean_rate = count / minutes
+        scenarios = [
+            AttackScenario('deauth_flood', start_time + timedelta(minutes=minutes * 0.2), 10, max(int(mean_rate * 3), 10)),
+            AttackScenario('auth_brute_force', start_time + timedelta(minutes=minutes * 0.5), 15, max(int(mean_rate), 10)),
+            AttackScenario('dns_flood', start_time + timedelta(minutes=minutes * 0.8), 10, max(int(mean_rate * 3), 10))
+        ]
+    generator = LogGenerator(count, start_time, start_time + timedelta(hours=hours), devices=devices,
+                             attacks=scenarios, seed=seed)
+    return list(generator.dicts())
+
+
+def load_corpus(path: str) -> List[Dict[str, Any]]:
+    """Load recorded log_entries rows from a JSON array or NDJSON file (e.g. an export)."""
+    with open(path) as f:
+        if path.endswith(('.ndjson', '.jsonl')):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = json.load(f)
+    for index, row in enumerate(rows):
+        row.setdefault('id', index + 1)
+        row.setdefault('process_name', row.get('program'))
+        row.setdefault('log_level', row.get('level'))
+        if isinstance(row.get('timestamp'), str):
+            row['timestamp'] = datetime.fromisoformat(row['timestamp'].replace('Z', '+00:00')).replace(tzinfo=None)
+    return rows
+
+
+# Agents
+
+def _rules(**extra) -> Dict[str, Any]:
+    rules = {'lookback_minutes': 5, 'analysis_interval': 300, 'severity_mapping': {'error': 4, 'critical': 5}}
+    rules.update(extra)
+    return rules
+
+
+class _LogLevelConfig:
+    analysis_interval = 300
+
+
+AGENTS: Dict[str, Callable[[ReplayDataService, Optional[str]], Any]] = {
+    'ml_wifi': lambda ds, model_path: MLBasedAgent({
+        'agent_id': 'bench_ml_wifi', 'name': 'Benchmark WiFi', 'agent_type': 'ml_based',
+        'process_filters': ['hostapd', 'wpa_supplicant'], 'model_path': model_path,
+        'analysis_rules': _rules()}, ds),
+    'ml_dns': lambda ds, model_path: MLBasedAgent({
+        'agent_id': 'bench_ml_dns', 'name': 'Benchmark DNS', 'agent_type': 'ml_based',
+        'process_filters': ['dnsmasq'], 'model_path': model_path, 'analysis_rules': _rules()}, ds),
+    'ml_firewall': lambda ds, model_path: MLBasedAgent({
+        'agent_id': 'bench_ml_firewall', 'name': 'Benchmark Firewall', 'agent_type': 'ml_based',
+        'process_filters': ['iptables'], 'model_path': model_path, 'analysis_rules': _rules()}, ds),
+    'rule_based': lambda ds, model_path: RuleBasedAgent({
+        'agent_id': 'bench_rule_based', 'name': 'Benchmark Rules', 'agent_type': 'rule_based',
+        'process_filters': ['nginx', 'postgresql', 'sshd', 'systemd'],
+        'analysis_rules': _rules(exclude_patterns=['started session'],
+                                 aggregation={'key_fields': ['program', 'level', 'template']})}, ds),
+    'hybrid': lambda ds, model_path: HybridAgent({
+        'agent_id': 'bench_hybrid', 'name': 'Benchmark Hybrid', 'agent_type': 'hybrid',
+        'process_filters': ['sshd', 'hostapd'], 'model_path': model_path,
+        'analysis_rules': _rules(fallback_rules={'enable_fallback': True})}, ds),
+    'log_level': lambda ds, model_path: LogLevelAgent(_LogLevelConfig(), ds)
+}
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max of a list of seconds, in milliseconds."""
+    if not values:
+        return {'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+    return {'p50_ms': round(float(p50), 3), 'p95_ms': round(float(p95), 3),
+            'p99_ms': round(float(p99), 3), 'max_ms': round(max(values) * 1000, 3)}
+
+
+class PipelineBenchmark:
+    """Replays a corpus through each agent in fixed analysis windows."""
+
+    def __init__(self, store: SQLiteLogStore, window_minutes: float = 5, model_path: Optional[str] = None,
+                 trace_memory: bool = True, repeats: int = 3):
+        self.store = store
+        self.window = timedelta(minutes=window_minutes)
+        self.model_path = model_path
+        self.trace_memory = trace_memory
+        self.repeats = max(1, repeats)
+
+    def _clocks(self) -> List[datetime]:
+        start, end = self.store.time_range()
+        clocks, clock = [], start + self.window
+        while clock < end + self.window:
+            clocks.append(clock)
+            clock += self.window
+        return clocks
+
+    async def _replay(self, name: str, trace_memory: bool = False) -> Dict[str, Any]:
+        """Run every window through a fresh agent; returns raw timings."""
+        data_service = ReplayDataService(self.store)
+        agent = AGENTS[name](data_service, self.model_path)
+        agent.is_running = True
+        agent_id = getattr(agent, 'agent_id', name)
+
+        stage_times: Dict[str, List[float]] = defaultdict(list)
+
+        def listener(label: str, stage: str, seconds: float) -> None:
+            if label == agent_id:
+                stage_times[stage].append(seconds)
+
+        cycle_times, rows, anomalies = [], 0, 0
+        if trace_memory:
+            tracemalloc.start()
+        pipeline_monitor.add_listener(listener)
+        try:
+            for clock in self._clocks():
+                data_service.clock = clock
+                start = time.perf_counter()
+                with pipeline_monitor.cycle(agent_id, self.window.total_seconds()) as stats:
+                    await agent.run_analysis_cycle()
+                cycle_times.append(time.perf_counter() - start)
+                rows += stats.rows
+                anomalies += stats.anomalies
+            peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        finally:
+            pipeline_monitor.remove_listener(listener)
+            if trace_memory:
+                tracemalloc.stop()
+        return {'cycle_times': cycle_times, 'stage_times': stage_times, 'rows': rows,
+                'anomalies': anomalies, 'peak_bytes': peak}
+
+    async def run_agent(self, name: str) -> Dict[str, Any]:
+        """Benchmark one agent type.
+
+        Timings come from the fastest of ``repeats`` untraced passes, which
+        filters out scheduling noise; peak memory from a separate traced
+        pass, since tracemalloc slows allocation-heavy code severalfold.
+        """
+        passes = [await self._replay(name) for _ in range(self.repeats)]
+        timed = min(passes, key=lambda replay: sum(replay['cycle_times']))
+        elapsed = sum(timed['cycle_times'])
+        rows = timed['rows']
+
+        stages = {}
+        for stage in STAGES:
+            times = timed['stage_times'].get(stage)
+            if not times:
+                continue
+            total = sum(times)
+            # Persist works per anomaly, every other stage per fetched row
+            unit, processed = ('anomalies', timed['anomalies']) if stage == 'persist' else ('rows', rows)
+            stages[stage] = {
+                'calls': len(times),
+                'total_seconds': round(total, 4),
+                f'{unit}_per_second': round(processed / total, 1) if total > 0 else None,
+                **percentiles(times)
+            }
+
+        result = {
+            'cycles': len(timed['cycle_times']),
+            'rows': rows,
+            'anomalies': timed['anomalies'],
+            'total_seconds': round(elapsed, 4),
+            'rows_per_second': round(rows / elapsed, 1) if elapsed > 0 else None,
+            'cycle': percentiles(timed['cycle_times']),
+            'stages': stages
+        }
+        if self.trace_memory:
+            traced = await self._replay(name, trace_memory=True)
+            result['peak_memory_mb'] = round(traced['peak_bytes'] / (1024 * 1024), 2)
+        return result
+
+    async def run(self, agents: Iterable[str] = tuple(AGENTS)) -> Dict[str, Any]:
+        """Benchmark several agent types and return the full report."""
+        start, end = self.store.time_range()
+        report = {
+            'created_at': datetime.now().isoformat(),
+            'environment': {'python': platform.python_version(), 'machine': platform.machine(),
+                            'cpu_count': os.cpu_count()},
+            'corpus': {'rows': self.store.count(), 'start': start.isoformat(), 'end': end.isoformat(),
+                       'window_minutes': self.window.total_seconds() / 60},
+            'repeats': self.repeats,
+            'agents': {}
+        }
+        for name in agents:
+            logger.info(f"Benchmarking {name}")
+            report['agents'][name] = await self.run_agent(name)
+        return report
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float = 0.5, min_latency_ms: float = 1.0) -> List[str]:
+    """Regressions of report against baseline beyond a relative tolerance.
+
+    Checks overall and per-stage throughput (lower is worse), cycle and
+    stage p95 latency and peak memory (higher is worse). Latencies under
+    ``min_latency_ms`` in the baseline are too noisy to compare and skipped.
+    """
+    regressions = []
+
+    def check(label: str, current: Optional[float], previous: Optional[float], higher_is_better: bool):
+        if not current or not previous:
+            return
+        if label.endswith('_ms') and previous < min_latency_ms:
+            return
+        change = (current - previous) / previous
+        if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+            regressions.append(f"{label}: {previous} -> {current} ({change:+.0%})")
+
+    for name, current in report['agents'].items():
+        previous = baseline.get('agents', {}).get(name)
+        if not previous:
+            continue
+        check(f"{name} rows_per_second", current.get('rows_per_second'), previous.get('rows_per_second'), True)
+        check(f"{name} cycle p95_ms", current['cycle']['p95_ms'], previous['cycle']['p95_ms'], False)
+        check(f"{name} peak_memory_mb", current.get('peak_memory_mb'), previous.get('peak_memory_mb'), False)
+        for stage, stats in current['stages'].items():
+            old = previous.get('stages', {}).get(stage)
+            if old:
+                for key in ('rows_per_second', 'anomalies_per_second'):
+                    if key in stats:
+                        check(f"{name} {stage} {key}", stats[key], old.get(key), True)
+                check(f"{name} {stage} p95_ms", stats['p95_ms'], old['p95_ms'], False)
+    return regressions
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"Corpus: {report['corpus']['rows']} rows, {report['corpus']['window_minutes']:g} minute windows")
+    for name, result in report['agents'].items():
+        memory = f", peak {result['peak_memory_mb']} MB" if 'peak_memory_mb' in result else ''
+        print(f"\n{name}: {result['rows']} rows in {result['cycles']} cycles, {result['rows_per_second']} rows/s, "
+              f"cycle p95 {result['cycle']['p95_ms']} ms, {result['anomalies']} anomalies{memory}")
+        for stage, stats in result['stages'].items():
+            rate = f"{stats['rows_per_second']} rows/s" if 'rows_per_second' in stats else \
+                f"{stats['anomalies_per_second']} anomalies/s"
+            print(f"  {stage:<10} {rate}  p50 {stats['p50_ms']} ms  "
+                  f"p95 {stats['p95_ms']} ms  p99 {stats['p99_ms']} ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--corpus', help="Replay a recorded JSON/NDJSON corpus instead of generating one")
+    parser.add_argument('--logs', type=int, default=50000, help="Rows to generate")
+    parser.add_argument('--hours', type=float, default=6.0, help="Time span of the generated corpus")
+    parser.add_argument('--devices', type=int, default=50, help="Devices in the generated corpus")
+    parser.add_argument('--no-attacks', action='store_true', help="Do not inject attack scenarios")
+    parser.add_argument('--agents', nargs='+', default=list(AGENTS), choices=list(AGENTS))
+    parser.add_argument('--window-minutes', type=float, default=5,
+                        help="Replay clock step; agents fetch their own lookback (5 minutes) per cycle")
+    parser.add_argument('--model-path', help="Model for ML and hybrid agents (default: rule-only model)")
+    parser.add_argument('--repeats', type=int, default=3, help="Timed passes per agent; the fastest is kept")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the traced peak memory pass")
+    parser.add_argument('--output', help="Write the report JSON here")
+    parser.add_argument('--baseline', help="Compare against this report JSON")
+    parser.add_argument('--save-baseline', action='store_true', help=f"Write the report to {BASELINE_PATH}")
+    parser.add_argument('--tolerance', type=float,
+                        help=f"Allowed relative regression (default: the baseline's, else {DEFAULT_TOLERANCE})")
+    args = parser.parse_args(argv)
+
+    # Agents log every cycle at INFO; keep the report readable
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    store = SQLiteLogStore()
+    if args.corpus:
+        store.load(load_corpus(args.corpus))
+    else:
+        start = datetime.now().replace(microsecond=0) - timedelta(hours=args.hours)
+        store.load(generate_corpus(args.logs, start, args.hours, args.devices, not args.no_attacks))
+
+    benchmark = PipelineBenchmark(store, args.window_minutes, args.model_path, not args.no_memory, args.repeats)
+    report = asyncio.run(benchmark.run(args.agents))
+    print_report(report)
+
+    if args.tolerance is not None or args.save_baseline:
+        report['tolerance'] = args.tolerance if args.tolerance is not None else DEFAULT_TOLERANCE
+    outputs = [args.output] if args.output else []
+    if args.save_baseline:
+        outputs.append(BASELINE_PATH)
+    for path in outputs:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('corpus', {}).get('rows') != report['corpus']['rows']:
+            print(f"\nWarning: baseline corpus has {baseline.get('corpus', {}).get('rows')} rows, "
+                  f"this run {report['corpus']['rows']}; results are not directly comparable")
+        tolerance = args.tolerance if args.tolerance is not None else baseline.get('tolerance', DEFAULT_TOLERANCE)
+        regressions = compare_to_baseline(report, baseline, tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
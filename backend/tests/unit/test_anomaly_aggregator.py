@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.mcp_service.components.anomaly_aggregator import AnomalyAggregator, CooldownStore
+
+@pytest.fixture
+def storm():
+    """A burst of errors from two programs."""
+    start = datetime(2025, 1, 1, 12, 0, 0)
+    logs = [
+        {'process_name': 'sshd', 'log_level': 'error', 'device_id': 1,
+         'message': f'Failed password for root from 10.0.0.{i} port {2000 + i}',
+         'timestamp': start + timedelta(seconds=i)}
+        for i in range(50)
+    ]
+    logs.append({'process_name': 'kernel', 'log_level': 'critical', 'message': 'Out of memory',
+                 'timestamp': start + timedelta(seconds=5)})
+    return logs
+
+def test_groups_carry_counts_and_samples(storm):
+    """Each key yields one group with counts, first/last seen and bounded samples."""
+    aggregator = AnomalyAggregator(key_fields=['program', 'level'], window_seconds=300, max_samples=3)
+    groups = aggregator.group(storm)
+
+    assert len(groups) == 2
+    sshd = groups[0]
+    assert sshd.key == {'program': 'sshd', 'level': 'error'}
+    assert sshd.count == 50
+    assert sshd.first_seen == storm[0]['timestamp']
+    assert sshd.last_seen == storm[49]['timestamp']
+    assert len(sshd.samples) == 3
+
+def test_template_key_merges_variable_messages(storm):
+    """Messages differing only in variables share a template key."""
+    aggregator = AnomalyAggregator(key_fields=['template'])
+    assert [group.count for group in aggregator.group(storm)] == [50, 1]
+
+    for log in storm:
+        log['template_id'] = 7
+    assert [group.key for group in aggregator.group(storm)] == [{'template': 7}]
+
+def test_cooldown_suppresses_repeat_groups(storm):
+    """A key in cooldown is not emitted again, even from another aggregator."""
+    store = CooldownStore(max_entries=10)
+    first = AnomalyAggregator(cooldown_seconds=300, cooldown_store=store, namespace='agent')
+    second = AnomalyAggregator(cooldown_seconds=300, cooldown_store=store, namespace='agent')
+
+    assert len(first.emit(storm)) == 2
+    assert second.emit(storm) == []
+
+def test_cooldown_store_uses_redis_and_stays_bounded():
+    """Redis SET NX EX holds shared cooldowns; local fallback evicts the oldest keys."""
+    redis_client = MagicMock()
+    redis_client.set.side_effect = [True, None]
+    shared = CooldownStore(redis_client, prefix='cd')
+    assert shared.acquire('a', 60)
+    assert not shared.acquire('a', 60)
+    redis_client.set.assert_called_with('cd:a', 1, nx=True, ex=60)
+
+    local = CooldownStore(max_entries=2)
+    for key in ('a', 'b', 'c'):
+        assert local.acquire(key, 60)
+    assert set(local.local_keys()) == {'b', 'c'}
+
+def test_unknown_key_field_rejected():
+    with pytest.raises(ValueError):
+        AnomalyAggregator(key_fields=['hostname'])
@@ -0,0 +1,55 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+from app.mcp_service.data_service import DataService
+
+
+class FakePipeline:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.keys = []
+
+    def hgetall(self, key):
+        self.keys.append(key)
+
+    def execute(self):
+        self.redis_client.threads.add(threading.get_ident())
+        return [self.redis_client.hashes[key] for key in self.keys]
+
+class FakeRedis:
+    """Sync client serving SCAN in pages and recording the calling threads."""
+
+    def __init__(self, hashes, page_size=2):
+        self.hashes = hashes
+        self.page_size = page_size
+        self.threads = set()
+
+    def scan(self, cursor, match=None, count=None):
+        self.threads.add(threading.get_ident())
+        keys = sorted(self.hashes)
+        page = keys[cursor:cursor + self.page_size]
+        next_cursor = cursor + self.page_size
+        return (next_cursor if next_cursor < len(keys) else 0), page
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+def make_service(redis_client):
+    service = DataService.__new__(DataService)
+    service.redis_client = redis_client
+    return service
+
+@pytest.mark.asyncio
+async def test_anomaly_batches_are_read_off_the_event_loop():
+    """SCAN pages and pipelined reads run in worker threads, filtered by time."""
+    hashes = {f"anomaly:2025-01-01T12:0{minute}:00": {'severity': str(minute)} for minute in range(5)}
+    redis_client = FakeRedis(hashes)
+    service = make_service(redis_client)
+
+    batches = [batch async for batch in service.iter_anomaly_batches(
+        datetime(2025, 1, 1, 12, 1), datetime(2025, 1, 1, 12, 3), batch_size=2)]
+
+    assert [[row['severity'] for row in batch] for batch in batches] == [['1', '2'], ['3']]
+    assert redis_client.threads and threading.get_ident() not in redis_client.threads
@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.mcp_service.components.anomaly_aggregator import AnomalyAggregator
+from app.services.anomaly_test_jobs import AnomalyTestJobManager, split_time_range
+
+class FakeRedis:
+    """Just enough of the Redis client for job state."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def exists(self, key):
+        return int(key in self.data)
+
+class FakeDataService:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    async def get_logs_by_program(self, start_time, end_time, programs=None):
+        self.calls.append((start_time, end_time, programs))
+        await asyncio.sleep(self.delay)
+        return [
+            {'process_name': 'sshd', 'log_level': 'error', 'message': 'Failed password',
+             'timestamp': start_time + timedelta(minutes=i)}
+            for i in range(3)
+        ] + [{'process_name': 'sshd', 'log_level': 'info', 'message': 'Accepted', 'timestamp': start_time}]
+
+class FakeRuleAgent:
+    def __init__(self, data_service):
+        self.agent_id = 'log_level_agent'
+        self.agent_name = 'Log Level Agent'
+        self.data_service = data_service
+        self.target_levels = ['error', 'critical']
+        self.severity_mapping = {'error': 3, 'critical': 5}
+        self._aggregator = AnomalyAggregator(key_fields=['program', 'level'], window_seconds=3600)
+
+def test_split_time_range():
+    start = datetime(2025, 1, 1)
+    windows = split_time_range(start, start + timedelta(hours=15), timedelta(hours=6))
+    assert [end - begin for begin, end in windows] == [timedelta(hours=6), timedelta(hours=6), timedelta(hours=3)]
+    assert windows[-1][1] == start + timedelta(hours=15)
+
+@pytest.mark.asyncio
+async def test_job_runs_windows_and_reports_progress():
+    """Each window is fetched separately and folded into the stored job."""
+    redis_client = FakeRedis()
+    data_service = FakeDataService()
+    manager = AnomalyTestJobManager(redis_client, chunk_concurrency=2)
+    start = datetime(2025, 1, 1)
+
+    job = manager.submit(FakeRuleAgent(data_service), start, start + timedelta(hours=12),
+                         programs=['sshd'], chunk_hours=4)
+    assert job['status'] == 'queued'
+    await asyncio.gather(*manager._tasks.values())
+
+    stored = manager.get_job(job['test_id'])
+    assert stored['status'] == 'completed'
+    assert stored['progress'] == {'chunks_done': 3, 'chunks_total': 3, 'percentage': 100.0}
+    assert stored['logs_processed'] == 12
+    assert stored['anomalies_detected'] == 3
+    assert all(result['count'] == 3 and result['severity'] == 3 for result in stored['results'])
+    assert len(data_service.calls) == 3
+    await manager.shutdown()
+
+@pytest.mark.asyncio
+async def test_cancel_stops_job():
+    redis_client = FakeRedis()
+    manager = AnomalyTestJobManager(redis_client, chunk_concurrency=1)
+    start = datetime(2025, 1, 1)
+
+    job = manager.submit(FakeRuleAgent(FakeDataService(delay=0.05)), start, start + timedelta(days=2),
+                         programs=None, chunk_hours=1)
+    await asyncio.sleep(0.01)
+    manager.cancel(job['test_id'])
+    await asyncio.gather(*manager._tasks.values(), return_exceptions=True)
+
+    stored = manager.get_job(job['test_id'])
+    assert stored['status'] == 'cancelled'
+    assert stored['progress']['chunks_done'] < stored['progress']['chunks_total']
+    await manager.shutdown()
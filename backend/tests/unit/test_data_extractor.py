@@ -0,0 +1,115 @@
+import csv
+import io
+
+import pytest
+
+from app.data.data_extractor import DataExtractor
+
+ROWS = [
+    [7, "login ok", "<13>login ok", "2024-01-01 10:00:03", 3],
+    [7, 'multi\nline, "quoted"', "", "2024-01-01 10:00:02", 3],
+    [9, "disk full", "<11>disk full", "2024-01-01 10:00:01", 1],
+    [7, "logout", "<13>logout", "2024-01-01 10:00:00", 3],
+]
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def mogrify(self, query, params):
+        return (query % {key: repr(value) for key, value in params.items()}).encode()
+
+    def copy_expert(self, sql, sink):
+        self.connection.statements.append(sql)
+        # One write per row, as psycopg2 does for COPY TO
+        for row in self.connection.rows:
+            buffer = io.StringIO()
+            csv.writer(buffer, lineterminator="\n").writerow(row)
+            sink.write(buffer.getvalue().encode())
+        if self.connection.fail:
+            raise RuntimeError("connection lost")
+
+class FakeConnection:
+    def __init__(self, fail=False, rows=ROWS):
+        self.rows = rows
+        self.statements = []
+        self.fail = fail
+        self.invalidated = False
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def invalidate(self):
+        self.invalidated = True
+
+    def close(self):
+        self.closed = True
+
+class FakeEngine:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def raw_connection(self):
+        return self.connection
+
+def make_extractor(connection):
+    extractor = DataExtractor.__new__(DataExtractor)
+    extractor.config = {}
+    extractor.chunk_rows = 2
+    extractor.engine = FakeEngine(connection)
+    return extractor
+
+def test_log_query_binds_filters():
+    extractor = make_extractor(FakeConnection())
+    query, params = extractor._log_query(72, limit=10, filters={"device_ip": ["10.0.0.1", "10.0.0.2"]})
+    assert "make_interval(hours => %(hours)s)" in query
+    assert "device_ip::text = ANY(%(filter_0)s::text[])" in query
+    assert "COUNT(*) OVER (PARTITION BY device_id) AS device_activity" in query
+    assert params == {"hours": 72, "filter_0": ["10.0.0.1", "10.0.0.2"], "limit": 10}
+
+    with pytest.raises(ValueError, match="Unsupported extraction filter"):
+        extractor._log_query(1, filters={"message; DROP TABLE log_entries": "x"})
+
+def test_iter_recent_logs_streams_typed_chunks():
+    connection = FakeConnection()
+    chunks = list(make_extractor(connection).iter_recent_logs(hours=48, device_id="7"))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2]
+    assert connection.statements[0].startswith("COPY (")
+    assert "device_id = '7'" in connection.statements[0]
+    assert connection.closed and not connection.invalidated
+
+    first = chunks[0]
+    assert first["device_id"].tolist() == ["7", "7"]
+    assert str(first["timestamp"].dtype).startswith("datetime64")
+    assert first["message"].tolist() == ["login ok", 'multi\nline, "quoted"']
+    assert first["raw_message_length"].tolist() == [12, 0]
+    assert first["device_activity"].tolist() == [3, 3]
+    assert list(first.columns) == ["device_id", "message", "raw_message", "timestamp", "hour",
+                                   "day_of_week", "message_length", "raw_message_length", "device_activity"]
+
+def test_string_device_ids_are_read_as_strings():
+    """log_entries.device_id is VARCHAR; ids like device_1 must not be parsed as numbers."""
+    connection = FakeConnection(rows=[
+        ["device_1", "login ok", "<13>login ok", "2024-01-01 10:00:01", 2],
+        ["device_1", "logout", "<13>logout", "2024-01-01 10:00:00", 2],
+        ["007", "disk full", "", "2024-01-01 09:59:59", 1],
+    ])
+    chunks = list(make_extractor(connection).iter_recent_logs())
+    devices = [device for chunk in chunks for device in chunk["device_id"]]
+    assert devices == ["device_1", "device_1", "007"]
+    assert chunks[1]["device_activity"].tolist() == [1]
+
+def test_closing_the_stream_abandons_the_copy():
+    connection = FakeConnection()
+    stream = make_extractor(connection).iter_recent_logs(chunk_rows=1)
+    next(stream)
+    stream.close()
+    assert connection.invalidated and connection.closed
+
+def test_copy_errors_reach_the_reader():
+    connection = FakeConnection(fail=True)
+    with pytest.raises(RuntimeError, match="connection lost"):
+        list(make_extractor(connection).iter_recent_logs())
+    assert connection.invalidated
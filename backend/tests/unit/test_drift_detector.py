@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from app.components.drift_detector import (
+    DriftDetector,
+    FixedBinHistogram,
+    SlidingWindowHistogram,
+    ks_statistic,
+    population_stability_index
+)
+
+@pytest.fixture
+def rng():
+    """Seeded random generator."""
+    return np.random.default_rng(42)
+
+def test_histogram_merge_adds_counts(rng):
+    """Histograms with the same edges merge by adding counts."""
+    reference = FixedBinHistogram.from_reference(rng.normal(size=1000), bins=10)
+    first, second = reference.empty_like(), reference.empty_like()
+    first.update(rng.normal(size=300))
+    second.update(rng.normal(size=200))
+
+    merged = first.merge(second)
+    assert merged.total == 500
+    np.testing.assert_array_equal(merged.counts, first.counts + second.counts)
+
+def test_psi_and_ks_detect_shift(rng):
+    """Shifted data scores higher than data from the reference distribution."""
+    reference = FixedBinHistogram.from_reference(rng.normal(size=5000))
+    same, shifted = reference.empty_like(), reference.empty_like()
+    same.update(rng.normal(size=2000))
+    shifted.update(rng.normal(loc=1.0, size=2000))
+
+    assert population_stability_index(reference, same) < 0.05
+    assert population_stability_index(reference, shifted) > 0.25
+    assert ks_statistic(reference, shifted) > ks_statistic(reference, same)
+
+def test_sliding_window_expires_old_buckets():
+    """Counts leave the window once their bucket expires."""
+    window = SlidingWindowHistogram(np.array([0.0]), window_seconds=60, num_buckets=6)
+    window.update(np.array([5, 0]), now=0)
+    window.update(np.array([0, 3]), now=30)
+
+    assert window.histogram(now=30).total == 8
+    assert window.histogram(now=65).total == 3
+    assert window.histogram(now=200).total == 0
+
+def test_detector_freezes_warmup_reference(rng):
+    """Without a training reference the warm-up sample becomes the reference."""
+    detector = DriftDetector(warmup_size=500)
+    detector.update({'rate': rng.normal(size=500)}, rng.normal(size=500), now=0)
+    assert detector.has_reference
+
+    detector.update({'rate': rng.normal(loc=3.0, size=500)}, rng.normal(size=500), now=10)
+    results = detector.compute(now=10)
+    assert results['rate']['psi'] > 1.0
+    assert results[DriftDetector.SCORES]['psi'] < 0.1
+
+def test_detector_reference_round_trip(rng):
+    """References survive serialisation into model metadata."""
+    detector = DriftDetector()
+    detector.set_reference({'rate': rng.normal(size=100)})
+
+    restored = DriftDetector()
+    restored.load_reference(detector.reference_to_dict())
+    np.testing.assert_array_equal(restored.reference['rate'].counts, detector.reference['rate'].counts)
+
+def test_monitors_use_the_training_reference(rng, tmp_path):
+    """A loaded model's metadata reference replaces any warm-up or earlier reference."""
+    from app.models.config import ModelConfig
+    from app.models.monitoring import model_monitor
+    from app.services.model_performance_monitor import ModelPerformanceMonitor
+
+    detector = DriftDetector()
+    detector.set_reference({'rate': rng.normal(size=500)}, rng.normal(loc=0.4, size=500))
+    metadata = {'drift_reference': detector.reference_to_dict()}
+
+    assert model_monitor.load_reference_from_metadata(metadata)
+    assert set(model_monitor.drift_detector.reference) == {'rate', DriftDetector.SCORES}
+    assert not model_monitor.load_reference_from_metadata({})
+    assert not model_monitor.drift_detector.has_reference
+
+    config = ModelConfig()
+    config.storage.directory = str(tmp_path)
+    monitor = ModelPerformanceMonitor(config)
+    assert monitor.load_reference_from_metadata('v1', metadata)
+    reference = monitor._get_score_reference('v1', np.array([]))
+    np.testing.assert_array_equal(reference.counts, detector.reference[DriftDetector.SCORES].counts)
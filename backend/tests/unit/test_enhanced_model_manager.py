@@ -13,15 +13,21 @@ from app.components.model_manager import ModelManager
 from app.models.config import ModelConfig, StorageConfig, IntegrationConfig
 
 @pytest.fixture
-def model_config():
-    """Create a test ModelConfig."""
+def model_config(tmp_path):
+    """Create a test ModelConfig storing models in a temporary directory."""
     config = ModelConfig()
-    config.storage.directory = "/tmp/test_models"
+    config.storage.directory = str(tmp_path / "models")
     return config
 
 @pytest.fixture
-def model_manager(model_config):
-    """Create a ModelManager instance for testing."""
+def model_manager(model_config, monkeypatch):
+    """Create a ModelManager instance for testing.
+    
+    ModelManager is a singleton; a fresh instance keeps the test from using
+    (and writing into) one created elsewhere, e.g. by importing app.main.
+    """
+    monkeypatch.setattr(ModelManager, '_instance', None)
+    monkeypatch.setattr(ModelManager, '_initialized', False)
     return ModelManager(config=model_config)
 
 @pytest.fixture
@@ -157,6 +163,23 @@ class TestEnhancedModelManager:
         assert result['is_valid'] is False
         assert len(result['errors']) > 0
     
+    @pytest.mark.asyncio
+    async def test_validate_imported_model_reuses_loader_validation(self, model_manager, temp_model_dir,
+                                                                   sample_model, sample_metadata):
+        """Imports and uploads share one validation and its cached result."""
+        model_path = Path(temp_model_dir) / "shared_model"
+        model_path.mkdir()
+        joblib.dump(sample_model, model_path / "model.joblib")
+        with open(model_path / "metadata.json", 'w') as f:
+            json.dump(sample_metadata, f)
+        
+        result = await model_manager._validate_imported_model(str(model_path))
+        
+        with patch('app.services.model_loader.load_model_artifact') as load_model_artifact:
+            cached = await model_manager.model_loader.validate_model_contents(model_path)
+        load_model_artifact.assert_not_called()
+        assert cached == result
+    
     @pytest.mark.asyncio
     async def test_load_model(self, model_manager, temp_model_dir, sample_model, sample_metadata):
         """Test model loading."""
@@ -505,7 +528,8 @@ class TestEnhancedModelManager:
         """Test successful model rollback."""
         with patch('pathlib.Path.exists', return_value=True), \
              patch.object(model_manager, 'load_model_version', return_value=True), \
-             patch.object(model_manager, '_update_deployment_status'):
+             patch.object(model_manager, '_update_deployment_status'), \
+             patch.object(model_manager, '_update_model_registry_by_version'):
             
             result = await model_manager.rollback_model("1.0.0")
             assert result is True
@@ -0,0 +1,85 @@
+import json
+import asyncio
+
+import pytest
+
+from app.services import event_bus as event_bus_module
+from app.services.event_bus import EventBus, format_sse
+
+class FakeRedis:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+
+def test_publish_goes_to_redis_once():
+    redis_client = FakeRedis()
+    bus = EventBus(redis_client)
+    bus.publish('agent_status', {'id': 'wifi_agent', 'status': 'active'})
+
+    [(channel, event)] = redis_client.published
+    assert channel == 'mcp:events'
+    assert event['type'] == 'agent_status'
+    assert event['data'] == {'id': 'wifi_agent', 'status': 'active'}
+
+    # Without Redis publishing is a no-op
+    EventBus().publish('anomaly', {})
+
+def test_dispatch_fans_out_and_drops_oldest_for_slow_clients():
+    bus = EventBus(queue_size=2)
+    with bus.subscription() as first, bus.subscription() as second:
+        assert bus.subscriber_count == 2
+        for index in range(3):
+            bus.dispatch({'type': 'anomaly', 'data': {'index': index}})
+        assert [first.get_nowait()['data']['index'] for _ in range(2)] == [1, 2]
+        assert second.qsize() == 2
+    assert bus.subscriber_count == 0
+
+def test_format_sse_names_the_event():
+    message = format_sse({'type': 'server_status', 'data': {'status': 'healthy'}})
+    assert message.startswith('event: server_status\ndata: ')
+    assert message.endswith('\n\n')
+    assert json.loads(message.split('data: ', 1)[1])['data'] == {'status': 'healthy'}
+
+class FailingPubSub:
+    """Delivers one event, then loses the connection."""
+
+    async def subscribe(self, channel):
+        pass
+
+    async def listen(self):
+        yield {'type': 'message', 'data': json.dumps({'type': 'anomaly', 'data': {}})}
+        raise ConnectionError("connection lost")
+
+class FailingRedis:
+    def __init__(self, **kwargs):
+        pass
+
+    def pubsub(self):
+        return FailingPubSub()
+
+    async def aclose(self):
+        pass
+
+@pytest.mark.asyncio
+async def test_subscription_failure_ends_streams(monkeypatch):
+    """Streams end when the subscription dies, so clients fall back to polling."""
+    monkeypatch.setattr(event_bus_module.aioredis, 'Redis', FailingRedis)
+    bus = EventBus(reconnect_delay=60)
+    with bus.subscription() as queue:
+        await bus.start('localhost', 6379)
+        assert (await asyncio.wait_for(queue.get(), 1))['type'] == 'anomaly'
+        assert await asyncio.wait_for(queue.get(), 1) is None
+        assert not bus.connected
+        await bus.stop()
+
+def test_stream_is_refused_without_subscription(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.api.endpoints import events
+
+    app = FastAPI()
+    app.include_router(events.router)
+    monkeypatch.setattr(events.event_bus, 'connected', False)
+    assert TestClient(app).get('/events').status_code == 503
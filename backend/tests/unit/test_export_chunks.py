@@ -0,0 +1,83 @@
+import pandas as pd
+
+from app.models.export import ExportConfig
+from app.services.export.columnar import to_records
+from app.services.export.data_transformer import DataTransformer
+from app.services.export.data_validator import DataValidator
+
+LOGS = [
+    {"timestamp": "2024-01-01 10:00:00", "level": "INFO", "message": "ok", "source": "nginx"},
+    {"timestamp": "not a time", "level": "TRACE", "message": "bad", "source": "nginx"},
+    {"timestamp": None, "level": "ERROR", "message": "null source", "source": None},
+    {"timestamp": "2024-01-01T10:00:00.250+02:00", "level": "DEBUG", "message": "offset", "source": "sshd"},
+]
+
+def test_chunk_report_matches_per_entry_validation():
+    """The chunk report aggregates exactly what validate_log_entry finds per record."""
+    validator = DataValidator(validation_level="full")
+    report = validator.validate_chunk("log_entry", LOGS)
+    results = [validator.validate_log_entry(entry) for entry in LOGS]
+
+    assert report.record_count == 4
+    assert report.valid_count == sum(result.is_valid for result in results)
+    assert report.invalid_rows == [i for i, result in enumerate(results) if not result.is_valid]
+    for field in ("timestamp", "level", "source"):
+        assert report.invalid_values[field] == sum(field in result.invalid_values for result in results)
+    expected_validity = sum(result.quality_metrics["validity"] for result in results) / len(results)
+    assert abs(report.quality_metrics["validity"] - expected_validity) < 1e-9
+    assert report.invalid_samples["level"] == ["TRACE"]
+
+def test_basic_level_omits_row_details_and_reports_merge():
+    validator = DataValidator()
+    first = validator.validate_chunk("ip", [
+        {"address": "10.0.0.1", "first_seen": "a", "last_seen": "b", "risk_score": 50},
+        {"address": "not-an-ip", "first_seen": "a", "last_seen": "b", "risk_score": 500},
+    ])
+    assert first.invalid_rows == [] and first.invalid_samples == {}
+    assert first.invalid_values == {"address": 1, "risk_score": 1}
+
+    second = validator.validate_chunk("ip", pd.DataFrame({"address": ["10.0.0.2"], "risk_score": [1]}))
+    assert second.missing_fields == {"first_seen": 1, "last_seen": 1}
+
+    merged = first.merge(second)
+    assert merged.record_count == 3 and merged.valid_count == 1
+    assert not merged.is_valid
+    assert merged.missing_fields == {"first_seen": 1, "last_seen": 1}
+    assert abs(merged.quality_metrics["completeness"] - (1.0 * 2 + 0.5) / 3) < 1e-9
+
+def test_chunk_transform_normalizes_columns_without_row_metadata():
+    transformer = DataTransformer(ExportConfig(data_types=["anomalies"]))
+    records = [
+        {"timestamp": "2024-01-01 10:00:00", "score": 95, "id": 1},
+        {"timestamp": "2024-01-01T10:00:00.5+02:00", "score": 0.4},
+        {"timestamp": "garbage", "score": "n/a", "id": 3},
+    ]
+    transformed = to_records(transformer.transform_chunk("anomaly", records), like=records)
+
+    assert transformed[0] == {"timestamp": "2024-01-01T10:00:00", "score": 0.95, "id": 1}
+    assert transformed[1] == {"timestamp": "2024-01-01T10:00:00.500000+02:00", "score": 0.4}
+    assert transformed[2]["timestamp"] == "garbage" and transformed[2]["score"] == "n/a"
+    assert transformer.metadata["transformation_version"] == "1.0"
+
+def test_batch_transform_matches_per_record_path_for_heterogeneous_records():
+    transformer = DataTransformer(ExportConfig(data_types=["anomalies", "ips"]))
+    anomalies = [
+        {"timestamp": "2024-01-01T10:00:00Z", "score": 80, "type": "spike"},
+        {"timestamp": "2024-01-01T10:00:00.5+02:00", "score": 0.4, "extra": {"k": 1}},
+        {"timestamp": "2024-01-01T10:00:00-0530", "score": None, "details": None},
+        {"score": 0.7, "type": "burst"},
+        {"timestamp": None, "type": "gap"},
+    ]
+    ips = [
+        {"address": "10.0.0.1", "first_seen": "2024-01-01 10:00:00", "risk_score": 50},
+        {"address": "10.0.0.2", "last_seen": "2024-01-02T00:00:00+01:00", "tags": ["scan"]},
+    ]
+
+    def without_time(record):
+        return dict(record, _metadata={"transformation_version": record["_metadata"]["transformation_version"]})
+
+    for data_type, records in (("anomaly", anomalies), ("ip", ips)):
+        batch = transformer.batch_transform(data_type, records)
+        expected = [transformer.transform(data_type, record) for record in records]
+        assert [without_time(r) for r in batch] == [without_time(r) for r in expected]
+        assert [list(r) for r in batch] == [list(r) for r in expected]
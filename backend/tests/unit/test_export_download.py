@@ -0,0 +1,55 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services.export.download import accepted_encodings, parse_range, tail_lines
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    # Multiple ranges are answered with the whole file
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=100-", 100)
+    with pytest.raises(ValueError):
+        parse_range("bytes=x-", 100)
+    # An empty file has no last N bytes
+    with pytest.raises(ValueError):
+        parse_range("bytes=-10", 0)
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, br;q=0.5, zstd;q=0") == {"gzip", "br"}
+    assert accepted_encodings(None) == set()
+
+@pytest.mark.asyncio
+async def test_tail_follows_growing_file_until_finished(tmp_path):
+    """Only complete lines are sent, and the stream ends once the writer is done."""
+    path = tmp_path / "export.jsonl"
+    path.write_bytes(b'{"id": 1}\n{"id"')
+    finished = False
+    received = []
+    checked_on = set()
+
+    def is_finished():
+        # Looked up in Redis by the endpoint, so never called on the event loop
+        checked_on.add(threading.current_thread())
+        return finished
+
+    async def consume():
+        async for block in tail_lines(str(path), is_finished, poll_interval=0.01):
+            received.append(block)
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0.05)
+    assert received == [b'{"id": 1}\n']
+
+    with open(path, "ab") as f:
+        f.write(b': 2}\n{"id": 3}\n')
+    finished = True
+    await asyncio.wait_for(task, timeout=1)
+    assert b"".join(received) == b'{"id": 1}\n{"id": 2}\n{"id": 3}\n'
+    assert checked_on and threading.current_thread() not in checked_on
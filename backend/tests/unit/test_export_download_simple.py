@@ -31,7 +31,7 @@ class TestExportDownloadSimple:
         }
         mock_get_metadata.return_value = test_metadata
 
-        response = client.get(f"/api/export/download/{test_export_id}")
+        response = client.get(f"/api/v1/export/download/{test_export_id}")
         
         assert response.status_code == 200
         assert response.headers["content-type"] == "application/octet-stream"
@@ -46,7 +46,7 @@ class TestExportDownloadSimple:
         test_export_id = "non-existent-export"
         mock_get_metadata.return_value = None
         
-        response = client.get(f"/api/export/download/{test_export_id}")
+        response = client.get(f"/api/v1/export/download/{test_export_id}")
         
         assert response.status_code == 404
         assert "Export not found" in response.json()["detail"]
@@ -62,7 +62,7 @@ class TestExportDownloadSimple:
         }
         mock_get_metadata.return_value = test_metadata
 
-        response = client.get(f"/api/export/download/{test_export_id}")
+        response = client.get(f"/api/v1/export/download/{test_export_id}")
         
         assert response.status_code == 404
         assert "Export file not found" in response.json()["detail"]
@@ -78,7 +78,50 @@ class TestExportDownloadSimple:
         }
         mock_get_metadata.return_value = test_metadata
 
-        response = client.get(f"/api/export/download/{test_export_id}")
+        response = client.get(f"/api/v1/export/download/{test_export_id}")
         
         assert response.status_code == 404
-        assert "Export file not found" in response.json()["detail"] 
\ No newline at end of file
+        assert "Export file not found" in response.json()["detail"]
+
+    @patch('app.services.export.status_manager.ExportStatusManager.get_export_metadata')
+    def test_download_ranges_and_validators(self, mock_get_metadata, tmp_path):
+        """Range, If-Range and If-None-Match are honoured."""
+        test_file = tmp_path / "export.jsonl"
+        test_file.write_bytes(b"0123456789")
+        mock_get_metadata.return_value = {"export_id": "ranged", "file_path": str(test_file), "status": "completed"}
+
+        full = client.get("/api/v1/export/download/ranged")
+        etag = full.headers["etag"]
+        assert full.content == b"0123456789" and full.headers["accept-ranges"] == "bytes"
+
+        partial = client.get("/api/v1/export/download/ranged", headers={"Range": "bytes=2-5"})
+        assert partial.status_code == 206
+        assert partial.content == b"2345"
+        assert partial.headers["content-range"] == "bytes 2-5/10"
+
+        resumed = client.get("/api/v1/export/download/ranged", headers={"Range": "bytes=7-", "If-Range": etag})
+        assert resumed.content == b"789"
+        stale = client.get("/api/v1/export/download/ranged", headers={"Range": "bytes=7-", "If-Range": '"other"'})
+        assert stale.status_code == 200 and stale.content == b"0123456789"
+
+        assert client.get("/api/v1/export/download/ranged", headers={"Range": "bytes=20-"}).status_code == 416
+        assert client.get("/api/v1/export/download/ranged", headers={"If-None-Match": etag}).status_code == 304
+
+    @patch('app.services.export.status_manager.ExportStatusManager.get_export_metadata')
+    def test_download_precompressed_variant(self, mock_get_metadata, tmp_path):
+        """A gzip variant is sent to clients that accept it."""
+        import gzip
+        test_file = tmp_path / "export.json"
+        test_file.write_bytes(b'{"data": []}')
+        variant = tmp_path / "export.json.gz"
+        variant.write_bytes(gzip.compress(test_file.read_bytes()))
+        mock_get_metadata.return_value = {
+            "export_id": "variant", "status": "completed", "data_types": ["logs"],
+            "files": {"logs": str(test_file)}, "variants": {"logs": {"gzip": str(variant)}}
+        }
+
+        response = client.get("/api/v1/export/download/variant", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.content == b'{"data": []}'
+        identity = client.get("/api/v1/export/download/variant", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in identity.headers
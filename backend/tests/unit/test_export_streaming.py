@@ -0,0 +1,121 @@
+import gzip
+import json
+import zipfile
+from datetime import datetime
+
+import pytest
+
+from app.mcp_service.data_service import DataService
+from app.models.export import ExportConfig
+from app.services.export import data_exporter as data_exporter_module
+from app.services.export.data_exporter import DataExporter
+
+def make_log(i):
+    return {
+        "id": i, "device_id": 1, "device_ip": "10.0.0.1", "timestamp": datetime(2024, 1, 1, 10, 0, i % 60),
+        "log_level": "info" if i % 10 else "bogus", "process_name": "nginx", "message": f"request {i}",
+        "raw_message": None, "structured_data": '{"k": 1}', "pushed_to_ai": False, "pushed_at": None,
+        "push_attempts": 0, "last_push_error": None
+    }
+
+class FakeDataService:
+    """Serves canned batches and records how the exporter asked for them."""
+
+    def __init__(self, log_count=25):
+        self.logs = [make_log(i) for i in range(log_count)]
+        self.calls = []
+
+    async def iter_log_batches(self, start_time, end_time, programs=None, filters=None, batch_size=1000):
+        self.calls.append(("logs", filters, batch_size))
+        for start in range(0, len(self.logs), batch_size):
+            yield self.logs[start:start + batch_size]
+
+    async def iter_ip_batches(self, start_time, end_time, programs=None, filters=None, batch_size=1000):
+        self.calls.append(("ips", filters, batch_size))
+        yield [{"address": "10.0.0.1", "first_seen": datetime(2024, 1, 1), "last_seen": datetime(2024, 1, 2),
+                "log_count": 25, "error_count": 0, "risk_score": 0.0}]
+
+    async def iter_anomaly_batches(self, start_time, end_time, batch_size=1000):
+        self.calls.append(("anomalies", None, batch_size))
+        yield [{"id": "anomaly:1", "timestamp": "2024-01-01 10:00:00", "score": "80", "type": "auth", "details": "x"}]
+
+@pytest.fixture
+def exporter(tmp_path, monkeypatch):
+    config_path = tmp_path / "source.yaml"
+    config_path.write_text("database: {}\n")
+    monkeypatch.chdir(tmp_path)
+    stored = {}
+    monkeypatch.setattr(data_exporter_module.ExportStatusManager, "store_export_metadata",
+                        staticmethod(lambda export_id, metadata: stored.update(metadata)))
+    exporter = DataExporter(str(config_path))
+    exporter.data_service = FakeDataService()
+    return exporter
+
+@pytest.mark.asyncio
+async def test_streams_each_type_in_batches_with_gzip(exporter):
+    config = ExportConfig(data_types=["logs", "ips", "anomalies"], batch_size=10, compression=True,
+                          filters={"device_ip": "10.0.0.1"}, validation_level="full")
+    metadata = await exporter.export_data("abc", format="json", config=config)
+
+    assert exporter.data_service.calls == [("logs", {"device_ip": "10.0.0.1"}, 10),
+                                           ("ips", {"device_ip": "10.0.0.1"}, 10),
+                                           ("anomalies", None, 10)]
+    assert metadata["records_by_type"] == {"logs": 25, "ips": 1, "anomalies": 1}
+    assert set(metadata["files"]) == {"logs", "ips", "anomalies"}
+    assert metadata["compression"] == "gzip"
+
+    with gzip.open(metadata["files"]["logs"], "rt") as f:
+        document = json.load(f)
+    assert [record["id"] for record in document["data"]] == list(range(25))
+    assert document["data"][0]["structured_data"] == {"k": 1}
+    assert document["export_metadata"]["total_records"] == 25
+
+    with gzip.open(metadata["files"]["anomalies"], "rt") as f:
+        assert json.load(f)["data"][0]["score"] == 0.8
+
+    # Every tenth log has an unknown level
+    assert metadata["validation"]["logs"]["invalid_values"] == {"level": 3}
+    assert metadata["validation"]["logs"]["invalid_rows"] == [0, 10, 20]
+    assert metadata["data_quality_metrics"]["valid_ratio"] == pytest.approx(24 / 27)
+
+@pytest.mark.asyncio
+async def test_zip_and_csv_outputs(exporter):
+    config = ExportConfig(data_types=["logs", "ips"], batch_size=7, validation_level="none")
+    metadata = await exporter.export_data("zipped", format="zip", config=config)
+    with zipfile.ZipFile(metadata["file_path"]) as archive:
+        assert sorted(archive.namelist()) == ["ips.csv", "ips.json", "logs.csv", "logs.json"]
+        assert len(json.loads(archive.read("logs.json"))["data"]) == 25
+        assert archive.read("logs.csv").decode().count("\n") == 26
+    assert metadata["validation"] == {}
+
+    metadata = await exporter.export_data("plain", format="csv", config=ExportConfig(data_types=["logs"]))
+    with open(metadata["file_path"], encoding="utf-8") as f:
+        assert f.readline().startswith("id,device_id,device_ip,timestamp")
+
+def test_export_filters_are_parameterized():
+    where, params = DataService._export_conditions(
+        datetime(2024, 1, 1), None, ["cron"],
+        {"device_ip": ["10.0.0.1", "10.0.0.2"], "message_contains": "'; DROP TABLE log_entries; --"}
+    )
+    assert where == ("WHERE timestamp >= $1 AND (process_name ILIKE $2 OR process_name ILIKE $3) "
+                     "AND device_ip::text = ANY($4::text[]) AND message ILIKE $5")
+    assert params[1:4] == ["%cron%", "%crond%", ["10.0.0.1", "10.0.0.2"]]
+    assert "DROP" not in where
+
+    with pytest.raises(ValueError, match="Invalid filter"):
+        ExportConfig(data_types=["logs"], filters={"password": "x"})
+    assert ExportConfig(data_types=["logs"], validation_level="strict").validation_level == "full"
+
+@pytest.mark.asyncio
+async def test_jsonl_export_is_published_early_with_gzip_variant(exporter, monkeypatch):
+    published = []
+    monkeypatch.setattr(data_exporter_module.DataExporter, "_update_metadata",
+                        staticmethod(lambda export_id, fields: published.append(fields)))
+    metadata = await exporter.export_data("live", format="jsonl", config=ExportConfig(data_types=["logs"]))
+
+    # The file path is known to clients before writing starts, so they can follow it
+    assert published[0] == {"status": "running", "files": {"logs": metadata["files"]["logs"]}}
+    with open(metadata["files"]["logs"], encoding="utf-8") as f:
+        assert [json.loads(line)["id"] for line in f] == list(range(25))
+    with gzip.open(metadata["variants"]["logs"]["gzip"], "rb") as f, open(metadata["files"]["logs"], "rb") as g:
+        assert f.read() == g.read()
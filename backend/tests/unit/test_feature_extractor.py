@@ -143,4 +143,25 @@ def test_metrics_recording(feature_extractor, sample_logs, test_registry):
     # Verify metrics were recorded
     metrics = {m.name: m for m in test_registry.collect()}
     assert 'feature_extraction_duration_seconds' in metrics
-    assert 'feature_extraction_count' in metrics 
\ No newline at end of file
+    assert 'feature_extraction_count' in metrics
+
+def test_log_entries_rows_are_featurized_by_process_name():
+    """Rows from the log_entries table carry process_name instead of program."""
+    extractor = FeatureExtractor()
+    wifi = extractor.extract_features([
+        {'process_name': 'hostapd', 'message': 'wlan0: STA aa:bb:cc:dd:ee:ff IEEE 802.11: authenticated'}
+    ])
+    assert 'deauth_count' in wifi
+    assert wifi['program_counts'] == {'hostapd': 1}
+
+    dns = extractor.extract_features([{'process_name': 'dnsmasq', 'message': 'query[A] example.com from 10.0.0.2'}])
+    assert dns['query_count'] == 1
+    assert dns['program_counts'] == {'dnsmasq': 1}
+
+def test_program_takes_precedence_over_process_name():
+    extractor = FeatureExtractor()
+    features = extractor.extract_features([
+        {'program': 'dnsmasq', 'process_name': 'hostapd', 'message': 'query[A] example.com from 10.0.0.2'}
+    ])
+    assert 'query_count' in features
+    assert features['program_counts'] == {'dnsmasq': 1}
@@ -0,0 +1,53 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.mcp_service.components.health_sampler import HealthSampler
+
+class FakeDataService:
+    """Data service whose database probe can be made to fail or hang."""
+
+    def __init__(self, error=None, delay=0.0):
+        self.error = error
+        self.delay = delay
+
+    async def check_database(self):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+
+@pytest.fixture
+def model_manager():
+    manager = MagicMock()
+    manager.is_running.return_value = True
+    return manager
+
+@pytest.mark.asyncio
+async def test_sample_caches_healthy_snapshot(model_manager):
+    """A successful sample is cached and reports every service healthy."""
+    sampler = HealthSampler(FakeDataService(), MagicMock(), model_manager)
+    assert sampler.snapshot is None and sampler.is_stale()
+    published = []
+    sampler.add_listener(published.append)
+
+    snapshot = await sampler.sample()
+    assert sampler.snapshot is snapshot
+    assert published == [snapshot]
+    assert snapshot['status'] == 'healthy'
+    assert set(snapshot['services']) == {'database', 'redis', 'model_service'}
+    assert 'cpu_usage' in snapshot['resources']
+    assert not sampler.is_stale()
+
+@pytest.mark.asyncio
+async def test_failing_and_slow_probes_mark_unhealthy(model_manager):
+    """Probe errors and timeouts are recorded instead of raised."""
+    redis_client = MagicMock()
+    redis_client.ping.side_effect = ConnectionError("redis down")
+    sampler = HealthSampler(FakeDataService(delay=1.0), redis_client, model_manager, timeout=0.05)
+
+    snapshot = await sampler.sample()
+    assert snapshot['status'] == 'unhealthy'
+    assert snapshot['services']['redis']['error'] == 'redis down'
+    assert 'Timed out' in snapshot['services']['database']['error']
+    assert snapshot['services']['model_service']['status'] == 'healthy'
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from app.mcp_service.status_manager import MCPStatusManager
+from app.services.heartbeat import HeartbeatService
+from app.services.status_manager import ServiceStatusManager
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def hset(self, key, mapping):
+        self.commands.append(('hset', key, mapping))
+
+    def expire(self, key, ttl):
+        self.commands.append(('expire', key, ttl))
+
+    def execute(self):
+        self.redis.round_trips += 1
+        for command in self.commands:
+            if command[0] == 'hset':
+                self.redis.hashes.setdefault(command[1], {}).update(command[2])
+            else:
+                self.redis.ttls[command[1]] = command[2]
+
+class FakeRedis:
+    """Counts round trips; only supports what the heartbeat uses."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.ttls = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def hgetall(self, key):
+        self.round_trips += 1
+        return dict(self.hashes.get(key, {}))
+
+@pytest.mark.asyncio
+async def test_beat_writes_all_components_in_one_round_trip():
+    """Checks run concurrently and every component lands in one hash with a TTL."""
+    redis_client = FakeRedis()
+    heartbeat = HeartbeatService(redis_client, interval=5)
+
+    async def slow_ok():
+        await asyncio.sleep(0.01)
+        return True
+
+    def failing():
+        raise ConnectionError("db down")
+
+    heartbeat.register('data_source', slow_ok)
+    heartbeat.register('model_service', failing)
+    heartbeat.register('exporter', lambda: False)
+    await heartbeat.beat()
+
+    assert redis_client.round_trips == 1
+    assert redis_client.ttls[heartbeat.key] == 15
+    statuses = heartbeat.read()
+    assert redis_client.round_trips == 2
+    assert statuses['data_source']['status'] == 'connected' and statuses['data_source']['health']
+    assert statuses['data_source']['error'] is None
+    assert statuses['model_service']['error'] == 'db down'
+    assert statuses['exporter']['error'] == 'Health check failed'
+    assert statuses['exporter']['uptime'] is not None
+
+@pytest.mark.asyncio
+async def test_slow_checks_time_out():
+    heartbeat = HeartbeatService(FakeRedis(), timeout=0.05)
+
+    async def hang():
+        await asyncio.sleep(1)
+
+    heartbeat.register('slow', hang)
+    await heartbeat.beat()
+    assert 'timed out' in heartbeat.read()['slow']['error']
+
+@pytest.mark.asyncio
+async def test_status_managers_report_through_heartbeat():
+    """Managers hold no connection or thread; reported changes reach Redis on the next beat."""
+    redis_client = FakeRedis()
+    heartbeat = HeartbeatService(redis_client, interval=60)
+    data_source = ServiceStatusManager('data_source', heartbeat=heartbeat)
+    mcp = MCPStatusManager(heartbeat=heartbeat)
+    mcp.start_status_updates()
+
+    data_source.update_status('connected')
+    heartbeat.start()
+    try:
+        await asyncio.sleep(0.05)
+        assert mcp.get_status()['status'] == 'healthy'
+
+        data_source.update_status('error', 'connection refused')
+        # The report wakes the loop well before the 60s interval
+        await asyncio.sleep(0.05)
+        current = data_source.get_current_status()
+        assert current['status'] == 'error'
+        assert current['error'] == 'connection refused'
+        assert mcp.get_current_status()['status'] == 'error'
+    finally:
+        await heartbeat.stop()
+
+    services = {status['service'] for status in ServiceStatusManager.get_all_services_status(redis_client)}
+    assert services == {'data_source', 'mcp_service'}
@@ -0,0 +1,147 @@
+import copy
+import json
+import os
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from app.models.training import ModelTrainer, ReservoirSample, rescale_forest
+
+FEATURES = ['signal_strength', 'retry_rate', 'packet_loss_rate']
+
+class TrainerConfig:
+    """The attributes ModelTrainer reads from its configuration."""
+
+    def __init__(self, model_dir):
+        self.model_dir = model_dir
+        self.feature_columns = FEATURES
+        self.n_estimators = 20
+        self.max_samples = 'auto'
+        self.contamination = 0.1
+        self.random_state = 0
+        self.train_test_split = 0.2
+
+    def dict(self):
+        return dict(vars(self))
+
+class FakeDataService:
+    """Returns each queued batch of logs once, recording the query window."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.windows = []
+
+    async def fetch_all(self, query, start, end):
+        self.windows.append((start, end))
+        return self.batches.pop(0) if self.batches else []
+
+class FakeFeatureExtractor:
+    async def extract(self, logs):
+        return {name: [log[name] for log in logs] for name in FEATURES}
+
+def make_logs(count, shift, seed):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(shift, 1.0, size=(count, len(FEATURES)))
+    return [dict(zip(FEATURES, row)) for row in values]
+
+def test_reservoir_keeps_a_uniform_sample():
+    reservoir = ReservoirSample(size=100, random_state=0)
+    for start in range(0, 10000, 1000):
+        reservoir.add(np.arange(start, start + 1000, dtype=float).reshape(-1, 1))
+    assert reservoir.seen == 10000
+    assert reservoir.items.shape == (100, 1)
+    assert len(np.unique(reservoir.items)) == 100
+    # Every part of the stream is represented
+    assert 2000 < reservoir.items.mean() < 8000
+
+def test_rescaled_trees_score_raw_data_unchanged():
+    rng = np.random.default_rng(1)
+    raw = rng.normal(5.0, 2.0, size=(300, 3))
+    old_scaler = StandardScaler().fit(raw)
+    model = IsolationForest(n_estimators=10, random_state=0).fit(old_scaler.transform(raw))
+    before = model.score_samples(old_scaler.transform(raw))
+
+    new_scaler = copy.deepcopy(old_scaler).partial_fit(rng.normal(9.0, 4.0, size=(300, 3)))
+    rescale_forest(model, old_scaler, new_scaler)
+    assert np.allclose(model.score_samples(new_scaler.transform(raw)), before)
+
+@pytest.mark.asyncio
+async def test_incremental_refresh_replaces_oldest_trees(tmp_path):
+    trainer = ModelTrainer(TrainerConfig(str(tmp_path)))
+    trainer.feature_extractor = FakeFeatureExtractor()
+    trainer.data_service = FakeDataService([make_logs(500, 0.0, 0), make_logs(200, 1.0, 1)])
+
+    first_dir = await trainer.train_and_save(datetime(2024, 1, 1), datetime(2024, 1, 2))
+    first = trainer.scaler.mean_.copy()
+    base_model = joblib.load(f"{first_dir}/model.joblib")
+
+    second_dir = await trainer.train_incremental(end_date=datetime(2024, 1, 2, 1), new_trees=5)
+    assert second_dir != first_dir
+    # Only rows after the previous watermark are read
+    assert trainer.data_service.windows[-1] == (datetime(2024, 1, 2), datetime(2024, 1, 2, 1))
+    # Scaler statistics cover both windows
+    assert trainer.scaler.n_samples_seen_ == 700
+    assert not np.allclose(trainer.scaler.mean_, first)
+
+    model = joblib.load(f"{second_dir}/model.joblib")
+    assert len(model.estimators_) == 20
+    def node_samples(trees):
+        return [tree.tree_.n_node_samples.tolist() for tree in trees]
+    assert node_samples(model.estimators_[:15]) == node_samples(base_model.estimators_[5:])
+
+    with open(f"{second_dir}/metadata.json") as f:
+        metadata = json.load(f)
+    assert metadata['training_mode'] == 'incremental'
+    assert metadata['trees_replaced'] == 5
+    assert metadata['new_samples'] == 200
+
+    # A refresh in the same second still gets its own version, listed last
+    assert sorted(os.listdir(tmp_path)) == [os.path.basename(first_dir), os.path.basename(second_dir)]
+
+    # Nothing new: the latest version is kept
+    assert await trainer.train_incremental(end_date=datetime(2024, 1, 2, 2)) == second_dir
+
+def test_sweep_selects_best_candidate_in_parallel(tmp_path):
+    trainer = ModelTrainer(TrainerConfig(str(tmp_path)))
+    X = np.random.default_rng(2).normal(size=(400, 3))
+    y = np.zeros(len(X))
+    grid = {'n_estimators': [5, 20], 'max_samples': ['auto', 0.5], 'contamination': [0.1]}
+
+    model, report = trainer.sweep_models(X, y, grid, n_jobs=2)
+    assert report['workers'] == 2
+    assert report['label_source'] == 'synthetic_outliers'
+    assert len(report['candidates']) == 4
+    precisions = [candidate['average_precision'] for candidate in report['candidates']]
+    assert precisions == sorted(precisions, reverse=True)
+    assert report['best_params'] == report['candidates'][0]['params']
+    assert model.n_estimators == report['best_params']['n_estimators']
+    # The winner is refitted in this process and matches the scored candidate
+    X_train = train_test_split(X, y, test_size=trainer.config.train_test_split,
+                               random_state=trainer.config.random_state)[0]
+    scored = IsolationForest(**report['best_params'], random_state=trainer.config.random_state).fit(X_train)
+    assert np.array_equal(model.score_samples(X), scored.score_samples(X))
+
+    # The same candidates score identically without worker processes
+    _, sequential = trainer.sweep_models(X, y, grid, n_jobs=1)
+    assert [c['average_precision'] for c in sequential['candidates']] == precisions
+
+    _, sampled = trainer.sweep_models(X, y, grid, n_iter=2, n_jobs=1)
+    assert len(sampled['candidates']) == 2
+
+@pytest.mark.asyncio
+async def test_sweep_report_is_saved_with_the_model(tmp_path):
+    trainer = ModelTrainer(TrainerConfig(str(tmp_path)))
+    trainer.feature_extractor = FakeFeatureExtractor()
+    trainer.data_service = FakeDataService([make_logs(300, 0.0, 3)])
+
+    model_dir = await trainer.train_and_save(datetime(2024, 1, 1), datetime(2024, 1, 2), sweep=True,
+                                             param_grid={'n_estimators': [5, 10]})
+    with open(f"{model_dir}/metadata.json") as f:
+        metadata = json.load(f)
+    assert sorted(c['params']['n_estimators'] for c in metadata['sweep']['candidates']) == [5, 10]
+    assert metadata['sweep']['best_params'] == metadata['sweep']['candidates'][0]['params']
@@ -0,0 +1,90 @@
+import json
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.models.config import ModelConfig
+from app.services.inference_metrics_store import InferenceMetricsRing
+from app.services.model_performance_monitor import ModelPerformanceMonitor
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary directory."""
+    path = Path(tempfile.mkdtemp())
+    yield path
+    shutil.rmtree(path)
+
+def test_ring_wraps_in_chronological_order(temp_dir):
+    """Old records are overwritten and snapshots stay ordered."""
+    ring = InferenceMetricsRing(temp_dir / 'model.ring', capacity=5)
+    for i in range(8):
+        ring.append(float(i), float(i) / 10, i % 2 == 0, timestamp=1000.0 + i)
+
+    records = ring.snapshot()
+    assert ring.total == 8
+    assert len(ring) == 5
+    np.testing.assert_array_equal(records['inference_time'], [3.0, 4.0, 5.0, 6.0, 7.0])
+    np.testing.assert_array_equal(records['is_anomaly'], [0, 1, 0, 1, 0])
+    assert ring.last_timestamp() == 1007.0
+
+def test_ring_persists_across_reopen(temp_dir):
+    """Flushed records survive reopening the buffer."""
+    path = temp_dir / 'model.ring'
+    ring = InferenceMetricsRing(path, capacity=10)
+    ring.append(0.5, 0.9, True)
+    ring.close()
+
+    reopened = InferenceMetricsRing(path, capacity=99)
+    assert reopened.capacity == 10
+    assert reopened.total == 1
+    assert reopened.snapshot()['anomaly_score'][0] == pytest.approx(0.9)
+
+def append_many(path, count):
+    ring = InferenceMetricsRing(path, capacity=64)
+    for i in range(count):
+        ring.append(0.1, 0.5, False, timestamp=float(i))
+    ring.close()
+
+def test_ring_is_shared_safely_between_processes(temp_dir):
+    """Workers (one per uvicorn process) appending to one buffer lose no records."""
+    path = temp_dir / 'model.ring'
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(append_many, [path] * 4, [2000] * 4))
+
+    ring = InferenceMetricsRing(path)
+    assert ring.total == 8000
+    assert len(ring) == 64
+    assert int(ring._header[4]) == 8000
+    assert not list(temp_dir.glob('*.tmp'))
+
+@pytest.mark.asyncio
+async def test_monitor_summary_and_legacy_migration(temp_dir):
+    """The monitor reads ring buffers and migrates legacy JSON history."""
+    config = ModelConfig()
+    config.storage.directory = str(temp_dir)
+    (temp_dir / 'performance_metrics.json').write_text(json.dumps({
+        'legacy': {
+            'inference_times': [0.1, 0.3],
+            'anomaly_scores': [0.2, 0.4],
+            'anomaly_counts': [0, 1],
+            'total_inferences': 5,
+            'last_updated': '2025-01-01T00:00:00'
+        }
+    }))
+    monitor = ModelPerformanceMonitor(config)
+
+    await monitor.record_inference_metrics('v1', 0.2, 0.5, True)
+    await monitor.record_inference_metrics('v1', 0.4, 0.1, False)
+
+    summary = await monitor.get_performance_summary('v1')
+    assert summary['total_inferences'] == 2
+    assert summary['performance_metrics']['avg_inference_time'] == pytest.approx(0.3)
+    assert summary['performance_metrics']['total_anomalies'] == 1
+
+    legacy = await monitor.get_performance_summary('legacy')
+    assert legacy['total_inferences'] == 5
+    assert legacy['performance_metrics']['anomaly_rate'] == pytest.approx(0.5)
@@ -0,0 +1,59 @@
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from tests.utils.log_generator import (
+    LOG_ENTRY_COLUMNS, AttackScenario, LogGenerator, load_sqlite, parse_attack, write_ndjson
+)
+
+START = datetime(2025, 1, 6)  # a Monday
+
+@pytest.fixture
+def generator():
+    attack = AttackScenario('deauth_flood', START + timedelta(hours=3), duration_minutes=10, rate_per_minute=50)
+    return LogGenerator(5000, START, START + timedelta(days=1), devices=20, attacks=[attack], seed=7)
+
+def test_rows_are_reproducible_and_time_ordered(generator):
+    rows = [row for batch in generator.batches(batch_size=1000) for row in batch]
+    assert len(rows) == 5000 + 10 * 50
+    assert all(len(row) == len(LOG_ENTRY_COLUMNS) for row in rows)
+    assert [row[2] for row in rows] == sorted(row[2] for row in rows)
+
+    again = LogGenerator(5000, START, START + timedelta(days=1), devices=20, attacks=generator.attacks, seed=7)
+    assert [row for batch in again.batches(batch_size=1000) for row in batch] == rows
+
+def test_attack_rows_are_labelled(generator):
+    attack_rows = [row for row in generator.dicts() if row['structured_data']]
+    assert len(attack_rows) == 500
+    assert {json.loads(row['structured_data'])['synthetic_attack'] for row in attack_rows} == {'deauth_flood'}
+    assert {row['process_name'] for row in attack_rows} == {'hostapd'}
+    assert len({row['device_id'] for row in attack_rows}) == 1
+
+def test_diurnal_rate_peaks_in_the_afternoon(generator):
+    weights = generator.minute_weights()
+    assert weights.sum() == pytest.approx(1.0)
+    assert weights[14 * 60] > 3 * weights[2 * 60]
+    assert generator.minute_counts().sum() == 5000
+
+def test_sinks_write_every_row(generator, tmp_path):
+    db_path = str(tmp_path / 'logs.db')
+    assert load_sqlite(generator, db_path) == 5500
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM log_entries").fetchone()[0] == 5500
+    conn.close()
+
+    ndjson_path = str(tmp_path / 'logs.ndjson')
+    assert write_ndjson(generator, ndjson_path) == 5500
+    with open(ndjson_path) as f:
+        first = json.loads(f.readline())
+    assert first['id'] == 1
+    assert datetime.fromisoformat(first['timestamp']) >= START
+
+def test_parse_attack():
+    attack = parse_attack('dns_flood:2:5:100', START)
+    assert (attack.kind, attack.start, attack.end, attack.rate_per_minute) == \
+        ('dns_flood', START + timedelta(hours=2), START + timedelta(hours=2, minutes=5), 100)
+    with pytest.raises(ValueError):
+        parse_attack('port_scan', START)
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.components.feature_extractor import FeatureExtractor
+from app.components.hyperloglog import HyperLogLog
+from app.components.log_rollup import LogRollup
+from app.mcp_service.components.rollup_ingestor import RollupIngestor
+
+START = datetime(2025, 1, 1, 12, 0)
+
+def make_logs():
+    logs = []
+    for minute in range(10):
+        timestamp = START + timedelta(minutes=minute, seconds=30)
+        logs.append({'id': minute * 3 + 1, 'timestamp': timestamp, 'device_id': 'ap-1', 'process_name': 'hostapd',
+                     'message': f"authentication failure for aa:bb:cc:dd:ee:{minute:02x} SSID='corp' reason=3"})
+        logs.append({'id': minute * 3 + 2, 'timestamp': timestamp, 'device_id': 'ap-2', 'process_name': 'hostapd',
+                     'message': f"deauthentication from 11:22:33:44:55:{minute % 4:02x} SSID='guest' status=1"})
+        logs.append({'id': minute * 3 + 3, 'timestamp': timestamp, 'device_id': 'ap-1', 'process_name': 'sshd',
+                     'message': 'Failed password for root', 'template_id': 7})
+    return logs
+
+def without_timestamp(features):
+    return {key: value for key, value in features.items() if key != 'timestamp'}
+
+def test_hyperloglog_estimates_and_merges():
+    first, second = HyperLogLog(12), HyperLogLog(12)
+    first.update(range(30000))
+    second.update(range(20000, 50000))
+    assert abs(len(first) - 30000) / 30000 < 0.05
+    assert abs(len(HyperLogLog.union([first, second])) - 50000) / 50000 < 0.05
+    assert len(HyperLogLog.from_bytes(second.to_bytes())) == len(second)
+
+    small = HyperLogLog(12)
+    small.update(['a', 'b', 'a', 'c'])
+    assert len(small) == 3
+    with pytest.raises(ValueError):
+        first.merge(HyperLogLog(10))
+
+def test_rollup_features_match_raw_extraction():
+    """Summing per-minute buckets gives the features of extracting from the rows."""
+    extractor = FeatureExtractor()
+    logs = make_logs()
+    rollup = LogRollup(extractor)
+    assert rollup.add_logs(logs) == len(logs)
+    assert rollup.last_log_id == 30
+
+    wifi_logs = [log for log in logs if log['process_name'] == 'hostapd']
+    from_rollup = rollup.extract_features(START, START + timedelta(minutes=10), programs=['HOSTAPD'])
+    assert without_timestamp(from_rollup) == without_timestamp(extractor.extract_wifi_features(wifi_logs))
+    assert from_rollup['unique_mac_count'] == 14
+
+    generic = rollup.extract_features(START, START + timedelta(minutes=10), kind='generic')
+    assert without_timestamp(generic) == without_timestamp(extractor.extract_generic_features(logs))
+
+    # Windows are [start, end) at minute resolution, and devices filter buckets
+    partial = rollup.extract_features(START + timedelta(minutes=2), START + timedelta(minutes=5),
+                                      programs=['hostapd'], devices=['ap-1'])
+    assert partial['auth_failures'] == 3
+    assert partial['deauth_count'] == 0
+
+def test_coverage_and_retention():
+    rollup = LogRollup(retention_minutes=5)
+    assert not rollup.covers(START, START + timedelta(minutes=5))
+    rollup.covered_since = START
+    rollup.add_logs(make_logs())
+    # Nothing is known to be complete until ingestion reaches the end of the table
+    assert not rollup.covers(START + timedelta(minutes=4), START + timedelta(minutes=9))
+    rollup.covered_until = START + timedelta(minutes=9)
+
+    stats = rollup.get_stats()
+    assert stats['minutes'] == 6
+    assert rollup.covers(START + timedelta(minutes=4), START + timedelta(minutes=9))
+    assert not rollup.covers(START, START + timedelta(minutes=9))
+    assert not rollup.covers(START + timedelta(minutes=5), START + timedelta(minutes=10))
+
+class FakeDataService:
+    """Serves logs by id, as the RollupIngestor reads them."""
+
+    def __init__(self, rollups, logs):
+        self.rollups = rollups
+        self.logs = logs
+
+    async def get_logs_by_program(self, start_time, end_time, programs):
+        return []
+
+    async def get_logs_after_id(self, last_id, limit):
+        return [log for log in self.logs if log['id'] > last_id][:limit]
+
+@pytest.mark.asyncio
+async def test_ingestion_advances_the_coverage_watermark():
+    rollup = LogRollup()
+    ingestor = RollupIngestor(FakeDataService(rollup, make_logs()), batch_size=10)
+    await ingestor.ingest()
+    backfilled_until = rollup.covered_until
+    assert rollup.covered_since < backfilled_until
+
+    assert await ingestor.ingest() == 30
+    assert rollup.covered_until > backfilled_until
+    assert rollup.covers(rollup.covered_since, rollup.covered_until)
+    assert not rollup.covers(rollup.covered_since, rollup.covered_until + timedelta(seconds=1))
+
+def test_hll_cardinality_mode_bounds_memory():
+    """unique_*_count outputs come from sketches; batch sketches merge across shards."""
+    extractor = FeatureExtractor(cardinality='hll', hll_precision=10)
+    flood = [{'process_name': 'hostapd', 'message': f"deauthentication from 02:00:{i >> 16 & 255:02x}:"
+              f"{i >> 8 & 255:02x}:{i & 255:02x}:01"} for i in range(20000)]
+    features = extractor.extract_wifi_features(flood)
+    assert abs(features['unique_mac_count'] - 20000) / 20000 < 0.1
+    assert FeatureExtractor().extract_wifi_features(flood[:50])['unique_mac_count'] == 50
+
+    first = extractor.cardinality_sketches(flood[:12000])['macs']
+    second = extractor.cardinality_sketches(flood[8000:])['macs']
+    assert abs(len(first.merge(second)) - 20000) / 20000 < 0.1
+    assert len(first.to_bytes()) == 1 + 1024
+
+    with pytest.raises(ValueError):
+        FeatureExtractor(cardinality='approximate')
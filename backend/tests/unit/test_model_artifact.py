@@ -0,0 +1,100 @@
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest
+
+from app.models.config import ModelConfig
+from app.services.model_artifact import (
+    INDEX_FILE,
+    load_mapped_model,
+    package_metadata,
+    read_model_index,
+    write_model_index
+)
+from app.services.model_validator import ModelValidator
+
+METADATA = {
+    'model_info': {'version': '1.0.0', 'model_type': 'isolation_forest', 'description': 'test'},
+    'training_info': {'feature_names': ['a', 'b', 'c'], 'n_samples': 500},
+    'evaluation_info': {'basic_metrics': {'f1_score': 0.8, 'precision': 0.8, 'recall': 0.8, 'roc_auc': 0.9}},
+    'drift_reference': {'bins': list(range(100))}
+}
+
+@pytest.fixture
+def model():
+    X = np.random.default_rng(0).normal(size=(500, 3))
+    return IsolationForest(n_estimators=25, max_features=0.67, contamination=0.05, random_state=0).fit(X)
+
+@pytest.fixture
+def package_dir(model):
+    """Create a temporary indexed model package."""
+    temp_dir = Path(tempfile.mkdtemp())
+    joblib.dump(model, temp_dir / 'model.joblib')
+    (temp_dir / 'metadata.json').write_text(json.dumps(METADATA))
+    write_model_index(temp_dir)
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+def test_index_answers_without_metadata_json(package_dir):
+    """Listing data comes from the index; bulky entries stay in metadata.json."""
+    index = read_model_index(package_dir)
+    assert index['model_type'] == 'IsolationForest'
+    assert index['feature_names'] == ['a', 'b', 'c']
+    assert index['metrics']['roc_auc'] == 0.9
+    assert set(index['file_hashes']) >= {'model.joblib', 'metadata.json', 'trees/threshold.npy'}
+    assert index['file_sizes']['model.joblib'] == (package_dir / 'model.joblib').stat().st_size
+    assert 'drift_reference' not in package_metadata(package_dir)
+
+def test_mapped_model_scores_like_the_original(package_dir, model):
+    mapped = load_mapped_model(package_dir)
+    assert isinstance(mapped.arrays['threshold'], np.memmap)
+
+    X = np.random.default_rng(1).normal(scale=2.0, size=(300, 3))
+    np.testing.assert_allclose(mapped.score_samples(X), model.score_samples(X))
+    np.testing.assert_allclose(mapped.decision_function(X), model.decision_function(X))
+    assert (mapped.predict(X) == model.predict(X)).all()
+
+def test_stale_or_corrupt_index_is_ignored(package_dir):
+    metadata = dict(METADATA, model_info={'version': '2.0.0'})
+    (package_dir / 'metadata.json').write_text(json.dumps(metadata))
+    os.utime(package_dir / 'metadata.json', ns=(1, 1))
+    assert read_model_index(package_dir) is None
+    assert load_mapped_model(package_dir) is None
+    assert package_metadata(package_dir)['model_info']['version'] == '2.0.0'
+
+    write_model_index(package_dir)
+    assert read_model_index(package_dir) is not None
+    data = bytearray((package_dir / INDEX_FILE).read_bytes())
+    data[-2] ^= 0xFF
+    (package_dir / INDEX_FILE).write_bytes(bytes(data))
+    assert read_model_index(package_dir) is None
+
+def test_rewritten_tree_arrays_invalidate_the_index(package_dir):
+    """Trees are mapped without rehashing, so a changed array file makes the index stale."""
+    assert load_mapped_model(package_dir) is not None
+    threshold = package_dir / 'trees' / 'threshold.npy'
+    np.save(threshold, np.zeros_like(np.load(threshold)))
+    os.utime(threshold, ns=(1, 1))
+    assert read_model_index(package_dir) is None
+    assert load_mapped_model(package_dir) is None
+
+    (package_dir / 'trees' / 'roots.npy').unlink()
+    write_model_index(package_dir)
+    assert load_mapped_model(package_dir) is not None
+
+@pytest.mark.asyncio
+async def test_validator_reads_the_index(package_dir, monkeypatch):
+    """An indexed package is validated without unpickling the model."""
+    monkeypatch.setattr('app.services.model_validator.joblib.load',
+                        lambda *args: pytest.fail("model was unpickled"))
+    validator = ModelValidator(ModelConfig())
+    result = await validator.validate_model_quality(str(package_dir))
+    assert result['errors'] == []
+    compatibility = await validator.validate_model_compatibility(str(package_dir), ['a', 'b', 'c'])
+    assert compatibility['is_compatible']
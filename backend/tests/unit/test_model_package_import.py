@@ -0,0 +1,96 @@
+import io
+import json
+import hashlib
+import zipfile
+import shutil
+import tempfile
+
+import pytest
+
+from app.models.config import ModelConfig
+from app.services.model_loader import ModelLoader
+
+def _build_package(files, manifest_hashes=None):
+    """Build an in-memory model package ZIP."""
+    if manifest_hashes is None:
+        manifest_hashes = {name: hashlib.sha256(data).hexdigest() for name, data in files.items()}
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, data in files.items():
+            zf.writestr(name, data)
+        zf.writestr('deployment_manifest.json', json.dumps({'file_hashes': manifest_hashes}))
+    buffer.seek(0)
+    return buffer
+
+@pytest.fixture
+def package_files():
+    """Files of a minimal model package."""
+    return {
+        'model.joblib': b'model-bytes' * 1000,
+        'metadata.json': b'{"model_type": "IsolationForest"}'
+    }
+
+@pytest.fixture
+def model_loader():
+    """Create a ModelLoader writing into a temporary directory."""
+    temp_dir = tempfile.mkdtemp()
+    config = ModelConfig()
+    config.storage.directory = temp_dir
+    yield ModelLoader(config)
+    shutil.rmtree(temp_dir)
+
+def test_extract_hashes_members(model_loader, package_files):
+    """Members are hashed while they are extracted."""
+    target_dir = model_loader.models_directory / 'extracted'
+    file_hashes = model_loader._extract_model_package_sync(_build_package(package_files), target_dir)
+
+    for name, data in package_files.items():
+        assert file_hashes[name] == hashlib.sha256(data).hexdigest()
+        assert (target_dir / name).read_bytes() == data
+    assert 'deployment_manifest.json' in file_hashes
+
+def test_extract_rejects_hash_mismatch(model_loader, package_files):
+    """A member that does not match the manifest aborts the import."""
+    package = _build_package(package_files, {'model.joblib': '0' * 64})
+    with pytest.raises(ValueError, match='Hash mismatch for model.joblib'):
+        model_loader._extract_model_package_sync(package, model_loader.models_directory / 'bad')
+
+def test_extract_rejects_invalid_manifest(model_loader, package_files):
+    """A manifest that is not JSON is rejected before extraction."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        for name, data in package_files.items():
+            zf.writestr(name, data)
+        zf.writestr('deployment_manifest.json', 'not json')
+    buffer.seek(0)
+
+    target_dir = model_loader.models_directory / 'bad'
+    with pytest.raises(ValueError, match='Invalid deployment_manifest.json'):
+        model_loader._extract_model_package_sync(buffer, target_dir)
+    assert not target_dir.exists()
+
+def test_extract_rejects_unsafe_paths(model_loader, package_files):
+    """Members escaping the target directory are rejected."""
+    package_files['../evil.txt'] = b'evil'
+    with pytest.raises(ValueError, match='Unsafe path'):
+        model_loader._extract_model_package_sync(
+            _build_package(package_files), model_loader.models_directory / 'bad'
+        )
+
+def test_extract_rejects_oversized_packages(model_loader, package_files):
+    """Packages expanding beyond the configured limit are rejected."""
+    model_loader.config.storage.max_package_size_mb = 0
+    with pytest.raises(ValueError, match='limit'):
+        model_loader._extract_model_package_sync(
+            _build_package(package_files), model_loader.models_directory / 'bad'
+        )
+
+@pytest.mark.asyncio
+async def test_process_rejects_unsafe_versions(model_loader, package_files):
+    """Versions taken from the file name cannot leave the models directory."""
+    sibling = model_loader.models_directory / 'x'
+    sibling.mkdir()
+    for filename in ('model_../../x_deployment.zip', 'model_a/../x_deployment.zip', 'model__deployment.zip'):
+        with pytest.raises(ValueError, match='Invalid model version'):
+            await model_loader.process_model_package(_build_package(package_files), filename=filename)
+    assert sibling.exists()
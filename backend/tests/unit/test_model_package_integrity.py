@@ -0,0 +1,60 @@
+import hashlib
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from app.services import model_package_integrity
+from app.services.model_package_integrity import (
+    ValidationCache,
+    calculate_file_hash,
+    hash_package_files,
+    package_fingerprint
+)
+
+@pytest.fixture
+def package_dir():
+    """Create a temporary model package directory."""
+    temp_dir = Path(tempfile.mkdtemp())
+    (temp_dir / 'metadata.json').write_text('{"model_info": {"version": "1.0.0"}}')
+    (temp_dir / 'model.joblib').write_bytes(b'\x00' * 10000)
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+def test_calculate_file_hash_matches_hashlib(package_dir):
+    """Buffered hashing matches a plain sha256 digest."""
+    path = package_dir / 'model.joblib'
+    assert calculate_file_hash(path) == hashlib.sha256(path.read_bytes()).hexdigest()
+
+def test_calculate_file_hash_mmap_path(package_dir, monkeypatch):
+    """Memory-mapped hashing matches a plain sha256 digest."""
+    monkeypatch.setattr(model_package_integrity, 'MMAP_THRESHOLD', 1)
+    path = package_dir / 'model.joblib'
+    assert calculate_file_hash(path) == hashlib.sha256(path.read_bytes()).hexdigest()
+
+def test_hash_package_files_skips_missing(package_dir):
+    """Only existing files are hashed."""
+    hashes = hash_package_files(package_dir, ['model.joblib', 'missing.txt'])
+    assert list(hashes) == ['model.joblib']
+
+def test_package_fingerprint_changes_with_content(package_dir):
+    """The fingerprint tracks file contents."""
+    before = package_fingerprint(hash_package_files(package_dir))
+    assert before == package_fingerprint(hash_package_files(package_dir))
+
+    (package_dir / 'metadata.json').write_text('{}')
+    assert before != package_fingerprint(hash_package_files(package_dir))
+
+def test_validation_cache_returns_copies():
+    """Cached results cannot be mutated by callers."""
+    cache = ValidationCache(max_entries=1)
+    cache.put('abc', 'loader', {'is_valid': True, 'warnings': []})
+
+    result = cache.get('abc', 'loader')
+    result['warnings'].append('changed')
+    assert cache.get('abc', 'loader')['warnings'] == []
+    assert cache.get('abc', 'manager') is None
+
+    cache.put('def', 'loader', {'is_valid': False})
+    assert cache.get('abc', 'loader') is None
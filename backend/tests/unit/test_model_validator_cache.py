@@ -0,0 +1,143 @@
+import json
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest
+
+from app.models.config import ModelConfig
+from app.services import model_validator
+from app.services.model_package_integrity import package_content_hash, validation_cache
+from app.services.model_validator import ModelValidator
+
+METADATA = {
+    'model_info': {'version': '1.0.0', 'model_type': 'isolation_forest', 'description': 'test',
+                   'created_at': '2024-01-01T00:00:00'},
+    'training_info': {'feature_names': ['a', 'b', 'c'], 'n_samples': 200},
+    'evaluation_info': {'basic_metrics': {'f1_score': 0.8, 'precision': 0.8, 'recall': 0.8, 'roc_auc': 0.9}}
+}
+
+@pytest.fixture
+def package_dir():
+    """Create a temporary model package without an index, so validation unpickles the model."""
+    temp_dir = Path(tempfile.mkdtemp())
+    X = np.random.default_rng(0).normal(size=(200, 3))
+    joblib.dump(IsolationForest(n_estimators=5, random_state=0).fit(X), temp_dir / 'model.joblib')
+    (temp_dir / 'metadata.json').write_text(json.dumps(METADATA))
+    (temp_dir / 'requirements.txt').write_text("# runtime\nscikit-learn==1.3.2\nnumpy\n")
+    (temp_dir / 'deployment_manifest.json').write_text(json.dumps({'deployment_ready': True}))
+    validation_cache.clear()
+    yield temp_dir
+    validation_cache.clear()
+    shutil.rmtree(temp_dir)
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Count model unpickling by the validator."""
+    calls = []
+    real_load = joblib.load
+    monkeypatch.setattr(model_validator.joblib, 'load', lambda *args: calls.append(args) or real_load(*args))
+    return calls
+
+def test_content_hash_follows_changes(package_dir):
+    first = package_content_hash(package_dir)
+    assert package_content_hash(package_dir) == first
+    (package_dir / 'README.md').write_text("notes")
+    assert package_content_hash(package_dir) != first
+
+@pytest.mark.asyncio
+async def test_repeat_validation_is_served_from_cache(package_dir, loads):
+    validator = ModelValidator(ModelConfig())
+    result = await validator.validate_model_quality(str(package_dir))
+    assert result['errors'] == []
+    assert len(loads) == 1
+
+    # A new validator (one per API request) shares the cache
+    result['errors'].append('mutated by caller')
+    again = await ModelValidator(ModelConfig()).validate_model_quality(str(package_dir))
+    assert again['errors'] == []
+    assert len(loads) == 1
+
+    metadata = dict(METADATA, evaluation_info={'basic_metrics': {'f1_score': 0.1}})
+    (package_dir / 'metadata.json').write_text(json.dumps(metadata))
+    changed = await validator.validate_model_quality(str(package_dir))
+    assert "F1 score below acceptable threshold (0.5)" in changed['errors']
+    assert len(loads) == 2
+
+@pytest.mark.asyncio
+async def test_checks_run_concurrently(package_dir, monkeypatch):
+    """All five checks are in flight at once, so none waits on another."""
+    barrier = threading.Barrier(5, timeout=5)
+
+    def waiting(check):
+        return lambda self, argument: (barrier.wait(), check(self, argument))[1]
+
+    for name in ('_check_model_structure', '_validate_performance_metrics', '_validate_feature_compatibility',
+                 '_validate_model_age', '_validate_package_structure'):
+        monkeypatch.setattr(ModelValidator, name, waiting(getattr(ModelValidator, name)))
+    result = await ModelValidator(ModelConfig()).validate_model_quality(str(package_dir))
+    assert result['errors'] == []
+
+@pytest.mark.asyncio
+async def test_report_reads_package_once_and_is_cached(package_dir, loads):
+    validator = ModelValidator(ModelConfig())
+    report = await validator.generate_validation_report(str(package_dir))
+    details = report['package_info']['model_details']
+    assert details['algorithm'] == 'IsolationForest'
+    assert (details['framework'], details['framework_version']) == ('scikit-learn', '1.3.2')
+    assert report['package_info']['deployment_info']['deployment_ready'] is True
+    assert report['package_info']['deployment_info']['environment_dependencies'] == ['scikit-learn==1.3.2', 'numpy']
+    assert report['package_structure']['file_sizes']['requirements.txt'] == len("# runtime\nscikit-learn==1.3.2\nnumpy\n")
+    assert report['validation_summary']['is_valid']
+    # Structure check and algorithm lookup
+    assert len(loads) == 2
+
+    again = await validator.generate_validation_report(str(package_dir))
+    assert again == report
+    assert len(loads) == 2
+
+    compatibility = await validator.validate_model_compatibility(str(package_dir), ['a', 'b', 'x'])
+    assert compatibility['missing_features'] == ['x']
+    assert (await validator.validate_model_compatibility(str(package_dir), ['a']))['is_compatible']
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached(package_dir, monkeypatch):
+    """A transient error is retried on the next call for the same package."""
+    def unreadable(model_dir):
+        raise OSError("temporarily unavailable")
+
+    monkeypatch.setattr(model_validator, 'package_metadata', unreadable)
+    validator = ModelValidator(ModelConfig())
+    assert not (await validator.validate_model_quality(str(package_dir)))['is_valid']
+
+    monkeypatch.undo()
+    assert (await validator.validate_model_quality(str(package_dir)))['is_valid']
+
+@pytest.mark.asyncio
+async def test_reports_on_failed_validation_are_not_cached(package_dir, monkeypatch):
+    """The package is fingerprinted once per report, and a failed check is retried."""
+    fingerprints = []
+    real_hash = model_validator.package_content_hash
+    monkeypatch.setattr(model_validator, 'package_content_hash',
+                        lambda model_dir: fingerprints.append(model_dir) or real_hash(model_dir))
+    real_check = ModelValidator._check_model_structure
+
+    def unreadable(self, model_dir):
+        raise OSError("temporarily unavailable")
+
+    monkeypatch.setattr(ModelValidator, '_check_model_structure', unreadable)
+    validator = ModelValidator(ModelConfig())
+    failed = await validator.generate_validation_report(str(package_dir))
+    assert failed['validation_summary']['error'] == "temporarily unavailable"
+    assert not failed['validation_summary']['is_valid']
+    assert len(fingerprints) == 1
+
+    monkeypatch.setattr(ModelValidator, '_check_model_structure', real_check)
+    report = await validator.generate_validation_report(str(package_dir))
+    assert report['validation_summary']['is_valid']
+    assert 'error' not in report['validation_summary']
+    assert len(fingerprints) == 2
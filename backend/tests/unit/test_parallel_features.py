@@ -0,0 +1,45 @@
+import pytest
+
+from app.components.feature_extractor import FeatureExtractor
+from app.components.parallel_features import ParallelFeatureExtractor, SharedLogColumns, extract_partition
+
+def make_logs(count):
+    programs = ['hostapd', 'wpa_supplicant', 'sshd']
+    return [
+        {'process_name': programs[i % 3], 'host': f'ap-{i % 4}', 'template_id': i % 5 if i % 2 else None,
+         'message': f"deauthentication from aa:bb:cc:00:{i % 256:02x}:{i % 7:02x} SSID='net{i % 3}' reason={i % 4} ü"}
+        for i in range(count)
+    ]
+
+def without_timestamp(features):
+    return {key: value for key, value in features.items() if key != 'timestamp'}
+
+def test_partitions_read_shared_columns():
+    """Workers rebuild their rows from the shared block; partial buckets merge to the serial result."""
+    logs = make_logs(500)
+    extractor = FeatureExtractor()
+    with SharedLogColumns(logs) as columns:
+        assert columns.programs == ['hostapd', 'wpa_supplicant', 'sshd']
+        parts = ParallelFeatureExtractor(max_workers=3).partitions(len(logs))
+        assert parts == [(0, 166), (166, 333), (333, 500)]
+        buckets = [extract_partition(columns.handle, start, end, 'wifi', 'exact', 12) for start, end in parts]
+
+    total = buckets[0]
+    for bucket in buckets[1:]:
+        total.merge(bucket)
+    assert (without_timestamp(extractor.features_from_rollup(total, 'wifi'))
+            == without_timestamp(extractor.extract_wifi_features(logs)))
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('cardinality', ['exact', 'hll'])
+async def test_process_pool_matches_serial_extraction(cardinality):
+    extractor = FeatureExtractor(cardinality)
+    logs = make_logs(3000)
+    parallel = ParallelFeatureExtractor(max_workers=2, min_batch_size=1000)
+    try:
+        features = await parallel.extract_features(logs, extractor)
+        small = await parallel.extract_features(logs[:10], extractor)
+    finally:
+        parallel.shutdown()
+    assert without_timestamp(features) == without_timestamp(extractor.extract_features(logs))
+    assert small['program_counts'] == {'hostapd': 4, 'wpa_supplicant': 3, 'sshd': 3}
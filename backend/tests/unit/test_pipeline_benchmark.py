@@ -0,0 +1,45 @@
+import copy
+from datetime import datetime
+
+import pytest
+
+from tests.performance.pipeline_benchmark import (
+    PipelineBenchmark, SQLiteLogStore, compare_to_baseline, generate_corpus
+)
+
+@pytest.fixture
+def store():
+    """A small two-hour corpus with injected attacks."""
+    log_store = SQLiteLogStore()
+    log_store.load(generate_corpus(2000, datetime(2025, 1, 1), hours=2))
+    return log_store
+
+def test_store_filters_like_data_service(store):
+    start, end = store.time_range()
+    logs = store.fetch(start, end, ['HOSTAPD'])
+    assert logs
+    assert all(log['process_name'] == 'hostapd' for log in logs)
+    assert logs[0]['timestamp'] >= logs[-1]['timestamp']
+    assert isinstance(logs[0]['timestamp'], datetime)
+
+@pytest.mark.asyncio
+async def test_report_covers_stages_per_agent(store):
+    """Each agent reports cycle and stage timings from the real pipeline code."""
+    benchmark = PipelineBenchmark(store, window_minutes=5, repeats=1)
+    report = await benchmark.run(['ml_wifi', 'rule_based', 'log_level'])
+
+    wifi = report['agents']['ml_wifi']
+    assert wifi['rows'] > 0
+    assert {'fetch', 'parse', 'featurize', 'score'} <= set(wifi['stages'])
+    assert wifi['peak_memory_mb'] > 0
+    assert wifi['cycle']['p95_ms'] >= wifi['cycle']['p50_ms']
+
+    rules = report['agents']['rule_based']
+    assert rules['anomalies'] > 0
+    assert 'anomalies_per_second' in rules['stages']['persist']
+    assert report['agents']['log_level']['rows'] >= store.count()
+
+    slower = copy.deepcopy(report)
+    slower['agents']['ml_wifi']['rows_per_second'] /= 3
+    assert compare_to_baseline(report, report) == []
+    assert [line.split(':')[0] for line in compare_to_baseline(slower, report)] == ['ml_wifi rows_per_second']
@@ -0,0 +1,49 @@
+import pytest
+from prometheus_client import CollectorRegistry
+
+from app.components.pipeline_monitor import PipelineMonitor
+
+@pytest.fixture
+def monitor():
+    """Pipeline monitor on a private registry."""
+    registry = CollectorRegistry()
+    return PipelineMonitor(registry), registry
+
+@pytest.mark.asyncio
+async def test_cycle_labels_stages_with_agent(monitor):
+    """Stages and backend calls inside a cycle are labelled with its agent."""
+    pipeline, registry = monitor
+
+    @pipeline.timed('fetch')
+    async def fetch():
+        pipeline.count_call('postgres', 'fetch_logs')
+        pipeline.record_rows(42)
+        return []
+
+    with pipeline.cycle('agent-1', interval=300):
+        await fetch()
+        pipeline.record_anomalies(3)
+
+    labels = {'agent': 'agent-1'}
+    assert registry.get_sample_value(
+        'mcp_pipeline_stage_seconds_count', {'agent': 'agent-1', 'stage': 'fetch'}) == 1
+    assert registry.get_sample_value('mcp_pipeline_cycle_rows_sum', labels) == 42
+    assert registry.get_sample_value('mcp_pipeline_cycle_anomalies_sum', labels) == 3
+    assert registry.get_sample_value(
+        'mcp_pipeline_backend_calls_total',
+        {'backend': 'postgres', 'operation': 'fetch_logs', 'agent': 'agent-1'}) == 1
+
+def test_stage_outside_cycle_and_errors(monitor):
+    """Work outside a cycle is labelled 'none'; failing cycles are counted."""
+    pipeline, registry = monitor
+
+    with pipeline.stage('score'):
+        pass
+    with pytest.raises(RuntimeError):
+        with pipeline.cycle('agent-2', interval=300):
+            raise RuntimeError("boom")
+
+    assert registry.get_sample_value(
+        'mcp_pipeline_stage_seconds_count', {'agent': 'none', 'stage': 'score'}) == 1
+    assert registry.get_sample_value('mcp_pipeline_cycle_errors_total', {'agent': 'agent-2'}) == 1
+    assert registry.get_sample_value('mcp_pipeline_cycle_seconds_count', {'agent': 'agent-2'}) == 1
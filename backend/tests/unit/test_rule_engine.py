@@ -0,0 +1,31 @@
+from app.mcp_service.components.rule_engine import CompiledRules, PatternSet
+
+def test_pattern_set_combines_and_keeps_grouped_patterns_separate():
+    """Plain patterns share one regex; grouped or flagged ones still match."""
+    patterns = PatternSet([r'timeout', r'disk \d+% full', r'(\w+)=\1', r'(?i)PANIC'])
+    assert patterns._combined is not None
+    assert len(patterns._separate) == 2
+
+    assert patterns.search('connection timeout')
+    assert patterns.search('disk 95% full')
+    assert patterns.search('a=a')
+    assert patterns.search('kernel panic')
+    assert not patterns.search('all good')
+
+def test_compiled_rules_filter_batch():
+    """Levels, excludes and includes are applied together, case-insensitively."""
+    rules = CompiledRules(['ERROR', 'critical'], include_patterns=['fail'], exclude_patterns=['ignored'])
+    logs = [
+        {'log_level': 'error', 'message': 'Login FAILED'},
+        {'level': 'CRITICAL', 'message': 'fail: ignored by policy'},
+        {'level': 'info', 'message': 'failover'},
+        {'level': 'error', 'message': None},
+        {'level': 'critical', 'message': 'service failure'}
+    ]
+    assert rules.filter(logs) == [logs[0], logs[4]]
+    assert [rules.matches(log) for log in logs] == [True, False, False, False, True]
+
+def test_compiled_rules_without_include_patterns_accept_all_messages():
+    """No include patterns means every non-excluded message passes."""
+    rules = CompiledRules(['error'])
+    assert rules.filter([{'level': 'error'}, {'level': 'warning'}]) == [{'level': 'error'}]
@@ -0,0 +1,90 @@
+import json
+from unittest.mock import MagicMock
+
+from app.mcp_service.components.template_miner import TemplateMiner, mask_variables
+
+def test_mask_variables():
+    """Numbers, addresses and hex values are masked."""
+    assert (mask_variables('Failed for 10.0.0.7:22 from aa:bb:cc:dd:ee:ff code 0x1f after 3.5s')
+            == 'Failed for <*> from <*> code <*> after <*>s')
+
+def test_similar_messages_share_a_template():
+    """Messages differing in a few tokens merge; parameters are extracted."""
+    miner = TemplateMiner()
+    first_id, _ = miner.add_log_message('Accepted password for alice from 10.0.0.1 port 22')
+    second_id, params = miner.add_log_message('Accepted password for bob from 10.0.0.2 port 2222')
+    other_id, _ = miner.add_log_message('Connection closed by authenticating user root')
+
+    assert first_id == second_id != other_id
+    assert miner.get_template(first_id) == 'Accepted password for <*> from <*> port <*>'
+    assert params == ['bob', '10.0.0.2', '2222']
+    assert miner.match('Accepted password for carol from 10.0.0.3 port 22') == first_id
+
+def test_annotate_tags_logs():
+    """Batches get template ids and parameters per log."""
+    miner = TemplateMiner()
+    logs = miner.annotate([{'message': 'disk 91% full'}, {'message': 'disk 97% full'}, {}])
+    assert logs[0]['template_id'] == logs[1]['template_id'] != logs[2]['template_id']
+    assert logs[1]['template_params'] == ['97%']
+
+def test_templates_are_shared_through_redis():
+    """Ids come from a shared counter and templates load into new miners."""
+    store, counter = {}, {'value': 0}
+    redis_client = MagicMock()
+
+    def incrby(key, amount):
+        counter['value'] += amount
+        return counter['value']
+
+    redis_client.incrby.side_effect = incrby
+    redis_client.hset.side_effect = lambda key, mapping: store.update(mapping)
+    redis_client.hgetall.side_effect = lambda key: dict(store)
+
+    writer = TemplateMiner(redis_client=redis_client)
+    template_id, _ = writer.add_log_message('user admin logged in')
+    writer.save()
+    assert json.loads(store[str(template_id)])['tokens'] == ['user', 'admin', 'logged', 'in']
+
+    reader = TemplateMiner(redis_client=redis_client)
+    assert reader.match('user admin logged in') == template_id
+
+def test_ids_are_reserved_in_blocks():
+    """One INCRBY covers many new templates; replicas get disjoint ids."""
+    counter = {'value': 0}
+    redis_client = MagicMock()
+
+    def incrby(key, amount):
+        counter['value'] += amount
+        return counter['value']
+
+    redis_client.incrby.side_effect = incrby
+    redis_client.hgetall.return_value = {}
+
+    first = TemplateMiner(redis_client=redis_client, id_block_size=10)
+    second = TemplateMiner(redis_client=redis_client, id_block_size=10)
+    first_ids = [first.add_log_message(f'event {word} happened')[0] for word in 'abc']
+    second_ids = [second.add_log_message(f'{word} went wrong')[0] for word in 'abc']
+
+    assert first_ids == [1, 2, 3]
+    assert second_ids == [11, 12, 13]
+    assert redis_client.incrby.call_count == 2
+
+def test_redis_is_skipped_after_a_failure_until_reload():
+    """A Redis error switches to local ids without retrying on every template."""
+    redis_client = MagicMock()
+    redis_client.hgetall.return_value = {}
+    redis_client.incrby.side_effect = ConnectionError('down')
+    miner = TemplateMiner(redis_client=redis_client)
+
+    logs = miner.annotate([{'message': 'alpha beta'}, {'message': 'gamma delta epsilon'}])
+
+    assert all(log['template_id'] >= 1_000_000_000 for log in logs)
+    assert redis_client.incrby.call_count == 1
+    redis_client.hset.assert_not_called()
+
+    redis_client.incrby.side_effect = None
+    redis_client.incrby.return_value = 100
+    miner.reload()
+    miner.save()
+    assert redis_client.hset.call_count == 1
+    assert miner.add_log_message('brand new message here')[0] == 1
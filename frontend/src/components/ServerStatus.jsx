@@ -2,12 +2,22 @@ import { useState, useEffect } from 'react';
 import { Card, Table, Badge, Spinner, Alert } from 'react-bootstrap';
 import { FaServer, FaCheckCircle, FaTimesCircle, FaExclamationTriangle } from 'react-icons/fa';
 import { fetchServerStatus } from '../services/api';
+import { useServerEvents } from '../hooks/useServerEvents';
 
 function ServerStatus() {
   const [serverStatus, setServerStatus] = useState(null);
   const [error, setError] = useState(null);
   const [loading, setLoading] = useState(true);
 
+  // Health samples are pushed as they are taken
+  const streamConnected = useServerEvents({
+    server_status: (event) => {
+      setServerStatus(event.data);
+      setError(null);
+      setLoading(false);
+    }
+  });
+
   useEffect(() => {
     const fetchData = async () => {
       try {
@@ -22,9 +32,10 @@ function ServerStatus() {
     };
 
     fetchData();
-    const interval = setInterval(fetchData, 30000); // Refresh every 30 seconds
+    if (streamConnected) return undefined;
+    const interval = setInterval(fetchData, 30000); // Poll every 30 seconds only without the event stream
     return () => clearInterval(interval);
-  }, []);
+  }, [streamConnected]);
 
   if (loading) {
     return (
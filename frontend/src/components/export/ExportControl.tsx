@@ -203,9 +203,9 @@ const ExportControl: React.FC<ExportControlProps> = () => {
           rules={[{ required: true, message: 'Please select validation level' }]}
         >
           <Select>
+            <Select.Option value="none">None</Select.Option>
             <Select.Option value="basic">Basic</Select.Option>
-            <Select.Option value="strict">Strict</Select.Option>
-            <Select.Option value="custom">Custom</Select.Option>
+            <Select.Option value="full">Full</Select.Option>
           </Select>
         </Form.Item>
 
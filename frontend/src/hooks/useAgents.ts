@@ -1,11 +1,31 @@
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { toast } from 'react-hot-toast';
 import { endpoints } from '../services/api';
+import { useServerEvents } from './useServerEvents';
 import type { Agent, AgentModelRequest, AvailableModel, AgentActionResponse, AgentDetailedInfo } from '../services/types';
 
 export const useAgents = () => {
   const queryClient = useQueryClient();
 
+  // Apply pushed status changes to the cached list instead of polling
+  const streamConnected = useServerEvents({
+    agent_status: (event) => {
+      const current = queryClient.getQueryData<Agent[]>(['agents']);
+      if (current && !current.some(agent => agent.id === event.data.id)) {
+        queryClient.invalidateQueries({ queryKey: ['agents'] });
+        return;
+      }
+      queryClient.setQueryData<Agent[]>(['agents'], (agents) =>
+        agents?.map(agent => (agent.id === event.data.id ? { ...agent, ...event.data } : agent))
+      );
+    },
+    agent_removed: (event) => {
+      queryClient.setQueryData<Agent[]>(['agents'], (agents) =>
+        agents?.filter(agent => agent.id !== event.data.id)
+      );
+    }
+  });
+
   // Query for listing agents
   const {
     data: agents = [],
@@ -15,7 +35,7 @@ export const useAgents = () => {
   } = useQuery({
     queryKey: ['agents'],
     queryFn: endpoints.listAgents,
-    refetchInterval: 30000, // Refetch every 30 seconds
+    refetchInterval: streamConnected ? false : 30000, // Poll every 30 seconds only without the event stream
     staleTime: 10000 // Consider data stale after 10 seconds
   });
 
@@ -162,6 +182,13 @@ export const useAgents = () => {
 export const useAgent = (agentId: string) => {
   const queryClient = useQueryClient();
 
+  const streamConnected = useServerEvents({
+    agent_status: (event) => {
+      if (event.data.id !== agentId) return;
+      queryClient.setQueryData<Agent>(['agent', agentId], (agent) => (agent ? { ...agent, ...event.data } : agent));
+    }
+  });
+
   const {
     data: agent,
     isLoading,
@@ -171,7 +198,7 @@ export const useAgent = (agentId: string) => {
     queryKey: ['agent', agentId],
     queryFn: () => endpoints.getAgent(agentId),
     enabled: !!agentId,
-    refetchInterval: 30000, // Refetch every 30 seconds
+    refetchInterval: streamConnected ? false : 30000, // Poll every 30 seconds only without the event stream
     staleTime: 10000 // Consider data stale after 10 seconds
   });
 
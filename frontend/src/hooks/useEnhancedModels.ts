@@ -1,6 +1,7 @@
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { toast } from 'react-hot-toast';
 import { endpoints } from '../services/api';
+import { useServerEvents } from './useServerEvents';
 import type { 
   ModelValidationResult,
   ModelPerformanceMetrics,
@@ -11,17 +12,26 @@ import type {
 export const useEnhancedModels = () => {
   const queryClient = useQueryClient();
 
+  // Refetch once per pushed model change instead of on a timer
+  const streamConnected = useServerEvents({
+    model_registry: () => {
+      queryClient.invalidateQueries({ queryKey: ['enhanced-models'] });
+      queryClient.invalidateQueries({ queryKey: ['transfer-history'] });
+    },
+    model_status: () => queryClient.invalidateQueries({ queryKey: ['enhanced-models'] })
+  });
+
   // Queries
   const modelsQuery = useQuery({
     queryKey: ['enhanced-models'],
     queryFn: () => endpoints.listEnhancedModels(),
-    refetchInterval: 30000,
+    refetchInterval: streamConnected ? false : 30000,
   });
 
   const transferHistoryQuery = useQuery({
     queryKey: ['transfer-history'],
     queryFn: () => endpoints.getTransferHistory(),
-    refetchInterval: 60000,
+    refetchInterval: streamConnected ? false : 60000,
   });
 
   const allPerformanceQuery = useQuery({
@@ -0,0 +1,35 @@
+import { useEffect, useRef, useState } from 'react';
+import {
+  subscribeToEvents,
+  onEventStreamConnectionChange,
+  isEventStreamConnected
+} from '../services/events';
+import type { ServerEvent } from '../services/events';
+
+/**
+ * Subscribe to server-pushed events by type.
+ *
+ * Returns whether the stream is connected, so queries can stop polling
+ * while pushed updates are arriving and fall back to polling otherwise.
+ */
+export const useServerEvents = (handlers: Record<string, (event: ServerEvent) => void>): boolean => {
+  const [connected, setConnected] = useState(isEventStreamConnected());
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+  const types = Object.keys(handlers).sort().join(',');
+
+  useEffect(() => {
+    const unsubscribers = types
+      .split(',')
+      .filter(Boolean)
+      .map(type => subscribeToEvents(type, event => handlersRef.current[type]?.(event)));
+    const stopListening = onEventStreamConnectionChange(setConnected);
+    setConnected(isEventStreamConnected());
+    return () => {
+      unsubscribers.forEach(unsubscribe => unsubscribe());
+      stopListening();
+    };
+  }, [types]);
+
+  return connected;
+};
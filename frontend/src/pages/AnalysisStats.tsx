@@ -1,8 +1,9 @@
 import React, { useState, useEffect } from 'react';
 import { Card, Row, Col, Badge, Table, Spinner, Alert, ProgressBar } from 'react-bootstrap';
 import { FaChartLine, FaEye, FaClock, FaExclamationTriangle, FaCheckCircle, FaServer } from 'react-icons/fa';
-import { useQuery } from '@tanstack/react-query';
+import { useQuery, useQueryClient } from '@tanstack/react-query';
 import { endpoints } from '../services/api';
+import { useServerEvents } from '../hooks/useServerEvents';
 import type { Agent } from '../services/types';
 
 interface AnalysisStats {
@@ -39,12 +40,21 @@ interface AnalysisOverview {
 
 const AnalysisStats: React.FC = () => {
   const [selectedAgent, setSelectedAgent] = useState<string | null>(null);
+  const queryClient = useQueryClient();
+
+  // Agents publish their status around every analysis cycle; refetch once per change
+  const streamConnected = useServerEvents({
+    agent_status: (event) => {
+      queryClient.invalidateQueries({ queryKey: ['analysis-overview'] }, { cancelRefetch: false });
+      queryClient.invalidateQueries({ queryKey: ['agent-stats', event.data.id] }, { cancelRefetch: false });
+    }
+  });
 
   // Fetch analysis overview
   const { data: overview, isLoading: overviewLoading, error: overviewError } = useQuery<AnalysisOverview>({
     queryKey: ['analysis-overview'],
     queryFn: () => endpoints.getAnalysisOverview(),
-    refetchInterval: 30000, // Refresh every 30 seconds
+    refetchInterval: streamConnected ? false : 30000, // Poll every 30 seconds only without the event stream
   });
 
   // Fetch specific agent stats
@@ -52,7 +62,7 @@ const AnalysisStats: React.FC = () => {
     queryKey: ['agent-stats', selectedAgent],
     queryFn: () => endpoints.getAgentStats(selectedAgent!),
     enabled: !!selectedAgent,
-    refetchInterval: 30000,
+    refetchInterval: streamConnected ? false : 30000,
   });
 
   const formatDuration = (seconds: number): string => {
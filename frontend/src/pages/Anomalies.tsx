@@ -7,6 +7,7 @@ import type { Anomaly, Agent, AnomalyTestRequest, AnomalyTestResponse } from '..
 import TabbedLayout from '../components/common/TabbedLayout';
 import type { TabItem } from '../components/common/types';
 import { useAgents } from '../hooks/useAgents';
+import { useServerEvents } from '../hooks/useServerEvents';
 import { toast } from 'react-hot-toast';
 
 const Anomalies: React.FC = () => {
@@ -18,14 +19,20 @@ const Anomalies: React.FC = () => {
   });
   const [testResults, setTestResults] = useState<AnomalyTestResponse | null>(null);
 
+  const queryClient = useQueryClient();
+
+  // Refetch when anomalies are stored; a burst shares one in-flight request
+  const streamConnected = useServerEvents({
+    anomaly: () => queryClient.invalidateQueries({ queryKey: ['anomalies'] }, { cancelRefetch: false })
+  });
+
   const { data: anomalies, isLoading, error, refetch } = useQuery<Anomaly[]>({
     queryKey: ['anomalies'],
     queryFn: () => endpoints.getAnomalies(),
-    refetchInterval: 30000, // Refresh every 30 seconds
+    refetchInterval: streamConnected ? false : 30000, // Poll every 30 seconds only without the event stream
   });
 
   const { agents, isLoading: isLoadingAgents } = useAgents();
-  const queryClient = useQueryClient();
 
   // Anomaly test mutation
   const runAnomalyTestMutation = useMutation({
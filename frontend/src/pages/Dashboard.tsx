@@ -1,11 +1,17 @@
 import React from "react";
-import { useQuery } from "@tanstack/react-query";
+import { useQuery, useQueryClient } from "@tanstack/react-query";
 import StatusPanel from "../components/dashboard/StatusPanel";
 import { Card } from "react-bootstrap";
 import { endpoints } from "../services/api";
+import { useServerEvents } from "../hooks/useServerEvents";
 import type { DashboardData } from "../services/types";
 
 const Dashboard: React.FC = () => {
+  const queryClient = useQueryClient();
+  useServerEvents({
+    dashboard: (event) => queryClient.setQueryData<DashboardData>(["dashboard"], event.data)
+  });
+
   const { data, isLoading, error } = useQuery<DashboardData>({
     queryKey: ["dashboard"],
     queryFn: () => endpoints.getDashboardData()
@@ -1,17 +1,23 @@
 import React from 'react';
-import { useQuery } from '@tanstack/react-query';
+import { useQuery, useQueryClient } from '@tanstack/react-query';
 import { Card, Row, Col, ProgressBar, Table, Badge, Spinner, Alert } from 'react-bootstrap';
 import { FaServer, FaMemory, FaHdd, FaCogs, FaExclamationTriangle, FaChartLine, FaList, FaDesktop } from 'react-icons/fa';
 import { endpoints } from '../services/api';
+import { useServerEvents } from '../hooks/useServerEvents';
 import type { ServerStatus } from '../services/types';
 import TabbedLayout from '../components/common/TabbedLayout';
 import type { TabItem } from '../components/common/types';
 
 const ServerStatusPage: React.FC = () => {
+  const queryClient = useQueryClient();
+  const streamConnected = useServerEvents({
+    server_status: (event) => queryClient.setQueryData<ServerStatus>(['serverStatus'], event.data)
+  });
+
   const { data: status, isLoading, error } = useQuery<ServerStatus>({
     queryKey: ['serverStatus'],
     queryFn: () => endpoints.getServerStatus(),
-    refetchInterval: 5000, // Refresh every 5 seconds
+    refetchInterval: streamConnected ? false : 5000, // Poll every 5 seconds only without the event stream
   });
 
   if (isLoading) {
@@ -415,8 +415,23 @@ export const endpoints = {
     return api.get('/agents/configs/templates').then(res => res.data);
   },
 
-  runAnomalyTest: (testRequest: AnomalyTestRequest) => {
+  runAnomalyTest: async (testRequest: AnomalyTestRequest) => {
     console.log("Running anomaly test:", testRequest);
-    return api.post<AnomalyTestResponse>("/agents/anomaly-test", testRequest).then(res => res.data);
+    // The test runs as a background job; poll until it finishes
+    let job = (await api.post<AnomalyTestResponse>("/agents/anomaly-test", testRequest)).data;
+    while (job.status === 'queued' || job.status === 'running') {
+      await new Promise(resolve => setTimeout(resolve, 2000));
+      job = await endpoints.getAnomalyTest(job.test_id);
+    }
+    return job;
+  },
+
+  getAnomalyTest: (testId: string) => {
+    return api.get<AnomalyTestResponse>(`/agents/anomaly-test/${testId}`).then(res => res.data);
+  },
+
+  cancelAnomalyTest: (testId: string) => {
+    console.log("Cancelling anomaly test:", testId);
+    return api.post<AnomalyTestResponse>(`/agents/anomaly-test/${testId}/cancel`).then(res => res.data);
   }
 };
\ No newline at end of file
@@ -0,0 +1,96 @@
+// One server-sent event stream per tab, shared by every subscriber.
+const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || "/api/v1";
+const REOPEN_DELAY_MS = 5000;
+
+export interface ServerEvent<T = any> {
+  type: string;
+  data: T;
+  timestamp: string;
+}
+
+type EventHandler = (event: ServerEvent) => void;
+type ConnectionListener = (connected: boolean) => void;
+
+const handlers = new Map<string, Set<EventHandler>>();
+const sourceListeners = new Map<string, EventListener>();
+const connectionListeners = new Set<ConnectionListener>();
+let source: EventSource | null = null;
+let reopenTimer: ReturnType<typeof setTimeout> | null = null;
+let connected = false;
+
+const setConnected = (value: boolean) => {
+  if (connected === value) return;
+  connected = value;
+  connectionListeners.forEach(listener => listener(value));
+};
+
+const attach = (type: string) => {
+  if (!source || sourceListeners.has(type)) return;
+  const listener = (message: Event) => {
+    try {
+      const event: ServerEvent = JSON.parse((message as MessageEvent).data);
+      handlers.get(type)?.forEach(handler => handler(event));
+    } catch (error) {
+      console.error(`Invalid ${type} event:`, error);
+    }
+  };
+  sourceListeners.set(type, listener);
+  source.addEventListener(type, listener);
+};
+
+const open = () => {
+  const stream = new EventSource(`${API_BASE_URL}/events`);
+  source = stream;
+  stream.onopen = () => setConnected(true);
+  stream.onerror = () => {
+    // EventSource reconnects by itself after a dropped stream; callers poll until it does
+    setConnected(false);
+    // A refused stream (503 while the server has no event subscription) is not retried
+    if (stream.readyState === EventSource.CLOSED && source === stream) {
+      source = null;
+      sourceListeners.clear();
+      reopenTimer = setTimeout(() => {
+        reopenTimer = null;
+        if (!source && handlers.size > 0) open();
+      }, REOPEN_DELAY_MS);
+    }
+  };
+  handlers.forEach((_, type) => attach(type));
+};
+
+const close = () => {
+  if (reopenTimer) clearTimeout(reopenTimer);
+  reopenTimer = null;
+  source?.close();
+  source = null;
+  sourceListeners.clear();
+  setConnected(false);
+};
+
+export const subscribeToEvents = (type: string, handler: EventHandler): (() => void) => {
+  if (!handlers.has(type)) handlers.set(type, new Set());
+  handlers.get(type)!.add(handler);
+  if (!source) open();
+  attach(type);
+
+  return () => {
+    const typeHandlers = handlers.get(type);
+    typeHandlers?.delete(handler);
+    if (typeHandlers && typeHandlers.size === 0) {
+      handlers.delete(type);
+      const listener = sourceListeners.get(type);
+      if (listener) source?.removeEventListener(type, listener);
+      sourceListeners.delete(type);
+    }
+    if (handlers.size === 0) close();
+  };
+};
+
+export const onEventStreamConnectionChange = (listener: ConnectionListener): (() => void) => {
+  connectionListeners.add(listener);
+  return () => {
+    connectionListeners.delete(listener);
+  };
+};
+
+export const isEventStreamConnected = () => connected;
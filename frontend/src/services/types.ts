@@ -518,6 +518,8 @@ export interface AnomalyTestRequest {
   days_back: number;
   start_date?: string;
   end_date?: string;
+  chunk_hours?: number;
+  store_anomalies?: boolean;
 }
 
 export interface AnomalyTestResponse {
@@ -538,6 +540,11 @@ export interface AnomalyTestResponse {
     source_log: any;
   }>;
   errors: string[];
+  progress?: {
+    chunks_done: number;
+    chunks_total: number;
+    percentage: number;
+  };
 }
 
 // End of types file - DatabaseConfig and DatabaseTestResult are exported above
\ No newline at end of file